@@ -1,7 +1,7 @@
 from django.contrib import admin, messages
 from django.contrib.auth.models import User
 from django.db.models import Prefetch, Index
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from django.utils import timezone
@@ -31,6 +31,8 @@ from .models import (
     FantasyTrade,
     FantasyMatchEvent,
     FantasyStats,
+    StatsJob,
+    SquadMembership,
 )
 
 from .forms import CSVUploadForm
@@ -39,7 +41,9 @@ from io import TextIOWrapper
 from django.db.models import Q, Avg, F
 from decimal import Decimal, ROUND_HALF_UP
 from .services.stats_service import update_fantasy_stats
+from .services.stats_job_service import retry_failed_jobs, submit_stats_jobs
 from .services.player_replacement_service import apply_ruled_out_replacement
+from .services.player_aggregates import batched_refresh
 
 import logging
 _logger = logging.getLogger(__name__)
@@ -370,6 +374,8 @@ class IPLMatchAdmin(admin.ModelAdmin):
             return f"{obj.stage} - {team_1} vs {team_2}"
     formatted_match.short_description = "Match"
 
+    # Aggregates for the rescored player events are refreshed once, after the boost rewrite
+    @batched_refresh()
     def save_model(self, request, obj, form, change):
         # Track if player_of_match was changed
         player_of_match_changed = False
@@ -454,6 +460,7 @@ class IPLMatchAdmin(admin.ModelAdmin):
                 
                 # Update each fantasy player event
                 affected_squad_ids = set()
+                updated_fantasy_events = []
                 for fantasy_event in affected_fantasy_events:
                     # Get the fresh event from our refreshed list
                     ipl_event = next((e for e in refreshed_ipl_events if e.id == fantasy_event.match_event_id), None)
@@ -462,11 +469,13 @@ class IPLMatchAdmin(admin.ModelAdmin):
                     
                     # Recalculate boost points with the updated base points
                     fantasy_event.boost_points = service._calculate_boost_points(ipl_event, fantasy_event.boost)
-                    fantasy_event.save()
+                    updated_fantasy_events.append(fantasy_event)
                     
                     print(f"Fantasy Event: Boost points changed from {old_boost} to {fantasy_event.boost_points}")
                     
                     affected_squad_ids.add(fantasy_event.fantasy_squad_id)
+                service.boost_memo.flush()
+                FantasyPlayerEvent.objects.bulk_update(updated_fantasy_events, ['boost_points'], batch_size=1000)
                 
                 # Update all fantasy match events for affected squads
                 for squad_id in affected_squad_ids:
@@ -543,17 +552,12 @@ class IPLMatchAdmin(admin.ModelAdmin):
                     
                     print(f"Updated FantasySquad {squad.name} total points: {old_total} -> {total_points}")
 
-                # Recalculate cached league stats after POTM-driven point changes.
+                # Queue a rebuild of cached league stats after POTM-driven point changes.
                 from api.models import FantasyLeague
-                from api.services.stats_service import update_fantasy_stats
-                league_ids = FantasyLeague.objects.filter(
+                league_ids = list(FantasyLeague.objects.filter(
                     season_id=obj.season_id
-                ).values_list('id', flat=True)
-                for league_id in league_ids:
-                    try:
-                        update_fantasy_stats(league_id)
-                    except Exception as e:
-                        print(f"Failed to update fantasy stats for league {league_id}: {e}")
+                ).values_list('id', flat=True))
+                transaction.on_commit(lambda: submit_stats_jobs(league_ids))
 
 @admin.register(PlayerMatchEvent)
 class IPLPlayerEventAdmin(admin.ModelAdmin):
@@ -627,17 +631,14 @@ class IPLPlayerEventAdmin(admin.ModelAdmin):
     team_name.short_description = 'Team'
     team_name.admin_order_field = 'for_team__short_name'
     
+    @batched_refresh()
     def save_model(self, request, obj, form, change):
-        """Override save_model to add error handling and proper point calculation"""
+        """
+        Override save_model to add error handling and proper point calculation.
+        Aggregates are refreshed once, after the boost points are rewritten.
+        """
         try:
-            # Only calculate the points if they are NULL or user is changing data
-            obj.batting_points_total = obj.bat_points
-            obj.bowling_points_total = obj.bowl_points
-            obj.fielding_points_total = obj.field_points
-            obj.other_points_total = obj.other_points
-            obj.total_points_all = obj.base_points
-            
-            # Save the model
+            # PlayerMatchEvent.save() rescores the event and drops its stored boost points
             super().save_model(request, obj, form, change)
             
             # Update affected fantasy player events
@@ -651,6 +652,10 @@ class IPLPlayerEventAdmin(admin.ModelAdmin):
             messages.error(request, f"Error saving player event: {str(e)}")
             # Do not re-raise the exception to prevent the admin from crashing
     
+    @batched_refresh()
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+
     def _update_fantasy_events(self, ipl_event, request):
         """Update related fantasy events when an IPL event changes"""
         try:
@@ -669,23 +674,16 @@ class IPLPlayerEventAdmin(admin.ModelAdmin):
             service = CricketDataService()
             
             # Update each fantasy event
+            updated_fantasy_events = []
             for fantasy_event in fantasy_events:
                 if fantasy_event.boost:
                     # Recalculate boost points based on the updated IPL event
-                    boost = fantasy_event.boost
-                    
-                    # For Captain (2x) and Vice Captain (1.5x) roles that apply to all points
-                    if boost.label in ['Captain', 'Vice Captain']:
-                        # The boost is (multiplier - 1) * base_points
-                        multiplier = boost.multiplier_runs  # All multipliers are the same for these roles
-                        fantasy_event.boost_points = (multiplier - 1.0) * ipl_event.total_points_all
-                    else:
-                        # For specialized roles, we need to do more detailed calculations
-                        fantasy_event.boost_points = service._calculate_boost_points(ipl_event, boost)
-                    
-                    fantasy_event.save(update_fields=['boost_points'])
+                    fantasy_event.boost_points = service._calculate_boost_points(ipl_event, fantasy_event.boost)
+                    updated_fantasy_events.append(fantasy_event)
                     affected_squads.add(fantasy_event.fantasy_squad_id)
                     updated_count += 1
+            service.boost_memo.flush()
+            FantasyPlayerEvent.objects.bulk_update(updated_fantasy_events, ['boost_points'], batch_size=1000)
             
             # Get the match
             match = ipl_event.match
@@ -992,7 +990,7 @@ class FantasyLeagueAdmin(admin.ModelAdmin):
         squads = FantasySquad.objects.filter(league=league)
         
         # Ensure all squads have a draft order
-        ensure_draft_orders(league, squads)
+        role_orders = ensure_draft_orders(league, squads)
         
         # Use existing or generate new snake draft order
         snake_order = league.snake_draft_order or generate_draft_order(squads)
@@ -1000,7 +998,8 @@ class FantasyLeagueAdmin(admin.ModelAdmin):
         # Run the draft - now using the complete draft function that assigns all players
         draft_results = run_complete_draft(
             league=league,
-            squads=squads
+            squads=squads,
+            role_orders=role_orders,
         )
         
         # Format the results with player details for display
@@ -1421,6 +1420,8 @@ class FantasyTradeAdmin(admin.ModelAdmin):
                     receiver.current_squad.append(player_id)
             
             # Save changes
+            initiator._membership_source = SquadMembership.Source.TRADE
+            receiver._membership_source = SquadMembership.Source.TRADE
             initiator.save()
             receiver.save()
             
@@ -1523,3 +1524,17 @@ class FantasyStatsAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+@admin.action(description="Retry selected failed jobs")
+def retry_stats_jobs(modeladmin, request, queryset):
+    retried = retry_failed_jobs(queryset)
+    modeladmin.message_user(request, f"Requeued {retried} failed stats jobs.", messages.SUCCESS)
+
+@admin.register(StatsJob)
+class StatsJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'league', 'match', 'status', 'attempts', 'max_attempts', 'run_after', 'locked_by', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('league__name', 'last_error')
+    readonly_fields = ('created_at', 'updated_at', 'finished_at', 'locked_by', 'locked_at', 'attempts', 'last_error')
+    raw_id_fields = ('league', 'match')
+    actions = [retry_stats_jobs]
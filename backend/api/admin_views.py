@@ -7,14 +7,16 @@ from django.shortcuts import redirect, render
 from django.contrib import messages
 import json
 import random
-from .models import FantasyLeague, FantasySquad, FantasyDraft, Player, DraftWindow
+from .models import FantasyLeague, FantasySquad, FantasyDraft, Player, PlayerSeasonAggregate, DraftWindow, SquadMembership
+from api.services.cache_invalidation import invalidate_league_caches
 from api.services.draft_window_service import (
+    allocate_pre_season_picks,
     resolve_draft_window,
     execute_draft_window,
 )
 import logging
 from django.db import transaction
-from django.db.models import Avg, Count, Q
+from django.db.models import OuterRef, Subquery
 
 logger = logging.getLogger(__name__)
 
@@ -70,8 +72,11 @@ def build_role_default_order(league, role):
             id__in=role_player_ids,
             role=role,
         ).annotate(
-            matches=Count('playermatchevent', filter=Q(playermatchevent__match__season=league.season)),
-            avg_points=Avg('playermatchevent__total_points_all', filter=Q(playermatchevent__match__season=league.season)),
+            avg_points=Subquery(
+                PlayerSeasonAggregate.objects.filter(
+                    player=OuterRef('pk'), season=league.season,
+                ).values('avg_points')[:1]
+            ),
         ).order_by('-avg_points', 'name')
         ranked_ids = list(ranked_players.values_list('id', flat=True))
         ranked_set = set(ranked_ids)
@@ -145,7 +150,7 @@ def run_draft_process(league_id, dry_run=False, force_new_snake_order=False):
         raise ValueError('No squads in this league')
     
     # Ensure all squads have a draft order object
-    ensure_draft_orders(league, squads)
+    role_orders = ensure_draft_orders(league, squads)
     
     # Generate a fresh snake draft order when requested, otherwise reuse if present.
     if force_new_snake_order or not league.snake_draft_order:
@@ -160,7 +165,8 @@ def run_draft_process(league_id, dry_run=False, force_new_snake_order=False):
     # Run the draft - assign all available players
     draft_results = run_complete_draft(
         league=league,
-        squads=squads
+        squads=squads,
+        role_orders=role_orders,
     )
     
     # Count how many players each squad got
@@ -183,36 +189,43 @@ def run_draft_process(league_id, dry_run=False, force_new_snake_order=False):
         'draft_completed': not dry_run
     }
 
-def run_complete_draft(league, squads):
-    """Run role-based snake drafts for the league and assign all players."""
-    squad_ids = list(squads.values_list('id', flat=True))
-    squad_id_set = set(squad_ids)
-    base_snake_order = [sid for sid in (league.snake_draft_order or []) if sid in squad_id_set]
-    base_snake_order.extend([sid for sid in squad_ids if sid not in base_snake_order])
+def load_role_draft_orders(league, squads, save=True):
+    """
+    Normalized pre-season draft order of every squad for every role, creating
+    the missing FantasyDraft rows unless save is False.
 
-    results = {squad.id: [] for squad in squads}
+    All of the league's pre-season rows are read in one query and new or
+    renormalized orders are written back in bulk. Bulk writes skip the
+    FantasyDraft post_save signal, so the league caches are dropped here.
 
-    for role, reverse_base_order in ROLE_DRAFT_CONFIG:
-        default_order, eligible_role_players = build_role_default_order(league, role)
-        if not eligible_role_players:
-            continue
+    Returns {role: (default_order, eligible_role_players, {squad_id: order})}.
+    """
+    squads = list(squads)
+    latest_drafts = {}
+    for draft_obj in FantasyDraft.objects.filter(
+        league=league,
+        squad__in=squads,
+        type='Pre-Season',
+    ).order_by('id'):
+        latest_drafts[(draft_obj.squad_id, draft_obj.role)] = draft_obj
 
-        role_draft_orders = {}
+    role_orders = {}
+    created, changed = [], []
+    for role, _ in ROLE_DRAFT_CONFIG:
+        default_order, eligible_role_players = build_role_default_order(league, role)
+        squad_orders = {}
         for squad in squads:
-            draft_obj = FantasyDraft.objects.filter(
-                league=league,
-                squad=squad,
-                type='Pre-Season',
-                role=role,
-            ).order_by('-id').first()
-            if not draft_obj:
-                draft_obj = FantasyDraft.objects.create(
+            draft_obj = latest_drafts.get((squad.id, role))
+            if draft_obj is None:
+                created.append(FantasyDraft(
                     league=league,
                     squad=squad,
                     type='Pre-Season',
                     role=role,
                     order=default_order,
-                )
+                ))
+                squad_orders[squad.id] = default_order
+                continue
 
             normalized_order = normalize_role_order(
                 draft_obj.order,
@@ -221,74 +234,47 @@ def run_complete_draft(league, squads):
             )
             if normalized_order != draft_obj.order:
                 draft_obj.order = normalized_order
-                draft_obj.save(update_fields=['order'])
-
-            role_draft_orders[squad.id] = normalized_order
-
-        drafted_role_players = set()
-        round_num = 0
-        role_base_order = list(reversed(base_snake_order)) if reverse_base_order else list(base_snake_order)
-
-        while len(drafted_role_players) < len(eligible_role_players):
-            round_order = role_base_order if round_num % 2 == 0 else list(reversed(role_base_order))
-            picked_in_round = False
+                changed.append(draft_obj)
+            squad_orders[squad.id] = normalized_order
+        role_orders[role] = (default_order, eligible_role_players, squad_orders)
 
-            for squad_id in round_order:
-                available_player = next(
-                    (
-                        player_id
-                        for player_id in role_draft_orders.get(squad_id, [])
-                        if player_id in eligible_role_players and player_id not in drafted_role_players
-                    ),
-                    None,
-                )
-                if available_player is None:
-                    continue
+    if save and (created or changed):
+        with transaction.atomic():
+            FantasyDraft.objects.bulk_create(created, batch_size=500)
+            FantasyDraft.objects.bulk_update(changed, ['order'], batch_size=500)
+        invalidate_league_caches([league.id])
+    return role_orders
 
-                results[squad_id].append(available_player)
-                drafted_role_players.add(available_player)
-                picked_in_round = True
 
-                if len(drafted_role_players) >= len(eligible_role_players):
-                    break
+def run_complete_draft(league, squads, role_orders=None):
+    """
+    Run role-based snake drafts for the league and assign all players.
 
-            if not picked_in_round:
-                break
+    role_orders is the result of ensure_draft_orders; it is loaded when not
+    given. The picks come from allocate_pre_season_picks, where each squad
+    keeps a cursor into its role order that only moves past drafted players.
+    """
+    squad_ids = [squad.id for squad in squads]
+    squad_id_set = set(squad_ids)
+    base_snake_order = [sid for sid in (league.snake_draft_order or []) if sid in squad_id_set]
+    base_snake_order.extend([sid for sid in squad_ids if sid not in base_snake_order])
 
-            round_num += 1
+    if role_orders is None:
+        role_orders = load_role_draft_orders(league, squads)
 
-    return results
+    picks = allocate_pre_season_picks(
+        base_snake_order,
+        {role: (eligible, squad_orders) for role, (_, eligible, squad_orders) in role_orders.items()},
+    )
+    return {squad_id: picks[squad_id] for squad_id in squad_ids}
 
 def ensure_draft_orders(league, squads):
-    """Ensure all squads have role-specific pre-season draft order objects."""
-    for role, _ in ROLE_DRAFT_CONFIG:
-        default_order, eligible_role_players = build_role_default_order(league, role)
-        for squad in squads:
-            draft_order = FantasyDraft.objects.filter(
-                league=league,
-                squad=squad,
-                type='Pre-Season',
-                role=role,
-            ).order_by('-id').first()
-
-            if not draft_order:
-                FantasyDraft.objects.create(
-                    league=league,
-                    squad=squad,
-                    type='Pre-Season',
-                    role=role,
-                    order=default_order,
-                )
-                continue
+    """
+    Ensure all squads have role-specific pre-season draft order objects.
 
-            normalized_order = normalize_role_order(
-                draft_order.order,
-                eligible_role_players,
-                default_order,
-            )
-            if normalized_order != draft_order.order:
-                draft_order.order = normalized_order
-                draft_order.save(update_fields=['order'])
+    Returns the normalized orders for run_complete_draft.
+    """
+    return load_role_draft_orders(league, squads)
 
 def generate_draft_order(squads):
     """Generate a random draft order using squad IDs."""
@@ -331,6 +317,7 @@ def save_draft_results(results):
     for squad_id, player_ids in results.items():
         squad = FantasySquad.objects.get(id=squad_id)
         squad.current_squad = player_ids
+        squad._membership_source = SquadMembership.Source.DRAFT
         squad.save()
 
 @staff_member_required
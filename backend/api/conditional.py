@@ -0,0 +1,48 @@
+"""
+ETag / Last-Modified functions for conditional GETs on polled endpoints.
+
+Used with django.views.decorators.http.condition, which calls them with the
+view's arguments before the view runs; a request whose If-None-Match matches
+gets a 304 without the view body or serializer running. ETags come from the
+data version counters (services/data_versions.py), which move on every write
+that changes these responses.
+"""
+from django.db.models import Max
+
+from .models import FantasyMatchEvent, FantasyStats
+from .services.data_versions import league_token, match_token
+
+
+def _league_id_param(request):
+    league_id = request.GET.get('league_id')
+    return int(league_id) if league_id and league_id.isdigit() else None
+
+
+def league_squads_etag(request, pk=None, **kwargs):
+    return f"league-squads-{pk}-{league_token(pk)}"
+
+
+def league_stats_etag(request, league_id=None, **kwargs):
+    return f"league-stats-{league_id}-{league_token(league_id)}"
+
+
+def league_stats_last_modified(request, league_id=None, **kwargs):
+    return FantasyStats.objects.filter(league_id=league_id).values_list('last_updated', flat=True).first()
+
+
+def match_events_etag(request, pk=None, **kwargs):
+    league_id = _league_id_param(request)
+    return f"match-events-{pk}-{league_id or 'all'}-{match_token(pk, league_id)}"
+
+
+def match_standings_etag(request, match_id=None, **kwargs):
+    league_id = _league_id_param(request)
+    return f"match-standings-{match_id}-{league_id or 'all'}-{match_token(match_id, league_id)}"
+
+
+def match_standings_last_modified(request, match_id=None, **kwargs):
+    events = FantasyMatchEvent.objects.filter(match_id=match_id)
+    league_id = _league_id_param(request)
+    if league_id:
+        events = events.filter(fantasy_squad__league_id=league_id)
+    return events.aggregate(last_updated=Max('updated_at'))['last_updated']
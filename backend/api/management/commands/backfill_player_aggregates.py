@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Season
+from api.services.data_versions import bump_versions
+from api.services.player_aggregates import refresh_player_season_aggregates, refresh_season_fantasy_aggregates
+
+
+class Command(BaseCommand):
+    help = "Rebuild the player-season, squad-player and league-player aggregates for one or all seasons."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--season-id",
+            type=int,
+            help="Optional season id. If omitted, rebuilds every season.",
+        )
+
+    def handle(self, *args, **options):
+        season_id = options.get("season_id")
+        seasons = Season.objects.order_by("year")
+        if season_id:
+            seasons = seasons.filter(id=season_id)
+            if not seasons.exists():
+                raise CommandError(f"Season {season_id} not found.")
+
+        total = 0
+        for season in seasons:
+            rows = refresh_player_season_aggregates(season.id)
+            refresh_season_fantasy_aggregates(season.id)
+            total += rows
+            self.stdout.write(f"Season {season.id} ({season.name}): {rows} player aggregates")
+
+        # Cached draft and preview responses read these rows
+        bump_versions(season_ids=seasons.values_list("id", flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} player aggregates"))
@@ -0,0 +1,110 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.draft_window_service import (
+    ROLE_DRAFT_CONFIG,
+    allocate_draft_picks,
+    build_draft_preferences,
+)
+
+
+def synthetic_draft(pool_size, squad_count, squad_size, seed=0):
+    """
+    Inputs for build_draft_preferences / allocate_draft_picks shaped like a real
+    mid-season draft: a role-balanced pool, every squad with a saved order per
+    role covering half the eligible players, and retained players removed from
+    each squad's needs.
+    """
+    rng = random.Random(seed)
+    roles = [role for role, _ in ROLE_DRAFT_CONFIG]
+    player_ids = list(range(1, pool_size + 1))
+    role_map = {player_id: roles[player_id % len(roles)] for player_id in player_ids}
+    role_available = {role: {pid for pid in player_ids if role_map[pid] == role} for role in roles}
+    role_default_order = {role: sorted(ids) for role, ids in role_available.items()}
+
+    squad_ids = list(range(1, squad_count + 1))
+    role_draft_map = {}
+    for squad_id in squad_ids:
+        for role in roles:
+            eligible = list(role_available[role])
+            rng.shuffle(eligible)
+            role_draft_map[(squad_id, role)] = eligible[: len(eligible) // 2]
+
+    retained = squad_size // 3
+    drafted_per_role = (squad_size - retained) // len(roles)
+    role_needs = {squad_id: {role: drafted_per_role for role in roles} for squad_id in squad_ids}
+    total_needs = {squad_id: squad_size - retained for squad_id in squad_ids}
+
+    return {
+        "squad_ids": squad_ids,
+        "role_available": role_available,
+        "available_players": set(player_ids),
+        "role_map": role_map,
+        "role_default_order": role_default_order,
+        "global_default_order": player_ids,
+        "role_draft_map": role_draft_map,
+        "role_needs": role_needs,
+        "total_needs": total_needs,
+    }
+
+
+def run_synthetic_draft(inputs):
+    role_preferences, global_preferences = build_draft_preferences(
+        inputs["squad_ids"],
+        inputs["role_available"],
+        inputs["available_players"],
+        inputs["role_map"],
+        inputs["role_default_order"],
+        inputs["global_default_order"],
+        inputs["role_draft_map"],
+        {},
+    )
+    return allocate_draft_picks(
+        inputs["squad_ids"],
+        inputs["role_available"],
+        inputs["available_players"],
+        role_preferences,
+        global_preferences,
+        inputs["role_default_order"],
+        inputs["global_default_order"],
+        inputs["role_needs"],
+        inputs["total_needs"],
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the mid-season draft engine (preference building plus allocation) "
+        "on synthetic pools; no database access."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pool-sizes",
+            default="250,500,1000,2000",
+            help="Comma-separated pool sizes to time.",
+        )
+        parser.add_argument("--squads", type=int, default=20, help="Squads per league.")
+        parser.add_argument("--squad-size", type=int, default=15, help="Players per squad.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is reported.")
+
+    def handle(self, *args, **options):
+        squads = options["squads"]
+        squad_size = options["squad_size"]
+        self.stdout.write(f"{squads} squads of {squad_size}, best of {options['repeat']} runs")
+
+        previous = None
+        for pool_size in [int(size) for size in options["pool_sizes"].split(",") if size.strip()]:
+            inputs = synthetic_draft(pool_size, squads, squad_size)
+            timings = []
+            for _ in range(max(1, options["repeat"])):
+                started = time.perf_counter()
+                assignments, _ = run_synthetic_draft(inputs)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            picks = sum(len(ids) for ids in assignments.values())
+            growth = f" ({best / previous[1]:.1f}x for {pool_size / previous[0]:.1f}x players)" if previous else ""
+            self.stdout.write(f"pool={pool_size:>6} picks={picks:>4} time={best * 1000:8.1f} ms{growth}")
+            previous = (pool_size, best)
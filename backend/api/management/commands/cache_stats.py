@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.services.response_cache import ENDPOINTS, OUTCOMES, get_metrics, reset_metrics
+
+
+class Command(BaseCommand):
+    help = "Show response cache hit / miss / stale / wait counts for the single-flight endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Zero the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        for endpoint, counts in get_metrics(ENDPOINTS).items():
+            total = sum(counts.values())
+            served = total - counts["miss"]
+            ratio = f"{served / total:.1%}" if total else "-"
+            summary = " ".join(f"{outcome}={counts[outcome]}" for outcome in OUTCOMES)
+            self.stdout.write(f"{endpoint}: {summary} served_from_cache={ratio}")
+
+        if options["reset"]:
+            reset_metrics(ENDPOINTS)
+            self.stdout.write("Counters reset.")
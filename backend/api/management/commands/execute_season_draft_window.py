@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import DraftWindow
+from api.services.draft_window_service import execute_season_draft_window
+
+
+class Command(BaseCommand):
+    help = "Executes a draft window for every league in its season."
+
+    def add_arguments(self, parser):
+        parser.add_argument("draft_window_id", type=int, help="Draft window ID")
+        parser.add_argument(
+            "--league",
+            type=int,
+            action="append",
+            help="Only run this league ID (repeatable). Defaults to every league in the season.",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Leagues run in parallel (default: 4)")
+        parser.add_argument("--dry_run", action="store_true", help="Simulate without saving")
+        parser.add_argument(
+            "--force_rerun",
+            action="store_true",
+            help="Allow re-running leagues that already executed the draft window",
+        )
+        parser.add_argument("--report", help="Write the combined JSON report to this path")
+
+    def handle(self, *args, **options):
+        try:
+            draft_window = DraftWindow.objects.get(id=options["draft_window_id"])
+        except DraftWindow.DoesNotExist:
+            raise CommandError(f"Draft window with ID {options['draft_window_id']} not found")
+
+        dry_run = options["dry_run"]
+        self.stdout.write(
+            f"{'Dry run' if dry_run else 'Executing'}: {draft_window} with {options['workers']} workers"
+        )
+
+        report = execute_season_draft_window(
+            draft_window,
+            league_ids=options["league"],
+            dry_run=dry_run,
+            force_rerun=options["force_rerun"],
+            workers=options["workers"],
+            progress=self._progress,
+        )
+
+        if options["report"]:
+            with open(options["report"], "w") as report_file:
+                json.dump(report, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['report']}")
+
+        counts = report["counts"]
+        summary = (
+            f"{report['leagues']} leagues from a pool of {report['pool_size']} in {report['seconds']}s: "
+            f"{counts['executed']} executed, {counts['dry_run']} dry run, "
+            f"{counts['skipped']} skipped, {counts['failed']} failed; {report['drafted']} players drafted"
+        )
+        self.stdout.write(self.style.ERROR(summary) if counts["failed"] else self.style.SUCCESS(summary))
+
+    def _progress(self, done, total, league):
+        line = f"[{done}/{total}] {league['league']} (#{league['league_id']}): {league['status']}"
+        if "error" in league:
+            line += f" - {league['error']}"
+        else:
+            line += f", {league['drafted']} drafted, shortfall {league['shortfall']}"
+        self.stdout.write(line)
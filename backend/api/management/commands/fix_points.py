@@ -5,6 +5,11 @@ from api.models import (
     PlayerMatchEvent, FantasyPlayerEvent, FantasyMatchEvent, FantasySquad, 
     Match, FantasyLeague
 )
+from api.services.boost_memo import BoostMemo, invalidate_boost_memo
+from api.services.data_versions import bump_versions
+from api.services.player_aggregates import refresh_fantasy_aggregates, refresh_for_events
+from api.services.scoring_service import SCORED_FIELDS, apply_points
+from api.services.squad_membership import owned_player_ids
 import logging
 
 logger = logging.getLogger(__name__)
@@ -66,18 +71,13 @@ class Command(BaseCommand):
                 league = FantasyLeague.objects.get(id=league_id)
                 self.stdout.write(f"Processing only league '{league.name}' (ID: {league_id})")
                 
-                # Find player IDs in these squads
-                squads = FantasySquad.objects.filter(league_id=league_id)
-                squad_players = set()
-                
-                for squad in squads:
-                    if squad.current_squad:
-                        squad_players.update(squad.current_squad)
+                # Find player IDs owned in this league at any point in the season
+                squad_players = owned_player_ids(league_id, include_past=True)
                 
                 # Filter IPL events to only those with players in the league
                 query = query.filter(player_id__in=squad_players)
             
-            ipl_events = list(query)
+            ipl_events = list(query.select_related('player'))
             total_events = len(ipl_events)
             self.stdout.write(f"Processing {total_events} IPLPlayerEvents")
             
@@ -95,267 +95,77 @@ class Command(BaseCommand):
             affected_matches = set()
             affected_squads = set()
             
-            # 1. First, recalculate all IPLPlayerEvents
-            for event in ipl_events:
-                old_total = event.total_points_all
-                
-                # Recalculate all point components
-                # Batting points
-                bat_points = 0
-                if event.bat_runs is not None:
-                    bat_points += (event.bat_runs or 0)  # Runs
-                    bat_points += (event.bat_fours or 0)  # Boundaries
-                    bat_points += (2 * (event.bat_sixes or 0))  # Six bonus
-                    
-                    # Milestones
-                    if event.bat_runs >= 50:
-                        bat_points += 8  # 50+ bonus
-                    if event.bat_runs >= 100:
-                        bat_points += 16  # 100+ bonus
-                    
-                    # Strike rate bonus/penalty
-                    if event.bat_balls and event.bat_balls >= 10:
-                        sr = (event.bat_runs / event.bat_balls) * 100
-                        if sr >= 200:
-                            bat_points += 6
-                        elif sr >= 175:
-                            bat_points += 4
-                        elif sr >= 150:
-                            bat_points += 2
-                        elif sr < 50:
-                            bat_points -= 6
-                        elif sr < 75:
-                            bat_points -= 4
-                        elif sr < 100:
-                            bat_points -= 2
-                    
-                    # Duck penalty for non-bowlers
-                    if (event.bat_runs == 0 and not event.bat_not_out and 
-                        hasattr(event.player, 'role') and event.player.role != 'BOWL'):
-                        bat_points -= 2
-                
-                # Bowling points
-                bowl_points = 0
-                if event.bowl_wickets is not None or event.bowl_maidens is not None:
-                    bowl_points += ((event.bowl_wickets or 0) * 25)  # Wickets
-                    bowl_points += ((event.bowl_maidens or 0) * 8)  # Maidens
-                    
-                    # Milestones
-                    if (event.bowl_wickets or 0) >= 3:
-                        bowl_points += 8  # 3+ wickets bonus
-                    if (event.bowl_wickets or 0) >= 5:
-                        bowl_points += 16  # 5+ wickets bonus
-                    
-                    # Economy bonus/penalty
-                    if event.bowl_balls and event.bowl_balls >= 10 and event.bowl_runs is not None:
-                        overs = event.bowl_balls / 6
-                        eco = event.bowl_runs / overs
-                        if eco <= 5:
-                            bowl_points += 6
-                        elif eco <= 6:
-                            bowl_points += 4
-                        elif eco <= 7:
-                            bowl_points += 2
-                        elif eco >= 12:
-                            bowl_points -= 6
-                        elif eco >= 11:
-                            bowl_points -= 4
-                        elif eco >= 10:
-                            bowl_points -= 2
-                
-                # Fielding points
-                field_points = 0
-                if any(v is not None for v in [event.wk_stumping, event.field_catch, event.wk_catch, event.run_out_solo, event.run_out_collab]):
-                    field_points = (
-                        ((event.wk_stumping or 0) * 12) +  # Stumpings
-                        ((event.field_catch or 0) * 8) +  # Catches
-                        ((event.wk_catch or 0) * 8) +  # Keeper catches
-                        ((event.run_out_solo or 0) * 8) +  # Solo run outs
-                        ((event.run_out_collab or 0) * 4)  # Collaborative run outs
-                    )
-                
-                # Other points (POTM + participation)
-                other_points = (50 if event.player_of_match else 0) + 4
-                
-                # Calculate total points
-                new_total = bat_points + bowl_points + field_points + other_points
-                
-                # Check if any values need to be updated
-                needs_update = (
-                    bat_points != event.batting_points_total or
-                    bowl_points != event.bowling_points_total or
-                    field_points != event.fielding_points_total or
-                    other_points != event.other_points_total or
-                    new_total != event.total_points_all
-                )
+            # 1. First, recalculate all IPLPlayerEvents in one scoring pass
+            old_totals = {event.id: event.total_points_all for event in ipl_events}
+            changed_events = apply_points(ipl_events)
+            
+            if changed_events and not dry_run:
+                PlayerMatchEvent.objects.bulk_update(changed_events, SCORED_FIELDS, batch_size=1000)
+                invalidate_boost_memo(event_ids=[event.id for event in changed_events])
+                refresh_for_events(changed_events)
+            
+            for event in changed_events:
+                updated_ipl_events += 1
+                affected_matches.add(event.match_id)
                 
-                # Update if needed
-                if needs_update:
-                    event.batting_points_total = bat_points
-                    event.bowling_points_total = bowl_points
-                    event.fielding_points_total = field_points
-                    event.other_points_total = other_points
-                    event.total_points_all = new_total
-                    
-                    if not dry_run:
-                        event.save(update_fields=[
-                            'batting_points_total', 'bowling_points_total',
-                            'fielding_points_total', 'other_points_total',
-                            'total_points_all'
-                        ])
-                    
-                    updated_ipl_events += 1
-                    affected_matches.add(event.match_id)
-                    
-                    self.stdout.write(f"  Updated IPL event {event.id}: "
-                                     f"total points {old_total} -> {new_total}")
+                self.stdout.write(f"  Updated IPL event {event.id}: "
+                                 f"total points {old_totals[event.id]} -> {event.total_points_all}")
             
             # 2. Now recalculate all related FantasyPlayerEvents
             fantasy_events = FantasyPlayerEvent.objects.filter(
                 match_event__in=[e.id for e in ipl_events]
             ).select_related('match_event', 'boost')
+            boost_memo = BoostMemo()
+            boost_memo.prefetch(e.id for e in ipl_events)
+            # In a dry run the stored values for rescored events were not invalidated
+            boost_memo.forget(e.id for e in changed_events)
+            ipl_events_by_id = {e.id: e for e in ipl_events}
+            changed_event_ids = {e.id for e in changed_events}
+            boost_updates = []
+            # Squads and players whose aggregates move with the new base or boost points
+            refresh_squads, refresh_players = set(), set()
             
             for fantasy_event in fantasy_events:
-                ipl_event = fantasy_event.match_event
+                ipl_event = ipl_events_by_id.get(fantasy_event.match_event_id, fantasy_event.match_event)
                 boost = fantasy_event.boost
                 old_boost = fantasy_event.boost_points
+                if ipl_event.id in changed_event_ids:
+                    refresh_squads.add(fantasy_event.fantasy_squad_id)
+                    refresh_players.add(ipl_event.player_id)
                 
                 # Skip if no boost assigned
                 if not boost:
                     fantasy_event.boost_points = 0
                     if old_boost != 0:
-                        if not dry_run:
-                            fantasy_event.save(update_fields=['boost_points'])
+                        boost_updates.append(fantasy_event)
                         updated_fantasy_events += 1
                         affected_squads.add(fantasy_event.fantasy_squad_id)
+                        refresh_squads.add(fantasy_event.fantasy_squad_id)
+                        refresh_players.add(ipl_event.player_id)
                     continue
                 
-                # Calculate boost points
-                # For uniform multipliers (Captain, Vice Captain)
-                is_uniform = all(
-                    getattr(boost, f'multiplier_{attr}') == boost.multiplier_runs
-                    for attr in [
-                        'fours', 'sixes', 'sr', 'bat_milestones', 'wickets',
-                        'maidens', 'economy', 'bowl_milestones', 'catches',
-                        'stumpings', 'run_outs', 'potm', 'playing'
-                    ]
-                )
-                
-                if is_uniform:
-                    # Simple calculation for uniform multipliers
-                    new_boost = (boost.multiplier_runs - 1.0) * ipl_event.total_points_all
-                else:
-                    # Detailed calculation for specialized roles
-                    # Batting boosts
-                    batting_runs = ipl_event.bat_runs or 0
-                    batting_fours = ipl_event.bat_fours or 0
-                    batting_sixes = (ipl_event.bat_sixes or 0) * 2  # Note the 2x for sixes
-                    
-                    # Batting milestones
-                    batting_milestones = 0
-                    if (ipl_event.bat_runs or 0) >= 50:
-                        batting_milestones += 8
-                    if (ipl_event.bat_runs or 0) >= 100:
-                        batting_milestones += 16
-                    
-                    # Strike rate bonus/penalty
-                    sr_points = 0
-                    if (ipl_event.bat_balls or 0) >= 10:
-                        sr = (ipl_event.bat_runs / ipl_event.bat_balls) * 100
-                        if sr >= 200:
-                            sr_points += 6
-                        elif sr >= 175:
-                            sr_points += 4
-                        elif sr >= 150:
-                            sr_points += 2
-                        elif sr < 50:
-                            sr_points -= 6
-                        elif sr < 75:
-                            sr_points -= 4
-                        elif sr < 100:
-                            sr_points -= 2
-                    
-                    # Separate boost calculations
-                    runs_boost = batting_runs * (boost.multiplier_runs - 1.0)
-                    fours_boost = batting_fours * (boost.multiplier_fours - 1.0)
-                    sixes_boost = batting_sixes * (boost.multiplier_sixes - 1.0)
-                    milestone_boost = batting_milestones * (boost.multiplier_bat_milestones - 1.0)
-                    sr_boost = sr_points * (boost.multiplier_sr - 1.0)
-                    
-                    bat_boost = runs_boost + fours_boost + sixes_boost + milestone_boost + sr_boost
-                    
-                    # Bowling boosts
-                    bowling_wickets = (ipl_event.bowl_wickets or 0) * 25
-                    bowling_maidens = (ipl_event.bowl_maidens or 0) * 8
-                    
-                    # Bowling milestones
-                    bowling_milestones = 0
-                    if (ipl_event.bowl_wickets or 0) >= 3:
-                        bowling_milestones += 8
-                    if (ipl_event.bowl_wickets or 0) >= 5:
-                        bowling_milestones += 16
-                    
-                    # Economy bonus/penalty
-                    economy_points = 0
-                    if (ipl_event.bowl_balls or 0) >= 10:
-                        eco = ipl_event.bowl_economy
-                        if eco <= 5:
-                            economy_points += 6
-                        elif eco <= 6:
-                            economy_points += 4
-                        elif eco <= 7:
-                            economy_points += 2
-                        elif eco >= 12:
-                            economy_points -= 6
-                        elif eco >= 11:
-                            economy_points -= 4
-                        elif eco >= 10:
-                            economy_points -= 2
-                    
-                    # Bowling boost components
-                    wickets_boost = bowling_wickets * (boost.multiplier_wickets - 1.0)
-                    maidens_boost = bowling_maidens * (boost.multiplier_maidens - 1.0)
-                    bowl_milestone_boost = bowling_milestones * (boost.multiplier_bowl_milestones - 1.0)
-                    economy_boost = economy_points * (boost.multiplier_economy - 1.0)
-                    
-                    bowl_boost = wickets_boost + maidens_boost + bowl_milestone_boost + economy_boost
-                    
-                    # Fielding boosts
-                    stumpings = (ipl_event.wk_stumping or 0) * 12
-                    catches = ((ipl_event.field_catch or 0) + (ipl_event.wk_catch or 0)) * 8
-                    run_outs = ((ipl_event.run_out_solo or 0) * 8) + ((ipl_event.run_out_collab or 0) * 4)
-                    
-                    stumping_boost = stumpings * (boost.multiplier_stumpings - 1.0)
-                    catch_boost = catches * (boost.multiplier_catches - 1.0)
-                    run_out_boost = run_outs * (boost.multiplier_run_outs - 1.0)
-                    
-                    field_boost = stumping_boost + catch_boost + run_out_boost
-                    
-                    # Other boosts
-                    potm_points = 50 if ipl_event.player_of_match else 0
-                    playing_points = 4
-                    
-                    potm_boost = potm_points * (boost.multiplier_potm - 1.0)
-                    playing_boost = playing_points * (boost.multiplier_playing - 1.0)
-                    
-                    other_boost = potm_boost + playing_boost
-                    
-                    # Total boost
-                    new_boost = bat_boost + bowl_boost + field_boost + other_boost
+                # Boost points are shared by every squad holding this player with this role
+                new_boost = boost_memo.boost_points_for(ipl_event, boost)
                 
                 # Update if changed
                 if round(new_boost, 2) != round(fantasy_event.boost_points, 2):
                     fantasy_event.boost_points = new_boost
-                    
-                    if not dry_run:
-                        fantasy_event.save(update_fields=['boost_points'])
+                    boost_updates.append(fantasy_event)
                     
                     updated_fantasy_events += 1
                     affected_squads.add(fantasy_event.fantasy_squad_id)
+                    refresh_squads.add(fantasy_event.fantasy_squad_id)
+                    refresh_players.add(ipl_event.player_id)
                     
                     self.stdout.write(f"  Updated fantasy event {fantasy_event.id}: "
                                      f"boost points {old_boost} -> {new_boost}")
             
+            if not dry_run:
+                boost_memo.flush()
+                # One write and one aggregate refresh once every boost is rewritten
+                FantasyPlayerEvent.objects.bulk_update(boost_updates, ['boost_points'], batch_size=1000)
+                refresh_fantasy_aggregates(refresh_squads, refresh_players)
+            
             # 3. Update all related FantasyMatchEvents
             for match_id in affected_matches:
                 match = Match.objects.get(id=match_id)
@@ -475,6 +285,12 @@ class Command(BaseCommand):
             if dry_run:
                 transaction.savepoint_rollback(savepoint)
                 self.stdout.write(self.style.WARNING("DRY RUN - All changes have been rolled back"))
+            elif affected_matches:
+                # Cached responses built from the rescored matches are stale
+                bump_versions(
+                    season_ids=Match.objects.filter(id__in=affected_matches).values_list('season_id', flat=True),
+                    match_ids=affected_matches,
+                )
             
             # Summary
             self.stdout.write(self.style.SUCCESS(
@@ -488,78 +304,19 @@ class Command(BaseCommand):
     
     def _update_match_ranks(self, match, league_id=None):
         """Update match ranks for all fantasy teams in this match."""
-        match_events = FantasyMatchEvent.objects.filter(match=match)
+        from api.services.cricket_data_service import CricketDataService
         
-        # If league_id provided, only update ranks for that league
-        if league_id:
-            match_events = match_events.filter(fantasy_squad__league_id=league_id)
-        
-        # Get unique leagues
-        from django.db.models import Count
-        leagues = FantasySquad.objects.filter(
-            id__in=match_events.values_list('fantasy_squad_id', flat=True)
-        ).values('league_id').annotate(count=Count('id')).values_list('league_id', flat=True)
-        
-        # Update ranks for each league
-        for league_id in leagues:
-            # Get events for this league and match, ordered by points
-            events = match_events.filter(
-                fantasy_squad__league_id=league_id
-            ).order_by('-total_points')
-            
-            # Assign ranks
-            for i, event in enumerate(events, 1):
-                event.match_rank = i
-                event.save(update_fields=['match_rank'])
+        changed = CricketDataService()._update_match_ranks(
+            match,
+            league_ids=[league_id] if league_id else None
+        )
+        self.stdout.write(f"  Updated match ranks for {changed} match events in match {match.id}")
     
     def _update_running_ranks(self, match, league_id=None):
         """Update running ranks and totals for all squads in this match."""
-        match_events = FantasyMatchEvent.objects.filter(match=match)
+        from api.services.cricket_data_service import CricketDataService
         
-        # If league_id provided, only update ranks for that league
-        if league_id:
-            match_events = match_events.filter(fantasy_squad__league_id=league_id)
-        
-        # Get unique leagues
-        leagues = FantasySquad.objects.filter(
-            id__in=match_events.values_list('fantasy_squad_id', flat=True)
-        ).values_list('league_id', flat=True).distinct()
-        
-        # Process each league
-        for league_id in leagues:
-            # Get all squads in this league
-            squads = FantasySquad.objects.filter(league_id=league_id)
-            
-            # Get all matches up to this one
-            prev_matches = Match.objects.filter(
-                season=match.season,
-                date__lte=match.date
-            ).order_by('date')
-            
-            # Track running totals
-            running_totals = {squad.id: 0 for squad in squads}
-            
-            # Calculate running totals
-            for m in prev_matches:
-                events = FantasyMatchEvent.objects.filter(
-                    match=m,
-                    fantasy_squad__league_id=league_id
-                )
-                
-                for event in events:
-                    running_totals[event.fantasy_squad_id] = running_totals.get(event.fantasy_squad_id, 0) + event.total_points
-            
-            # Sort by total points
-            sorted_squads = sorted(
-                running_totals.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
-            
-            # Assign ranks
-            for rank, (squad_id, total) in enumerate(sorted_squads, 1):
-                event = match_events.filter(fantasy_squad_id=squad_id).first()
-                if event:
-                    event.running_rank = rank
-                    event.running_total_points = total
-                    event.save(update_fields=['running_rank', 'running_total_points'])
\ No newline at end of file
+        CricketDataService()._update_running_ranks(
+            match,
+            league_ids=[league_id] if league_id else None
+        )
@@ -2,6 +2,10 @@ from django.core.management.base import BaseCommand
 from api.models import PlayerMatchEvent, FantasyPlayerEvent, FantasySquad, FantasyBoostRole, FantasyMatchEvent, Match
 from django.db.models import F, Sum
 from django.db import transaction
+from api.services.boost_memo import BoostMemo
+from api.services.data_versions import bump_versions
+from api.services.player_aggregates import refresh_player_season_aggregates, refresh_season_fantasy_aggregates
+from api.services.scoring_service import recalculate_event_points
 import logging
 import decimal
 from decimal import Decimal
@@ -69,6 +73,15 @@ class Command(BaseCommand):
         if not options['skip_squads']:
             self.recalculate_fantasy_squad_points(season=season)
         
+        matches = Match.objects.filter(season__year=season) if season else Match.objects.all()
+        season_ids = list(matches.values_list('season_id', flat=True).distinct())
+        for season_id in season_ids:
+            refresh_player_season_aggregates(season_id)
+            refresh_season_fantasy_aggregates(season_id)
+
+        # Cached responses built from the recalculated matches are stale
+        bump_versions(season_ids=season_ids, match_ids=matches.values_list('id', flat=True))
+        
         self.stdout.write(self.style.SUCCESS('Points recalculation completed successfully'))
     
     def recalculate_ipl_player_events(self, batch_size, season=None):
@@ -77,149 +90,25 @@ class Command(BaseCommand):
         if season:
             queryset = queryset.filter(match__season__year=season)
         
-        count = 0
         total = queryset.count()
         self.stdout.write(f'Found {total} PlayerMatchEvent records to process for season {season or "all"}')
         
-        
         if total == 0:
             self.stdout.write('No PlayerMatchEvent records to process')
             return
         
-        # Process in batches to avoid memory issues
-        for i in range(0, total, batch_size):
-            with transaction.atomic():
-                batch = queryset[i:i+batch_size]
-                batch_count = 0
-                
-                for event in batch:
-                    try:
-                        # === BATTING POINTS ===
-                        bat_points = 0
-                        if event.bat_runs is not None:
-                            # Runs & boundaries
-                            bat_points += event.bat_runs  # Runs
-                            bat_points += (event.bat_fours or 0)  # Fours
-                            bat_points += (2 * (event.bat_sixes or 0))  # Sixes (2 points each)
-                            
-                            # Milestones (50+, 100+)
-                            if event.bat_runs >= 100:
-                                bat_points += 16  # 100+ bonus
-                            if event.bat_runs >= 50:
-                                bat_points += 8   # 50+ bonus
-                            
-                            # Strike Rate Bonus/Penalty (min 10 balls)
-                            if event.bat_balls and event.bat_balls >= 10:
-                                # Use string comparison for exact precision at boundaries
-                                sr_raw = float(event.bat_runs) / float(event.bat_balls) * 100.0
-                                sr_rounded = round(sr_raw, 2)
-                                
-                                # Explicit handling for boundary case
-                                if sr_rounded == 100.00:
-                                    # Exactly 100.00 - NO penalty
-                                    pass
-                                elif sr_rounded >= 200.00:
-                                    bat_points += 6
-                                elif sr_rounded >= 175.00:
-                                    bat_points += 4
-                                elif sr_rounded >= 150.00:
-                                    bat_points += 2
-                                elif sr_rounded < 50.00:
-                                    bat_points -= 6
-                                elif sr_rounded < 75.00:
-                                    bat_points -= 4
-                                elif sr_rounded < 100.00:
-                                    bat_points -= 2
-                            
-                            # Duck Penalty (0 runs, not not-out, non-bowler)
-                            if event.bat_runs == 0 and not event.bat_not_out:
-                                # Only check role if player exists and has a role attribute
-                                if hasattr(event.player, 'role') and event.player.role != 'BOWL':
-                                    bat_points -= 2
-                        
-                        # === BOWLING POINTS ===
-                        bowl_points = 0
-                        if event.bowl_wickets is not None or event.bowl_maidens is not None:
-                            # Base bowling points
-                            bowl_points += ((event.bowl_wickets or 0) * 25)  # Wickets (25 points each)
-                            bowl_points += ((event.bowl_maidens or 0) * 8)   # Maidens (8 points each)
-                            
-                            # Milestone bonuses
-                            if (event.bowl_wickets or 0) >= 5:
-                                bowl_points += 16  # 5+ wickets bonus
-                            if (event.bowl_wickets or 0) >= 3:
-                                bowl_points += 8   # 3+ wickets bonus
-                            
-                            # Economy Bonus/Penalty (min 10 balls)
-                            if event.bowl_balls and event.bowl_balls >= 10 and event.bowl_runs is not None:
-                                # Use string comparison for exact precision at boundaries
-                                overs = float(event.bowl_balls) / 6.0
-                                eco_raw = float(event.bowl_runs) / overs
-                                eco_rounded = round(eco_raw, 2)
-                                
-                                # Explicit handling for boundary case
-                                if eco_rounded == 7.00:
-                                    # Exactly 7.00 - NO bonus
-                                    pass
-                                elif eco_rounded < 5.00:
-                                    bowl_points += 6
-                                elif eco_rounded < 6.00:
-                                    bowl_points += 4
-                                elif eco_rounded < 7.00:
-                                    bowl_points += 2
-                                elif eco_rounded >= 12.00:
-                                    bowl_points -= 6
-                                elif eco_rounded >= 11.00:
-                                    bowl_points -= 4
-                                elif eco_rounded >= 10.00:
-                                    bowl_points -= 2
-                        
-                        # === FIELDING POINTS ===
-                        field_points = 0
-                        if any(v is not None for v in [event.wk_stumping, event.field_catch, event.wk_catch, event.run_out_solo, event.run_out_collab]):
-                            field_points = (
-                                ((event.wk_stumping or 0) * 12) +     # Stumpings (12 pts)
-                                ((event.field_catch or 0) * 8) +      # Catches (8 pts)
-                                ((event.wk_catch or 0) * 8) +         # Keeper catches (8 pts)
-                                ((event.run_out_solo or 0) * 8) +     # Solo run outs (8 pts)
-                                ((event.run_out_collab or 0) * 4)     # Collaborative run outs (4 pts)
-                            )
-                        
-                        # === OTHER POINTS ===
-                        other_points = 4  # Participation (always 4)
-                        if event.player_of_match:
-                            other_points += 50  # Player of the match (50 pts)
-                        
-                        # === TOTAL POINTS ===
-                        total_points = bat_points + bowl_points + field_points + other_points
-                        
-                        # Update the event
-                        event.batting_points_total = bat_points
-                        event.bowling_points_total = bowl_points
-                        event.fielding_points_total = field_points
-                        event.other_points_total = other_points
-                        event.total_points_all = total_points
-                        
-                        event.save(update_fields=[
-                            'batting_points_total', 'bowling_points_total',
-                            'fielding_points_total', 'other_points_total',
-                            'total_points_all'
-                        ])
-                        batch_count += 1
-                        
-                    except Exception as e:
-                        self.stderr.write(f"Error processing PlayerMatchEvent {event.id}: {str(e)}")
-                
-                count += batch_count
-            
-            self.stdout.write(f'Processed {min(count, total)} of {total} IPLPlayerEvents')
+        # Score whole batches at once and bulk-write only the rows that changed,
+        # committing each batch
+        summary = recalculate_event_points(queryset, batch_size=batch_size)
+        
+        self.stdout.write(
+            f'Processed {summary["processed"]} of {total} IPLPlayerEvents '
+            f'({summary["updated"]} updated)'
+        )
     
     def recalculate_fantasy_player_events(self, batch_size, season=None):
-        # Initialize count variable
-        count = 0
-        
         # Filter by season if specified
-        base_query = FantasyPlayerEvent.objects.select_related('match_event', 'boost')
+        base_query = FantasyPlayerEvent.objects.select_related('match_event', 'boost').order_by('id')
         if season:
             base_query = base_query.filter(match_event__match__season__year=season)
         
@@ -230,125 +119,35 @@ class Command(BaseCommand):
             self.stdout.write('No FantasyPlayerEvent records to process')
             return
         
+        # Boost points are shared by every squad holding a player with the same role
+        boost_memo = BoostMemo()
+        count = 0
+        updated = 0
+        
         # Process in batches
         for i in range(0, total, batch_size):
             with transaction.atomic():
-                batch = base_query[i:i+batch_size]
+                batch = list(base_query[i:i+batch_size])
+                boost_memo.prefetch(event.match_event_id for event in batch)
                 
-                batch_count = 0
+                changed = []
                 for event in batch:
-                    try:
-                        if not event.boost:
-                            event.boost_points = 0
-                            event.save(update_fields=['boost_points'])
-                            batch_count += 1
-                            continue
-                        
-                        # Recalculate boost points based on role
-                        ipl_event = event.match_event
-                        boost = event.boost
-                        
-                        # For Captain (2x) and Vice Captain (1.5x) roles that apply to all points
-                        if boost.label in ['Captain', 'Vice Captain']:
-                            multiplier = boost.multiplier_runs  # All multipliers are the same for these roles
-                            event.boost_points = (multiplier - 1.0) * ipl_event.total_points_all
-                        else:
-                            # Calculate specific boost points for each category
-                            # Batting boosts
-                            bat_boost = 0
-                            if ipl_event.bat_runs is not None:
-                                bat_boost += (boost.multiplier_runs - 1.0) * ipl_event.bat_runs
-                                bat_boost += (boost.multiplier_fours - 1.0) * (ipl_event.bat_fours or 0)
-                                bat_boost += (boost.multiplier_sixes - 1.0) * 2 * (ipl_event.bat_sixes or 0)
-                                
-                                # SR bonus calculation - use exact float math
-                                sr_bonus = 0
-                                if ipl_event.bat_balls and ipl_event.bat_balls >= 10:
-                                    sr = float(ipl_event.bat_runs) / float(ipl_event.bat_balls) * 100.0
-                                    if sr >= 200.0:
-                                        sr_bonus = 6
-                                    elif sr >= 175.0:
-                                        sr_bonus = 4
-                                    elif sr >= 150.0:
-                                        sr_bonus = 2
-                                    elif sr < 50.0:
-                                        sr_bonus = -6
-                                    elif sr < 75.0:
-                                        sr_bonus = -4
-                                    elif sr < 100.0:  # SR=100 gets NO penalty
-                                        sr_bonus = -2
-                                
-                                bat_boost += (boost.multiplier_sr - 1.0) * sr_bonus
-                                
-                                # Milestones
-                                bat_milestones = 0
-                                if ipl_event.bat_runs >= 100:
-                                    bat_milestones += 16
-                                if ipl_event.bat_runs >= 50:
-                                    bat_milestones += 8
-                                
-                                bat_boost += (boost.multiplier_bat_milestones - 1.0) * bat_milestones
-                            
-                            # Bowling boosts
-                            bowl_boost = 0
-                            if ipl_event.bowl_wickets is not None or ipl_event.bowl_maidens is not None:
-                                bowl_boost += (boost.multiplier_wickets - 1.0) * 25 * (ipl_event.bowl_wickets or 0)
-                                bowl_boost += (boost.multiplier_maidens - 1.0) * 8 * (ipl_event.bowl_maidens or 0)
-                                
-                                # Economy bonus calculation - use exact float math
-                                eco_bonus = 0
-                                if ipl_event.bowl_balls and ipl_event.bowl_balls >= 10 and ipl_event.bowl_runs is not None:
-                                    overs = float(ipl_event.bowl_balls) / 6.0
-                                    eco = float(ipl_event.bowl_runs) / overs
-                                    if eco < 5.0:
-                                        eco_bonus = 6
-                                    elif eco < 6.0:
-                                        eco_bonus = 4
-                                    elif eco < 7.0:  # Eco=7.0 gets NO bonus
-                                        eco_bonus = 2
-                                    elif eco >= 12.0:
-                                        eco_bonus = -6
-                                    elif eco >= 11.0:
-                                        eco_bonus = -4
-                                    elif eco >= 10.0:
-                                        eco_bonus = -2
-                                
-                                bowl_boost += (boost.multiplier_economy - 1.0) * eco_bonus
-                                
-                                # Milestones
-                                bowl_milestones = 0
-                                if (ipl_event.bowl_wickets or 0) >= 5:
-                                    bowl_milestones += 16
-                                if (ipl_event.bowl_wickets or 0) >= 3:
-                                    bowl_milestones += 8
-                                
-                                bowl_boost += (boost.multiplier_bowl_milestones - 1.0) * bowl_milestones
-                            
-                            # Fielding boosts
-                            field_boost = 0
-                            catches = (ipl_event.field_catch or 0) + (ipl_event.wk_catch or 0)
-                            field_boost += (boost.multiplier_catches - 1.0) * 8 * catches
-                            field_boost += (boost.multiplier_stumpings - 1.0) * 12 * (ipl_event.wk_stumping or 0)
-                            run_out_points = 8 * (ipl_event.run_out_solo or 0) + 4 * (ipl_event.run_out_collab or 0)
-                            field_boost += (boost.multiplier_run_outs - 1.0) * run_out_points
-                            
-                            # Other boosts (POTM + participation)
-                            other_boost = 0
-                            potm_boost = (boost.multiplier_potm - 1.0) * (50 if ipl_event.player_of_match else 0)
-                            playing_boost = (boost.multiplier_playing - 1.0) * 4  # Participation points
-                            other_boost = potm_boost + playing_boost
-                            
-                            # Total boost points
-                            event.boost_points = float(bat_boost + bowl_boost + field_boost + other_boost)
-                        
-                        event.save(update_fields=['boost_points'])
-                        batch_count += 1
-                    except Exception as e:
-                        self.stderr.write(f"Error processing FantasyPlayerEvent {event.id}: {str(e)}")
+                    boost_points = boost_memo.boost_points_for(event.match_event, event.boost)
+                    if event.boost_points != boost_points:
+                        event.boost_points = boost_points
+                        changed.append(event)
                 
-                count += batch_count
+                if changed:
+                    FantasyPlayerEvent.objects.bulk_update(changed, ['boost_points'], batch_size=batch_size)
+                boost_memo.flush()
             
-            self.stdout.write(f'Processed {min(count, total)} of {total} FantasyPlayerEvents')
+            count += len(batch)
+            updated += len(changed)
+        
+        self.stdout.write(
+            f'Processed {count} of {total} FantasyPlayerEvents ({updated} updated, '
+            f'{boost_memo.misses} boost values computed)'
+        )
 
     def recalculate_fantasy_match_events(self, season=None):
         """Recalculate match events with optional season filter"""
@@ -421,11 +220,17 @@ class Command(BaseCommand):
         service = CricketDataService()
         matches = Match.objects.filter(
             id__in=FantasyMatchEvent.objects.values('match').distinct()
-        ).order_by('date')
+        ).order_by('date', 'id')
         
+        # Matches are replayed in order, so each one can build on the previous running totals
+        match_ranks_changed = running_ranks_changed = 0
         for match in matches:
-            service._update_match_ranks(match)
-            service._update_running_ranks(match)
+            match_ranks_changed += service._update_match_ranks(match)
+            running_ranks_changed += service._update_running_ranks(match, incremental=True)
+        
+        self.stdout.write(
+            f'Updated match ranks on {match_ranks_changed} and running ranks on {running_ranks_changed} match events'
+        )
     
     def recalculate_fantasy_squad_points(self, season=None):
         """Calculate FantasySquad totals from FantasyMatchEvents"""
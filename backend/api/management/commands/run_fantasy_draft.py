@@ -5,7 +5,7 @@ import random
 import logging
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from api.models import FantasyLeague, FantasySquad, FantasyDraft, Season, Player
+from api.models import FantasyLeague, FantasySquad, FantasyDraft, Season, Player, SquadMembership
 from django.utils import timezone
 from django.db.models import Avg, Count, Q
 from typing import List, Dict, Any
@@ -306,6 +306,7 @@ class Command(BaseCommand):
         for squad_id, player_ids in results.items():
             squad = FantasySquad.objects.get(id=squad_id)
             squad.current_squad = player_ids
+            squad._membership_source = SquadMembership.Source.DRAFT
             squad.save()
             
             self.stdout.write(f'Assigned {len(player_ids)} players to {squad.name}')
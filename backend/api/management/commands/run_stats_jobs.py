@@ -0,0 +1,101 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from api.models import FantasyLeague, StatsJob
+from api.services.stats_job_service import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_POLL_INTERVAL,
+    enqueue_stats_jobs,
+    queue_status,
+    retry_failed_jobs,
+    run_worker,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run the FantasyStats job worker, or inspect and manage the queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help=f'Number of jobs processed in parallel (default: {DEFAULT_CONCURRENCY})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help=f'Seconds an idle worker waits before polling again (default: {DEFAULT_POLL_INTERVAL})'
+        )
+        parser.add_argument(
+            '--drain',
+            action='store_true',
+            help='Exit once the queue has no runnable jobs instead of polling forever'
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='Print queue counts and recent failures, then exit'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Requeue all failed jobs, then exit'
+        )
+        parser.add_argument(
+            '--enqueue-league',
+            type=int,
+            action='append',
+            help='Queue a full stats rebuild for a league ID (repeatable), then exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['status']:
+            self._print_status()
+            return
+
+        if options['retry_failed']:
+            retried = retry_failed_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Requeued {retried} failed jobs"))
+            return
+
+        if options['enqueue_league']:
+            league_ids = list(
+                FantasyLeague.objects.filter(id__in=options['enqueue_league']).values_list('id', flat=True)
+            )
+            created = enqueue_stats_jobs(league_ids)
+            self.stdout.write(self.style.SUCCESS(f"Queued {created} full rebuild jobs"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Starting stats worker with {options['concurrency']} threads"
+            + (" (drain mode)" if options['drain'] else "")
+        ))
+        summary = run_worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            drain=options['drain'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker finished: {summary['succeeded']} succeeded, {summary['failed']} failed"
+        ))
+
+    def _print_status(self):
+        status = queue_status()
+        counts = status['counts']
+        self.stdout.write("Stats job queue:")
+        for value, label in StatsJob.Status.choices:
+            self.stdout.write(f"  {label}: {counts.get(value, 0)}")
+        self.stdout.write(f"  Pending retries: {status['retrying']}")
+
+        if status['recent_failures']:
+            self.stdout.write(self.style.WARNING("Recent failures:"))
+            for failure in status['recent_failures']:
+                self.stdout.write(
+                    f"  Job {failure['id']} league={failure['league_id']} match={failure['match_id']} "
+                    f"attempts={failure['attempts']} at {failure['finished_at']}: {failure['last_error']}"
+                )
@@ -0,0 +1,99 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import DraftWindow, FantasyLeague
+from api.services.draft_simulation import (
+    DEFAULT_PREFERENCE_NOISE,
+    DEFAULT_RUNS,
+    ROLES,
+    build_mid_season_model,
+    build_pre_season_model,
+    simulate_drafts,
+)
+from api.services.draft_window_service import resolve_draft_window
+
+
+class Command(BaseCommand):
+    help = 'Run randomized draft simulations for a league and report projected points and role balance per squad'
+
+    def add_arguments(self, parser):
+        parser.add_argument('league_id', type=int, help='League ID')
+        parser.add_argument(
+            '--mid_season',
+            action='store_true',
+            help='Simulate the mid-season draft window instead of the pre-season draft'
+        )
+        parser.add_argument(
+            '--draft_window',
+            type=int,
+            help='Draft window ID for --mid_season. Defaults to the resolved MID_SEASON window.'
+        )
+        parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f'Simulated drafts (default: {DEFAULT_RUNS})')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes to run the simulations on (default: CPU count)'
+        )
+        parser.add_argument('--seed', type=int, help='Base random seed, for repeatable reports')
+        parser.add_argument(
+            '--preference_noise',
+            type=float,
+            default=DEFAULT_PREFERENCE_NOISE,
+            help=f'Rank noise, in list positions, added to preference orders (default: {DEFAULT_PREFERENCE_NOISE})'
+        )
+        parser.add_argument(
+            '--order_jitter',
+            type=float,
+            help='Places the snake order may move (default: full shuffle pre-season, 2 mid-season)'
+        )
+        parser.add_argument('--report', help='Write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        try:
+            league = FantasyLeague.objects.get(id=options['league_id'])
+        except FantasyLeague.DoesNotExist:
+            raise CommandError(f"League with ID {options['league_id']} not found")
+
+        try:
+            if options['mid_season']:
+                draft_window = resolve_draft_window(
+                    league,
+                    draft_window_id=options['draft_window'],
+                    kind=DraftWindow.Kind.MID_SEASON,
+                )
+                model = build_mid_season_model(league, draft_window)
+            else:
+                model = build_pre_season_model(league)
+            report = simulate_drafts(
+                model,
+                runs=options['runs'],
+                seed=options['seed'],
+                preference_noise=options['preference_noise'],
+                order_jitter=options['order_jitter'],
+                workers=options['workers'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['report']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['runs']} {report['kind'].replace('_', '-')} drafts for {league.name} (seed {report['seed']})"
+        ))
+        self.stdout.write(
+            f"{'Squad':<24} {'mean':>8} {'p10':>8} {'p50':>8} {'p90':>8}  "
+            + ' '.join(f'{role:>5}' for role in ROLES)
+        )
+        for squad in report['squads']:
+            points = squad['projected_points']
+            self.stdout.write(
+                f"{squad['squad_name'][:24]:<24} {points['mean']:>8.1f} {points['p10']:>8.1f} "
+                f"{points['p50']:>8.1f} {points['p90']:>8.1f}  "
+                + ' '.join(f"{squad['roles'][role]['mean']:>5.1f}" for role in ROLES)
+            )
@@ -1,6 +1,7 @@
-from django.db import models
 from django.core.management.base import BaseCommand
-from api.models import PlayerMatchEvent
+from api.models import PlayerMatchEvent, Season
+from api.services.player_aggregates import refresh_player_season_aggregates, refresh_season_fantasy_aggregates
+from api.services.scoring_service import recalculate_event_points
 
 class Command(BaseCommand):
     help = 'Updates points fields for all existing IPLPlayerEvents'
@@ -11,24 +12,13 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Updating points for {total_events} events...")
         
-        for i, event in enumerate(events, 1):
-            # Calculate all points
-            batting = event.bat_points
-            bowling = event.bowl_points
-            fielding = event.field_points
-            other = (50 if event.player_of_match else 0) + 4  # POTM + participation
-            total = batting + bowling + fielding + other
-
-            # Use update() to bypass the model's save() method and properties
-            PlayerMatchEvent.objects.filter(id=event.id).update(
-                batting_points_total=batting,
-                bowling_points_total=bowling,
-                fielding_points_total=fielding,
-                other_points_total=other,
-                total_points_all=total
-            )
-            
-            if i % 100 == 0:
-                self.stdout.write(f"Processed {i}/{total_events} events...")
+        # Scores in batches and writes with bulk_update, bypassing the model's save()
+        summary = recalculate_event_points(events)
+        if summary['updated']:
+            for season_id in Season.objects.values_list('id', flat=True):
+                refresh_player_season_aggregates(season_id)
+                refresh_season_fantasy_aggregates(season_id)
         
-        self.stdout.write(self.style.SUCCESS(f"Successfully updated points for {total_events} events"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully updated points for {total_events} events ({summary['updated']} changed)"
+        ))
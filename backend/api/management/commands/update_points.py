@@ -20,6 +20,12 @@ class Command(BaseCommand):
             help='Update all live matches'
         )
 
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-apply the scorecard even if it has not changed since the last update'
+        )
+
     def handle(self, *args, **options):
         service = CricketDataService()
         
@@ -28,10 +34,12 @@ class Command(BaseCommand):
             match_id = options['match_id']
             self.stdout.write(self.style.SUCCESS(f'Updating match {match_id}...'))
             
-            result = service.update_match_points(match_id)
+            result = service.update_match_points(match_id, force=options['force'])
             
             if 'error' in result:
                 self.stdout.write(self.style.ERROR(f"Error: {result['error']}"))
+            elif result.get('unchanged'):
+                self.stdout.write(self.style.WARNING('Scorecard unchanged since the last update'))
             else:
                 self.stdout.write(self.style.SUCCESS(
                     f"Updated {result['player_events_updated']} player events and "
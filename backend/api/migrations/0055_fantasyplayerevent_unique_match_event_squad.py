@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def remove_duplicate_fantasy_player_events(apps, schema_editor):
+    FantasyPlayerEvent = apps.get_model('api', 'FantasyPlayerEvent')
+
+    duplicates = (
+        FantasyPlayerEvent.objects.values('match_event_id', 'fantasy_squad_id')
+        .annotate(row_count=Count('id'), keep_id=Max('id'))
+        .filter(row_count__gt=1)
+    )
+    for duplicate in duplicates:
+        FantasyPlayerEvent.objects.filter(
+            match_event_id=duplicate['match_event_id'],
+            fantasy_squad_id=duplicate['fantasy_squad_id'],
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0054_draftwindowleaguerun_draftwindowteameligibility_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_fantasy_player_events, reverse_code=migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='fantasyplayerevent',
+            unique_together={('match_event', 'fantasy_squad')},
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0055_fantasyplayerevent_unique_match_event_squad'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fantasystats',
+            name='fold_state',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
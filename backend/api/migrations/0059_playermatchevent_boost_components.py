@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0058_matchscorecardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playermatchevent',
+            name='boost_components',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
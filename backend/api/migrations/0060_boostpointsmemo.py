@@ -0,0 +1,25 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0059_playermatchevent_boost_components'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoostPointsMemo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('boost_points', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('boost', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memos', to='api.fantasyboostrole')),
+                ('match_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boost_memos', to='api.playermatchevent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('match_event', 'boost'), name='uniq_boost_memo_event_role')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_squad_memberships(apps, schema_editor):
+    # Existing rosters have no recorded history; open spells cover every match,
+    # which matches how current_squad was read before this table existed.
+    FantasySquad = apps.get_model('api', 'FantasySquad')
+    Player = apps.get_model('api', 'Player')
+    SquadMembership = apps.get_model('api', 'SquadMembership')
+
+    player_ids = set(Player.objects.values_list('id', flat=True))
+    memberships = []
+    for squad_id, league_id, current_squad in FantasySquad.objects.values_list('id', 'league_id', 'current_squad'):
+        for player_id in dict.fromkeys(current_squad or []):
+            if player_id in player_ids:
+                memberships.append(SquadMembership(
+                    fantasy_squad_id=squad_id,
+                    league_id=league_id,
+                    player_id=player_id,
+                    source='MANUAL',
+                ))
+    SquadMembership.objects.bulk_create(memberships, batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0060_boostpointsmemo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SquadMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('DRAFT', 'Draft'), ('TRADE', 'Trade'), ('REPLACEMENT', 'Replacement'), ('MANUAL', 'Manual')], default='MANUAL', max_length=12)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('left_at', models.DateTimeField(blank=True, null=True)),
+                ('fantasy_squad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='api.fantasysquad')),
+                ('from_match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='memberships_started', to='api.match')),
+                ('from_phase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='memberships_started', to='api.seasonphase')),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='squad_memberships', to='api.fantasyleague')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='squad_memberships', to='api.player')),
+                ('to_match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='memberships_ended', to='api.match')),
+                ('to_phase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='memberships_ended', to='api.seasonphase')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'left_at'], name='api_squadmem_player_idx'), models.Index(fields=['league', 'player'], name='api_squadmem_league_idx'), models.Index(fields=['fantasy_squad', 'left_at'], name='api_squadmem_squad_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('left_at__isnull', True)), fields=('fantasy_squad', 'player'), name='uniq_open_squad_membership')],
+            },
+        ),
+        migrations.RunPython(backfill_squad_memberships, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0062_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('total_points', models.IntegerField(default=0)),
+                ('avg_points', models.FloatField(default=0)),
+                ('batting_points', models.IntegerField(default=0)),
+                ('bowling_points', models.IntegerField(default=0)),
+                ('fielding_points', models.IntegerField(default=0)),
+                ('other_points', models.IntegerField(default=0)),
+                ('bat_innings', models.IntegerField(default=0)),
+                ('bat_runs', models.IntegerField(default=0)),
+                ('bat_balls', models.IntegerField(default=0)),
+                ('bat_fours', models.IntegerField(default=0)),
+                ('bat_sixes', models.IntegerField(default=0)),
+                ('bat_not_outs', models.IntegerField(default=0)),
+                ('bowl_innings', models.IntegerField(default=0)),
+                ('bowl_balls', models.IntegerField(default=0)),
+                ('bowl_runs', models.IntegerField(default=0)),
+                ('bowl_wickets', models.IntegerField(default=0)),
+                ('bowl_maidens', models.IntegerField(default=0)),
+                ('catches', models.IntegerField(default=0)),
+                ('stumpings', models.IntegerField(default=0)),
+                ('run_outs', models.IntegerField(default=0)),
+                ('player_of_match', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_aggregates', to='api.player')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_aggregates', to='api.season')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', 'player'], name='api_playerseasonagg_season_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'season'), name='uniq_player_season_aggregate')],
+            },
+        ),
+    ]
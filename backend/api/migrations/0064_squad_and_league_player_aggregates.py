@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0063_playerseasonaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaguePlayerAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('base_points', models.IntegerField(default=0)),
+                ('boost_points', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_aggregates', to='api.fantasyleague')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='league_aggregates', to='api.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('league', 'player'), name='uniq_league_player_aggregate')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SquadPlayerAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('base_points', models.IntegerField(default=0)),
+                ('boost_points', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fantasy_squad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_aggregates', to='api.fantasysquad')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='squad_aggregates', to='api.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fantasy_squad', 'player'), name='uniq_squad_player_aggregate')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0064_squad_and_league_player_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='squadmembership',
+            name='after_match',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='memberships_started_after', to='api.match'),
+        ),
+        migrations.AlterField(
+            model_name='squadmembership',
+            name='to_match',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='memberships_ended', to='api.match'),
+        ),
+    ]
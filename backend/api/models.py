@@ -488,20 +488,28 @@ class PlayerMatchEvent(models.Model):
     other_points_total = models.IntegerField(default=0)
     total_points_all = models.IntegerField(default=0)
 
+    # Points per FantasyBoostRole multiplier category, in scoring_service.BOOST_CATEGORIES order
+    boost_components = models.JSONField(default=list, blank=True)
+
     def save(self, *args, **kwargs):
+        # Compare with the stored row rather than relying on apply_points()
+        # reporting a change: callers may already have rescored the instance
+        is_new = not self.pk or self._state.adding
+        inputs_changed = not is_new and self._has_point_fields_changed()
+
         # Calculate point totals only if necessary fields have changed or object is new
-        if not self.pk or self._state.adding or self._has_point_fields_changed():
-            self.batting_points_total = self.bat_points
-            self.bowling_points_total = self.bowl_points  
-            self.fielding_points_total = self.field_points
-            self.other_points_total = self.other_points
-            self.total_points_all = (self.batting_points_total + 
-                                    self.bowling_points_total + 
-                                    self.fielding_points_total + 
-                                    self.other_points_total)
-        
+        points_changed = False
+        if is_new or not self.boost_components or inputs_changed:
+            from api.services.scoring_service import apply_points
+            points_changed = bool(apply_points([self]))
+        stats_changed = not is_new and (inputs_changed or points_changed)
+
         super().save(*args, **kwargs)
 
+        if stats_changed:
+            from api.services.boost_memo import invalidate_boost_memo
+            invalidate_boost_memo(event_ids=[self.pk])
+
     def _has_point_fields_changed(self):
         """Check if any fields affecting point calculations have changed"""
         if not self.pk:
@@ -561,117 +569,45 @@ class PlayerMatchEvent(models.Model):
         eco = Decimal(str(self.bowl_runs)) / overs
         return eco.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
     
-    def _calculate_sr_bonus(self):
-        """Calculate strike rate bonus/penalty"""
-        if self.bat_balls < 10:  # Minimum 10 balls required
-            return 0
-        
-        from decimal import Decimal
-        sr = self.bat_strike_rate
-        if not isinstance(sr, Decimal):
-            sr = Decimal(str(sr))
-            
-        if sr >= Decimal('200'):
-            return 6
-        elif sr >= Decimal('175'):
-            return 4
-        elif sr >= Decimal('150'):
-            return 2
-        elif sr < Decimal('50'):
-            return -6
-        elif sr < Decimal('75'):
-            return -4
-        elif sr < Decimal('100'):
-            return -2
-        return 0
-    
-    def _calculate_economy_bonus(self):
-        """Calculate economy rate bonus/penalty"""
-        if self.bowl_balls < 10:  # Minimum 10 balls required
-            return 0
-            
-        from decimal import Decimal
-        economy = self.bowl_economy
-        if not isinstance(economy, Decimal):
-            economy = Decimal(str(economy))
-            
-        if economy < Decimal('5'):
-            return 6
-        elif economy < Decimal('6'):
-            return 4
-        elif economy < Decimal('7'):
-            return 2
-        elif economy >= Decimal('12'):
-            return -6
-        elif economy >= Decimal('11'):
-            return -4
-        elif economy >= Decimal('10'):
-            return -2
-        return 0
+    def _scored_points(self):
+        """
+        Score this event with the shared scoring engine without saving it. The
+        result is kept on the instance until one of the scored inputs changes.
+        """
+        from api.services.scoring_service import event_row, score_rows
+        row = event_row(self)
+        key = tuple(row.values())
+        cached = getattr(self, '_scored_points_cache', None)
+        if cached is None or cached[0] != key:
+            points = score_rows([row])
+            cached = (key, {field: int(values[0]) for field, values in points.items()})
+            self._scored_points_cache = cached
+        return cached[1]
 
     @property
     def bat_points(self):
         """Calculate total batting points"""
-        if self.bat_runs is None:
-            return 0
-            
-        points = 0
-        points += self.bat_runs  # Runs
-        points += (self.bat_fours or 0)  # Boundaries
-        points += (2 * (self.bat_sixes or 0))  # Six bonus
-        points += (8 if self.bat_runs >= 50 else 0)  # 50+ bonus
-        points += (16 if self.bat_runs >= 100 else 0)  # 100+ bonus
-        points += self._calculate_sr_bonus()  # Strike rate bonus/penalty
-        
-        # Duck penalty for non-bowlers
-        if (self.bat_runs == 0 and not self.bat_not_out and 
-            hasattr(self.player, 'role') and self.player.role != 'BOWL'):
-            points -= 2
-            
-        return points
+        return self._scored_points()['batting_points_total']
     
     @property
     def bowl_points(self):
         """Calculate total bowling points"""
-        if self.bowl_wickets is None and self.bowl_maidens is None:
-            return 0
-            
-        points = 0
-        points += ((self.bowl_wickets or 0) * 25)  # Wickets
-        points += ((self.bowl_maidens or 0) * 8)  # Maidens
-        points += (8 if (self.bowl_wickets or 0) >= 3 else 0)  # 3+ wickets bonus
-        points += (16 if (self.bowl_wickets or 0) >= 5 else 0)  # 5+ wickets bonus
-        points += self._calculate_economy_bonus()  # Economy bonus/penalty
-        return points
+        return self._scored_points()['bowling_points_total']
     
     @property
     def field_points(self):
         """Calculate total fielding points"""
-        if all(v is None for v in [self.wk_stumping, self.field_catch, self.wk_catch, self.run_out_solo, self.run_out_collab]):
-            return 0
-            
-        return (
-            ((self.wk_stumping or 0) * 12) +  # Stumpings
-            ((self.field_catch or 0) * 8) +  # Catches
-            ((self.wk_catch or 0) * 8) +  # Keeper catches
-            ((self.run_out_solo or 0) * 8) +  # Solo run outs
-            ((self.run_out_collab or 0) * 4)  # Collaborative run outs
-        )
+        return self._scored_points()['fielding_points_total']
     
     @property
     def other_points(self):
         """Calculate other points (POTM + playing)"""
-        return (50 if self.player_of_match else 0) + 4  # POTM + participation
+        return self._scored_points()['other_points_total']
     
     @property
     def base_points(self):
         """Calculate total base points"""
-        return (
-            self.bat_points +
-            self.bowl_points +
-            self.field_points +
-            self.other_points
-        )
+        return self._scored_points()['total_points_all']
     
     class Meta:
         db_table = 'api_iplplayerevent'
@@ -709,6 +645,75 @@ class PlayerMatchEvent(models.Model):
         return f"{self.player.name} - {self.match}"
 
 
+class MatchScorecardSnapshot(models.Model):
+    """
+    Last scorecard applied to a match by CricketDataService.update_match_points.
+
+    content_hash covers the scorecard payload, so an identical poll is skipped
+    outright; player_stats holds the per-player records that were written, so a
+    changed poll only touches the players whose line actually moved.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='scorecard_snapshot')
+    # Empty when some players could not be resolved, forcing the next poll to retry them
+    content_hash = models.CharField(max_length=64, blank=True)
+    player_stats = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Scorecard snapshot for {self.match}"
+
+
+class PlayerSeasonAggregate(models.Model):
+    """
+    A player's PlayerMatchEvent totals for one season.
+
+    Rows are rebuilt for the touched (season, players) whenever events are
+    written (see services/player_aggregates.py), so draft, preview and history
+    endpoints read one row per player-season instead of re-aggregating events.
+    """
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='season_aggregates')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='player_aggregates')
+    matches = models.PositiveIntegerField(default=0)
+
+    total_points = models.IntegerField(default=0)
+    avg_points = models.FloatField(default=0)
+    batting_points = models.IntegerField(default=0)
+    bowling_points = models.IntegerField(default=0)
+    fielding_points = models.IntegerField(default=0)
+    other_points = models.IntegerField(default=0)
+
+    bat_innings = models.IntegerField(default=0)
+    bat_runs = models.IntegerField(default=0)
+    bat_balls = models.IntegerField(default=0)
+    bat_fours = models.IntegerField(default=0)
+    bat_sixes = models.IntegerField(default=0)
+    bat_not_outs = models.IntegerField(default=0)
+
+    bowl_innings = models.IntegerField(default=0)
+    bowl_balls = models.IntegerField(default=0)
+    bowl_runs = models.IntegerField(default=0)
+    bowl_wickets = models.IntegerField(default=0)
+    bowl_maidens = models.IntegerField(default=0)
+
+    catches = models.IntegerField(default=0)
+    stumpings = models.IntegerField(default=0)
+    run_outs = models.IntegerField(default=0)
+    player_of_match = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'season'], name='uniq_player_season_aggregate'),
+        ]
+        indexes = [
+            models.Index(fields=['season', 'player'], name='api_playerseasonagg_season_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} in season {self.season_id}: {self.matches} matches"
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     theme = models.CharField(max_length=10, choices=[('light', 'Light'), ('dark', 'Dark')], default='light')
@@ -873,6 +878,64 @@ class FantasySquad(TimeStampedModel):
         return f"{self.name} ({self.league.name})"
 
 
+class SquadMembership(models.Model):
+    """
+    A player's spell in a fantasy squad.
+
+    current_squad holds the live roster; this table records who owned each
+    player and for which matches, so ownership lookups are indexed queries and
+    past rosters can be read without replaying draft payloads. Rows are kept in
+    sync by services/squad_membership.py. A spell starts at from_match, and
+    strictly after after_match (the last match that had started when the player
+    joined); only backfilled spells leave both null. to_match is the last match
+    a closed spell covers.
+    """
+    class Source(models.TextChoices):
+        DRAFT = 'DRAFT', _('Draft')
+        TRADE = 'TRADE', _('Trade')
+        REPLACEMENT = 'REPLACEMENT', _('Replacement')
+        MANUAL = 'MANUAL', _('Manual')
+
+    fantasy_squad = models.ForeignKey(FantasySquad, on_delete=models.CASCADE, related_name='memberships')
+    league = models.ForeignKey(FantasyLeague, on_delete=models.CASCADE, related_name='squad_memberships')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='squad_memberships')
+    source = models.CharField(max_length=12, choices=Source.choices, default=Source.MANUAL)
+    from_match = models.ForeignKey(
+        Match, on_delete=models.SET_NULL, null=True, blank=True, related_name='memberships_started'
+    )
+    after_match = models.ForeignKey(
+        Match, on_delete=models.RESTRICT, null=True, blank=True, related_name='memberships_started_after'
+    )
+    to_match = models.ForeignKey(
+        Match, on_delete=models.RESTRICT, null=True, blank=True, related_name='memberships_ended'
+    )
+    from_phase = models.ForeignKey(
+        SeasonPhase, on_delete=models.SET_NULL, null=True, blank=True, related_name='memberships_started'
+    )
+    to_phase = models.ForeignKey(
+        SeasonPhase, on_delete=models.SET_NULL, null=True, blank=True, related_name='memberships_ended'
+    )
+    joined_at = models.DateTimeField(default=timezone.now)
+    left_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['player', 'left_at'], name='api_squadmem_player_idx'),
+            models.Index(fields=['league', 'player'], name='api_squadmem_league_idx'),
+            models.Index(fields=['fantasy_squad', 'left_at'], name='api_squadmem_squad_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fantasy_squad', 'player'],
+                condition=models.Q(left_at__isnull=True),
+                name='uniq_open_squad_membership',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} in {self.fantasy_squad_id} ({self.source})"
+
+
 class SquadPhaseBoost(models.Model):
     fantasy_squad = models.ForeignKey(FantasySquad, on_delete=models.CASCADE, related_name='phase_boosts')
     phase = models.ForeignKey(SeasonPhase, on_delete=models.CASCADE, related_name='squad_boosts')
@@ -954,6 +1017,7 @@ class FantasyPlayerEvent(models.Model):
     boost_points = models.FloatField(default=0)
 
     class Meta:
+        unique_together = ('match_event', 'fantasy_squad')
         indexes = [
             models.Index(fields=['match_event']),
             models.Index(fields=['fantasy_squad']),
@@ -962,6 +1026,71 @@ class FantasyPlayerEvent(models.Model):
 
     def __str__(self):
         return f"{self.fantasy_squad.name} - {self.match_event.player.name} - {self.match_event.match}"
+
+
+class SquadPlayerAggregate(models.Model):
+    """
+    A player's FantasyPlayerEvent totals while owned by one fantasy squad.
+
+    Rebuilt for the touched (squad, player) pairs whenever fantasy events are
+    written (see services/player_aggregates.py).
+    """
+    fantasy_squad = models.ForeignKey(FantasySquad, on_delete=models.CASCADE, related_name='player_aggregates')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='squad_aggregates')
+    matches = models.PositiveIntegerField(default=0)
+    base_points = models.IntegerField(default=0)
+    boost_points = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fantasy_squad', 'player'], name='uniq_squad_player_aggregate'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} in squad {self.fantasy_squad_id}: {self.matches} matches"
+
+
+class LeaguePlayerAggregate(models.Model):
+    """
+    A player's FantasyPlayerEvent totals across every squad of a league, for the
+    league's season. Maintained alongside SquadPlayerAggregate.
+    """
+    league = models.ForeignKey(FantasyLeague, on_delete=models.CASCADE, related_name='player_aggregates')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='league_aggregates')
+    matches = models.PositiveIntegerField(default=0)
+    base_points = models.IntegerField(default=0)
+    boost_points = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['league', 'player'], name='uniq_league_player_aggregate'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} in league {self.league_id}: {self.matches} matches"
+
+class BoostPointsMemo(models.Model):
+    """
+    Boost points a FantasyBoostRole earns on a PlayerMatchEvent.
+
+    Many squads own the same player with the same role, so the value is stored
+    once per (event, role) and shared. Rows are deleted when the event's stats
+    or the role's multipliers change (see services/boost_memo.py).
+    """
+    match_event = models.ForeignKey(PlayerMatchEvent, on_delete=models.CASCADE, related_name='boost_memos')
+    boost = models.ForeignKey(FantasyBoostRole, on_delete=models.CASCADE, related_name='memos')
+    boost_points = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match_event', 'boost'], name='uniq_boost_memo_event_role'),
+        ]
+
+    def __str__(self):
+        return f"{self.boost} on event {self.match_event_id}: {self.boost_points}"
     
 class FantasyTrade(models.Model):
     initiator = models.ForeignKey(FantasySquad, on_delete=models.CASCADE, related_name='initiated_trades')
@@ -1015,6 +1144,83 @@ class FantasyStats(models.Model):
     # Pre-calculated JSON fields
     match_details = models.JSONField(default=dict)
     player_details = models.JSONField(default=dict)
+
+    # Running aggregates that let a newly completed match be folded into the
+    # JSON above without replaying the season (see stats_service.fold_match_into_stats)
+    fold_state = models.JSONField(default=dict, blank=True)
     
     def __str__(self):
         return f"Stats for {self.league.name}"
+
+class StatsJob(models.Model):
+    """
+    Queued FantasyStats recalculation for one league.
+
+    A job with a match folds that match into the league's stats; a job without
+    one rebuilds them from scratch. Jobs are processed by the run_stats_jobs
+    management command (see services/stats_job_service.py).
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        RUNNING = 'RUNNING', _('Running')
+        SUCCEEDED = 'SUCCEEDED', _('Succeeded')
+        FAILED = 'FAILED', _('Failed')
+
+    league = models.ForeignKey('FantasyLeague', on_delete=models.CASCADE, related_name='stats_jobs')
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, null=True, blank=True, related_name='stats_jobs')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['league', 'status']),
+        ]
+        constraints = [
+            # At most one queued job per (league, match); re-enqueues collapse into it.
+            models.UniqueConstraint(
+                fields=['league', 'match'],
+                condition=models.Q(status='PENDING'),
+                name='uniq_pending_stats_job',
+            ),
+        ]
+
+    def __str__(self):
+        target = f"match {self.match_id}" if self.match_id else "full rebuild"
+        return f"Stats job {self.id} for league {self.league_id} ({target}, {self.status})"
+
+
+class DataVersion(models.Model):
+    """
+    Monotonic change counter for a league, season or match.
+
+    Writers bump the counter whenever data shown by the cached endpoints
+    changes (see services/data_versions.py); cache keys embed the current
+    values, so a bump retires every cached response built from older data.
+    """
+    class Scope(models.TextChoices):
+        LEAGUE = 'LEAGUE', _('League')
+        SEASON = 'SEASON', _('Season')
+        MATCH = 'MATCH', _('Match')
+
+    scope = models.CharField(max_length=6, choices=Scope.choices)
+    object_id = models.PositiveBigIntegerField()
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'object_id'], name='uniq_data_version_scope_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.object_id} v{self.version}"
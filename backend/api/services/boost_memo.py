@@ -0,0 +1,119 @@
+"""
+Shared boost points per (PlayerMatchEvent, FantasyBoostRole).
+
+Boost points depend only on the event's scored stats and the role's
+multipliers, not on the squad, so every squad that owns a player with the same
+role gets the same value. BoostMemo computes each pair once, keeps it in memory
+for the current run and persists it in BoostPointsMemo so later runs (ingest,
+recalculate_points, fix_points, admin edits) reuse it.
+
+Stored values are invalidated by:
+- PlayerMatchEvent.save() and the bulk scoring writers when an event's points change
+- FantasyBoostRole saves (api.signals)
+Writers that bypass these (queryset .update() on stat fields) must call
+invalidate_boost_memo themselves.
+"""
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..models import BoostPointsMemo, FantasyBoostRole, PlayerMatchEvent
+from .scoring_service import boost_components, boost_points
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_boost_memo(event_ids: Optional[Iterable[int]] = None, boost_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Delete stored boost points for these events and/or roles.
+
+    Returns:
+        Number of memo rows deleted
+    """
+    memos = BoostPointsMemo.objects.all()
+    if event_ids is not None:
+        event_ids = list(event_ids)
+        if not event_ids:
+            return 0
+        memos = memos.filter(match_event_id__in=event_ids)
+    if boost_ids is not None:
+        boost_ids = list(boost_ids)
+        if not boost_ids:
+            return 0
+        memos = memos.filter(boost_id__in=boost_ids)
+    deleted, _ = memos.delete()
+    return deleted
+
+
+class BoostMemo:
+    """
+    Per-run boost points memo backed by the BoostPointsMemo table.
+
+    Call prefetch() with the events about to be scored to load their stored
+    values in one query, boost_points_for() for each (event, role) pair, and
+    flush() to persist the values computed during the run.
+    """
+
+    def __init__(self):
+        self._values: Dict[Tuple[int, int], float] = {}
+        self._loaded_event_ids = set()
+        self._pending: Dict[Tuple[int, int], float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, event_ids: Iterable[int]) -> None:
+        event_ids = set(event_ids) - self._loaded_event_ids
+        if not event_ids:
+            return
+        rows = BoostPointsMemo.objects.filter(match_event_id__in=event_ids).values_list(
+            'match_event_id', 'boost_id', 'boost_points'
+        )
+        for event_id, boost_id, value in rows:
+            self._values.setdefault((event_id, boost_id), value)
+        self._loaded_event_ids |= event_ids
+
+    def forget(self, event_ids: Iterable[int]) -> None:
+        """Drop in-memory values for events whose stats changed during this run."""
+        event_ids = set(event_ids)
+        for key in [key for key in self._values if key[0] in event_ids]:
+            del self._values[key]
+            self._pending.pop(key, None)
+
+    def boost_points_for(self, event: PlayerMatchEvent, boost: Optional[FantasyBoostRole]) -> float:
+        if boost is None:
+            return 0
+        key = (event.id, boost.id)
+        if key not in self._values and event.id not in self._loaded_event_ids:
+            self.prefetch([event.id])
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+
+        self.misses += 1
+        value = boost_points(boost_components(event), event.total_points_all, boost)
+        self._values[key] = value
+        self._pending[key] = value
+        return value
+
+    def flush(self) -> int:
+        """
+        Persist values computed since the last flush.
+
+        Returns:
+            Number of memo rows written
+        """
+        if not self._pending:
+            return 0
+        memos = [
+            BoostPointsMemo(match_event_id=event_id, boost_id=boost_id, boost_points=value)
+            for (event_id, boost_id), value in self._pending.items()
+        ]
+        BoostPointsMemo.objects.bulk_create(
+            memos,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['match_event', 'boost'],
+            update_fields=['boost_points', 'updated_at'],
+        )
+        logger.debug(f"Stored {len(memos)} boost memo rows ({self.hits} hits, {self.misses} misses)")
+        self._pending = {}
+        return len(memos)
@@ -0,0 +1,106 @@
+"""
+Response cache keys and their invalidation.
+
+The league, stats, player and match endpoints cache whole responses in the
+shared Django cache (settings.CACHES). Views build keys with the helpers below.
+
+League and match keys embed data version tokens (services/data_versions.py), so
+writers invalidate them by bumping the counters; entries from older versions are
+never read again and age out of the cache. Player history has no counter and is
+deleted key by key.
+
+- update_match_points: bumps the match and its season, deletes history for the
+  players whose records changed
+- roster changes (drafts, trades, replacements), draft orders, boost edits and
+  stats rebuilds: bump the league (via api.signals)
+
+Version-free *_stale keys hold the last payload built for each resource; they
+are served only while another worker rebuilds the fresh entry
+(services/response_cache.py).
+
+Deletes run after the surrounding transaction commits so a concurrent request
+cannot refill a key with pre-commit data.
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .data_versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+NO_LEAGUE = 'no_league'
+
+# Versioned entries only go stale when their counters move, so keep them long.
+# The timeout is a backstop for writes that bump no counter (player profile edits).
+VERSIONED_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+def league_players_key(league_id: int, season_id: int, version: str) -> str:
+    return f'league_players_{league_id}_{season_id}_v{version}'
+
+
+def league_squads_key(league_id: int, version: str) -> str:
+    return f'league_squads_v4_{league_id}_v{version}'
+
+
+def league_stats_key_prefix(league_id: int, version: str) -> str:
+    return f'league_stats_{league_id}_v{version}'
+
+
+def league_players_stale_key(league_id: int, season_id: int) -> str:
+    return f'league_players_{league_id}_{season_id}_stale'
+
+
+def league_squads_stale_key(league_id: int) -> str:
+    return f'league_squads_v4_{league_id}_stale'
+
+
+def league_stats_stale_key_prefix(league_id: int) -> str:
+    return f'league_stats_{league_id}_stale'
+
+
+def player_history_key(player_id: int) -> str:
+    return f'player_history_{player_id}'
+
+
+def match_events_key(match_id: int, league_id=None, version: str = '0') -> str:
+    return f'match_events_{match_id}_{league_id or NO_LEAGUE}_v{version}'
+
+
+def delete_keys(keys: Iterable[str]) -> List[str]:
+    """
+    Delete cache keys once the current transaction commits.
+
+    Returns:
+        The keys scheduled for deletion
+    """
+    keys = sorted(set(keys))
+    if keys:
+        def _delete():
+            cache.delete_many(keys)
+            logger.debug(f"Invalidated {len(keys)} cache keys")
+        transaction.on_commit(_delete)
+    return keys
+
+
+def invalidate_match_caches(match, player_ids: Optional[Iterable[int]] = None) -> List[str]:
+    """
+    Retire cached responses built from a match's scores.
+
+    Args:
+        match: Match whose player or fantasy events changed
+        player_ids: Players whose match records changed
+
+    Returns:
+        The player history keys scheduled for deletion
+    """
+    bump_versions(season_ids=[match.season_id], match_ids=[match.id])
+    return delete_keys(player_history_key(player_id) for player_id in player_ids or [])
+
+
+def invalidate_league_caches(league_ids: Iterable[int]) -> None:
+    """Retire cached league responses after a roster, draft, boost or stats change."""
+    bump_versions(league_ids=league_ids)
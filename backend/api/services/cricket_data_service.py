@@ -1,26 +1,73 @@
-import requests
 import logging
 from typing import Dict, List, Optional, Union, Tuple
 from decimal import Decimal
 from django.conf import settings
 from django.db import transaction, models
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 
+from api.services.boost_memo import BoostMemo, invalidate_boost_memo
+from api.services.cache_invalidation import invalidate_match_caches
+from api.services.player_aggregates import refresh_fantasy_aggregates, refresh_player_season_aggregates
+from api.services.identity_resolver import IdentityResolver
+from api.services.scorecard_diff import diff_player_records, scorecard_content_hash
+from api.services.scoring_service import SCORED_FIELDS, STAT_FIELDS, apply_points
+from api.services.scorecard_fetcher import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT, ScorecardFetcher
+from api.services.squad_membership import squad_ids_by_player_for_match
 from api.models import (
     Match, Player, Team, PlayerMatchEvent, FantasySquad, FantasyPlayerEvent, FantasyBoostRole, FantasyMatchEvent, FantasyLeague,
-    SquadPhaseBoost
+    SquadPhaseBoost, MatchScorecardSnapshot
 )
 
 logger = logging.getLogger(__name__)
 
+# Starting values for a player's first scorecard line in a match
+NEW_PLAYER_EVENT_DEFAULTS = {
+    "bat_runs": 0,
+    "bat_balls": 0,
+    "bat_fours": 0,
+    "bat_sixes": 0,
+    "bat_not_out": True,
+    "bat_innings": 0,
+    "bowl_balls": 0,
+    "bowl_maidens": 0,
+    "bowl_runs": 0,
+    "bowl_wickets": 0,
+    "bowl_innings": 0,
+    "field_catch": 0,
+    "wk_catch": 0,
+    "wk_stumping": 0,
+    "run_out_solo": 0,
+    "run_out_collab": 0,
+    "player_of_match": False,
+}
+
+PLAYER_EVENT_UPDATE_FIELDS = ["for_team", "vs_team", "bat_innings", "bowl_innings", *STAT_FIELDS, *SCORED_FIELDS]
+
 class CricketDataService:
     """
     Service to fetch cricket match data from CricketData API and update database.
     """
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, fetcher=None):
         self.api_key = api_key or settings.CRICDATA_API_KEY
-        self.base_url = "https://api.cricapi.com/v1"
+        self.base_url = getattr(settings, "CRICDATA_BASE_URL", "https://api.cricapi.com/v1")
+        self._fetcher = fetcher
+        self.resolver = IdentityResolver()
+        self.boost_memo = BoostMemo()
+
+    @property
+    def fetcher(self) -> ScorecardFetcher:
+        """Pooled scorecard client, created on first use."""
+        if self._fetcher is None:
+            self._fetcher = ScorecardFetcher(
+                self.base_url,
+                self.api_key,
+                max_workers=getattr(settings, "CRICDATA_MAX_CONCURRENT_REQUESTS", DEFAULT_MAX_WORKERS),
+                timeout=getattr(settings, "CRICDATA_REQUEST_TIMEOUT", DEFAULT_TIMEOUT),
+                min_interval=getattr(settings, "CRICDATA_MIN_REQUEST_INTERVAL", 0.0),
+            )
+        return self._fetcher
         
     def fetch_match_scorecard(self, match_id: str) -> Dict:
         """
@@ -32,47 +79,33 @@ class CricketDataService:
         Returns:
             Dict containing the match scorecard data
         """
-        url = f"{self.base_url}/match_scorecard"
-        params = {"apikey": self.api_key, "id": match_id}
-        
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()  # Raise exception for non-200 status codes
-            
-            data = response.json()
-            print("Full Response: ", data)
-            if data.get("status") != "success":
-                error_msg = data.get("message", "Unknown API error")
-                logger.error(f"API Error for match {match_id}: {error_msg}")
-                return None
-                
-            return data
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch match {match_id}: {str(e)}")
-            return None
+        return self.fetcher.fetch(match_id)
     
     @transaction.atomic
-    def update_match_points(self, match_id: str) -> Dict:
+    def update_match_points(self, match_id: str, match_data: Optional[Dict] = None, force: bool = False) -> Dict:
         """
         Main method to update all fantasy points for a match.
         Runs in a database transaction for consistency.
+
+        The scorecard is compared with the snapshot stored by the previous run:
+        an identical scorecard is skipped, and otherwise only players whose
+        stats changed are written and fanned out to fantasy squads.
         
         Args:
             match_id: The CricketData API match ID
+            match_data: Scorecard already fetched by the caller; fetched here if omitted
+            force: Re-apply every player line even if the scorecard is unchanged
             
         Returns:
             Dict with summary of updates
         """
         print("Starting update_match_points for match ", match_id)
         logger.info(f"Starting update_match_points for match {match_id}")
-
-        # Reset sequence to prevent ID conflicts
-        self._reset_player_event_sequence()
         
         # Get the IPL match by cricdata_id
         try:
             print(f"Finding match with cricdata_id: {match_id}")
-            match = Match.objects.get(cricdata_id=match_id)
+            match = Match.objects.select_related('team_1', 'team_2').get(cricdata_id=match_id)
             print(f"Found match: {match.id} - {match.team_1.short_name} vs {match.team_2.short_name}")
         except Match.DoesNotExist:
             logger.error(f"No match found with cricdata_id: {match_id}")
@@ -82,35 +115,81 @@ class CricketDataService:
             return {"error": f"Error finding match: {str(e)}"}
         
         # Fetch data from API
-        match_data = self.fetch_match_scorecard(match_id)
+        if match_data is None:
+            match_data = self.fetch_match_scorecard(match_id)
         if not match_data:
             logger.error(f"Failed to fetch match data for {match_id}")
             return {"error": "Failed to fetch match data"}
+
+        content_hash = scorecard_content_hash(match_data)
+        snapshot = MatchScorecardSnapshot.objects.filter(match=match).first()
+        if snapshot and not force and snapshot.content_hash == content_hash:
+            logger.info(f"Scorecard for {match_id} unchanged since the last update, skipping")
+            return {
+                "match": match.id,
+                "unchanged": True,
+                "player_events_updated": 0,
+                "fantasy_events_updated": 0,
+                "fantasy_match_events_updated": 0,
+                "fantasy_squads_updated": 0
+            }
+
+        # Reset sequence to prevent ID conflicts
+        self._reset_player_event_sequence()
         
         try:
             # Update match details
             print(f"Updating match details for {match_id}")
             self._update_match_details(match, match_data)
             
-            # Process player performances
+            # Process player performances, writing only lines that changed since the last snapshot
             print(f"Processing player performances for {match_id}")
-            updated_events = self._process_player_performances(match, match_data)
-            logger.info(f"Updated {len(updated_events)} player events")
-            
-            # Update fantasy player events for all fantasy squads
-            logger.info(f"Updating fantasy events for {match_id}")
-            fantasy_events = self._update_fantasy_events(match, updated_events)
-            logger.info(f"Updated {len(fantasy_events)} fantasy events")
-            
-            # Update fantasy match events (new)
-            logger.info(f"Updating fantasy match events for {match_id}")
-            match_events = self._update_fantasy_match_events(match, fantasy_events)
-            logger.info(f"Updated {len(match_events)} fantasy match events")
-            
-            # Update total points for each fantasy squad
-            logger.info(f"Updating fantasy squad totals for {match_id}")
-            updated_squads = self._update_fantasy_squad_totals(match.season)
-            logger.info(f"Updated {len(updated_squads)} fantasy squads")
+            records = self._parse_player_performances(match, match_data)
+            previous = snapshot.player_stats if snapshot and not force else {}
+            changed = diff_player_records(records, previous)
+            applied = self._apply_player_records(match, changed)
+            updated_events = list(applied.values())
+            logger.info(f"Updated {len(updated_events)} of {len(records)} player events")
+
+            fantasy_events, match_events, updated_squads = [], [], []
+            if updated_events:
+                refresh_player_season_aggregates(match.season_id, [event.player_id for event in updated_events])
+
+                # Update fantasy player events for all fantasy squads
+                logger.info(f"Updating fantasy events for {match_id}")
+                fantasy_events = self._update_fantasy_events(match, updated_events)
+                refresh_fantasy_aggregates(
+                    {event.fantasy_squad_id for event in fantasy_events},
+                    [event.player_id for event in updated_events],
+                )
+                logger.info(f"Updated {len(fantasy_events)} fantasy events")
+                
+                # Update fantasy match events (new)
+                logger.info(f"Updating fantasy match events for {match_id}")
+                match_events = self._update_fantasy_match_events(match)
+                logger.info(f"Updated {len(match_events)} fantasy match events")
+            
+            if match_events:
+                # Update total points for each fantasy squad
+                logger.info(f"Updating fantasy squad totals for {match_id}")
+                updated_squads = self._update_fantasy_squad_totals(match.season, match=match)
+                logger.info(f"Updated {len(updated_squads)} fantasy squads")
+
+            # Players that could not be resolved stay out of the snapshot and are retried next poll
+            applied_stats = {
+                cricdata_id: record for cricdata_id, record in records.items()
+                if cricdata_id in applied or cricdata_id not in changed
+            }
+            MatchScorecardSnapshot.objects.update_or_create(
+                match=match,
+                defaults={
+                    "content_hash": content_hash if len(applied_stats) == len(records) else "",
+                    "player_stats": applied_stats,
+                }
+            )
+
+            # Cached league, match and player responses built from this scorecard are now stale
+            invalidate_match_caches(match, player_ids=[event.player_id for event in updated_events])
             
             return {
                 "match": match.id,
@@ -133,18 +212,8 @@ class CricketDataService:
         Returns:
             List of update results for each match
         """
-        live_matches = Match.objects.filter(status='LIVE')
-        results = []
-        
-        for match in live_matches:
-            if match.cricdata_id:
-                team_1_name = match.team_1.short_name if match.team_1 else "TBD"
-                team_2_name = match.team_2.short_name if match.team_2 else "TBD"
-                print("Updating match points for ", team_1_name, " vs ", team_2_name)
-                result = self.update_match_points(match.cricdata_id)
-                results.append(result)
-        
-        return results
+        live_matches = Match.objects.filter(status='LIVE').exclude(cricdata_id__isnull=True).exclude(cricdata_id='')
+        return self.update_all_eligible_matches(live_matches)
 
     def get_bulk_update_queryset(self):
         """
@@ -162,15 +231,27 @@ class CricketDataService:
     def update_all_eligible_matches(self, matches=None) -> List[Dict]:
         """
         Update all eligible matches (typically all started matches with CricData IDs).
+
+        Scorecards are fetched concurrently up front; each match is then applied
+        in its own transaction, one at a time.
         """
         matches_to_update = matches if matches is not None else self.get_bulk_update_queryset()
+        if hasattr(matches_to_update, "select_related"):
+            matches_to_update = matches_to_update.select_related('team_1', 'team_2')
+        matches_to_update = list(matches_to_update)
+        scorecards = self.fetcher.fetch_many(match.cricdata_id for match in matches_to_update)
         results = []
 
         for match in matches_to_update:
             team_1_name = match.team_1.short_name if match.team_1 else "TBD"
             team_2_name = match.team_2.short_name if match.team_2 else "TBD"
+            match_data = scorecards.get(match.cricdata_id)
+            if not match_data:
+                logger.error(f"Failed to fetch match data for {match.cricdata_id}")
+                results.append({"match": match.id, "error": "Failed to fetch match data"})
+                continue
             print("Updating match points for ", team_1_name, " vs ", team_2_name)
-            result = self.update_match_points(match.cricdata_id)
+            result = self.update_match_points(match.cricdata_id, match_data=match_data)
             results.append(result)
 
         return results
@@ -262,6 +343,8 @@ class CricketDataService:
     def _process_player_performances(self, match: Match, match_data: Dict) -> List[PlayerMatchEvent]:
         """
         Process player performances from scorecard data and update/create PlayerMatchEvent objects.
+        Every player line is written; update_match_points uses the parse/apply steps directly
+        so it can skip lines that have not changed.
         
         Args:
             match: The Match object
@@ -270,11 +353,39 @@ class CricketDataService:
         Returns:
             List of updated PlayerMatchEvent objects
         """
+        records = self._parse_player_performances(match, match_data)
+        return list(self._apply_player_records(match, records).values())
+
+    def _parse_player_performances(self, match: Match, match_data: Dict) -> Dict[str, Dict]:
+        """
+        Flatten the scorecard into one record per player.
+        
+        Records are plain JSON so they can be stored in a MatchScorecardSnapshot and
+        compared with the next poll. A player appearing in several lines (batting,
+        bowling, catching) gets one record; later lines set their own stats and the
+        teams, as they did when each line was saved in turn.
+        
+        Args:
+            match: The Match object
+            match_data: The API response data
+            
+        Returns:
+            Dict of cricdata_id -> {"name", "for_team_id", "vs_team_id", "stats"}
+        """
         data = match_data.get("data", {})
         scorecard = data.get("scorecard", [])
-        
-        updated_events = []
-        player_events = {}  # Track player events by cricdata_id
+        records = {}
+
+        def record_for(player_data, for_team, vs_team):
+            cricdata_id = player_data.get("id")
+            name = player_data.get("name")
+            if not cricdata_id or not name:
+                print("Skipping player, missing ID or name", cricdata_id, name)
+                return None
+            record = records.setdefault(cricdata_id, {"name": name, "stats": {}})
+            record["for_team_id"] = for_team.id if for_team else None
+            record["vs_team_id"] = vs_team.id if vs_team else None
+            return record["stats"]
         
         # Process batting, bowling, and fielding performances
         for inning in scorecard:
@@ -282,52 +393,23 @@ class CricketDataService:
             batting_team = self._extract_team_name(inning_name)
             bowling_team = match.team_1 if batting_team == match.team_2 else match.team_2
             
-            # Process batting performances
             for batting in inning.get("batting", []):
-                batsman = batting.get("batsman", {})
-                cricdata_id = batsman.get("id")
-                player_name = batsman.get("name")
-                
-                # Use the new sync method
-                player = self.sync_player_data({
-                    'id': cricdata_id,
-                    'name': player_name
-                })
-                
-                if not player:
-                    logger.warning(f"Skipping batting entry for {player_name}, player not found and could not be created")
+                stats = record_for(batting.get("batsman", {}), batting_team, bowling_team)
+                if stats is None:
                     continue
-                
-                # Create or update player event
-                event = self._get_or_create_player_event(match, player, batting_team, bowling_team)
-                
-                # Update batting stats
-                event.bat_runs = batting.get("r", 0)
-                event.bat_balls = batting.get("b", 0)
-                event.bat_fours = batting.get("4s", 0)
-                event.bat_sixes = batting.get("6s", 0)
-                event.bat_not_out = batting.get("dismissal-text") in ["not out", "batting"]
-                event.bat_innings = 1
-                
-                event.save()
-                player_events[cricdata_id] = event
-                updated_events.append(event)
-                print("Batting stats updated for ", player.name, " as ", event.bat_runs, " runs in ", event.bat_balls, " balls.")
+                stats.update({
+                    "bat_runs": batting.get("r", 0),
+                    "bat_balls": batting.get("b", 0),
+                    "bat_fours": batting.get("4s", 0),
+                    "bat_sixes": batting.get("6s", 0),
+                    "bat_not_out": batting.get("dismissal-text") in ["not out", "batting"],
+                    "bat_innings": 1,
+                })
             
-            # Process bowling performances
             for bowling in inning.get("bowling", []):
-                bowler = bowling.get("bowler", {})
-                cricdata_id = bowler.get("id")
-                player_name = bowler.get("name")
-                
-                player = self._find_player_by_cricdata_id(cricdata_id, player_name)
-                if not player:
+                stats = record_for(bowling.get("bowler", {}), bowling_team, batting_team)
+                if stats is None:
                     continue
-                
-                # Create or update player event
-                event = self._get_or_create_player_event(match, player, bowling_team, batting_team)
-                
-                # Update bowling stats
                 # Convert overs to balls (e.g., 4.3 overs = (4*6 + 3) = 27 balls)
                 overs_str = str(bowling.get("o", "0"))
                 if "." in overs_str:
@@ -335,62 +417,119 @@ class CricketDataService:
                     balls = (int(full_overs) * 6) + int(partial)
                 else:
                     balls = int(float(overs_str)) * 6
-                
-                event.bowl_balls = balls
-                event.bowl_maidens = bowling.get("m", 0)
-                event.bowl_runs = bowling.get("r", 0)
-                event.bowl_wickets = bowling.get("w", 0)
-                event.bowl_innings = 1
-                
-                event.save()
-                player_events[cricdata_id] = event
-                updated_events.append(event)
-                print("Bowling stats updated for ", player.name, " as ", event.bowl_wickets, " wickets for ", event.bowl_runs, " runs in ", event.bowl_balls, " balls.")
+                stats.update({
+                    "bowl_balls": balls,
+                    "bowl_maidens": bowling.get("m", 0),
+                    "bowl_runs": bowling.get("r", 0),
+                    "bowl_wickets": bowling.get("w", 0),
+                    "bowl_innings": 1,
+                })
             
-            # Process fielding performances
             for catching in inning.get("catching", []):
                 catcher = catching.get("catcher", {})
                 if not catcher:
                     continue
-                    
-                cricdata_id = catcher.get("id")
-                player_name = catcher.get("name")
-                
-                player = self._find_player_by_cricdata_id(cricdata_id, player_name)
-                if not player:
+                stats = record_for(catcher, bowling_team, batting_team)
+                if stats is None:
                     continue
-                
-                # Create or update player event
-                event = self._get_or_create_player_event(match, player, bowling_team, batting_team)
-                
-                # Update fielding stats
-                event.field_catch = catching.get("catch", 0)
-                event.wk_catch = catching.get("cb", 0)  # caught behind
-                event.wk_stumping = catching.get("stumped", 0)
-                event.run_out_solo = catching.get("runout", 0)
-                
-                event.save()
-                player_events[cricdata_id] = event
-                updated_events.append(event)
-                print("Fielding stats updated for ", player.name, " as ", event.field_catch, " catches, ", event.wk_catch, " wicket-keeping catches, ", event.wk_stumping, " stumpings, and ", event.run_out_solo, " solo run-outs.")
+                stats.update({
+                    "field_catch": catching.get("catch", 0),
+                    "wk_catch": catching.get("cb", 0),  # caught behind
+                    "wk_stumping": catching.get("stumped", 0),
+                    "run_out_solo": catching.get("runout", 0),
+                })
         
         # Check if Player of the Match is defined
         if data.get("playerOfMatch"):
-            potm_name = data.get("playerOfMatch")
-            potm = self._find_player_by_name(potm_name)
-            if potm and potm.cricdata_id in player_events:
-                event = player_events[potm.cricdata_id]
-                event.player_of_match = True
-                event.save()
-                match.player_of_match = potm
-                match.save()
+            potm = self._find_player_by_name(data.get("playerOfMatch"))
+            if potm and potm.cricdata_id in records:
+                records[potm.cricdata_id]["stats"]["player_of_match"] = True
+
+        return records
+
+    def _apply_player_records(self, match: Match, records: Dict[str, Dict]) -> Dict[str, PlayerMatchEvent]:
+        """
+        Write parsed player records to their PlayerMatchEvents.
+        
+        Existing events are read in one query, points for every touched event are
+        scored in one batch, and rows are written with one bulk_create for new
+        events plus one bulk_update for existing ones.
         
-        # Remove duplicates
-        return list({e.id: e for e in updated_events}.values())
+        Args:
+            match: The Match object
+            records: cricdata_id -> record from _parse_player_performances
+            
+        Returns:
+            Dict of cricdata_id -> saved PlayerMatchEvent, for players that could be resolved
+        """
+        players = {}
+        for cricdata_id, record in records.items():
+            player = self._find_player_by_cricdata_id(cricdata_id, record["name"])
+            if not player:
+                logger.warning(f"Skipping scorecard entry for {record['name']}, player not found")
+                continue
+            players[cricdata_id] = player
+        if not players:
+            return {}
+
+        teams = {team.id: team for team in (match.team_1, match.team_2) if team}
+        missing_team_ids = {
+            team_id for cricdata_id in players
+            for team_id in (records[cricdata_id]["for_team_id"], records[cricdata_id]["vs_team_id"])
+            if team_id and team_id not in teams
+        }
+        if missing_team_ids:
+            teams.update(Team.objects.in_bulk(missing_team_ids))
+
+        existing = {
+            event.player_id: event
+            for event in PlayerMatchEvent.objects.filter(
+                match=match, player_id__in=[player.id for player in players.values()]
+            )
+        }
+
+        applied, to_create, to_update = {}, [], []
+        for cricdata_id, player in players.items():
+            record = records[cricdata_id]
+            event = existing.get(player.id)
+            if event is None:
+                event = PlayerMatchEvent(player=player, match=match, **NEW_PLAYER_EVENT_DEFAULTS)
+                to_create.append(event)
+            else:
+                # Reuse the resolved player so scoring can read its role without a query
+                event.player = player
+                to_update.append(event)
+            event.for_team = teams.get(record["for_team_id"])
+            event.vs_team = teams.get(record["vs_team_id"])
+            for field, value in record["stats"].items():
+                setattr(event, field, value)
+            applied[cricdata_id] = event
+            logger.debug(f"Stats updated for {player.name}: {record['stats']}")
+
+        rescored = apply_points(list(applied.values()))
+        if to_create:
+            PlayerMatchEvent.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            PlayerMatchEvent.objects.bulk_update(to_update, PLAYER_EVENT_UPDATE_FIELDS, batch_size=500)
+            # Boost points stored for events whose points moved are stale
+            updated_ids = {event.pk for event in to_update}
+            stale_ids = [event.pk for event in rescored if event.pk in updated_ids]
+            if stale_ids:
+                invalidate_boost_memo(event_ids=stale_ids)
+                self.boost_memo.forget(stale_ids)
+
+        for cricdata_id, event in applied.items():
+            if records[cricdata_id]["stats"].get("player_of_match") and match.player_of_match_id != event.player_id:
+                match.player_of_match = event.player
+                match.save()
+
+        return applied
     
     def _update_fantasy_events(self, match: Match, player_events: List[PlayerMatchEvent]) -> List[FantasyPlayerEvent]:
         """
-        Update FantasyPlayerEvents for all squads that have the players who participated in the match.
+        Update FantasyPlayerEvents for all squads that owned the players who participated in the match.
+        Ownership is resolved through a player -> squads index read from SquadMembership once per
+        call, and all FantasyPlayerEvents are upserted with a single bulk query.
         
         Args:
             match: The Match object
@@ -399,128 +538,134 @@ class CricketDataService:
         Returns:
             List of updated FantasyPlayerEvent objects
         """
-        updated_events = []
-        
+        if not player_events:
+            return []
+
         # Get all fantasy squads for this season
         squads = FantasySquad.objects.filter(league__season=match.season)
+        squad_ids_by_player = self._build_squad_player_index(match, {event.player_id for event in player_events})
 
         # Boost assignments are phase-based only: SquadPhaseBoost for match.season_phase
-        assignments_by_squad = {}
+        boost_ids_by_squad = {}
         if match.season_phase_id:
             phase_boosts = SquadPhaseBoost.objects.filter(
                 fantasy_squad__in=squads,
                 phase_id=match.season_phase_id
             ).only("fantasy_squad_id", "assignments")
-            assignments_by_squad = {
-                item.fantasy_squad_id: (item.assignments or [])
-                for item in phase_boosts
-            }
+            for item in phase_boosts:
+                boost_ids_by_squad[item.fantasy_squad_id] = {
+                    assignment.get("player_id"): assignment.get("boost_id")
+                    for assignment in reversed(item.assignments or [])
+                    if isinstance(assignment, dict)
+                }
+
+        boost_roles_by_id = {role.id: role for role in FantasyBoostRole.objects.all()}
+
+        # Boost points depend only on (event, boost role); the memo computes each pair once
+        self.boost_memo.prefetch(event.id for event in player_events)
+        fantasy_events = []
 
-        boost_roles = FantasyBoostRole.objects.all()
-        boost_roles_by_id = {role.id: role for role in boost_roles}
-        
         for event in player_events:
-            player = event.player
-            
-            # Find all squads that have this player in their current_squad
-            for squad in squads:
-                current_squad = squad.current_squad or []
-                
-                # Check if player is in this squad
-                if player.id not in current_squad:
-                    continue
-                
+            for squad_id in squad_ids_by_player.get(event.player_id, []):
                 # Determine if the player has a boost role in this match phase assignment
-                boost_id = None
-                phase_assignments = assignments_by_squad.get(squad.id, [])
+                boost_id = boost_ids_by_squad.get(squad_id, {}).get(event.player_id)
+                boost = boost_roles_by_id.get(boost_id) if boost_id else None
 
-                for assignment in phase_assignments:
-                    if assignment.get("player_id") == player.id:
-                        boost_id = assignment.get("boost_id")
-                        break
-                
-                # If no boost found, leave boost as None
-                if not boost_id:
-                    boost = None
-                    boost_points = 0
-                else:
-                    boost = boost_roles_by_id.get(boost_id)
-                    if boost is None:
-                        logger.warning(
-                            "Invalid boost role id %s for squad %s in phase %s",
-                            boost_id,
-                            squad.id,
-                            match.season_phase_id
-                        )
-                        boost_points = 0
-                    else:
-                        # Calculate boost points based on role
-                        boost_points = self._calculate_boost_points(event, boost)
-                
-                # Create or update fantasy player event
-                fantasy_event, created = FantasyPlayerEvent.objects.get_or_create(
+                if boost_id and boost is None:
+                    logger.warning(
+                        "Invalid boost role id %s for squad %s in phase %s",
+                        boost_id,
+                        squad_id,
+                        match.season_phase_id
+                    )
+
+                fantasy_events.append(FantasyPlayerEvent(
                     match_event=event,
-                    fantasy_squad=squad,
-                    defaults={"boost": boost, "boost_points": boost_points}
-                )
-                
-                # Update the fantasy event
-                if not created:
-                    fantasy_event.boost = boost
-                    fantasy_event.boost_points = boost_points
-                    fantasy_event.save()
-                
-                updated_events.append(fantasy_event)
+                    fantasy_squad_id=squad_id,
+                    boost=boost,
+                    boost_points=self.boost_memo.boost_points_for(event, boost),
+                ))
+
+        if fantasy_events:
+            FantasyPlayerEvent.objects.bulk_create(
+                fantasy_events,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["match_event", "fantasy_squad"],
+                update_fields=["boost", "boost_points"],
+            )
+        self.boost_memo.flush()
+
+        return fantasy_events
+
+    def _build_squad_player_index(self, match: Match, player_ids=None) -> Dict[int, List[int]]:
+        """
+        Build a player_id -> [squad_id] index of the squads that owned each player for this match.
+        Reads SquadMembership, so a player traded after the match stays with the squad that
+        fielded them when the match is re-processed.
         
-        return updated_events
+        Args:
+            match: The Match object
+            player_ids: Optional player IDs to restrict the index to
+            
+        Returns:
+            Dict mapping each owned player ID to the IDs of squads that own it
+        """
+        return squad_ids_by_player_for_match(match, player_ids)
     
-    def _update_fantasy_squad_totals(self, season) -> List[FantasySquad]:
+    def _update_fantasy_squad_totals(self, season, match=None) -> List[FantasySquad]:
         """
-        Update total points for all fantasy squads in the season.
+        Update total points for fantasy squads in the season.
         Ensures that total_points is exactly the sum of base_points and boost_points 
         from all FantasyMatchEvent objects.
         
+        Totals for all squads come from one grouped query, and changed squads are
+        written with one bulk update.
+        
         Args:
             season: The Season object
+            match: Optional Match; only squads with FantasyPlayerEvents in it are refreshed
             
         Returns:
-            List of updated FantasySquad objects
+            List of FantasySquad objects whose total changed
         """
-        updated_squads = []
-        
-        # Get all fantasy squads for this season
         squads = FantasySquad.objects.filter(league__season=season)
+        if match is not None:
+            squads = squads.filter(
+                id__in=FantasyPlayerEvent.objects.filter(match_event__match=match).values('fantasy_squad_id')
+            )
         
+        # Calculate points based on FantasyMatchEvent totals (which have already been calculated)
+        season_events = models.Q(match_events__match__season=season)
+        squads = squads.annotate(
+            total_base=models.Sum('match_events__total_base_points', filter=season_events),
+            total_boost=models.Sum('match_events__total_boost_points', filter=season_events)
+        ).only('id', 'name', 'total_points', 'updated_at')
+        
+        updated_squads = []
+        now = timezone.now()
         for squad in squads:
-            # Calculate points based on FantasyMatchEvent totals (which have already been calculated)
-            # This ensures total_points is correctly the sum of base + boost points
-            match_events_totals = FantasyMatchEvent.objects.filter(
-                fantasy_squad=squad,
-                match__season=season
-            ).aggregate(
-                total_base=models.Sum('total_base_points'),
-                total_boost=models.Sum('total_boost_points')
-            )
-            
-            base_points = match_events_totals.get('total_base') or 0
-            boost_points = match_events_totals.get('total_boost') or 0
-            
             # Ensure total is exactly the sum of base and boost
-            squad_total = base_points + boost_points
+            squad_total = (squad.total_base or 0) + (squad.total_boost or 0)
             
             # Update the squad total only if it's different
             if abs(float(squad.total_points) - squad_total) > 0.01:  # Small epsilon for float comparison
                 logger.info(f"Updating {squad.name} points from {squad.total_points} to {squad_total}")
                 squad.total_points = squad_total
-                squad.save()
-                
-            updated_squads.append(squad)
+                squad.updated_at = now
+                updated_squads.append(squad)
+        
+        if updated_squads:
+            FantasySquad.objects.bulk_update(updated_squads, ['total_points', 'updated_at'], batch_size=1000)
         
         return updated_squads
     
     def _calculate_boost_points(self, event: PlayerMatchEvent, boost: FantasyBoostRole) -> float:
         """
         Calculate boost points based on player's performance and assigned role.
+        Values come from the boost memo, which computes each (event, role) pair
+        once as a dot product of the event's stored per-category points with the
+        role's multipliers. Call self.boost_memo.flush() to persist new values.
         
         Args:
             event: The PlayerMatchEvent with player's performance
@@ -529,202 +674,8 @@ class CricketDataService:
         Returns:
             Calculated boost points
         """
-        # If no boost role is assigned, return 0 boost points
-        if boost is None:
-            return 0
-        # Check if this is a uniform multiplier (Captain or Vice Captain)
-        is_uniform_multiplier = (
-            boost.multiplier_runs == boost.multiplier_fours == 
-            boost.multiplier_sixes == boost.multiplier_sr == 
-            boost.multiplier_bat_milestones == boost.multiplier_wickets == 
-            boost.multiplier_maidens == boost.multiplier_economy == 
-            boost.multiplier_bowl_milestones == boost.multiplier_catches == 
-            boost.multiplier_stumpings == boost.multiplier_run_outs == 
-            boost.multiplier_potm == boost.multiplier_playing
-        )
-        
-        # For uniform multipliers (like Captain 2x or Vice-Captain 1.5x), use a simpler calculation
-        if is_uniform_multiplier:
-            # The boost is (multiplier - 1) * base_points
-            return (boost.multiplier_runs - 1.0) * event.total_points_all
-            
-        # Otherwise, do the detailed calculation for specialized roles
-        base_points = event.total_points_all
-        total_boost_points = 0
-        
-        # Apply role-specific multipliers to different stat categories
-        
-        # Batting points
-        batting_base = 0
-        batting_runs = event.bat_runs or 0  # Just runs, not including boundaries
-        batting_fours = (event.bat_fours or 0)  # Boundaries (4s)
-        batting_sixes = (event.bat_sixes or 0)  # Boundaries (6s)
-        
-        batting_base = batting_runs + batting_fours + (2 * batting_sixes)
-        
-        # Batting milestones
-        batting_milestones = 0
-        if (event.bat_runs or 0) >= 100:
-            batting_milestones += 16  # Century
-        if (event.bat_runs or 0) >= 50:
-            batting_milestones += 8  # Half-century
-            
-        # Strike rate calculation
-        sr_bonus = 0
-        if (event.bat_balls or 0) >= 10 and event.bat_runs is not None:
-            from decimal import Decimal, ROUND_HALF_UP
-            sr = Decimal(str(event.bat_runs)) / Decimal(str(event.bat_balls)) * Decimal('100')
-            sr = sr.quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
-            
-            if sr >= Decimal('200'):
-                sr_bonus = 6
-            elif sr >= Decimal('175'):
-                sr_bonus = 4
-            elif sr >= Decimal('150'):
-                sr_bonus = 2
-            elif sr < Decimal('50'):
-                sr_bonus = -6
-            elif sr < Decimal('75'):
-                sr_bonus = -4
-            elif sr < Decimal('100'):
-                sr_bonus = -2
-        
-        # Calculate batting boost     
-        # Separately calculate boost for each component
-        runs_boost = batting_runs * (boost.multiplier_runs - 1.0)
-        fours_boost = batting_fours * (boost.multiplier_fours - 1.0)
-        sixes_boost = (2 * batting_sixes) * (boost.multiplier_sixes - 1.0)
-        milestone_boost = batting_milestones * (boost.multiplier_bat_milestones - 1.0)
-        sr_boost = sr_bonus * (boost.multiplier_sr - 1.0)
-        
-        total_boost_points += (runs_boost + fours_boost + sixes_boost + milestone_boost + sr_boost)
-        
-        # Bowling points
-        bowling_wickets = (event.bowl_wickets or 0) * 25  # Wickets
-        bowling_maidens = (event.bowl_maidens or 0) * 8   # Maidens
-        
-        # Bowling milestones
-        bowling_milestones = 0
-        if (event.bowl_wickets or 0) >= 5:
-            bowling_milestones += 16  # 5-wicket haul
-        if (event.bowl_wickets or 0) >= 3:
-            bowling_milestones += 8  # 3-wicket haul
-            
-        # Economy bonus calculation
-        eco_bonus = 0
-        if (event.bowl_balls or 0) >= 10 and event.bowl_runs is not None:
-            from decimal import Decimal, ROUND_HALF_UP
-            overs = Decimal(str(event.bowl_balls)) / Decimal('6')
-            eco = Decimal(str(event.bowl_runs)) / overs
-            eco = eco.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            
-            if eco < Decimal('5'):
-                eco_bonus = 6
-            elif eco < Decimal('6'):
-                eco_bonus = 4
-            elif eco < Decimal('7'):
-                eco_bonus = 2
-            elif eco >= Decimal('12'):
-                eco_bonus = -6
-            elif eco >= Decimal('11'):
-                eco_bonus = -4
-            elif eco >= Decimal('10'):
-                eco_bonus = -2
-        
-        # Calculate bowling boost        
-        wickets_boost = bowling_wickets * (boost.multiplier_wickets - 1.0)
-        maidens_boost = bowling_maidens * (boost.multiplier_maidens - 1.0)
-        bowl_milestone_boost = bowling_milestones * (boost.multiplier_bowl_milestones - 1.0)
-        economy_boost = eco_bonus * (boost.multiplier_economy - 1.0)
-        
-        total_boost_points += (wickets_boost + maidens_boost + bowl_milestone_boost + economy_boost)
-        
-        # Fielding points
-        stumpings = (event.wk_stumping or 0) * 12  # Stumpings
-        catches = ((event.field_catch or 0) + (event.wk_catch or 0)) * 8  # All catches
-        run_outs = ((event.run_out_solo or 0) * 8) + ((event.run_out_collab or 0) * 4)  # Run outs
-        
-        fielding_base = stumpings + catches + run_outs
-        
-        # Calculate fielding boost
-        stumping_boost = stumpings * (boost.multiplier_stumpings - 1.0)
-        catch_boost = catches * (boost.multiplier_catches - 1.0)
-        run_out_boost = run_outs * (boost.multiplier_run_outs - 1.0)
-        
-        total_boost_points += (stumping_boost + catch_boost + run_out_boost)
-        
-        # Other points
-        potm_points = 50 if event.player_of_match else 0  # POTM
-        playing_points = 4  # Everyone gets 4 points for playing
-        
-        # Calculate other boost
-        potm_boost = potm_points * (boost.multiplier_potm - 1.0)
-        playing_boost = playing_points * (boost.multiplier_playing - 1.0)
-        
-        total_boost_points += (potm_boost + playing_boost)
-        
-        return total_boost_points
+        return self.boost_memo.boost_points_for(event, boost)
     
-    def _get_or_create_player_event(self, match: Match, player: Player, 
-                                for_team: Team, vs_team: Team) -> PlayerMatchEvent:
-        """
-        Get or create an PlayerMatchEvent for a player in a match.
-        
-        Args:
-            match: The Match object
-            player: The Player object
-            for_team: The team the player is playing for
-            vs_team: The opponent team
-            
-        Returns:
-            PlayerMatchEvent object
-        """
-        try:
-            # First try to get an existing event
-            event = PlayerMatchEvent.objects.get(
-                player=player,
-                match=match
-            )
-            
-            # If found, update the teams if needed
-            if event.for_team != for_team or event.vs_team != vs_team:
-                event.for_team = for_team
-                event.vs_team = vs_team
-                event.save()
-            
-            return event
-            
-        except PlayerMatchEvent.DoesNotExist:
-            # Create a new event with "force_insert=False" to avoid ID conflicts
-            event = PlayerMatchEvent(
-                player=player,
-                match=match,
-                for_team=for_team,
-                vs_team=vs_team,
-                # Initialize with zeros
-                bat_runs=0,
-                bat_balls=0,
-                bat_fours=0,
-                bat_sixes=0,
-                bat_not_out=True,
-                bat_innings=0,
-                bowl_balls=0,
-                bowl_maidens=0,
-                bowl_runs=0,
-                bowl_wickets=0,
-                bowl_innings=0,
-                field_catch=0,
-                wk_catch=0,
-                wk_stumping=0,
-                run_out_solo=0,
-                run_out_collab=0,
-                player_of_match=False
-            )
-            
-            # Use save with force_insert=False to let DB handle ID assignment
-            event.save(force_insert=False)
-            return event
-        
     def _reset_player_event_sequence(self):
         """
         Reset the auto-increment sequence for PlayerMatchEvent to avoid ID conflicts.
@@ -770,37 +721,22 @@ class CricketDataService:
         
         # Try by cricdata_id first
         if cricdata_id:
-            player = Player.objects.filter(cricdata_id=cricdata_id).first()
+            player = self.resolver.player_by_cricdata_id(cricdata_id)
             if player:
                 logger.debug(f"Found player by cricdata_id: {player.name}")
                 return player
         
-        # Fallback to name matching
+        # Fallback to exact name, then other names
         if name:
-            # Try exact match
-            player = Player.objects.filter(name__iexact=name).first()
+            player = self.resolver.player_by_name(name) or self.resolver.player_by_alias(name)
             if player:
-                logger.debug(f"Found player by exact name: {player.name}")
+                logger.debug(f"Found player by name: {player.name}")
                 # Update cricdata_id if it's missing
                 if cricdata_id and not player.cricdata_id:
                     logger.info(f"Updating cricdata_id for player {player.name}")
                     player.cricdata_id = cricdata_id
                     player.save()
                 return player
-            
-            # Try checking if name is in our other_names field
-            players = Player.objects.all()
-            for p in players:
-                if hasattr(p, 'other_names') and p.other_names:
-                    for alt_name in p.other_names:
-                        if name.lower() == alt_name.lower():
-                            logger.debug(f"Found player by other name: {p.name}")
-                            # Update cricdata_id if it's missing
-                            if cricdata_id and not p.cricdata_id:
-                                logger.info(f"Updating cricdata_id for player {p.name}")
-                                p.cricdata_id = cricdata_id
-                                p.save()
-                            return p
         
         # No match found
         logger.warning(f"Could not find player match for cricdata_id={cricdata_id}, name={name}")
@@ -816,11 +752,12 @@ class CricketDataService:
         Returns:
             Player object or None if not found
         """
-        return Player.objects.filter(name__iexact=name).first()
+        return self.resolver.player_by_name(name)
     
     def _find_team_by_name(self, name: str) -> Optional[Team]:
         """
-        Find an IPL team by name with flexible matching.
+        Find an IPL team by name with flexible matching
+        (full name, then short name, then other names).
         
         Args:
             name: The team name to match
@@ -828,27 +765,10 @@ class CricketDataService:
         Returns:
             Team object or None if not found
         """
-        # Try exact match first
-        team = Team.objects.filter(name__iexact=name).first()
-        if team:
-            return team
-        
-        # Try short_name
-        team = Team.objects.filter(short_name__iexact=name).first()
-        if team:
-            return team
-        
-        # Try matching against other_names
-        teams = Team.objects.all()
-        for t in teams:
-            if hasattr(t, 'other_names') and t.other_names:
-                for alt_name in t.other_names:
-                    if name.lower() == alt_name.lower():
-                        return t
-        
-        # No match found
-        logger.warning(f"Could not find team match for name={name}")
-        return None
+        team = self.resolver.team_by_name(name)
+        if team is None:
+            logger.warning(f"Could not find team match for name={name}")
+        return team
     
     def _extract_team_name(self, inning_name: str) -> Optional[Team]:
         """
@@ -876,170 +796,221 @@ class CricketDataService:
         return None
     
 
-    def _update_fantasy_match_events(self, match, fantasy_player_events):
+    def _update_fantasy_match_events(self, match, fantasy_player_events=None):
         """
         Create or update FantasyMatchEvent records for all squads in this match.
         Uses existing FantasyPlayerEvent records with their pre-calculated boost points.
+        Only rows whose totals changed are written, and ranks are refreshed only
+        when something changed.
         
         Args:
             match: The Match object
-            fantasy_player_events: List of FantasyPlayerEvent objects for this match
+            fantasy_player_events: FantasyPlayerEvent objects for this match; when omitted,
+                totals are aggregated from every stored FantasyPlayerEvent of the match
         
         Returns:
-            List of updated FantasyMatchEvent objects
+            List of created or updated FantasyMatchEvent objects
         """
         print(f"Updating fantasy match events for {match}")
         
-        # Group events by fantasy squad
-        squad_events = {}
-        for event in fantasy_player_events:
-            squad_id = event.fantasy_squad_id
-            if squad_id not in squad_events:
-                squad_events[squad_id] = []
-            squad_events[squad_id].append(event)
-        
-        match_events = []
+        # Totals per fantasy squad as (base, boost, players)
+        squad_totals = {}
+        if fantasy_player_events is None:
+            rows = FantasyPlayerEvent.objects.filter(match_event__match=match).values('fantasy_squad_id').annotate(
+                base=models.Sum('match_event__total_points_all'),
+                boost=models.Sum('boost_points'),
+                players=models.Count('id')
+            )
+            for row in rows:
+                squad_totals[row['fantasy_squad_id']] = (row['base'] or 0, row['boost'] or 0, row['players'])
+        else:
+            for event in fantasy_player_events:
+                base, boost, players = squad_totals.get(event.fantasy_squad_id, (0, 0, 0))
+                squad_totals[event.fantasy_squad_id] = (
+                    base + event.match_event.total_points_all, boost + event.boost_points, players + 1
+                )
         
         # Get all squads that should have a match event (from all leagues for this season)
-        all_squads = FantasySquad.objects.filter(league__season=match.season)
+        squad_ids = FantasySquad.objects.filter(league__season=match.season).values_list('id', flat=True)
+        existing = {event.fantasy_squad_id: event for event in FantasyMatchEvent.objects.filter(match=match)}
         
         # Create FantasyMatchEvent for all squads, even those without active players
-        for squad in all_squads:
-            # Get or create a FantasyMatchEvent for this squad and match
-            try:
-                match_event = FantasyMatchEvent.objects.get(
-                    match=match,
-                    fantasy_squad=squad
-                )
-            except FantasyMatchEvent.DoesNotExist:
-                match_event = FantasyMatchEvent(
-                    match=match,
-                    fantasy_squad=squad
-                )
-                match_event.save()
-            
-            # Calculate totals
-            events = squad_events.get(squad.id, [])
-            base_points = sum(event.match_event.total_points_all for event in events)
-            boost_points = sum(event.boost_points for event in events)
-            total_points = base_points + boost_points
-            
-            # Update the event
-            match_event.total_base_points = base_points
-            match_event.total_boost_points = boost_points
-            match_event.total_points = total_points
-            match_event.players_count = len(events)
-            match_event.save()
-            
-            match_events.append(match_event)
-        
-        # Calculate match ranks within each league
-        self._update_match_ranks(match)
+        to_create, to_update = [], []
+        now = timezone.now()
+        for squad_id in squad_ids:
+            base_points, boost_points, players_count = squad_totals.get(squad_id, (0, 0, 0))
+            values = {
+                "total_base_points": base_points,
+                "total_boost_points": boost_points,
+                "total_points": base_points + boost_points,
+                "players_count": players_count,
+            }
+            match_event = existing.get(squad_id)
+            if match_event is None:
+                to_create.append(FantasyMatchEvent(match=match, fantasy_squad_id=squad_id, **values))
+                continue
+            if all(getattr(match_event, field) == value for field, value in values.items()):
+                continue
+            for field, value in values.items():
+                setattr(match_event, field, value)
+            match_event.updated_at = now
+            to_update.append(match_event)
+        
+        if to_create:
+            FantasyMatchEvent.objects.bulk_create(to_create, batch_size=1000)
+        if to_update:
+            FantasyMatchEvent.objects.bulk_update(
+                to_update,
+                ['total_base_points', 'total_boost_points', 'total_points', 'players_count', 'updated_at'],
+                batch_size=1000
+            )
         
-        # Calculate running ranks
-        self._update_running_ranks(match)
+        unranked = any(event.match_rank is None or event.running_rank is None for event in existing.values())
+        if to_create or to_update or unranked:
+            # Calculate match ranks within each league
+            self._update_match_ranks(match)
+            
+            # Calculate running ranks from the previous match's running totals
+            self._update_running_ranks(match, incremental=True)
         
-        return match_events
+        return to_create + to_update
 
-    def _update_match_ranks(self, match):
+    def _update_match_ranks(self, match, league_ids=None) -> int:
         """
         Update match_rank for all FantasyMatchEvents in this match.
-        Events are ranked by total_points in descending order within each league.
+        Events are ranked by total_points in descending order within each league
+        (ties broken by squad ID).
+        
+        Ranks for every league come from one window-function query, and rows
+        whose rank changed are written back with one bulk update.
         
         Args:
             match: The Match object
+            league_ids: Optional iterable restricting the update to these leagues
+            
+        Returns:
+            Number of FantasyMatchEvents whose match_rank changed
         """
         print(f"Updating match ranks for {match}")
         
-        # Get all fantasy match events for this match
         match_events = FantasyMatchEvent.objects.filter(match=match)
-        
-        # Get the unique leagues represented in this match
-        league_ids = set(
-            FantasySquad.objects.filter(
-                id__in=match_events.values_list('fantasy_squad_id', flat=True)
-            ).values_list('league_id', flat=True)
-        )
-        
-        # Process rankings for each league separately
-        for league_id in league_ids:
-            # Get events for this match and league, ordered by total points
-            league_events = match_events.filter(
-                fantasy_squad__league_id=league_id
-            ).order_by('-total_points')
-            
-            # Assign ranks within this league
-            for i, event in enumerate(league_events):
-                event.match_rank = i + 1
-                event.save()
+        if league_ids is not None:
+            match_events = match_events.filter(fantasy_squad__league_id__in=league_ids)
+        
+        ranked = match_events.annotate(
+            new_rank=models.Window(
+                expression=RowNumber(),
+                partition_by=[models.F('fantasy_squad__league_id')],
+                order_by=[models.F('total_points').desc(), models.F('fantasy_squad_id').asc()],
+            )
+        ).only('id', 'match_rank', 'updated_at')
+        
+        changed = []
+        now = timezone.now()
+        for event in ranked:
+            if event.match_rank != event.new_rank:
+                event.match_rank = event.new_rank
+                event.updated_at = now
+                changed.append(event)
+        
+        if changed:
+            FantasyMatchEvent.objects.bulk_update(changed, ['match_rank', 'updated_at'], batch_size=1000)
+        logger.info(f"Updated match ranks for {len(changed)} fantasy match events in {match}")
+        return len(changed)
 
-    def _update_running_ranks(self, match):
+    def _update_running_ranks(self, match, incremental: bool = False, league_ids=None):
         """
         Calculate and update running ranks for all squads in this match's league.
         The running rank is the squad's position in the league as of this match.
         
+        Running totals come from a single grouped query over the season up to this match.
+        With incremental=True they are instead derived from each squad's previous
+        FantasyMatchEvent.running_total_points, which assumes earlier matches are
+        already ranked (e.g. when refreshing the latest match or replaying in order).
+        
         Args:
             match: The Match object
+            incremental: Build on the previous match's running totals
+            league_ids: Optional iterable restricting the update to these leagues
+            
+        Returns:
+            Number of FantasyMatchEvents whose running rank or total changed
         """
         print(f"Updating running ranks for {match}")
         
         # Get all FantasyMatchEvents for this match
         match_events = FantasyMatchEvent.objects.filter(match=match)
+        if league_ids is not None:
+            match_events = match_events.filter(fantasy_squad__league_id__in=league_ids)
+        match_events = list(match_events.annotate(squad_league_id=models.F('fantasy_squad__league_id')))
         
-        if not match_events.exists():
-            return
+        if not match_events:
+            return 0
         
         # Get the unique leagues represented in this match
-        league_ids = set(
-            FantasySquad.objects.filter(
-                id__in=match_events.values_list('fantasy_squad_id', flat=True)
-            ).values_list('league_id', flat=True)
-        )
-        
-        # Process each league separately
-        for league_id in league_ids:
-            # Get all squads in this league
-            squads = FantasySquad.objects.filter(league_id=league_id)
-            
-            # Get all matches up to and including the current match for this league's season
-            league = FantasyLeague.objects.get(id=league_id)
-            season = league.season
-            all_season_matches = Match.objects.filter(
-                season=season,
-                date__lte=match.date
-            ).order_by('date')
-            
-            # Dictionary to track running totals for each squad
-            running_totals = {squad.id: 0 for squad in squads}
+        league_ids = {event.squad_league_id for event in match_events}
+        squads = FantasySquad.objects.filter(league_id__in=league_ids)
+        
+        if incremental:
+            previous_event = FantasyMatchEvent.objects.filter(
+                fantasy_squad_id=models.OuterRef('pk'),
+                match__season_id=match.season_id,
+            ).filter(
+                models.Q(match__date__lt=match.date) |
+                models.Q(match__date=match.date, match_id__lt=match.id)
+            ).order_by('-match__date', '-match_id').values('running_total_points')[:1]
+            squad_rows = squads.annotate(
+                previous_total=models.Subquery(previous_event)
+            ).values_list('id', 'league_id', 'previous_total')
+            
+            running_totals = {squad_id: previous_total or 0 for squad_id, _, previous_total in squad_rows}
+            for event in match_events:
+                running_totals[event.fantasy_squad_id] += event.total_points
+        else:
+            squad_rows = squads.values_list('id', 'league_id')
+            running_totals = {squad_id: 0 for squad_id, _ in squad_rows}
+            season_totals = FantasyMatchEvent.objects.filter(
+                fantasy_squad__league_id__in=league_ids,
+                match__season_id=match.season_id,
+                match__date__lte=match.date
+            ).values('fantasy_squad_id').annotate(
+                total=models.Sum('total_points')
+            ).values_list('fantasy_squad_id', 'total')
+            for squad_id, total in season_totals:
+                running_totals[squad_id] = total or 0
+        
+        squad_ids_by_league = {}
+        for row in squad_rows:
+            squad_ids_by_league.setdefault(row[1], []).append(row[0])
+        
+        events_by_league = {}
+        for event in match_events:
+            events_by_league.setdefault(event.squad_league_id, []).append(event)
+        
+        # Rank in memory and write changed rows back with one bulk update
+        changed = []
+        now = timezone.now()
+        for league_id, league_events in events_by_league.items():
+            sorted_squad_ids = sorted(
+                squad_ids_by_league.get(league_id, []),
+                key=lambda squad_id: (-running_totals[squad_id], squad_id)
+            )
+            ranks = {squad_id: rank for rank, squad_id in enumerate(sorted_squad_ids, 1)}
             
-            # For each match up to the current one, update running totals
-            for m in all_season_matches:
-                # Get all FantasyMatchEvents for this match
-                events = FantasyMatchEvent.objects.filter(
-                    match=m,
-                    fantasy_squad__league_id=league_id
-                )
-                
-                # Update running totals
-                for event in events:
-                    squad_id = event.fantasy_squad_id
-                    if squad_id in running_totals:
-                        running_totals[squad_id] += event.total_points
-                
-                # If this is the current match, update running_ranks
-                if m.id == match.id:
-                    # Sort squads by total points
-                    sorted_squads = sorted(
-                        running_totals.items(),
-                        key=lambda x: x[1],
-                        reverse=True  # Descending order
-                    )
-                    
-                    # Update running ranks for each squad
-                    for rank, (squad_id, total) in enumerate(sorted_squads, 1):
-                        # Find the corresponding FantasyMatchEvent
-                        event = match_events.filter(fantasy_squad_id=squad_id).first()
-                        if event:
-                            event.running_rank = rank
-                            event.running_total_points = total
-                            event.save()
+            for event in league_events:
+                running_rank = ranks.get(event.fantasy_squad_id)
+                running_total = running_totals.get(event.fantasy_squad_id, 0)
+                if event.running_rank == running_rank and event.running_total_points == running_total:
+                    continue
+                event.running_rank = running_rank
+                event.running_total_points = running_total
+                event.updated_at = now
+                changed.append(event)
+        
+        if changed:
+            FantasyMatchEvent.objects.bulk_update(
+                changed,
+                ['running_rank', 'running_total_points', 'updated_at'],
+                batch_size=1000
+            )
+        return len(changed)
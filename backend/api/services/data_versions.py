@@ -0,0 +1,99 @@
+"""
+Per-league, season and match data version counters.
+
+Every write that changes what the league, stats or match endpoints return bumps
+the matching counter:
+
+- scorecard ingest and point recalculations: the match and its season
+- trades, drafts and replacements: the league (via api.signals)
+- boost assignments, boost role edits and stats rebuilds: the league(s)
+
+Cached responses key on the counters (league_token / match_token), so they never
+need a TTL to become fresh again and can be kept for a long time.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.db.models import F, Q, Subquery
+from django.utils import timezone
+
+from ..models import DataVersion, FantasyLeague
+
+logger = logging.getLogger(__name__)
+
+Scope = DataVersion.Scope
+
+
+def _bump(scope: str, object_ids: Iterable[int]) -> None:
+    object_ids = sorted(set(object_id for object_id in object_ids if object_id is not None))
+    if not object_ids:
+        return
+    DataVersion.objects.bulk_create(
+        [DataVersion(scope=scope, object_id=object_id) for object_id in object_ids],
+        ignore_conflicts=True,
+    )
+    DataVersion.objects.filter(scope=scope, object_id__in=object_ids).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+
+
+def bump_versions(
+    league_ids: Iterable[int] = (),
+    season_ids: Iterable[int] = (),
+    match_ids: Iterable[int] = (),
+) -> None:
+    """Increment the counters for these leagues, seasons and matches."""
+    _bump(Scope.LEAGUE, league_ids)
+    _bump(Scope.SEASON, season_ids)
+    _bump(Scope.MATCH, match_ids)
+    logger.debug(f"Bumped data versions: leagues={league_ids} seasons={season_ids} matches={match_ids}")
+
+
+def bump_all_league_versions() -> None:
+    """Increment every league's counter, for edits that affect all leagues (boost roles)."""
+    _bump(Scope.LEAGUE, FantasyLeague.objects.values_list('id', flat=True))
+
+
+def get_versions(
+    league_id: Optional[int] = None,
+    season_id: Optional[int] = None,
+    match_id: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Current counters in one query; objects that were never bumped are at 0.
+
+    Returns:
+        Dict keyed by scope value ('LEAGUE', 'SEASON', 'MATCH')
+    """
+    wanted = [(Scope.LEAGUE, league_id), (Scope.SEASON, season_id), (Scope.MATCH, match_id)]
+    query = Q()
+    for scope, object_id in wanted:
+        if object_id is not None:
+            query |= Q(scope=scope, object_id=object_id)
+    versions = {scope.value: 0 for scope, object_id in wanted if object_id is not None}
+    if versions:
+        versions.update(DataVersion.objects.filter(query).values_list('scope', 'version'))
+    return versions
+
+
+def league_token(league_id: int, season_id: Optional[int] = None) -> str:
+    """
+    Version token for responses built from a league's squads and its season's scores.
+    The league's season is looked up in the same query when season_id is not given.
+    """
+    league_versions = Q(scope=Scope.LEAGUE, object_id=league_id)
+    if season_id is None:
+        season_id = Subquery(FantasyLeague.objects.filter(id=league_id).values('season_id')[:1])
+    versions = dict(
+        DataVersion.objects.filter(league_versions | Q(scope=Scope.SEASON, object_id=season_id))
+        .values_list('scope', 'version')
+    )
+    return f"{versions.get(Scope.LEAGUE, 0)}.{versions.get(Scope.SEASON, 0)}"
+
+
+def match_token(match_id: int, league_id: Optional[int] = None) -> str:
+    """Version token for responses built from one match, optionally in a league's context."""
+    versions = get_versions(league_id=league_id, match_id=match_id)
+    if league_id is None:
+        return str(versions[Scope.MATCH])
+    return f"{versions[Scope.MATCH]}.{versions[Scope.LEAGUE]}"
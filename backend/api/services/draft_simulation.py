@@ -0,0 +1,333 @@
+"""
+Monte Carlo draft simulation for what-if analysis.
+
+A league's pre-season draft or mid-season draft window is reduced to a
+compact model: plain player and squad ids, preference orders, pools, needs
+and per-player projections, with no ORM objects. Each run then:
+
+- varies the snake order: a full shuffle for pre-season drafts, whose real
+  order is random, and a bounded jitter of the standings order for mid-season
+  windows
+- perturbs every squad's preference orders with bounded rank noise, so
+  players swap with neighbours a few places away
+- drafts with the allocation the real drafts use (allocate_pre_season_picks
+  or allocate_draft_picks)
+
+Runs are split across a process pool. Run i always uses seed + i, so a seeded
+simulation gives the same report for any number of workers. The report has
+each squad's distribution of projected points (the summed season average
+points of its resulting squad) and of its player count per role.
+"""
+import logging
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from ..models import DraftWindow, FantasyLeague, FantasySquad, PlayerSeasonAggregate
+from .draft_window_service import (
+    ROLE_DRAFT_CONFIG,
+    allocate_draft_picks,
+    allocate_pre_season_picks,
+    build_league_draft_inputs,
+)
+
+logger = logging.getLogger(__name__)
+
+PRE_SEASON = 'pre_season'
+MID_SEASON = 'mid_season'
+
+DEFAULT_RUNS = 1000
+DEFAULT_PREFERENCE_NOISE = 3.0
+DEFAULT_MID_SEASON_ORDER_JITTER = 2.0
+RUNS_PER_TASK = 50
+
+ROLES = [role for role, _ in ROLE_DRAFT_CONFIG]
+
+
+def _projected_points(season_id: int, player_ids) -> Dict[int, float]:
+    """
+    Average points per match for each player: the season's aggregate when it
+    has one, else the player's most recent season. Players without any
+    aggregate are left out and project to 0.
+    """
+    best = {}
+    rows = PlayerSeasonAggregate.objects.filter(player_id__in=list(player_ids)).values_list(
+        'player_id', 'season_id', 'season__year', 'avg_points'
+    )
+    for player_id, row_season_id, year, avg_points in rows:
+        rank = (row_season_id == season_id, year)
+        if player_id not in best or rank > best[player_id][0]:
+            best[player_id] = (rank, avg_points)
+    return {player_id: avg_points for player_id, (_, avg_points) in best.items()}
+
+
+def build_pre_season_model(league: FantasyLeague) -> Dict:
+    """Compact model of the league's pre-season draft; saved orders are read, not written."""
+    # admin_views imports this package's services, so it is imported late
+    from ..admin_views import load_role_draft_orders
+
+    squads = list(FantasySquad.objects.filter(league=league).order_by('id'))
+    if not squads:
+        raise ValueError("No squads in this league.")
+
+    role_orders = {
+        role: (sorted(eligible), squad_orders)
+        for role, (_, eligible, squad_orders) in load_role_draft_orders(league, squads, save=False).items()
+    }
+    roles = {player_id: role for role, (eligible, _) in role_orders.items() for player_id in eligible}
+    return {
+        'kind': PRE_SEASON,
+        'league_id': league.id,
+        'squad_ids': [squad.id for squad in squads],
+        'squad_names': {squad.id: squad.name for squad in squads},
+        'role_orders': role_orders,
+        'retained': {squad.id: [] for squad in squads},
+        'roles': roles,
+        'projections': _projected_points(league.season_id, roles),
+    }
+
+
+def build_mid_season_model(league: FantasyLeague, draft_window: DraftWindow) -> Dict:
+    """Compact model of a mid-season draft window for the league."""
+    inputs = build_league_draft_inputs(league, draft_window)
+    retained = {
+        squad_id: list(dict.fromkeys(player_ids))
+        for squad_id, player_ids in inputs['retained_map'].items()
+    }
+    roles = inputs['role_map']
+    return {
+        'kind': MID_SEASON,
+        'league_id': league.id,
+        'squad_ids': inputs['standings_order'],
+        'squad_names': {squad.id: squad.name for squad in inputs['squads']},
+        'role_available': {role: sorted(ids) for role, ids in inputs['role_available'].items()},
+        'available_players': sorted(inputs['available_players']),
+        'role_preferences': inputs['role_preferences'],
+        'global_preferences': inputs['global_preferences'],
+        'role_default_order': inputs['role_default_order'],
+        'global_default_order': inputs['global_default_order'],
+        'role_needs': inputs['role_needs'],
+        'total_needs': inputs['total_needs'],
+        'retained': retained,
+        'roles': roles,
+        'projections': _projected_points(league.season_id, roles),
+    }
+
+
+def _perturbed(order: List[int], rng: random.Random, noise: float, reach: int) -> List[int]:
+    """
+    Order with every position shifted by triangular noise of standard
+    deviation ``noise`` (bounded at +-noise * sqrt(6)) and re-sorted.
+
+    A cursor never gets further into a list than the number of picks in the
+    draft (``reach``), and with bounded noise nothing further back than
+    reach + 2 * bound can land ahead of that, so only that head is shuffled.
+    """
+    if noise <= 0:
+        return order
+    spread = noise * math.sqrt(6)
+    head_size = reach + 2 * math.ceil(spread) + 1
+    uniform = rng.random
+    keyed = [
+        (position + (uniform() + uniform() - 1) * spread, player_id)
+        for position, player_id in enumerate(order[:head_size])
+    ]
+    keyed.sort()
+    return [player_id for _, player_id in keyed] + order[head_size:]
+
+
+def _snake_order(squad_ids: List[int], rng: random.Random, jitter: float) -> List[int]:
+    if math.isinf(jitter):
+        order = list(squad_ids)
+        rng.shuffle(order)
+        return order
+    if jitter <= 0:
+        return list(squad_ids)
+    keyed = [(position + rng.uniform(0, jitter), squad_id) for position, squad_id in enumerate(squad_ids)]
+    keyed.sort()
+    return [squad_id for _, squad_id in keyed]
+
+
+def simulate_draft_run(model: Dict, seed: int, preference_noise: float, order_jitter: float) -> Dict[int, List[int]]:
+    """One randomized draft; returns each squad's resulting player ids."""
+    rng = random.Random(seed)
+    order = _snake_order(model['squad_ids'], rng, order_jitter)
+
+    if model['kind'] == PRE_SEASON:
+        # Every eligible player is drafted, so the whole order is in reach
+        role_orders = {
+            role: (set(eligible), {
+                squad_id: _perturbed(squad_order, rng, preference_noise, len(eligible))
+                for squad_id, squad_order in squad_orders.items()
+            })
+            for role, (eligible, squad_orders) in model['role_orders'].items()
+        }
+        return allocate_pre_season_picks(order, role_orders)
+
+    reach = sum(model['total_needs'].values())
+    role_preferences = {
+        squad_id: {
+            role: _perturbed(role_order, rng, preference_noise, reach)
+            for role, role_order in preferences.items()
+        }
+        for squad_id, preferences in model['role_preferences'].items()
+    }
+    global_preferences = {
+        squad_id: _perturbed(preferences, rng, preference_noise, reach)
+        for squad_id, preferences in model['global_preferences'].items()
+    }
+    assignments, _ = allocate_draft_picks(
+        order,
+        {role: set(ids) for role, ids in model['role_available'].items()},
+        set(model['available_players']),
+        role_preferences,
+        global_preferences,
+        model['role_default_order'],
+        model['global_default_order'],
+        model['role_needs'],
+        model['total_needs'],
+    )
+    squads = {}
+    for squad_id in model['squad_ids']:
+        retained = model['retained'].get(squad_id, [])
+        retained_set = set(retained)
+        squads[squad_id] = retained + [pid for pid in assignments.get(squad_id, []) if pid not in retained_set]
+    return squads
+
+
+def _score_runs(model: Dict, seeds, preference_noise: float, order_jitter: float) -> List[List[tuple]]:
+    """Per run, one (projected_points, role_counts) per squad in model['squad_ids'] order."""
+    projections = model['projections']
+    roles = model['roles']
+    scored = []
+    for seed in seeds:
+        squads = simulate_draft_run(model, seed, preference_noise, order_jitter)
+        run = []
+        for squad_id in model['squad_ids']:
+            player_ids = squads.get(squad_id, [])
+            role_counts = [0] * len(ROLES)
+            for player_id in player_ids:
+                role = roles.get(player_id)
+                if role in ROLES:
+                    role_counts[ROLES.index(role)] += 1
+            run.append((sum(projections.get(player_id, 0.0) for player_id in player_ids), role_counts))
+        scored.append(run)
+    return scored
+
+
+# Set in each pool process by _init_worker so the model is pickled once per process
+_worker_model = None
+
+
+def _init_worker(model: Dict) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _score_runs_in_worker(seeds, preference_noise: float, order_jitter: float) -> List[List[tuple]]:
+    return _score_runs(_worker_model, seeds, preference_noise, order_jitter)
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    count = len(ordered)
+    mean = sum(ordered) / count
+
+    def percentile(fraction):
+        return ordered[min(count - 1, int(fraction * count))]
+
+    return {
+        'mean': round(mean, 2),
+        'stdev': round(math.sqrt(sum((value - mean) ** 2 for value in ordered) / count), 2),
+        'min': round(ordered[0], 2),
+        'p10': round(percentile(0.1), 2),
+        'p50': round(percentile(0.5), 2),
+        'p90': round(percentile(0.9), 2),
+        'max': round(ordered[-1], 2),
+    }
+
+
+def simulate_drafts(
+    model: Dict,
+    *,
+    runs: int = DEFAULT_RUNS,
+    seed: Optional[int] = None,
+    preference_noise: float = DEFAULT_PREFERENCE_NOISE,
+    order_jitter: Optional[float] = None,
+    workers: int = 1,
+) -> Dict:
+    """
+    Run randomized drafts over a model from build_pre_season_model or
+    build_mid_season_model.
+
+    Args:
+        model: Compact draft model
+        runs: Number of simulated drafts
+        seed: Base seed; None picks one at random (it is echoed in the report)
+        preference_noise: Standard deviation, in list positions, of the rank
+            noise added to every preference order; 0 keeps the saved orders
+        order_jitter: How far, in places, the snake order may move; None means
+            a full shuffle for pre-season and 2 places for mid-season
+        workers: Processes to spread the runs over; 1 runs them in this process
+
+    Returns:
+        Report with the simulation settings and per-squad distributions
+    """
+    if runs < 1:
+        raise ValueError("At least one run is required.")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    if order_jitter is None:
+        order_jitter = math.inf if model['kind'] == PRE_SEASON else DEFAULT_MID_SEASON_ORDER_JITTER
+
+    seeds = list(range(seed, seed + runs))
+    chunks = [seeds[start:start + RUNS_PER_TASK] for start in range(0, runs, RUNS_PER_TASK)]
+    # Workers inherit the loaded Django app through fork; elsewhere run inline
+    if workers > 1 and len(chunks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(model,),
+        ) as executor:
+            scored = [
+                run
+                for chunk_runs in executor.map(
+                    _score_runs_in_worker, chunks,
+                    [preference_noise] * len(chunks), [order_jitter] * len(chunks),
+                )
+                for run in chunk_runs
+            ]
+    else:
+        scored = _score_runs(model, seeds, preference_noise, order_jitter)
+
+    squads = []
+    for index, squad_id in enumerate(model['squad_ids']):
+        points = [run[index][0] for run in scored]
+        role_counts = [run[index][1] for run in scored]
+        squads.append({
+            'squad_id': squad_id,
+            'squad_name': model['squad_names'].get(squad_id, str(squad_id)),
+            'projected_points': _distribution(points),
+            'roles': {
+                role: {
+                    'mean': round(sum(counts[role_index] for counts in role_counts) / len(scored), 2),
+                    'min': min(counts[role_index] for counts in role_counts),
+                    'max': max(counts[role_index] for counts in role_counts),
+                }
+                for role_index, role in enumerate(ROLES)
+            },
+        })
+    logger.debug(f"Simulated {runs} {model['kind']} drafts for league {model['league_id']}")
+
+    return {
+        'league_id': model['league_id'],
+        'kind': model['kind'],
+        'runs': runs,
+        'seed': seed,
+        'preference_noise': preference_noise,
+        'order_jitter': None if math.isinf(order_jitter) else order_jitter,
+        'squads': squads,
+    }
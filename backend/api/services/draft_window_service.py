@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 
-from django.db import transaction
-from django.db.models import Avg, Q
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 
 from api.models import (
@@ -15,12 +18,16 @@ from api.models import (
     FantasyLeague,
     FantasySquad,
     Player,
+    PlayerSeasonAggregate,
     PlayerSeasonTeam,
     SeasonPhase,
     SeasonTeam,
+    SquadMembership,
     SquadPhaseBoost,
 )
 
+logger = logging.getLogger(__name__)
+
 ROLE_DRAFT_CONFIG = (
     (FantasyDraft.Role.BAT, False),
     (FantasyDraft.Role.WK, True),
@@ -346,10 +353,13 @@ def _normalize_order(order: List[int], eligible_ids: Set[int]) -> List[int]:
 
 
 def _default_order_for_players(league: FantasyLeague, player_ids: List[int]) -> List[int]:
+    return _default_order_for_season(league.season_id, player_ids)
+
+
+def _default_order_for_season(season_id: int, player_ids: List[int]) -> List[int]:
     ranked_players = Player.objects.filter(id__in=player_ids).annotate(
-        avg_points=Avg(
-            "playermatchevent__total_points_all",
-            filter=Q(playermatchevent__match__season=league.season),
+        avg_points=Subquery(
+            PlayerSeasonAggregate.objects.filter(player=OuterRef("pk"), season_id=season_id).values("avg_points")[:1]
         )
     ).order_by("-avg_points", "name")
     ranked_ids = list(ranked_players.values_list("id", flat=True))
@@ -358,34 +368,286 @@ def _default_order_for_players(league: FantasyLeague, player_ids: List[int]) ->
     return ranked_ids
 
 
-@transaction.atomic
-def execute_draft_window(
+class PreferenceCursor:
+    """
+    Walks a preference list past players that are no longer available.
+
+    Pools only ever shrink during a draft, so a player skipped once is never
+    available again and the cursor never moves back: all picks from one list
+    cost O(len(list)) in total instead of a rescan from the head per pick.
+    """
+
+    __slots__ = ("order", "position")
+
+    def __init__(self, order: List[int]):
+        self.order = order
+        self.position = 0
+
+    def next_available(self, pool: Set[int]) -> Optional[int]:
+        order = self.order
+        position = self.position
+        while position < len(order) and order[position] not in pool:
+            position += 1
+        self.position = position
+        return order[position] if position < len(order) else None
+
+
+def _extend_with_default(order: List[int], default_order: List[int]) -> List[int]:
+    seen = set(order)
+    return order + [player_id for player_id in default_order if player_id not in seen]
+
+
+def build_draft_preferences(
+    squad_ids: List[int],
+    role_available: Dict[str, Set[int]],
+    available_players: Set[int],
+    role_map: Dict[int, str],
+    role_default_order: Dict[str, List[int]],
+    global_default_order: List[int],
+    role_draft_map: Dict[tuple, List[int]],
+    legacy_draft_map: Dict[int, List[int]],
+) -> tuple:
+    """
+    Full per-role and flex preference lists for each squad: the squad's saved
+    order (per-role drafts, else the legacy single list) followed by the
+    default order for everyone it left out.
+
+    Returns:
+        (role_preferences, global_preferences), keyed by squad id
+    """
+    role_preferences = {}
+    global_preferences = {}
+    for squad_id in squad_ids:
+        squad_role_preferences = {}
+        legacy_order = legacy_draft_map.get(squad_id, [])
+        for role, _ in ROLE_DRAFT_CONFIG:
+            eligible_ids = role_available.get(role, set())
+            if not eligible_ids:
+                squad_role_preferences[role] = []
+                continue
+
+            raw_order = role_draft_map.get((squad_id, role))
+            if raw_order:
+                normalized = _normalize_order(raw_order, eligible_ids)
+            elif legacy_order:
+                normalized = _normalize_order(
+                    [pid for pid in legacy_order if role_map.get(pid) == role],
+                    eligible_ids,
+                )
+            else:
+                normalized = []
+
+            if normalized:
+                normalized = _extend_with_default(normalized, role_default_order[role])
+            else:
+                normalized = list(role_default_order[role])
+            squad_role_preferences[role] = normalized
+
+        role_preferences[squad_id] = squad_role_preferences
+
+        if legacy_order:
+            global_preferences[squad_id] = _extend_with_default(
+                _normalize_order(legacy_order, available_players), global_default_order
+            )
+        else:
+            combined = list(dict.fromkeys(
+                player_id for role, _ in ROLE_DRAFT_CONFIG for player_id in squad_role_preferences[role]
+            ))
+            global_preferences[squad_id] = _extend_with_default(combined, global_default_order)
+
+    return role_preferences, global_preferences
+
+
+def allocate_draft_picks(
+    standings_order: List[int],
+    role_available: Dict[str, Set[int]],
+    available_players: Set[int],
+    role_preferences: Dict[int, Dict[str, List[int]]],
+    global_preferences: Dict[int, List[int]],
+    role_default_order: Dict[str, List[int]],
+    global_default_order: List[int],
+    role_needs: Dict[int, Dict[str, int]],
+    total_needs: Dict[int, int],
+) -> tuple:
+    """
+    Run the snake draft: one pass per role in ROLE_DRAFT_CONFIG order, then a
+    flex fill for squads still short. Pure and deterministic; none of the
+    arguments are modified.
+
+    Each squad keeps a cursor per preference list and pools are sets, so a
+    draft costs O(squads * preference length) overall.
+
+    Returns:
+        (squad_assignments, snake_order_by_role): picked player ids per squad in
+        pick order, and each role pass's first-round order and round count
+    """
+    available_players = set(available_players)
+    role_needs = {squad_id: dict(needs) for squad_id, needs in role_needs.items()}
+    total_needs = dict(total_needs)
+    squad_assignments = {squad_id: [] for squad_id in standings_order}
+    snake_order_by_role = {}
+
+    # Role-specific passes with custom first-round direction.
+    for role, reverse_first_round in ROLE_DRAFT_CONFIG:
+        role_pool = set(role_available.get(role, set()))
+        if not role_pool:
+            snake_order_by_role[role] = {"first_round": [], "rounds_run": 0}
+            continue
+
+        role_base_order = list(reversed(standings_order)) if reverse_first_round else list(standings_order)
+        rounds = (role_base_order, role_base_order[::-1])
+        cursors = {
+            squad_id: PreferenceCursor(role_preferences.get(squad_id, {}).get(role, []))
+            for squad_id in standings_order
+        }
+        default_cursor = PreferenceCursor(role_default_order.get(role, []))
+        rounds_run = 0
+
+        while role_pool and any(role_needs[squad_id][role] > 0 for squad_id in standings_order):
+            picked_this_round = False
+
+            for squad_id in rounds[rounds_run % 2]:
+                if role_needs[squad_id][role] <= 0 or total_needs[squad_id] <= 0:
+                    continue
+
+                selected = cursors[squad_id].next_available(role_pool)
+                if selected is None:
+                    selected = default_cursor.next_available(role_pool)
+                if selected is None:
+                    continue
+
+                squad_assignments[squad_id].append(selected)
+                role_pool.remove(selected)
+                available_players.discard(selected)
+                role_needs[squad_id][role] -= 1
+                total_needs[squad_id] -= 1
+                picked_this_round = True
+
+            if not picked_this_round:
+                break
+            rounds_run += 1
+
+        snake_order_by_role[role] = {
+            "first_round": role_base_order,
+            "rounds_run": rounds_run,
+        }
+
+    # Flex fill if any squads still need players.
+    rounds = (standings_order, standings_order[::-1])
+    cursors = {
+        squad_id: PreferenceCursor(global_preferences.get(squad_id, []))
+        for squad_id in standings_order
+    }
+    default_cursor = PreferenceCursor(global_default_order)
+    flex_round = 0
+    while available_players and any(need > 0 for need in total_needs.values()):
+        picked_this_round = False
+        for squad_id in rounds[flex_round % 2]:
+            if total_needs[squad_id] <= 0:
+                continue
+            selected = cursors[squad_id].next_available(available_players)
+            if selected is None:
+                selected = default_cursor.next_available(available_players)
+            if selected is None:
+                continue
+
+            squad_assignments[squad_id].append(selected)
+            available_players.remove(selected)
+            total_needs[squad_id] -= 1
+            picked_this_round = True
+
+        if not picked_this_round:
+            break
+        flex_round += 1
+
+    return squad_assignments, snake_order_by_role
+
+
+def allocate_pre_season_picks(
+    base_snake_order: List[int],
+    role_orders: Dict[str, tuple],
+) -> Dict[int, List[int]]:
+    """
+    Pre-season snake draft that hands out every eligible player: one pass per
+    role in ROLE_DRAFT_CONFIG order, each squad picking the first undrafted
+    player of its order. Pure; role_orders maps role to
+    (eligible_player_ids, {squad_id: order}).
+
+    Returns:
+        Picked player ids per squad in pick order
+    """
+    results = {squad_id: [] for squad_id in base_snake_order}
+
+    for role, reverse_base_order in ROLE_DRAFT_CONFIG:
+        eligible_role_players, role_draft_orders = role_orders.get(role, (set(), {}))
+        undrafted = set(eligible_role_players)
+        cursors = {
+            squad_id: PreferenceCursor(role_draft_orders.get(squad_id, []))
+            for squad_id in base_snake_order
+        }
+        role_base_order = list(reversed(base_snake_order)) if reverse_base_order else list(base_snake_order)
+        rounds = (role_base_order, role_base_order[::-1])
+        round_num = 0
+
+        while undrafted:
+            picked_in_round = False
+
+            for squad_id in rounds[round_num % 2]:
+                available_player = cursors[squad_id].next_available(undrafted)
+                if available_player is None:
+                    continue
+
+                results[squad_id].append(available_player)
+                undrafted.remove(available_player)
+                picked_in_round = True
+
+                if not undrafted:
+                    break
+
+            if not picked_in_round:
+                break
+
+            round_num += 1
+
+    return results
+
+
+def build_league_draft_inputs(
     league: FantasyLeague,
     draft_window: DraftWindow,
-    *,
-    dry_run: bool = False,
-    force_rerun: bool = False,
-    executed_by=None,
+    shared_inputs: Optional[Dict] = None,
 ) -> Dict:
+    """
+    Everything allocate_draft_picks needs for one league, plus the squads,
+    retained players and standings the callers report on.
+
+    shared_inputs is the result of build_shared_draft_inputs for this window;
+    when given, the pool, player roles and default orders are taken from it
+    instead of being recomputed for the league.
+    """
     if league.season_id != draft_window.season_id:
         raise ValueError("Draft window does not belong to league season.")
-
-    if has_draft_window_run(league, draft_window) and not (dry_run or force_rerun):
-        raise ValueError("This draft window has already been executed for this league.")
+    if shared_inputs is not None and shared_inputs["draft_window_id"] != draft_window.id:
+        raise ValueError("Shared draft inputs belong to a different draft window.")
 
     squads = list(FantasySquad.objects.filter(league=league).order_by("-total_points", "id"))
     if not squads:
         raise ValueError("No squads in this league.")
 
-    base_pool = draft_window.draft_pool or compile_draft_window_pool(draft_window)
+    if shared_inputs is not None:
+        base_pool = shared_inputs["base_pool"]
+    else:
+        base_pool = draft_window.draft_pool or compile_draft_window_pool(draft_window)
     if not base_pool:
         raise ValueError("Draft pool is empty for this draft window.")
 
-    effective_pool = build_draft_pool(league, draft_window)
+    # Same pool as build_draft_pool, without loading the retained players twice
+    retained_map = get_retained_player_map(league, draft_window)
+    all_retained_ids = {player_id for player_ids in retained_map.values() for player_id in player_ids}
+    effective_pool = [player_id for player_id in base_pool if player_id not in all_retained_ids]
     if not effective_pool:
         raise ValueError("No eligible players remain in the draft pool after retention.")
 
-    retained_map = get_retained_player_map(league, draft_window)
     available_players = set(effective_pool)
 
     current_squad_ids = {}
@@ -397,10 +659,10 @@ def execute_draft_window(
         tracked_player_ids.update(current_squad_ids[squad.id])
         tracked_player_ids.update(retained_map.get(squad.id, []))
 
-    role_map = {
-        player.id: player.role
-        for player in Player.objects.filter(id__in=tracked_player_ids).only("id", "role")
-    }
+    role_map = dict(shared_inputs["role_map"]) if shared_inputs is not None else {}
+    missing_role_ids = tracked_player_ids.difference(role_map)
+    if missing_role_ids:
+        role_map.update(Player.objects.filter(id__in=missing_role_ids).values_list("id", "role"))
 
     standings_snapshot = [
         {
@@ -418,11 +680,21 @@ def execute_draft_window(
         for role, _ in ROLE_DRAFT_CONFIG
     }
 
-    role_default_order = {
-        role: _default_order_for_players(league, list(role_available.get(role, set())))
-        for role, _ in ROLE_DRAFT_CONFIG
-    }
-    global_default_order = _default_order_for_players(league, list(available_players))
+    if shared_inputs is not None:
+        # Dropping retained players from the season-wide orders keeps the ranking
+        role_default_order = {
+            role: [pid for pid in shared_inputs["role_default_order"][role] if pid in role_available[role]]
+            for role, _ in ROLE_DRAFT_CONFIG
+        }
+        global_default_order = [
+            pid for pid in shared_inputs["global_default_order"] if pid in available_players
+        ]
+    else:
+        role_default_order = {
+            role: _default_order_for_players(league, list(role_available.get(role, set())))
+            for role, _ in ROLE_DRAFT_CONFIG
+        }
+        global_default_order = _default_order_for_players(league, list(available_players))
 
     drafts = FantasyDraft.objects.filter(
         league=league,
@@ -438,53 +710,16 @@ def execute_draft_window(
         else:
             legacy_draft_map[draft.squad_id] = draft.order or []
 
-    role_preferences = {}
-    global_preferences = {}
-    for squad in squads:
-        squad_role_preferences = {}
-        legacy_order = legacy_draft_map.get(squad.id, [])
-        for role, _ in ROLE_DRAFT_CONFIG:
-            eligible_ids = role_available.get(role, set())
-            if not eligible_ids:
-                squad_role_preferences[role] = []
-                continue
-
-            raw_order = role_draft_map.get((squad.id, role))
-            if raw_order:
-                normalized = _normalize_order(raw_order, eligible_ids)
-            elif legacy_order:
-                normalized = _normalize_order(
-                    [pid for pid in legacy_order if role_map.get(pid) == role],
-                    eligible_ids,
-                )
-            else:
-                normalized = []
-
-            if normalized:
-                missing = [pid for pid in role_default_order[role] if pid not in set(normalized)]
-                normalized.extend(missing)
-            else:
-                normalized = list(role_default_order[role])
-            squad_role_preferences[role] = normalized
-
-        role_preferences[squad.id] = squad_role_preferences
-
-        if legacy_order:
-            normalized_global = _normalize_order(legacy_order, available_players)
-            normalized_global.extend(
-                [pid for pid in global_default_order if pid not in set(normalized_global)]
-            )
-            global_preferences[squad.id] = normalized_global
-        else:
-            combined = []
-            seen_combined = set()
-            for role, _ in ROLE_DRAFT_CONFIG:
-                for player_id in squad_role_preferences[role]:
-                    if player_id not in seen_combined:
-                        combined.append(player_id)
-                        seen_combined.add(player_id)
-            combined.extend([pid for pid in global_default_order if pid not in seen_combined])
-            global_preferences[squad.id] = combined
+    role_preferences, global_preferences = build_draft_preferences(
+        [squad.id for squad in squads],
+        role_available,
+        available_players,
+        role_map,
+        role_default_order,
+        global_default_order,
+        role_draft_map,
+        legacy_draft_map,
+    )
 
     role_needs = {}
     total_needs = {}
@@ -512,79 +747,73 @@ def execute_draft_window(
         role_needs[squad_id] = squad_role_needs
         total_needs[squad_id] = max(0, len(target_ids) - len(retained_set))
 
-    squad_assignments = {squad.id: [] for squad in squads}
-    snake_order_by_role = {}
-
-    # Role-specific passes with custom first-round direction.
-    for role, reverse_first_round in ROLE_DRAFT_CONFIG:
-        role_pool = role_available.get(role, set())
-        if not role_pool:
-            snake_order_by_role[role] = {"first_round": [], "rounds_run": 0}
-            continue
-
-        role_base_order = list(reversed(standings_order)) if reverse_first_round else list(standings_order)
-        rounds_run = 0
-
-        while role_pool and any(role_needs[squad.id][role] > 0 for squad in squads):
-            round_order = role_base_order if rounds_run % 2 == 0 else list(reversed(role_base_order))
-            picked_this_round = False
-
-            for squad_id in round_order:
-                if role_needs[squad_id][role] <= 0 or total_needs[squad_id] <= 0:
-                    continue
-
-                preferred_order = role_preferences.get(squad_id, {}).get(role, [])
-                selected = next((pid for pid in preferred_order if pid in role_pool), None)
-                if selected is None:
-                    selected = next((pid for pid in role_default_order.get(role, []) if pid in role_pool), None)
-                if selected is None:
-                    continue
-
-                squad_assignments[squad_id].append(selected)
-                role_pool.remove(selected)
-                available_players.discard(selected)
-                role_needs[squad_id][role] -= 1
-                total_needs[squad_id] -= 1
-                picked_this_round = True
+    return {
+        "squads": squads,
+        "effective_pool": effective_pool,
+        "retained_map": retained_map,
+        "current_squad_ids": current_squad_ids,
+        "standings_snapshot": standings_snapshot,
+        "standings_order": standings_order,
+        "role_map": role_map,
+        "role_available": role_available,
+        "available_players": available_players,
+        "role_default_order": role_default_order,
+        "global_default_order": global_default_order,
+        "role_preferences": role_preferences,
+        "global_preferences": global_preferences,
+        "role_needs": role_needs,
+        "total_needs": total_needs,
+    }
 
-            if not picked_this_round:
-                break
-            rounds_run += 1
 
-        snake_order_by_role[role] = {
-            "first_round": role_base_order,
-            "rounds_run": rounds_run,
-        }
-
-    # Flex fill if any squads still need players.
-    flex_round = 0
-    while available_players and any(need > 0 for need in total_needs.values()):
-        round_order = standings_order if flex_round % 2 == 0 else list(reversed(standings_order))
-        picked_this_round = False
-        for squad_id in round_order:
-            if total_needs[squad_id] <= 0:
-                continue
-            preferred_order = global_preferences.get(squad_id, [])
-            selected = next((pid for pid in preferred_order if pid in available_players), None)
-            if selected is None:
-                selected = next((pid for pid in global_default_order if pid in available_players), None)
-            if selected is None:
-                continue
+@transaction.atomic
+def execute_draft_window(
+    league: FantasyLeague,
+    draft_window: DraftWindow,
+    *,
+    dry_run: bool = False,
+    force_rerun: bool = False,
+    executed_by=None,
+    shared_inputs: Optional[Dict] = None,
+) -> Dict:
+    """
+    Run the mid-season draft for one league and, unless dry_run, save the new
+    squads and the DraftWindowLeagueRun. shared_inputs is passed on to
+    build_league_draft_inputs.
+    """
+    if league.season_id != draft_window.season_id:
+        raise ValueError("Draft window does not belong to league season.")
 
-            squad_assignments[squad_id].append(selected)
-            available_players.remove(selected)
-            total_needs[squad_id] -= 1
-            picked_this_round = True
+    if has_draft_window_run(league, draft_window) and not (dry_run or force_rerun):
+        raise ValueError("This draft window has already been executed for this league.")
 
-        if not picked_this_round:
-            break
-        flex_round += 1
+    inputs = build_league_draft_inputs(league, draft_window, shared_inputs)
+    squads = inputs["squads"]
+    effective_pool = inputs["effective_pool"]
+    retained_map = inputs["retained_map"]
+    current_squad_ids = inputs["current_squad_ids"]
+    standings_snapshot = inputs["standings_snapshot"]
+    role_default_order = inputs["role_default_order"]
+    role_preferences = inputs["role_preferences"]
+
+    squad_assignments, snake_order_by_role = allocate_draft_picks(
+        inputs["standings_order"],
+        inputs["role_available"],
+        inputs["available_players"],
+        role_preferences,
+        inputs["global_preferences"],
+        role_default_order,
+        inputs["global_default_order"],
+        inputs["role_needs"],
+        inputs["total_needs"],
+    )
 
     squad_results = {}
     squad_snapshots = {}
     for squad in squads:
         retained_ids = list(dict.fromkeys(retained_map.get(squad.id, [])))
-        drafted_ids = [pid for pid in squad_assignments.get(squad.id, []) if pid not in set(retained_ids)]
+        retained_set = set(retained_ids)
+        drafted_ids = [pid for pid in squad_assignments.get(squad.id, []) if pid not in retained_set]
         inferred_target = len(current_squad_ids.get(squad.id, []))
         new_squad = retained_ids + drafted_ids
 
@@ -603,6 +832,7 @@ def execute_draft_window(
 
         if not dry_run:
             squad.current_squad = new_squad
+            squad._membership_source = SquadMembership.Source.DRAFT
             squad.save(update_fields=["current_squad"])
 
     result_payload = {
@@ -663,3 +893,158 @@ def execute_draft_window(
         draft_window.save(update_fields=["executed_at"])
 
     return result_payload
+
+
+def build_shared_draft_inputs(draft_window: DraftWindow) -> Dict:
+    """
+    The league-independent part of a draft window: its compiled pool, the pool
+    players' roles and the season-ranked default orders. Every league of the
+    season drafts from this pool minus its own retained players.
+    """
+    base_pool = list(dict.fromkeys(draft_window.draft_pool or compile_draft_window_pool(draft_window)))
+    role_map = dict(Player.objects.filter(id__in=base_pool).values_list("id", "role"))
+    role_default_order = {
+        role: _default_order_for_season(
+            draft_window.season_id,
+            [player_id for player_id in base_pool if role_map.get(player_id) == role],
+        )
+        for role, _ in ROLE_DRAFT_CONFIG
+    }
+    return {
+        "draft_window_id": draft_window.id,
+        "base_pool": base_pool,
+        "role_map": role_map,
+        "role_default_order": role_default_order,
+        "global_default_order": _default_order_for_season(draft_window.season_id, base_pool),
+    }
+
+
+def _execute_league_draft(
+    league_id: int,
+    draft_window: DraftWindow,
+    shared_inputs: Dict,
+    *,
+    dry_run: bool,
+    force_rerun: bool,
+    executed_by,
+) -> Dict:
+    """One league of execute_season_draft_window; failures are reported, not raised."""
+    started = time.perf_counter()
+    league = FantasyLeague.objects.get(id=league_id)
+    summary = {"league_id": league.id, "league": league.name}
+    if not (dry_run or force_rerun) and has_draft_window_run(league, draft_window):
+        summary.update({"status": "skipped", "error": "Draft window already executed for this league."})
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+    try:
+        result = execute_draft_window(
+            league,
+            draft_window,
+            dry_run=dry_run,
+            force_rerun=force_rerun,
+            executed_by=executed_by,
+            shared_inputs=shared_inputs,
+        )
+    except Exception as exc:
+        if not isinstance(exc, ValueError):
+            logger.exception(f"Draft window {draft_window.id} failed for league {league.id}")
+        summary.update({"status": "failed", "error": str(exc)})
+    else:
+        squad_results = result["squad_results"]
+        summary.update({
+            "status": "executed" if result["draft_completed"] else "dry_run",
+            "squads": result["squads"],
+            "drafted": sum(item["drafted"] for item in squad_results.values()),
+            "shortfall": sum(item["shortfall"] for item in squad_results.values()),
+            "standings_snapshot": result["standings_snapshot"],
+            "squad_results": squad_results,
+            "squad_snapshots": result["squad_snapshots"],
+        })
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def _execute_league_draft_in_thread(league_id: int, draft_window_id: int, shared_inputs: Dict, **options) -> Dict:
+    try:
+        draft_window = DraftWindow.objects.get(id=draft_window_id)
+        return _execute_league_draft(league_id, draft_window, shared_inputs, **options)
+    finally:
+        connection.close()
+
+
+def execute_season_draft_window(
+    draft_window: DraftWindow,
+    *,
+    league_ids: Optional[List[int]] = None,
+    dry_run: bool = False,
+    force_rerun: bool = False,
+    executed_by=None,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int, Dict], None]] = None,
+) -> Dict:
+    """
+    Run a draft window for every league of its season.
+
+    The pool, roles and default orders are computed once
+    (build_shared_draft_inputs); leagues then run on ``workers`` threads, each
+    in its own transaction, so one failing league leaves the others applied.
+    Leagues that already ran the window are skipped unless force_rerun.
+
+    Args:
+        draft_window: Window to execute
+        league_ids: Limit to these leagues of the season; None runs all of them
+        dry_run: Allocate and report without saving
+        force_rerun: Re-run leagues that already executed this window
+        executed_by: User recorded on each DraftWindowLeagueRun
+        workers: Leagues processed in parallel; 1 (or SQLite) runs them in the
+            calling thread
+        progress: Called as progress(done, total, league_summary) after each league
+
+    Returns:
+        Combined report with one summary per league, in league id order
+    """
+    leagues = FantasyLeague.objects.filter(season_id=draft_window.season_id)
+    if league_ids is not None:
+        leagues = leagues.filter(id__in=league_ids)
+    league_ids = list(leagues.order_by("id").values_list("id", flat=True))
+
+    started = time.perf_counter()
+    shared_inputs = build_shared_draft_inputs(draft_window)
+    options = {"dry_run": dry_run, "force_rerun": force_rerun, "executed_by": executed_by}
+
+    summaries = []
+
+    def finished(summary):
+        summaries.append(summary)
+        if progress:
+            progress(len(summaries), len(league_ids), summary)
+
+    # SQLite locks whole tables for a writer, so parallel leagues would only
+    # fail each other there
+    if workers <= 1 or connection.vendor == "sqlite":
+        for league_id in league_ids:
+            finished(_execute_league_draft(league_id, draft_window, shared_inputs, **options))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="draft-window") as executor:
+            futures = [
+                executor.submit(_execute_league_draft_in_thread, league_id, draft_window.id, shared_inputs, **options)
+                for league_id in league_ids
+            ]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    summaries.sort(key=lambda summary: summary["league_id"])
+    counts = {status: 0 for status in ("executed", "dry_run", "skipped", "failed")}
+    for summary in summaries:
+        counts[summary["status"]] += 1
+    return {
+        "draft_window_id": draft_window.id,
+        "season_id": draft_window.season_id,
+        "dry_run": dry_run,
+        "pool_size": len(shared_inputs["base_pool"]),
+        "leagues": len(summaries),
+        "counts": counts,
+        "drafted": sum(summary.get("drafted", 0) for summary in summaries),
+        "seconds": round(time.perf_counter() - started, 3),
+        "league_results": summaries,
+    }
@@ -0,0 +1,103 @@
+"""
+In-memory player and team lookups for scorecard ingest.
+
+Scorecards name players and teams by CricketData id, display name or a
+historical alias. Resolving each of those with its own query (and scanning
+every row's other_names in Python when nothing matches) costs dozens of queries
+per scorecard. IdentityResolver loads players and teams once into case-folded
+dictionaries so each lookup is a dict hit.
+
+Indexes are rebuilt lazily after any Player or Team save or delete in this
+process (see api.signals). Queryset .update() calls bypass signals; call
+invalidate_identity_cache() after those.
+"""
+import itertools
+import logging
+from typing import Dict, Iterable, Optional
+
+from ..models import Player, Team
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever a Player or Team changes; resolvers built under an older
+# generation reload on their next lookup.
+_generation = itertools.count(1)
+_current_generation = 0
+
+
+def invalidate_identity_cache() -> None:
+    """Mark every IdentityResolver in this process as stale."""
+    global _current_generation
+    _current_generation = next(_generation)
+
+
+def _fold(value) -> str:
+    return str(value).strip().casefold() if value else ''
+
+
+def _index(objects: Iterable, keys) -> Dict[str, object]:
+    """Map each folded key to the first object (in query order) that has it."""
+    index = {}
+    for obj in objects:
+        for key in keys(obj):
+            folded = _fold(key)
+            if folded:
+                index.setdefault(folded, obj)
+    return index
+
+
+class IdentityResolver:
+    """
+    Case-folded lookups for players (cricdata_id, name, aliases) and teams
+    (name, short name, aliases). Build one per ingest run and reuse it across
+    matches; it reloads itself after Player or Team saves.
+    """
+
+    def __init__(self):
+        self._generation = None
+        self._players_by_cricdata_id = {}
+        self._players_by_name = {}
+        self._players_by_alias = {}
+        self._teams_by_name = {}
+        self._teams_by_short_name = {}
+        self._teams_by_alias = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._generation == _current_generation:
+            return
+        generation = _current_generation
+
+        players = list(Player.objects.order_by('name', 'id'))
+        self._players_by_cricdata_id = _index(players, lambda p: [p.cricdata_id])
+        self._players_by_name = _index(players, lambda p: [p.name])
+        self._players_by_alias = _index(players, lambda p: getattr(p, 'other_names', None) or [])
+
+        teams = list(Team.objects.order_by('name', 'id'))
+        self._teams_by_name = _index(teams, lambda t: [t.name])
+        self._teams_by_short_name = _index(teams, lambda t: [t.short_name])
+        self._teams_by_alias = _index(teams, lambda t: t.other_names or [])
+
+        self._generation = generation
+        logger.debug(f"Identity resolver loaded {len(players)} players and {len(teams)} teams")
+
+    def player_by_cricdata_id(self, cricdata_id: str) -> Optional[Player]:
+        self._ensure_loaded()
+        return self._players_by_cricdata_id.get(_fold(cricdata_id))
+
+    def player_by_name(self, name: str) -> Optional[Player]:
+        self._ensure_loaded()
+        return self._players_by_name.get(_fold(name))
+
+    def player_by_alias(self, name: str) -> Optional[Player]:
+        self._ensure_loaded()
+        return self._players_by_alias.get(_fold(name))
+
+    def team_by_name(self, name: str) -> Optional[Team]:
+        """Match on full name, then short name, then historical names."""
+        self._ensure_loaded()
+        folded = _fold(name)
+        return (
+            self._teams_by_name.get(folded)
+            or self._teams_by_short_name.get(folded)
+            or self._teams_by_alias.get(folded)
+        )
@@ -0,0 +1,308 @@
+"""
+Materialized player totals:
+
+- PlayerSeasonAggregate: PlayerMatchEvent totals per (player, season)
+- SquadPlayerAggregate: FantasyPlayerEvent totals per (fantasy squad, player)
+- LeaguePlayerAggregate: FantasyPlayerEvent totals per (league, player) for the
+  league's season
+
+Writers refresh the rows they touch:
+
+- scorecard ingest (CricketDataService.update_match_points): the match's season
+  and the owning squads and leagues, for the players whose events changed
+- single event saves and deletes (api.signals) and fix_points: the event's player
+- admin paths that save or delete several events: once, inside batched_refresh()
+- recalculate_points and the backfill_player_aggregates command: whole seasons
+
+A refresh re-aggregates the underlying events, so it is idempotent and safe to
+repeat. Readers get one row per player-season, squad-player or league-player.
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from ..models import (
+    FantasyPlayerEvent,
+    FantasySquad,
+    LeaguePlayerAggregate,
+    Match,
+    PlayerMatchEvent,
+    PlayerSeasonAggregate,
+    SquadPlayerAggregate,
+)
+
+from .data_versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_FIELDS = [
+    'matches', 'total_points', 'avg_points',
+    'batting_points', 'bowling_points', 'fielding_points', 'other_points',
+    'bat_innings', 'bat_runs', 'bat_balls', 'bat_fours', 'bat_sixes', 'bat_not_outs',
+    'bowl_innings', 'bowl_balls', 'bowl_runs', 'bowl_wickets', 'bowl_maidens',
+    'catches', 'stumpings', 'run_outs', 'player_of_match',
+]
+
+
+def _sum(expression):
+    return Coalesce(Sum(expression), 0)
+
+
+AGGREGATES = {
+    'matches': Count('id'),
+    'total_points': _sum('total_points_all'),
+    'batting_points': _sum('batting_points_total'),
+    'bowling_points': _sum('bowling_points_total'),
+    'fielding_points': _sum('fielding_points_total'),
+    'other_points': _sum('other_points_total'),
+    'bat_innings': _sum('bat_innings'),
+    'bat_runs': _sum('bat_runs'),
+    'bat_balls': _sum('bat_balls'),
+    'bat_fours': _sum('bat_fours'),
+    'bat_sixes': _sum('bat_sixes'),
+    'bat_not_outs': Count('id', filter=Q(bat_not_out=True)),
+    'bowl_innings': _sum('bowl_innings'),
+    'bowl_balls': _sum('bowl_balls'),
+    'bowl_runs': _sum('bowl_runs'),
+    'bowl_wickets': _sum('bowl_wickets'),
+    'bowl_maidens': _sum('bowl_maidens'),
+    'catches': _sum(Coalesce('field_catch', 0) + Coalesce('wk_catch', 0)),
+    'stumpings': _sum('wk_stumping'),
+    'run_outs': _sum(Coalesce('run_out_solo', 0) + Coalesce('run_out_collab', 0)),
+    'player_of_match': Count('id', filter=Q(player_of_match=True)),
+}
+
+
+def refresh_player_season_aggregates(season_id: int, player_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuild a season's aggregate rows from its PlayerMatchEvents.
+
+    Args:
+        season_id: Season to refresh
+        player_ids: Limit to these players; None rebuilds the whole season
+
+    Returns:
+        Number of rows written
+    """
+    events = PlayerMatchEvent.objects.filter(match__season_id=season_id)
+    stale = PlayerSeasonAggregate.objects.filter(season_id=season_id)
+    if player_ids is not None:
+        player_ids = sorted(set(player_ids))
+        if not player_ids:
+            return 0
+        events = events.filter(player_id__in=player_ids)
+        stale = stale.filter(player_id__in=player_ids)
+
+    # Annotation names are prefixed because most of them shadow PlayerMatchEvent fields
+    annotations = {f'agg_{name}': aggregate for name, aggregate in AGGREGATES.items()}
+    rows = []
+    for values in events.values('player_id').annotate(**annotations).order_by('player_id'):
+        totals = {name: values[f'agg_{name}'] for name in AGGREGATES}
+        totals['avg_points'] = totals['total_points'] / totals['matches']
+        rows.append(PlayerSeasonAggregate(season_id=season_id, player_id=values['player_id'], **totals))
+
+    with transaction.atomic():
+        # Players whose last event in the season went away lose their row
+        stale.exclude(player_id__in=[row.player_id for row in rows]).delete()
+        PlayerSeasonAggregate.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['player', 'season'],
+            update_fields=AGGREGATE_FIELDS + ['updated_at'],
+        )
+    logger.debug(f"Refreshed {len(rows)} player aggregates for season {season_id}")
+    return len(rows)
+
+
+def refresh_for_events(events: Iterable[PlayerMatchEvent]) -> int:
+    """Refresh the (season, player) rows behind these events."""
+    players_by_match = defaultdict(set)
+    for event in events:
+        players_by_match[event.match_id].add(event.player_id)
+    if not players_by_match:
+        return 0
+
+    players_by_season = defaultdict(set)
+    for match_id, season_id in Match.objects.filter(id__in=players_by_match).values_list('id', 'season_id'):
+        players_by_season[season_id] |= players_by_match[match_id]
+    return sum(
+        refresh_player_season_aggregates(season_id, player_ids)
+        for season_id, player_ids in players_by_season.items()
+    )
+
+
+
+FANTASY_AGGREGATES = {
+    'matches': Count('match_event__match', distinct=True),
+    'base_points': _sum('match_event__total_points_all'),
+    'boost_points': Coalesce(Sum('boost_points'), 0.0),
+}
+FANTASY_AGGREGATE_FIELDS = list(FANTASY_AGGREGATES) + ['updated_at']
+
+
+def _replace_fantasy_rows(model, owner_field, owner_path, events, existing):
+    """
+    Upsert one row per (owner, player) from the events and drop existing rows
+    whose events are gone. owner_path is the FantasyPlayerEvent lookup of the owner id.
+    """
+    rows = [
+        model(**{f'{owner_field}_id': values['owner_id']}, player_id=values['player_id'],
+              **{name: values[name] for name in FANTASY_AGGREGATES})
+        for values in events.values(
+            owner_id=F(owner_path), player_id=F('match_event__player_id'),
+        ).annotate(**FANTASY_AGGREGATES).order_by()
+    ]
+    keys = {(getattr(row, f'{owner_field}_id'), row.player_id) for row in rows}
+    gone = [
+        row_id for row_id, owner_id, player_id in existing.values_list('id', f'{owner_field}_id', 'player_id')
+        if (owner_id, player_id) not in keys
+    ]
+    with transaction.atomic():
+        if gone:
+            model.objects.filter(id__in=gone).delete()
+        model.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=[owner_field, 'player'],
+            update_fields=FANTASY_AGGREGATE_FIELDS,
+        )
+    return len(rows)
+
+
+def refresh_squad_player_aggregates(squad_ids: Iterable[int], player_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuild SquadPlayerAggregate rows for these squads.
+
+    Args:
+        squad_ids: Fantasy squads to refresh
+        player_ids: Limit to these players; None rebuilds every player of the squads
+
+    Returns:
+        Number of rows written
+    """
+    squad_ids = sorted(set(squad_ids))
+    events = FantasyPlayerEvent.objects.filter(fantasy_squad_id__in=squad_ids)
+    existing = SquadPlayerAggregate.objects.filter(fantasy_squad_id__in=squad_ids)
+    if player_ids is not None:
+        player_ids = sorted(set(player_ids))
+        events = events.filter(match_event__player_id__in=player_ids)
+        existing = existing.filter(player_id__in=player_ids)
+    if not squad_ids or player_ids == []:
+        return 0
+    return _replace_fantasy_rows(SquadPlayerAggregate, 'fantasy_squad', 'fantasy_squad_id', events, existing)
+
+
+def refresh_league_player_aggregates(league_ids: Iterable[int], player_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuild LeaguePlayerAggregate rows for these leagues from their squads'
+    events in the league's season.
+
+    Returns:
+        Number of rows written
+    """
+    league_ids = sorted(set(league_ids))
+    events = FantasyPlayerEvent.objects.filter(
+        fantasy_squad__league_id__in=league_ids,
+        match_event__match__season_id=F('fantasy_squad__league__season_id'),
+    )
+    existing = LeaguePlayerAggregate.objects.filter(league_id__in=league_ids)
+    if player_ids is not None:
+        player_ids = sorted(set(player_ids))
+        events = events.filter(match_event__player_id__in=player_ids)
+        existing = existing.filter(player_id__in=player_ids)
+    if not league_ids or player_ids == []:
+        return 0
+    return _replace_fantasy_rows(LeaguePlayerAggregate, 'league', 'fantasy_squad__league_id', events, existing)
+
+
+def refresh_fantasy_aggregates(squad_ids: Iterable[int], player_ids: Optional[Iterable[int]] = None) -> None:
+    """Refresh the squad rows for these squads and the league rows of their leagues."""
+    squad_ids = sorted(set(squad_ids))
+    if not squad_ids:
+        return
+    league_ids = FantasySquad.objects.filter(id__in=squad_ids).values_list('league_id', flat=True).distinct()
+    player_ids = None if player_ids is None else sorted(set(player_ids))
+    refresh_squad_player_aggregates(squad_ids, player_ids)
+    refresh_league_player_aggregates(league_ids, player_ids)
+    logger.debug(f"Refreshed fantasy aggregates for {len(squad_ids)} squads")
+
+
+def refresh_fantasy_aggregates_for_events(match_event_ids: Iterable[int]) -> None:
+    """Refresh the squad and league rows that include these PlayerMatchEvents."""
+    pairs = FantasyPlayerEvent.objects.filter(match_event_id__in=list(match_event_ids)).values_list(
+        'fantasy_squad_id', 'match_event__player_id'
+    )
+    squad_ids, player_ids = set(), set()
+    for squad_id, player_id in pairs:
+        squad_ids.add(squad_id)
+        player_ids.add(player_id)
+    refresh_fantasy_aggregates(squad_ids, player_ids)
+
+
+def refresh_season_fantasy_aggregates(season_id: int) -> None:
+    """Rebuild the squad and league rows of every league in a season."""
+    refresh_fantasy_aggregates(FantasySquad.objects.filter(league__season_id=season_id).values_list('id', flat=True))
+
+
+class PendingRefresh:
+    """Refreshes and version bumps collected by batched_refresh()."""
+
+    def __init__(self):
+        self.events = {}
+        self.squad_ids = set()
+        self.player_ids = set()
+
+    def add_player_event(self, event: PlayerMatchEvent) -> None:
+        self.events[event.id] = event
+
+    def add_fantasy_event(self, squad_id: int, player_id: int) -> None:
+        self.squad_ids.add(squad_id)
+        self.player_ids.add(player_id)
+
+    def run(self) -> None:
+        if self.events:
+            events = list(self.events.values())
+            match_ids = {event.match_id for event in events}
+            refresh_for_events(events)
+            refresh_fantasy_aggregates_for_events(list(self.events))
+            bump_versions(
+                season_ids=Match.objects.filter(id__in=match_ids).values_list('season_id', flat=True),
+                match_ids=match_ids,
+            )
+        refresh_fantasy_aggregates(self.squad_ids, self.player_ids)
+
+
+_batch = threading.local()
+
+
+def pending_refresh() -> Optional[PendingRefresh]:
+    """The batch open in this thread, if any."""
+    return getattr(_batch, 'pending', None)
+
+
+@contextmanager
+def batched_refresh():
+    """
+    Defer the per-row refreshes api.signals runs for PlayerMatchEvent and
+    FantasyPlayerEvent saves and deletes, and run them once on exit.
+
+    For admin paths that write several events. Nested batches join the outer
+    one; nothing is refreshed if the block raises.
+    """
+    if pending_refresh() is not None:
+        yield
+        return
+    _batch.pending = pending = PendingRefresh()
+    try:
+        yield
+    finally:
+        _batch.pending = None
+    pending.run()
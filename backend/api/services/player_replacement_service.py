@@ -1,6 +1,6 @@
 from django.db import transaction
 
-from api.models import FantasySquad, PlayerSeasonTeam
+from api.models import FantasySquad, PlayerSeasonTeam, SquadMembership
 
 
 def apply_ruled_out_replacement(player_season_team):
@@ -38,13 +38,16 @@ def apply_ruled_out_replacement(player_season_team):
             replacement_mapping.save(update_fields=["team"])
             mapping_updated = True
 
-        squads = FantasySquad.objects.filter(
-            league__season_id=player_season_team.season_id
-        ).only("id", "current_squad")
-
         ruled_out_player_id = player_season_team.player_id
         replacement_player_id = player_season_team.replacement_id
 
+        owner_ids = SquadMembership.objects.filter(
+            league__season_id=player_season_team.season_id,
+            player_id=ruled_out_player_id,
+            left_at__isnull=True,
+        ).values("fantasy_squad_id")
+        squads = FantasySquad.objects.filter(id__in=owner_ids).only("id", "league_id", "current_squad")
+
         for squad in squads:
             current_squad = list(squad.current_squad or [])
             if ruled_out_player_id not in current_squad:
@@ -54,6 +57,7 @@ def apply_ruled_out_replacement(player_season_team):
 
             current_squad.append(replacement_player_id)
             squad.current_squad = current_squad
+            squad._membership_source = SquadMembership.Source.REPLACEMENT
             squad.save(update_fields=["current_squad"])
             squads_updated += 1
 
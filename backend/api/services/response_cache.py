@@ -0,0 +1,145 @@
+"""
+Single-flight fills for expensive cached responses.
+
+When a cached league payload is missing (its data version moved or it aged out)
+only the worker that takes the fill lock rebuilds it. Other workers serve the
+last payload built for the same resource (stale-while-revalidate) or, when there
+is none yet, wait for the filler instead of starting their own rebuild.
+
+In a view:
+
+    fill = SingleFlightFill('league_squads', cache_key, stale_key)
+    cached = fill.get()
+    if cached is not None:
+        return Response(cached, headers=fill.headers)
+    ...build the payload...
+    fill.set(payload, timeout)
+
+Hit / miss / stale / wait counts are kept per endpoint in the shared cache, so
+they add up across workers (see the cache_stats management command).
+"""
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Longer than the slowest rebuild; a filler that dies frees the lock after this
+LOCK_TIMEOUT = 60
+# How long a worker with nothing stale to serve waits for the filler
+WAIT_TIMEOUT = 10
+WAIT_INTERVAL = 0.1
+# Stale copies only back up in-flight rebuilds, but must outlive the fresh entry
+STALE_TIMEOUT = 60 * 60 * 24
+
+OUTCOMES = ('hit', 'miss', 'stale', 'wait')
+ENDPOINTS = ('league_players', 'league_squads', 'league_stats')
+
+# Stale payloads must not be stored by clients under the fresh ETag that
+# condition() would otherwise attach, or a later revalidation would 304 onto them
+STALE_RESPONSE_HEADERS = {'Cache-Control': 'no-store', 'ETag': 'W/"stale"'}
+
+
+def metric_key(endpoint: str, outcome: str) -> str:
+    return f'cache_metrics:{endpoint}:{outcome}'
+
+
+def record(endpoint: str, outcome: str) -> None:
+    key = metric_key(endpoint, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_metrics(endpoints: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """Counts per endpoint and outcome; outcomes that never happened are 0."""
+    endpoints = list(endpoints)
+    counts = cache.get_many([metric_key(endpoint, outcome) for endpoint in endpoints for outcome in OUTCOMES])
+    return {
+        endpoint: {outcome: counts.get(metric_key(endpoint, outcome), 0) for outcome in OUTCOMES}
+        for endpoint in endpoints
+    }
+
+
+def reset_metrics(endpoints: Iterable[str]) -> None:
+    cache.delete_many([metric_key(endpoint, outcome) for endpoint in endpoints for outcome in OUTCOMES])
+
+
+class SingleFlightFill:
+    """
+    One cache lookup-or-rebuild for a response payload.
+
+    Args:
+        endpoint: Name the metrics are counted under
+        key: Fresh (versioned) cache key
+        stale_key: Version-free key holding the last payload built for the resource
+    """
+
+    def __init__(self, endpoint: str, key: str, stale_key: str,
+                 lock_timeout: int = LOCK_TIMEOUT, wait_timeout: float = WAIT_TIMEOUT):
+        self.endpoint = endpoint
+        self.key = key
+        self.stale_key = stale_key
+        self.lock_key = f'{key}:lock'
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.stale = False
+        self.locked = False
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        return STALE_RESPONSE_HEADERS if self.stale else None
+
+    def _acquire(self) -> bool:
+        self.locked = cache.add(self.lock_key, 1, self.lock_timeout)
+        return self.locked
+
+    def _outcome(self, outcome: str, data: Any = None) -> Any:
+        record(self.endpoint, outcome)
+        logger.debug(f"Cache {outcome} for {self.key}")
+        return data
+
+    def get(self) -> Any:
+        """
+        The payload to serve, or None when the caller has to build it.
+
+        None means this worker holds the fill lock (or gave up waiting for a
+        filler that never finished) and must call set() with the new payload.
+        """
+        data = cache.get(self.key)
+        if data is not None:
+            return self._outcome('hit', data)
+        if self._acquire():
+            return self._outcome('miss')
+
+        data = cache.get(self.stale_key)
+        if data is not None:
+            self.stale = True
+            return self._outcome('stale', data)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            data = cache.get(self.key)
+            if data is not None:
+                return self._outcome('wait', data)
+            # The filler failed and released the lock; take over
+            if self._acquire():
+                break
+        return self._outcome('miss')
+
+    def set(self, data: Any, timeout: int) -> None:
+        """Store a freshly built payload and let waiting workers have it."""
+        cache.set(self.key, data, timeout)
+        cache.set(self.stale_key, data, max(timeout, STALE_TIMEOUT))
+        self.release()
+
+    def release(self) -> None:
+        """Drop the fill lock without storing anything, e.g. after a failed build."""
+        if self.locked:
+            cache.delete(self.lock_key)
+            self.locked = False
@@ -0,0 +1,45 @@
+"""
+Change detection for CricketData scorecards.
+
+A live match is polled far more often than its scorecard changes. The service
+keeps a MatchScorecardSnapshot per match: a hash of the last applied payload and
+the per-player records it produced. An identical poll is recognised from the
+hash alone; otherwise only players whose record differs are written.
+"""
+import hashlib
+import json
+from typing import Dict
+
+
+def scorecard_content_hash(match_data: Dict) -> str:
+    """
+    Stable hash of a scorecard response.
+
+    Only the ``data`` payload is hashed. The ``info`` block carries request
+    counters (hitsToday, ...) that change on every call.
+    """
+    payload = json.dumps(
+        match_data.get("data") or {},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def diff_player_records(records: Dict[str, Dict], previous: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Records that are new or differ from the previously applied snapshot.
+
+    Args:
+        records: cricdata_id -> record parsed from the current scorecard
+        previous: cricdata_id -> record stored with the last applied scorecard
+
+    Returns:
+        Subset of ``records`` that needs to be written
+    """
+    return {
+        cricdata_id: record
+        for cricdata_id, record in records.items()
+        if previous.get(cricdata_id) != record
+    }
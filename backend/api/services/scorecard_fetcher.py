@@ -0,0 +1,170 @@
+"""
+Concurrent HTTP client for CricketData scorecards.
+
+Scorecards are fetched over one pooled ``requests.Session`` with per-request
+timeouts and a bounded thread pool. The fetcher backs off on HTTP 429 using the
+``Retry-After`` header, spaces out request starts when ``min_interval`` is set,
+and stops issuing requests once the API reports the daily hit limit is used up.
+Only the network stage is concurrent; callers apply the results to the
+database one match at a time.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 20)
+DEFAULT_MAX_RETRIES = 2
+# Upper bound on how long a Retry-After header can make a worker sleep.
+MAX_RETRY_AFTER = 30.0
+
+
+class ScorecardFetcher:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        min_interval: float = 0.0,
+        session: Optional[requests.Session] = None,
+    ):
+        """
+        Args:
+            base_url: API root, e.g. https://api.cricapi.com/v1
+            api_key: CricketData API key
+            max_workers: Maximum number of requests in flight
+            timeout: requests timeout, a number or (connect, read) tuple
+            max_retries: Retries after a 429 or connection error
+            min_interval: Minimum seconds between request starts across all workers
+            session: Session to use instead of creating a pooled one
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.min_interval = min_interval
+        self.session = session or self._build_session(self.max_workers)
+
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._quota_exhausted = threading.Event()
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def quota_exhausted(self) -> bool:
+        return self._quota_exhausted.is_set()
+
+    def _wait_for_slot(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.min_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    @staticmethod
+    def _retry_after_seconds(response: requests.Response, attempt: int) -> float:
+        header = response.headers.get("Retry-After")
+        try:
+            delay = float(header)
+        except (TypeError, ValueError):
+            delay = 2.0 ** attempt
+        return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+    def _check_quota(self, data: Dict) -> None:
+        info = data.get("info") or {}
+        hits_today, hits_limit = info.get("hitsToday"), info.get("hitsLimit")
+        if isinstance(hits_today, int) and isinstance(hits_limit, int) and hits_limit and hits_today >= hits_limit:
+            logger.warning(f"CricketData daily hit limit reached ({hits_today}/{hits_limit})")
+            self._quota_exhausted.set()
+
+    def fetch(self, match_id: str) -> Optional[Dict]:
+        """
+        Fetch one scorecard.
+
+        Returns:
+            The decoded response when the API reports success, otherwise None
+        """
+        if self.quota_exhausted:
+            logger.error(f"Skipping scorecard fetch for {match_id}: API hit limit reached")
+            return None
+
+        url = f"{self.base_url}/match_scorecard"
+        params = {"apikey": self.api_key, "id": match_id}
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt < self.max_retries:
+                    logger.warning(f"Retrying match {match_id} after {type(e).__name__}")
+                    continue
+                logger.error(f"Failed to fetch match {match_id}: {str(e)}")
+                return None
+            except requests.RequestException as e:
+                logger.error(f"Failed to fetch match {match_id}: {str(e)}")
+                return None
+
+            if response.status_code == 429:
+                if attempt < self.max_retries:
+                    delay = self._retry_after_seconds(response, attempt)
+                    logger.warning(f"Rate limited fetching match {match_id}; retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Failed to fetch match {match_id}: rate limited")
+                return None
+
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"Failed to fetch match {match_id}: {str(e)}")
+                return None
+
+            self._check_quota(data)
+            if data.get("status") != "success":
+                error_msg = data.get("message") or data.get("reason") or "Unknown API error"
+                logger.error(f"API Error for match {match_id}: {error_msg}")
+                return None
+            logger.debug(f"Scorecard response for {match_id}: {data}")
+            return data
+        return None
+
+    def fetch_many(self, match_ids: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch several scorecards concurrently.
+
+        Returns:
+            Dict of match_id -> scorecard (None for failed fetches), in input order
+        """
+        match_ids = list(dict.fromkeys(match_ids))
+        if not match_ids:
+            return {}
+        workers = min(self.max_workers, len(match_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scorecard") as executor:
+            scorecards = list(executor.map(self.fetch, match_ids))
+        return dict(zip(match_ids, scorecards))
+
+    def close(self) -> None:
+        self.session.close()
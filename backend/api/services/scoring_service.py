@@ -0,0 +1,359 @@
+"""
+Columnar scoring engine for PlayerMatchEvent base points.
+
+All base point rules live here. PlayerMatchEvent.save(), the
+``recalculate_points`` command and the ``fix_points`` command score through
+the same functions, so a rule change only has to be made once.
+
+Events are scored as whole columns: raw stat fields are packed into NumPy
+arrays and every rule is applied to all rows at once. Strike rate and economy
+are compared using exact integer arithmetic that reproduces the
+``Decimal.quantize(..., ROUND_HALF_UP)`` behaviour of
+``PlayerMatchEvent.bat_strike_rate`` / ``bowl_economy``.
+
+The same pass produces each event's boost components: the points earned in
+every FantasyBoostRole multiplier category. They are stored on the event so
+boost points for any role are a dot product with that role's multipliers.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F
+
+STAT_FIELDS = (
+    "bat_runs",
+    "bat_balls",
+    "bat_fours",
+    "bat_sixes",
+    "bat_not_out",
+    "bowl_balls",
+    "bowl_maidens",
+    "bowl_runs",
+    "bowl_wickets",
+    "field_catch",
+    "wk_catch",
+    "wk_stumping",
+    "run_out_solo",
+    "run_out_collab",
+    "player_of_match",
+)
+
+POINT_FIELDS = (
+    "batting_points_total",
+    "bowling_points_total",
+    "fielding_points_total",
+    "other_points_total",
+    "total_points_all",
+)
+
+# FantasyBoostRole multiplier categories, in the order boost components are stored.
+# Each category maps to the role's ``multiplier_<category>`` field.
+BOOST_CATEGORIES = (
+    "runs",
+    "fours",
+    "sixes",
+    "bat_milestones",
+    "sr",
+    "wickets",
+    "maidens",
+    "bowl_milestones",
+    "economy",
+    "stumpings",
+    "catches",
+    "run_outs",
+    "potm",
+    "playing",
+)
+
+# Fields apply_points() may change on an event.
+SCORED_FIELDS = POINT_FIELDS + ("boost_components",)
+
+# Player role whose batters are exempt from the duck penalty.
+DUCK_EXEMPT_ROLE = "BOWL"
+
+# Minimum balls faced / bowled before strike rate and economy bonuses apply.
+MIN_BALLS_FOR_RATE_BONUS = 10
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def _column(rows: Sequence[Dict], field: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (values, is_null) arrays for one stat field."""
+    raw = [row.get(field) for row in rows]
+    is_null = np.fromiter((value is None for value in raw), dtype=bool, count=len(raw))
+    values = np.fromiter((int(value or 0) for value in raw), dtype=np.int64, count=len(raw))
+    return values, is_null
+
+
+def build_columns(rows: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Pack stat dictionaries into scoring columns.
+
+    Each row must contain the STAT_FIELDS keys plus ``player_role``.
+    Null stats are stored as 0 with a matching ``<field>_null`` mask where the
+    rules need to tell "not recorded" apart from zero.
+    """
+    columns = {}
+    for field in STAT_FIELDS:
+        values, is_null = _column(rows, field)
+        columns[field] = values
+        columns[f"{field}_null"] = is_null
+    columns["is_bowler"] = np.fromiter(
+        (row.get("player_role") == DUCK_EXEMPT_ROLE for row in rows),
+        dtype=bool,
+        count=len(rows),
+    )
+    return columns
+
+
+def event_row(event) -> Dict:
+    """Stat dictionary for a PlayerMatchEvent instance."""
+    row = {field: getattr(event, field) for field in STAT_FIELDS}
+    player = getattr(event, "player", None) if event.player_id else None
+    row["player_role"] = getattr(player, "role", None)
+    return row
+
+
+def _rounded_rate(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """
+    Integer ROUND_HALF_UP of numerator / denominator for non-negative inputs.
+    Rows with a zero denominator return 0 and must be masked by the caller.
+    """
+    safe_denominator = np.where(denominator > 0, denominator, 1)
+    return (2 * numerator + safe_denominator) // (2 * safe_denominator)
+
+
+def strike_rate_bonus(runs: np.ndarray, balls: np.ndarray) -> np.ndarray:
+    # Strike rate in tenths, i.e. runs / balls * 100 quantized to 0.1.
+    sr_tenths = _rounded_rate(runs * 1000, balls)
+    bonus = np.select(
+        [
+            sr_tenths >= 2000,
+            sr_tenths >= 1750,
+            sr_tenths >= 1500,
+            sr_tenths < 500,
+            sr_tenths < 750,
+            sr_tenths < 1000,
+        ],
+        [6, 4, 2, -6, -4, -2],
+        default=0,
+    )
+    return np.where(balls >= MIN_BALLS_FOR_RATE_BONUS, bonus, 0)
+
+
+def economy_bonus(runs: np.ndarray, balls: np.ndarray, runs_null: np.ndarray) -> np.ndarray:
+    # Economy in hundredths, i.e. runs / (balls / 6) quantized to 0.01.
+    eco_hundredths = _rounded_rate(runs * 600, balls)
+    bonus = np.select(
+        [
+            eco_hundredths < 500,
+            eco_hundredths < 600,
+            eco_hundredths < 700,
+            eco_hundredths >= 1200,
+            eco_hundredths >= 1100,
+            eco_hundredths >= 1000,
+        ],
+        [6, 4, 2, -6, -4, -2],
+        default=0,
+    )
+    return np.where((balls >= MIN_BALLS_FOR_RATE_BONUS) & ~runs_null, bonus, 0)
+
+
+def batting_milestones(runs: np.ndarray) -> np.ndarray:
+    return np.where(runs >= 50, 8, 0) + np.where(runs >= 100, 16, 0)
+
+
+def bowling_milestones(wickets: np.ndarray) -> np.ndarray:
+    return np.where(wickets >= 3, 8, 0) + np.where(wickets >= 5, 16, 0)
+
+
+def score_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Apply the base point rules to whole columns.
+
+    Returns an int64 array for each name in POINT_FIELDS.
+    """
+    runs = columns["bat_runs"]
+    is_duck = (
+        (runs == 0)
+        & ~columns["bat_runs_null"]
+        & (columns["bat_not_out"] == 0)
+        & ~columns["is_bowler"]
+    )
+    batting = (
+        runs
+        + columns["bat_fours"]
+        + 2 * columns["bat_sixes"]
+        + batting_milestones(runs)
+        + strike_rate_bonus(runs, columns["bat_balls"])
+        - np.where(is_duck, 2, 0)
+    )
+    batting = np.where(columns["bat_runs_null"], 0, batting)
+
+    wickets = columns["bowl_wickets"]
+    bowling = (
+        25 * wickets
+        + 8 * columns["bowl_maidens"]
+        + bowling_milestones(wickets)
+        + economy_bonus(columns["bowl_runs"], columns["bowl_balls"], columns["bowl_runs_null"])
+    )
+    bowling = np.where(
+        columns["bowl_wickets_null"] & columns["bowl_maidens_null"],
+        0,
+        bowling,
+    )
+
+    fielding = (
+        12 * columns["wk_stumping"]
+        + 8 * columns["field_catch"]
+        + 8 * columns["wk_catch"]
+        + 8 * columns["run_out_solo"]
+        + 4 * columns["run_out_collab"]
+    )
+
+    other = np.where(columns["player_of_match"] != 0, 50, 0) + 4
+
+    return {
+        "batting_points_total": batting,
+        "bowling_points_total": bowling,
+        "fielding_points_total": fielding,
+        "other_points_total": other,
+        "total_points_all": batting + bowling + fielding + other,
+    }
+
+
+def score_rows(rows: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    return score_columns(build_columns(rows))
+
+
+def score_boost_components(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Points per boost category for whole columns.
+
+    Returns an int64 array of shape (rows, len(BOOST_CATEGORIES)). Unlike the
+    base totals, categories ignore the duck penalty and the null masks that
+    zero a whole batting or bowling line; a role whose multipliers are all
+    equal is applied to total_points_all instead (see boost_points).
+    """
+    runs = columns["bat_runs"]
+    wickets = columns["bowl_wickets"]
+    sr = np.where(columns["bat_runs_null"], 0, strike_rate_bonus(runs, columns["bat_balls"]))
+    components = (
+        runs,
+        columns["bat_fours"],
+        2 * columns["bat_sixes"],
+        batting_milestones(runs),
+        sr,
+        25 * wickets,
+        8 * columns["bowl_maidens"],
+        bowling_milestones(wickets),
+        economy_bonus(columns["bowl_runs"], columns["bowl_balls"], columns["bowl_runs_null"]),
+        12 * columns["wk_stumping"],
+        8 * (columns["field_catch"] + columns["wk_catch"]),
+        8 * columns["run_out_solo"] + 4 * columns["run_out_collab"],
+        np.where(columns["player_of_match"] != 0, 50, 0),
+        np.full(len(runs), 4, dtype=np.int64),
+    )
+    return np.stack(components, axis=1) if len(runs) else np.zeros((0, len(BOOST_CATEGORIES)), dtype=np.int64)
+
+
+def boost_components(event) -> List[int]:
+    """Boost components for one PlayerMatchEvent, from the stored vector when present."""
+    if event.boost_components and len(event.boost_components) == len(BOOST_CATEGORIES):
+        return event.boost_components
+    row = {field: getattr(event, field) for field in STAT_FIELDS}
+    return [int(value) for value in score_boost_components(build_columns([row]))[0]]
+
+
+def boost_multipliers(boost) -> Tuple[float, ...]:
+    return tuple(getattr(boost, f"multiplier_{category}") for category in BOOST_CATEGORIES)
+
+
+def boost_points(components: Sequence[int], total_points_all: int, boost) -> float:
+    """
+    Extra points a FantasyBoostRole adds on top of an event's base points.
+
+    Roles with one multiplier for every category (Captain, Vice Captain) scale
+    the whole base total; others apply each multiplier to its category.
+    """
+    if boost is None:
+        return 0
+    multipliers = boost_multipliers(boost)
+    if len(set(multipliers)) == 1:
+        return (multipliers[0] - 1.0) * total_points_all
+    return float(sum(points * (multiplier - 1.0) for points, multiplier in zip(components, multipliers)))
+
+
+def apply_points(events: Sequence) -> List:
+    """
+    Score PlayerMatchEvent instances in one pass and set their point fields.
+
+    Returns the events whose stored totals changed.
+    """
+    if not events:
+        return []
+
+    columns = build_columns([event_row(event) for event in events])
+    points = score_columns(columns)
+    components = score_boost_components(columns).tolist()
+    changed = []
+    for index, event in enumerate(events):
+        event_changed = False
+        for field in POINT_FIELDS:
+            value = int(points[field][index])
+            if getattr(event, field) != value:
+                setattr(event, field, value)
+                event_changed = True
+        if event.boost_components != components[index]:
+            event.boost_components = components[index]
+            event_changed = True
+        if event_changed:
+            changed.append(event)
+    return changed
+
+
+def recalculate_event_points(queryset, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rescore every PlayerMatchEvent in ``queryset`` and write back changed rows.
+
+    Rows are read as plain values in primary key batches and written with one
+    bulk_update per batch, each in its own transaction so a long rescore does
+    not hold row locks on every event until it finishes.
+    """
+    from api.models import PlayerMatchEvent
+    from api.services.boost_memo import invalidate_boost_memo
+
+    fields = ("id",) + STAT_FIELDS + SCORED_FIELDS
+    queryset = queryset.order_by("id")
+    summary = {"processed": 0, "updated": 0}
+    last_id = 0
+
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).values(*fields, player_role=F("player__role"))[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        columns = build_columns(rows)
+        points = score_columns(columns)
+        components = score_boost_components(columns).tolist()
+        changed = []
+        for index, row in enumerate(rows):
+            values = {field: int(points[field][index]) for field in POINT_FIELDS}
+            values["boost_components"] = components[index]
+            if any(row[field] != values[field] for field in SCORED_FIELDS):
+                changed.append(PlayerMatchEvent(id=row["id"], **values))
+
+        if changed and not dry_run:
+            with transaction.atomic():
+                PlayerMatchEvent.objects.bulk_update(changed, SCORED_FIELDS, batch_size=batch_size)
+                invalidate_boost_memo(event_ids=[event.id for event in changed])
+
+        summary["processed"] += len(rows)
+        summary["updated"] += len(changed)
+
+    return summary
+
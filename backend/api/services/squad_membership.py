@@ -0,0 +1,162 @@
+"""
+SquadMembership upkeep and ownership lookups.
+
+FantasySquad.current_squad stays the live roster that the UI edits. Every write
+to it is mirrored here as membership spells: players that leave a squad have
+their open spell closed after the last match that has started, and players that
+join get a spell starting after that match (and at the next one, when it is
+scheduled already). "Which squads own
+player X for match M" is then an indexed query instead of a scan of every
+squad's JSON list.
+
+FantasySquad saves are synced by api.signals (set ``squad._membership_source``
+before saving to record why the roster changed). Writers that bypass save(),
+such as bulk_update, must call sync_squad_memberships themselves.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import FantasyLeague, Match, SquadMembership
+
+logger = logging.getLogger(__name__)
+
+
+def effective_matches(season_id: int, now=None) -> Tuple[Optional[Match], Optional[Match]]:
+    """
+    Matches bounding a roster change made now.
+
+    Returns:
+        (last match that has started, first match that has not); either may be None
+    """
+    now = now or timezone.now()
+    matches = Match.objects.filter(season_id=season_id).only('id', 'date', 'season_phase_id')
+    started = Q(date__lte=now) | ~Q(status=Match.Status.SCHEDULED)
+    last_started = matches.filter(started).order_by('-date', '-match_number').first()
+    next_match = matches.exclude(started).order_by('date', 'match_number').first()
+    return last_started, next_match
+
+
+def sync_squad_memberships(squads: Iterable, source: str = SquadMembership.Source.MANUAL, now=None) -> Tuple[int, int]:
+    """
+    Bring open memberships in line with each squad's current_squad.
+
+    Args:
+        squads: FantasySquad objects (id, league_id and current_squad are read)
+        source: SquadMembership.Source recorded on new spells
+        now: Time of the change, defaults to timezone.now()
+
+    Returns:
+        (memberships opened, memberships closed)
+    """
+    squads = list(squads)
+    if not squads:
+        return 0, 0
+    now = now or timezone.now()
+
+    open_by_squad: Dict[int, Dict[int, SquadMembership]] = {squad.id: {} for squad in squads}
+    for membership in SquadMembership.objects.filter(
+        fantasy_squad_id__in=open_by_squad, left_at__isnull=True
+    ).only('id', 'fantasy_squad_id', 'player_id'):
+        open_by_squad[membership.fantasy_squad_id][membership.player_id] = membership
+
+    changes = []
+    for squad in squads:
+        roster = set(squad.current_squad or [])
+        current = open_by_squad[squad.id]
+        joined = [player_id for player_id in dict.fromkeys(squad.current_squad or []) if player_id not in current]
+        left = [membership for player_id, membership in current.items() if player_id not in roster]
+        if joined or left:
+            changes.append((squad, joined, left))
+    if not changes:
+        return 0, 0
+
+    season_by_league = dict(
+        FantasyLeague.objects.filter(id__in={squad.league_id for squad, _, _ in changes}).values_list('id', 'season_id')
+    )
+    boundaries = {}
+    to_open, to_close = [], []
+    for squad, joined, left in changes:
+        season_id = season_by_league[squad.league_id]
+        if season_id not in boundaries:
+            boundaries[season_id] = effective_matches(season_id, now=now)
+        last_started, next_match = boundaries[season_id]
+
+        for membership in left:
+            membership.left_at = now
+            membership.to_match = last_started
+            membership.to_phase_id = last_started.season_phase_id if last_started else None
+            to_close.append(membership)
+        for player_id in joined:
+            to_open.append(SquadMembership(
+                fantasy_squad_id=squad.id,
+                league_id=squad.league_id,
+                player_id=player_id,
+                source=source,
+                from_match=next_match,
+                after_match=last_started,
+                from_phase_id=next_match.season_phase_id if next_match else None,
+                joined_at=now,
+            ))
+
+    if to_close:
+        SquadMembership.objects.bulk_update(to_close, ['left_at', 'to_match', 'to_phase'], batch_size=1000)
+    if to_open:
+        SquadMembership.objects.bulk_create(to_open, batch_size=1000)
+    logger.debug(f"Squad memberships: {len(to_open)} opened, {len(to_close)} closed ({source})")
+    return len(to_open), len(to_close)
+
+
+def memberships_for_match(match: Match, player_ids: Optional[Iterable[int]] = None):
+    """
+    Memberships of the match season's leagues that cover the match.
+
+    A spell covers a match when it started at or before it, after the match
+    that was last to start when the player joined, and is still open or ended
+    at or after it. Closed spells without a to_match ended before any match and
+    cover nothing.
+    """
+    memberships = SquadMembership.objects.filter(
+        league__season_id=match.season_id,
+    ).filter(
+        Q(from_match__isnull=True) | Q(from_match__date__lte=match.date),
+    ).filter(
+        Q(after_match__isnull=True)
+        | Q(after_match__date__lt=match.date)
+        | Q(after_match__date=match.date, after_match__match_number__lt=match.match_number),
+    ).filter(
+        Q(left_at__isnull=True) | Q(to_match__date__gte=match.date),
+    )
+    if player_ids is not None:
+        memberships = memberships.filter(player_id__in=list(player_ids))
+    return memberships
+
+
+def squad_ids_by_player_for_match(match: Match, player_ids: Optional[Iterable[int]] = None) -> Dict[int, List[int]]:
+    """
+    Build a player_id -> [squad_id] index of who owned each player for this match.
+
+    Returns:
+        Dict mapping each owned player ID to the IDs of squads that own it
+    """
+    squad_ids_by_player: Dict[int, List[int]] = {}
+    rows = memberships_for_match(match, player_ids).values_list('player_id', 'fantasy_squad_id').distinct()
+    for player_id, squad_id in rows:
+        squad_ids_by_player.setdefault(player_id, []).append(squad_id)
+    return squad_ids_by_player
+
+
+def owned_player_ids(league_id: int, include_past: bool = False) -> List[int]:
+    """
+    Players owned by any squad in the league.
+
+    Args:
+        league_id: FantasyLeague ID
+        include_past: Also include players traded or released earlier in the season
+    """
+    memberships = SquadMembership.objects.filter(league_id=league_id)
+    if not include_past:
+        memberships = memberships.filter(left_at__isnull=True)
+    return list(memberships.values_list('player_id', flat=True).distinct())
@@ -0,0 +1,301 @@
+"""
+Database-backed queue for FantasyStats recalculation.
+
+Match completion (and admin edits) enqueue StatsJob rows instead of running
+update_fantasy_stats inline. A worker started with ``manage.py run_stats_jobs``
+claims jobs and processes them on a thread pool. Jobs for the same league never
+run concurrently, so incremental folds are applied in the order they were queued.
+
+For local development without a worker, settings.STATS_JOBS_INLINE makes
+submit_stats_jobs drain the queue in the calling process.
+"""
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from ..models import FantasyLeague, StatsJob
+from .stats_service import update_fantasy_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_POLL_INTERVAL = 2.0
+# Seconds to wait before retry n is 30 * 2 ** (n - 1): 30s, 60s, 120s, ...
+RETRY_BASE_DELAY = 30
+# RUNNING jobs whose worker has not finished within this window are requeued.
+STALE_JOB_TIMEOUT = timedelta(minutes=15)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_stats_jobs(league_ids: Iterable[int], match_id: Optional[int] = None) -> int:
+    """
+    Queue a stats update for each league.
+
+    A league that already has a pending job for the same match (or a pending
+    full rebuild when match_id is None) is skipped.
+
+    Returns:
+        Number of jobs created
+    """
+    league_ids = list(league_ids)
+    if not league_ids:
+        return 0
+
+    pending = set(
+        StatsJob.objects.filter(
+            league_id__in=league_ids,
+            match_id=match_id,
+            status=StatsJob.Status.PENDING,
+        ).values_list('league_id', flat=True)
+    )
+    created = 0
+    for league_id in league_ids:
+        if league_id in pending:
+            continue
+        try:
+            with transaction.atomic():
+                StatsJob.objects.create(league_id=league_id, match_id=match_id)
+            created += 1
+        except IntegrityError:
+            # Another process queued the same job between the check and the insert.
+            continue
+    logger.info(f"Queued {created} stats jobs for match {match_id} ({len(league_ids)} leagues)")
+    return created
+
+
+def run_pending_jobs_inline(worker_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Claim and run runnable jobs in the calling thread until none is left.
+
+    Failed jobs back off as usual, so they are not picked up again here; the
+    next drain (or a worker) retries them once their delay has passed.
+    """
+    worker_id = worker_id or f"inline:{default_worker_id()}"
+    results = {"succeeded": 0, "failed": 0}
+    while True:
+        job = claim_next_job(worker_id)
+        if job is None:
+            break
+        results["succeeded" if run_job(job) else "failed"] += 1
+    return results
+
+
+def submit_stats_jobs(league_ids: Iterable[int], match_id: Optional[int] = None) -> int:
+    """
+    Queue stats updates for the ``run_stats_jobs`` worker.
+
+    Call this on commit from request and signal handlers. With
+    settings.STATS_JOBS_INLINE (development only) the queue is drained in the
+    calling thread instead.
+
+    Returns:
+        Number of jobs created
+    """
+    created = enqueue_stats_jobs(league_ids, match_id=match_id)
+    if settings.STATS_JOBS_INLINE:
+        results = run_pending_jobs_inline()
+        logger.info(f"Ran stats jobs inline: {results['succeeded']} succeeded, {results['failed']} failed")
+    return created
+
+
+def requeue_stale_jobs(timeout: timedelta = STALE_JOB_TIMEOUT) -> int:
+    """Return RUNNING jobs abandoned by a dead worker to the queue."""
+    cutoff = timezone.now() - timeout
+    return StatsJob.objects.filter(
+        status=StatsJob.Status.RUNNING,
+        locked_at__lt=cutoff,
+    ).update(status=StatsJob.Status.PENDING, locked_by='', locked_at=None, run_after=timezone.now())
+
+
+def claim_next_job(worker_id: str) -> Optional[StatsJob]:
+    """
+    Claim the oldest runnable job whose league has no job in progress.
+
+    The claim is a conditional UPDATE, so concurrent workers never process the
+    same job even on databases without SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    busy_leagues = StatsJob.objects.filter(status=StatsJob.Status.RUNNING).values('league_id')
+    candidates = StatsJob.objects.filter(
+        status=StatsJob.Status.PENDING,
+        run_after__lte=timezone.now(),
+    ).exclude(league_id__in=busy_leagues).order_by('created_at', 'id')
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidate_ids = list(candidates.values_list('id', flat=True)[:10])
+
+    for job_id in candidate_ids:
+        now = timezone.now()
+        claimed = StatsJob.objects.filter(id=job_id, status=StatsJob.Status.PENDING).exclude(
+            league_id__in=busy_leagues
+        ).update(
+            status=StatsJob.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            locked_by=worker_id,
+            locked_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return StatsJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job: StatsJob) -> bool:
+    """
+    Run one claimed job and record the outcome.
+
+    Failures are retried with exponential backoff until max_attempts is reached,
+    after which the job is left FAILED with its last error.
+
+    Returns:
+        True if the job succeeded
+    """
+    try:
+        with transaction.atomic():
+            # Row lock on the league serialises stats writes across workers.
+            FantasyLeague.objects.select_for_update().filter(id=job.league_id).exists()
+            update_fantasy_stats(job.league_id, match_id=job.match_id)
+    except Exception as e:
+        logger.exception(f"Stats job {job.id} failed (attempt {job.attempts}/{job.max_attempts})")
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            updates = {"status": StatsJob.Status.PENDING, "run_after": now + timedelta(seconds=delay)}
+        else:
+            updates = {"status": StatsJob.Status.FAILED, "finished_at": now}
+        try:
+            StatsJob.objects.filter(id=job.id).update(
+                last_error=f"{type(e).__name__}: {e}", locked_by='', locked_at=None, updated_at=now, **updates
+            )
+        except IntegrityError:
+            # A fresh pending job for the same (league, match) was queued meanwhile; it supersedes this one.
+            StatsJob.objects.filter(id=job.id).update(
+                status=StatsJob.Status.FAILED, last_error=f"{type(e).__name__}: {e}", finished_at=now
+            )
+        return False
+
+    now = timezone.now()
+    StatsJob.objects.filter(id=job.id).update(
+        status=StatsJob.Status.SUCCEEDED, last_error='', finished_at=now, updated_at=now
+    )
+    return True
+
+
+def retry_failed_jobs(queryset=None) -> int:
+    """Reset FAILED jobs so workers pick them up again."""
+    queryset = queryset if queryset is not None else StatsJob.objects.all()
+    retried = 0
+    for job in queryset.filter(status=StatsJob.Status.FAILED):
+        try:
+            with transaction.atomic():
+                StatsJob.objects.filter(id=job.id).update(
+                    status=StatsJob.Status.PENDING,
+                    attempts=0,
+                    run_after=timezone.now(),
+                    finished_at=None,
+                )
+            retried += 1
+        except IntegrityError:
+            continue
+    return retried
+
+
+def queue_status(recent_failures: int = 10) -> Dict:
+    """
+    Summary of the queue for the admin and the run_stats_jobs --status flag.
+
+    Returns:
+        Dict with counts per status, the number of pending jobs waiting on a
+        retry delay, and the most recent failures with their errors.
+    """
+    counts = {status: 0 for status in StatsJob.Status.values}
+    for row in StatsJob.objects.values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+
+    failures = StatsJob.objects.filter(status=StatsJob.Status.FAILED).order_by('-finished_at')[:recent_failures]
+    return {
+        "counts": counts,
+        "retrying": StatsJob.objects.filter(status=StatsJob.Status.PENDING, attempts__gt=0).count(),
+        "recent_failures": [
+            {
+                "id": job.id,
+                "league_id": job.league_id,
+                "match_id": job.match_id,
+                "attempts": job.attempts,
+                "last_error": job.last_error,
+                "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            }
+            for job in failures
+        ],
+    }
+
+
+def _worker_loop(worker_id: str, stop: threading.Event, poll_interval: float, drain: bool, results: List) -> None:
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim_next_job(worker_id)
+            if job is None:
+                if drain:
+                    return
+                stop.wait(poll_interval)
+                continue
+            results.append(run_job(job))
+    finally:
+        connection.close()
+
+
+def run_worker(
+    concurrency: int = DEFAULT_CONCURRENCY,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    drain: bool = False,
+    stop: Optional[threading.Event] = None,
+    worker_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Process queued jobs on ``concurrency`` threads.
+
+    Args:
+        concurrency: Number of jobs processed in parallel
+        poll_interval: Seconds an idle thread sleeps before polling again
+        drain: Return once no runnable job is left instead of polling forever
+        stop: Event that stops the worker when set
+        worker_id: Identifier recorded on claimed jobs
+
+    Returns:
+        Dict with the number of succeeded and failed job runs
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    requeued = requeue_stale_jobs()
+    if requeued:
+        logger.warning(f"Requeued {requeued} stale stats jobs")
+
+    results: List[bool] = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="stats-job") as executor:
+        futures = [
+            executor.submit(_worker_loop, f"{worker_id}/{index}", stop, poll_interval, drain, results)
+            for index in range(concurrency)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            logger.info("Stopping stats worker after in-flight jobs finish")
+            stop.set()
+
+    succeeded = sum(1 for result in results if result)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded}
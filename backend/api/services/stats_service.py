@@ -1,6 +1,7 @@
 import statistics
 import logging
-from django.db.models import Sum, Count, Q, F
+from collections import namedtuple
+from django.db.models.functions import Coalesce
 from ..models import (
     FantasyLeague, FantasySquad, 
     FantasyMatchEvent, FantasyPlayerEvent, Match, FantasyStats
@@ -8,20 +9,125 @@ from ..models import (
 
 logger = logging.getLogger("api.stats_service")
 
-def calculate_running_total_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
-    squad_ids = list(squads.values_list('id', flat=True))
-    running_totals = {squad_id: 0.0 for squad_id in squad_ids}
-    chart_data = []
+STATS_MATCH_STATUSES = ['COMPLETED', 'NO_RESULT']
+
+# Bump when the shape of FantasyStats.fold_state changes; stored state with a
+# different version forces a full rebuild on the next update.
+FOLD_STATE_VERSION = 1
+
+TOP_N = 25
+MATCH_MVPS_PER_MATCH = 5
+
+MatchRow = namedtuple('MatchRow', 'id date match_number season_phase_id phase team_1_short_name team_2_short_name')
+MatchEventRow = namedtuple(
+    'MatchEventRow',
+    'match_id fantasy_squad_id total_base_points total_boost_points total_points '
+    'match_rank running_rank players_count'
+)
+PlayerEventRow = namedtuple('PlayerEventRow', 'match_id fantasy_squad_id player_id player_name base boost_points')
+
+
+class LeagueStatsData:
+    """
+    Every row the stats calculators need for one league, loaded in a single pass.
+
+    Matches are kept in season order (date, match number, id); match and player
+    events follow that order, so per-squad lists are already chronological.
+    """
+
+    def __init__(self, squads, matches, match_events, player_events):
+        self.squads = squads
+        self.matches = matches
+        self.match_events = match_events
+        self.player_events = player_events
+
+        self.match_events_by_match = {}
+        self.match_events_by_squad = {}
+        for event in match_events:
+            self.match_events_by_match.setdefault(event.match_id, {})[event.fantasy_squad_id] = event
+            self.match_events_by_squad.setdefault(event.fantasy_squad_id, []).append(event)
+        self.player_events_by_match = {}
+        for event in player_events:
+            self.player_events_by_match.setdefault(event.match_id, []).append(event)
+
+    def for_matches(self, match_ids):
+        """Restrict the data to a subset of matches (e.g. one phase) without querying again."""
+        match_ids = set(match_ids)
+        return LeagueStatsData(
+            self.squads,
+            [match for match in self.matches if match.id in match_ids],
+            [event for event in self.match_events if event.match_id in match_ids],
+            [event for event in self.player_events if event.match_id in match_ids],
+        )
+
+
+def load_league_stats_data(league_id, matches):
+    """
+    Load squads, matches, FantasyMatchEvents and FantasyPlayerEvents for a
+    league in four queries.
+
+    Args:
+        league_id: FantasyLeague id
+        matches: Match queryset limiting which matches are included
 
-    for match in matches.order_by('date', 'match_number', 'id'):
-        events = FantasyMatchEvent.objects.filter(
-            match=match,
-            fantasy_squad__league_id=league_id
+    Returns:
+        LeagueStatsData
+    """
+    squads = list(
+        FantasySquad.objects.filter(league_id=league_id).order_by('id').values('id', 'name', 'color')
+    )
+    match_order = ('date', 'match_number', 'id')
+    match_rows = [
+        MatchRow(*row)
+        for row in matches.order_by(*match_order).values_list(
+            'id', 'date', 'match_number', 'season_phase_id',
+            Coalesce('season_phase__phase', 'phase'),
+            'team_1__short_name', 'team_2__short_name',
+        )
+    ]
+    event_order = ('match__date', 'match__match_number', 'match_id')
+    match_events = [
+        MatchEventRow(*row)
+        for row in FantasyMatchEvent.objects.filter(
+            fantasy_squad__league_id=league_id,
+            match__in=matches
+        ).order_by(*event_order, 'fantasy_squad_id').values_list(*MatchEventRow._fields)
+    ]
+    player_events = [
+        PlayerEventRow(*row)
+        for row in FantasyPlayerEvent.objects.filter(
+            fantasy_squad__league_id=league_id,
+            match_event__match__in=matches
+        ).order_by(
+            'match_event__match__date', 'match_event__match__match_number', 'match_event__match_id', 'id'
+        ).values_list(
+            'match_event__match_id',
+            'fantasy_squad_id',
+            'match_event__player_id',
+            'match_event__player__name',
+            'match_event__total_points_all',
+            'boost_points',
         )
+    ]
+    return LeagueStatsData(squads, match_rows, match_events, player_events)
+
+def _stats_data(league_id, matches, data):
+    return data if data is not None else load_league_stats_data(league_id, matches)
+
+def _match_name(match):
+    return f"{match.team_1_short_name or 'T1'} vs {match.team_2_short_name or 'T2'}"
+
+def calculate_running_total_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
+    running_totals = {squad["id"]: 0.0 for squad in data.squads}
+    chart_data = []
+
+    for match in data.matches:
+        events = data.match_events_by_match.get(match.id, {})
         matchData = {}
-        for squad_id in squad_ids:
-            event = next((e for e in events if e.fantasy_squad_id == squad_id), None)
+        for squad in data.squads:
+            squad_id = squad["id"]
+            event = events.get(squad_id)
             current_match_points = float(event.total_points or 0) if event else 0.0
             running_totals[squad_id] += current_match_points
             matchData[squad_id] = {
@@ -29,355 +135,318 @@ def calculate_running_total_for_matches(league_id, matches):
                 "runningTotal": running_totals[squad_id],
                 "squad": {
                     "id": squad_id,
-                    "name": str(squads.get(id=squad_id).name),
-                    "color": str(squads.get(id=squad_id).color)
+                    "name": str(squad["name"]),
+                    "color": str(squad["color"])
                 }
             }
         data_point = {
             "name": str(match.match_number),
             "match_id": match.id,
             "date": match.date.strftime('%a, %b %d') if match.date else "Unknown Date",
-            "match_name": f"{match.team_1.short_name if match.team_1 else 'T1'} vs {match.team_2.short_name if match.team_2 else 'T2'}",
+            "match_name": _match_name(match),
             "matchData": matchData
         }
-        for squad_id in squad_ids:
-            data_point[f"squad_{squad_id}"] = matchData[squad_id]["runningTotal"]
+        for squad in data.squads:
+            data_point[f"squad_{squad['id']}"] = matchData[squad["id"]]["runningTotal"]
         chart_data.append(data_point)
     return chart_data
 
-def calculate_domination_for_matches(league_id, matches):
+def _domination_entries(match, events):
+    total_match_points = sum(me.total_points for me in events)
+    if total_match_points == 0:
+        return []
+    entries = []
+    for me in events:
+        domination_pct = (me.total_points / total_match_points) * 100
+        if domination_pct > 20:
+            entries.append({
+                "match_id": match.id,
+                "squad_id": me.fantasy_squad_id,
+                "percentage": float(domination_pct)
+            })
+    return entries
+
+def calculate_domination_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
     domination_stats = []
-    for match in matches:
-        match_events = FantasyMatchEvent.objects.filter(
-            match=match,
-            fantasy_squad__league_id=league_id
-        )
-        total_match_points = sum(me.total_points for me in match_events)
-        if total_match_points == 0:
-            continue
-        for me in match_events:
-            domination_pct = (me.total_points / total_match_points) * 100
-            if domination_pct > 20:
-                domination_stats.append({
-                    "match_id": match.id,
-                    "squad_id": me.fantasy_squad_id,
-                    "percentage": float(domination_pct)
-                })
+    for match in data.matches:
+        events = data.match_events_by_match.get(match.id, {}).values()
+        domination_stats.extend(_domination_entries(match, events))
     domination_stats.sort(key=lambda x: x["percentage"], reverse=True)
-    return domination_stats[:25]
+    return domination_stats[:TOP_N]
+
+def _rank_summary(counts):
+    ranks = [int(rank) for rank, count in counts.items() for _ in range(count)]
+    if not ranks:
+        return None
+    highest = min(ranks)
+    try:
+        mode_rank = statistics.mode(ranks)
+    except statistics.StatisticsError:
+        mode_rank = None
+    return {
+        "highest": highest,
+        "lowest": max(ranks),
+        "median": statistics.median(ranks),
+        "mode": mode_rank,
+        "games_at_highest": ranks.count(highest)
+    }
 
-def calculate_squad_stats_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
+def _rank_counts(events):
+    counts = {}
+    for event in events:
+        if event.running_rank is not None:
+            counts[str(event.running_rank)] = counts.get(str(event.running_rank), 0) + 1
+    return counts
+
+def calculate_rank_counts_for_matches(league_id, matches, data=None):
+    """
+    Histogram of running ranks per squad, keyed by str(squad_id) then str(rank).
+    Ranks are counted in match order so the mode tie-break follows the season.
+    """
+    data = _stats_data(league_id, matches, data)
+    return {
+        str(squad_id): _rank_counts(events)
+        for squad_id, events in data.match_events_by_squad.items()
+    }
+
+def _empty_rank_stats():
+    return {"highest": None, "lowest": None, "median": None, "mode": None, "games_at_highest": 0}
+
+def calculate_squad_stats_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
     squad_stats = []
-    for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        )
-        if not match_events.exists():
+    for squad in data.squads:
+        match_events = data.match_events_by_squad.get(squad["id"], [])
+        if not match_events:
             continue
-        most_points_match = match_events.order_by('-total_points').first()
-        most_actives_match = match_events.order_by('-players_count').first()
-        caps_count = match_events.filter(match_rank=1).count()
-        ranks = list(match_events.values_list('running_rank', flat=True))
-        highest_rank = min(ranks) if ranks else None
-        lowest_rank = max(ranks) if ranks else None
-        games_at_highest = ranks.count(highest_rank) if ranks else 0
-        median_rank = statistics.median(ranks) if ranks else None
-        try:
-            mode_rank = statistics.mode(ranks) if ranks else None
-        except:
-            mode_rank = None
-        recent_matches = match_events.order_by('-match__date')[:5]
-        recent_form = [me.match_rank for me in recent_matches]
+        most_points_match = max(match_events, key=lambda me: me.total_points)
+        most_actives_match = max(match_events, key=lambda me: me.players_count)
         squad_stats.append({
-            "squad_id": squad.id,
-            "squad_name": squad.name,
-            "color": squad.color,
+            "squad_id": squad["id"],
+            "squad_name": squad["name"],
+            "color": squad["color"],
             "most_points_in_match": {
-                "value": float(most_points_match.total_points) if most_points_match else 0,
-                "match_id": most_points_match.match_id if most_points_match else None
+                "value": float(most_points_match.total_points),
+                "match_id": most_points_match.match_id
             },
             "total_actives": sum(me.players_count for me in match_events),
             "most_actives_in_match": {
-                "value": most_actives_match.players_count if most_actives_match else 0,
-                "match_id": most_actives_match.match_id if most_actives_match else None
+                "value": most_actives_match.players_count,
+                "match_id": most_actives_match.match_id
             },
-            "caps": caps_count,
-            "rank_stats": {
-                "highest": highest_rank,
-                "lowest": lowest_rank,
-                "median": median_rank,
-                "mode": mode_rank,
-                "games_at_highest": games_at_highest
-            },
-            "recent_form": recent_form
+            "caps": sum(1 for me in match_events if me.match_rank == 1),
+            "rank_stats": _rank_summary(_rank_counts(match_events)) or _empty_rank_stats(),
+            "recent_form": [me.match_rank for me in reversed(match_events)][:5]
         })
     return squad_stats
 
-def calculate_season_mvp_for_matches(league_id, matches):
-    player_events = FantasyPlayerEvent.objects.filter(
-        fantasy_squad__league_id=league_id,
-        match_event__match__in=matches
-    ).select_related('match_event__player', 'fantasy_squad')
-    player_totals = {}
+def calculate_season_player_totals_for_matches(league_id, matches, data=None):
+    """
+    Season totals for every (squad, player) pair, keyed by "<squad_id>:<player_id>".
+    """
+    data = _stats_data(league_id, matches, data)
+    return _fold_player_totals({}, data.player_events)
+
+def _top_season_mvps(player_totals):
+    season_mvp = sorted(player_totals.values(), key=lambda x: x["total"], reverse=True)
+    return [dict(entry) for entry in season_mvp[:TOP_N]]
+
+def calculate_season_mvp_for_matches(league_id, matches, data=None):
+    return _top_season_mvps(calculate_season_player_totals_for_matches(league_id, matches, data))
+
+def _match_top_performers(match_id, player_events):
+    match_player_data = {}
     for pe in player_events:
-        player_id = pe.match_event.player_id
-        squad_id = pe.fantasy_squad_id
-        key = (squad_id, player_id)
-        if key not in player_totals:
-            player_totals[key] = {
-                "squad_id": squad_id,
-                "player_id": player_id,
-                "player_name": pe.match_event.player.name,
-                "matches": set(),
+        key = (pe.player_id, pe.fantasy_squad_id)
+        if key not in match_player_data:
+            match_player_data[key] = {
+                "player_id": pe.player_id,
+                "player_name": pe.player_name,
+                "squad_id": pe.fantasy_squad_id,
+                "match_id": match_id,
                 "base": 0,
                 "boost": 0,
                 "total": 0
             }
-        player_totals[key]["matches"].add(pe.match_event.match_id)
-        player_totals[key]["base"] += pe.match_event.total_points_all
-        player_totals[key]["boost"] += pe.boost_points
-        player_totals[key]["total"] += (pe.match_event.total_points_all + pe.boost_points)
-    season_mvp = []
-    for key, data in player_totals.items():
-        season_mvp.append({
-            "player_id": data["player_id"],
-            "player_name": data["player_name"],
-            "squad_id": data["squad_id"],
-            "matches": len(data["matches"]),
-            "base": float(data["base"]),
-            "boost": float(data["boost"]),
-            "total": float(data["total"])
-        })
-    season_mvp.sort(key=lambda x: x["total"], reverse=True)
-    return season_mvp[:25]
-
-def calculate_match_mvp_for_matches(league_id, matches):
-    player_events = FantasyPlayerEvent.objects.filter(
-        fantasy_squad__league_id=league_id,
-        match_event__match__in=matches
-    ).select_related('match_event__player', 'fantasy_squad')
+        match_player_data[key]["base"] += pe.base
+        match_player_data[key]["boost"] += pe.boost_points
+        match_player_data[key]["total"] += (pe.base + pe.boost_points)
+    return sorted(
+        match_player_data.values(),
+        key=lambda x: x["total"],
+        reverse=True
+    )[:MATCH_MVPS_PER_MATCH]
+
+def calculate_match_mvp_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
     match_mvps = []
-    for match in matches:
-        match_player_events = player_events.filter(match_event__match=match)
-        match_player_data = {}
-        for pe in match_player_events:
-            key = (pe.match_event.player_id, pe.fantasy_squad_id)
-            if key not in match_player_data:
-                match_player_data[key] = {
-                    "player_id": pe.match_event.player_id,
-                    "player_name": pe.match_event.player.name,
-                    "squad_id": pe.fantasy_squad_id,
-                    "match_id": match.id,
-                    "base": 0,
-                    "boost": 0,
-                    "total": 0
-                }
-            match_player_data[key]["base"] += pe.match_event.total_points_all
-            match_player_data[key]["boost"] += pe.boost_points
-            match_player_data[key]["total"] += (pe.match_event.total_points_all + pe.boost_points)
-        top_performers = sorted(
-            match_player_data.values(),
-            key=lambda x: x["total"],
-            reverse=True
-        )[:5]
-        match_mvps.extend(top_performers)
+    for match in data.matches:
+        match_mvps.extend(_match_top_performers(match.id, data.player_events_by_match.get(match.id, [])))
     match_mvps.sort(key=lambda x: x["total"], reverse=True)
-    return match_mvps[:25]
-
-def calculate_squad_mvps_for_matches(league_id, matches):
-    player_events = FantasyPlayerEvent.objects.filter(
-        fantasy_squad__league_id=league_id,
-        match_event__match__in=matches
-    ).select_related('match_event__player', 'fantasy_squad')
-    squad_mvps = {}
+    return match_mvps[:TOP_N]
+
+def _fold_squad_mvps(squad_mvps, player_events):
+    squad_mvps = dict(squad_mvps)
     for pe in player_events:
         squad_id = str(pe.fantasy_squad_id)
-        points = pe.match_event.total_points_all + pe.boost_points
+        points = pe.base + pe.boost_points
         if squad_id not in squad_mvps or points > squad_mvps[squad_id]["points"]:
             squad_mvps[squad_id] = {
-                "player_id": pe.match_event.player_id,
-                "player_name": pe.match_event.player.name,
+                "player_id": pe.player_id,
+                "player_name": pe.player_name,
                 "points": float(points)
             }
     return squad_mvps
 
-def calculate_season_total_actives_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
-    squad_ids = list(squads.values_list('id', flat=True))
+def calculate_squad_mvps_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
+    return _fold_squad_mvps({}, data.player_events)
+
+def calculate_season_total_actives_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
     actives = []
-    for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        )
-        total_actives = sum(me.players_count for me in match_events)
+    for squad in data.squads:
+        match_events = data.match_events_by_squad.get(squad["id"], [])
         actives.append({
             "squad": {
-                "id": squad.id,
-                "name": squad.name,
-                "color": squad.color
+                "id": squad["id"],
+                "name": squad["name"],
+                "color": squad["color"]
             },
-            "count": total_actives
+            "count": sum(me.players_count for me in match_events)
         })
     actives.sort(key=lambda x: x["count"], reverse=True)
     return actives
 
-def calculate_most_points_in_match_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
-    most_points = []
-    for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        ).order_by('-total_points')
-        if match_events.exists():
-            top_event = match_events.first()
-            # Defensive: ensure squad fields are always present and not None
-            most_points.append({
-                "squad_id": squad.id,
-                "squad_name": squad.name or "",
-                "color": squad.color or "#808080",
-                "match_id": top_event.match_id,
-                "match_number": getattr(top_event.match, "match_number", None),
-                "match_name": (
-                    f"{getattr(getattr(top_event.match, 'team_1', None), 'short_name', 'T1')} vs "
-                    f"{getattr(getattr(top_event.match, 'team_2', None), 'short_name', 'T2')}"
-                ),
-                "base": float(getattr(top_event, "total_base_points", 0) or 0),
-                "boost": float(getattr(top_event, "total_boost_points", 0) or 0),
-                "total": float(getattr(top_event, "total_points", 0) or 0)
-            })
-    most_points.sort(key=lambda x: x["total"], reverse=True)
-    return most_points[:25]
+def _most_points_entry(squad, event, match):
+    # Defensive: ensure squad fields are always present and not None
+    return {
+        "squad_id": squad["id"],
+        "squad_name": squad["name"] or "",
+        "color": squad["color"] or "#808080",
+        "match_id": event.match_id,
+        "match_number": match.match_number,
+        "match_name": _match_name(match),
+        "base": float(event.total_base_points or 0),
+        "boost": float(event.total_boost_points or 0),
+        "total": float(event.total_points or 0)
+    }
 
-def calculate_most_players_in_match_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
-    most_actives = []
-    for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        ).order_by('-players_count')
-        if match_events.exists():
-            top_event = match_events.first()
-            most_actives.append({
-                "squad_id": squad.id,
-                "squad_name": squad.name or "",
-                "color": squad.color or "#808080",
-                "match_id": top_event.match_id,
-                "match_number": getattr(top_event.match, "match_number", None),
-                "match_name": (
-                    f"{getattr(getattr(top_event.match, 'team_1', None), 'short_name', 'T1')} vs "
-                    f"{getattr(getattr(top_event.match, 'team_2', None), 'short_name', 'T2')}"
-                ),
-                "count": getattr(top_event, "players_count", 0) or 0
-            })
-    most_actives.sort(key=lambda x: x["count"], reverse=True)
-    return most_actives[:25]
+def _most_players_entry(squad, event, match):
+    return {
+        "squad_id": squad["id"],
+        "squad_name": squad["name"] or "",
+        "color": squad["color"] or "#808080",
+        "match_id": event.match_id,
+        "match_number": match.match_number,
+        "match_name": _match_name(match),
+        "count": event.players_count or 0
+    }
 
-def calculate_rank_breakdown_for_matches(league_id, matches):
-    squads = FantasySquad.objects.filter(league_id=league_id)
+def _best_match_per_squad(data, value_key, build_entry):
+    matches_by_id = {match.id: match for match in data.matches}
+    best = []
+    for squad in data.squads:
+        match_events = data.match_events_by_squad.get(squad["id"], [])
+        if not match_events:
+            continue
+        entries = [build_entry(squad, event, matches_by_id[event.match_id]) for event in match_events]
+        best.append(max(entries, key=lambda x: x[value_key]))
+    best.sort(key=lambda x: x[value_key], reverse=True)
+    return best[:TOP_N]
+
+def calculate_most_points_in_match_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
+    return _best_match_per_squad(data, "total", _most_points_entry)
+
+def calculate_most_players_in_match_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
+    return _best_match_per_squad(data, "count", _most_players_entry)
+
+def _rank_breakdown(squads, rank_counts):
     breakdown = []
     for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        )
-        ranks = list(match_events.values_list('running_rank', flat=True))
-        if not ranks:
+        summary = _rank_summary(rank_counts.get(str(squad["id"]), {}))
+        if summary is None:
             continue
-        highest_rank = min(ranks)
-        lowest_rank = max(ranks)
-        median_rank = statistics.median(ranks)
-        try:
-            mode_rank = statistics.mode(ranks)
-        except:
-            mode_rank = None
         breakdown.append({
-            "squad_id": squad.id,
-            "squad_name": squad.name,
-            "color": squad.color,
-            "highest": highest_rank,
-            "lowest": lowest_rank,
-            "median": median_rank,
-            "mode": mode_rank
+            "squad_id": squad["id"],
+            "squad_name": squad["name"],
+            "color": squad["color"],
+            "highest": summary["highest"],
+            "lowest": summary["lowest"],
+            "median": summary["median"],
+            "mode": summary["mode"]
         })
     return breakdown
 
-def calculate_league_table_for_matches(league_id, matches):
+def calculate_rank_breakdown_for_matches(league_id, matches, data=None):
+    data = _stats_data(league_id, matches, data)
+    return _rank_breakdown(data.squads, calculate_rank_counts_for_matches(league_id, matches, data))
+
+def _league_table_mvp(squad_mvps, squad_id):
+    mvp_data = squad_mvps.get(str(squad_id), {})
+    if not mvp_data:
+        return None
+    return {
+        "player_id": mvp_data.get("player_id"),
+        "player_name": mvp_data.get("player_name"),
+        "points": mvp_data.get("points", 0)
+    }
+
+def _recent_form_entry(match, event):
+    return {
+        "match_number": match.match_number,
+        "match_rank": event.match_rank,
+        "date": match.date.isoformat() if match.date else None
+    }
+
+def calculate_league_table_for_matches(league_id, matches, data=None):
     """
     Calculate comprehensive league table data including all fields needed by the frontend
     """
-    squads = FantasySquad.objects.filter(league_id=league_id)
+    data = _stats_data(league_id, matches, data)
+    matches_by_id = {match.id: match for match in data.matches}
     table = []
-    
+
     # Get MVP data for each squad (reusing existing logic)
-    squad_mvps = calculate_squad_mvps_for_matches(league_id, matches)
-    
-    for squad in squads:
-        match_events = FantasyMatchEvent.objects.filter(
-            fantasy_squad_id=squad.id,
-            match__in=matches
-        ).order_by('match__date')
-        
-        # Basic points calculation
-        total_points = sum(me.total_points for me in match_events)
-        base_points = sum(me.total_base_points for me in match_events)
-        boost_points = sum(me.total_boost_points for me in match_events)
-        
-        # Calculate caps (number of times ranked #1 in a match)
-        caps = match_events.filter(match_rank=1).count()
-        
-        # Calculate total actives (sum of players_count across all matches)
-        total_actives = sum(me.players_count for me in match_events)
-        
-        # Calculate recent form (last 5 match ranks)
-        recent_matches = match_events.order_by('-match__date')[:5]
-        recent_form = []
-        for match_event in recent_matches:
-            recent_form.append({
-                "match_number": match_event.match.match_number,
-                "match_rank": match_event.match_rank,
-                "date": match_event.match.date.isoformat() if match_event.match.date else None
-            })
-        # Reverse to get chronological order (oldest to newest)
-        recent_form.reverse()
-        
-        # Get MVP for this squad
-        squad_id_str = str(squad.id)
-        mvp_data = squad_mvps.get(squad_id_str, {})
-        mvp = None
-        if mvp_data:
-            mvp = {
-                "player_id": mvp_data.get("player_id"),
-                "player_name": mvp_data.get("player_name"),
-                "points": mvp_data.get("points", 0)
-            }
-        
-        # Calculate rank change (this would need historical data or previous calculations)
-        # For now, setting to 0 as we'd need to compare with previous week's standings
-        rank_change = 0
-        
+    squad_mvps = calculate_squad_mvps_for_matches(league_id, matches, data)
+
+    for squad in data.squads:
+        match_events = data.match_events_by_squad.get(squad["id"], [])
+
+        # Recent form: last 5 match ranks in chronological order (oldest to newest)
+        recent_form = [_recent_form_entry(matches_by_id[me.match_id], me) for me in match_events[-5:]]
+
+        # Rank change would need the previous week's standings; not tracked yet
         table.append({
-            "id": squad.id,
-            "name": squad.name,
-            "color": squad.color,
-            "total_points": float(total_points),
-            "base_points": float(base_points),
-            "boost_points": float(boost_points),
-            "caps": caps,
-            "total_actives": total_actives,
-            "mvp": mvp,
+            "id": squad["id"],
+            "name": squad["name"],
+            "color": squad["color"],
+            "total_points": float(sum(me.total_points for me in match_events)),
+            "base_points": float(sum(me.total_base_points for me in match_events)),
+            "boost_points": float(sum(me.total_boost_points for me in match_events)),
+            "caps": sum(1 for me in match_events if me.match_rank == 1),
+            "total_actives": sum(me.players_count for me in match_events),
+            "mvp": _league_table_mvp(squad_mvps, squad["id"]),
             "recent_form": recent_form,
-            "rank_change": rank_change
+            "rank_change": 0
         })
-    
+
     # Sort by total points (descending)
     table.sort(key=lambda x: x["total_points"], reverse=True)
     return table
 
+def _match_position(match):
+    """Sort position of a match in the season, matching the running total ordering."""
+    return [match.date.timestamp() if match.date else 0.0, match.match_number, match.id]
+
+def _match_phase_key(match):
+    if match.season_phase_id:
+        return str(match.season_phase.phase)
+    return str(match.phase) if match.phase is not None else None
+
 def recalculate_all_stats(stats, league_id):
     logger.info(f"Starting full recalculation of fantasy stats for league {league_id}")
     stats.match_details = {
@@ -398,45 +467,309 @@ def recalculate_all_stats(stats, league_id):
 
     matches = Match.objects.filter(
         fantasymatchevent__fantasy_squad__league_id=league_id,
-        status__in=['COMPLETED', 'NO_RESULT']
-    ).distinct().order_by('date')
+        status__in=STATS_MATCH_STATUSES
+    ).distinct()
+    league_data = load_league_stats_data(league_id, matches)
 
-    all_phases = matches.values_list('season_phase__phase', flat=True).distinct()
-    all_phases = [p for p in all_phases if p is not None]
-    all_phases = sorted(set(all_phases))
+    # MatchRow.phase is the SeasonPhase number, falling back to Match.phase;
+    # Match.phase only defines the phase list when no match has a SeasonPhase.
+    all_phases = sorted({match.phase for match in league_data.matches if match.season_phase_id})
     if not all_phases:
-        all_phases = matches.values_list('phase', flat=True).distinct()
-        all_phases = [p for p in all_phases if p is not None]
-        all_phases = sorted(set(all_phases))
-
-    def get_matches_for_phase(phase=None):
-        if phase is None:
-            return matches
-        return matches.filter(Q(season_phase__phase=phase) | Q(season_phase__isnull=True, phase=phase))
+        all_phases = sorted({match.phase for match in league_data.matches if match.phase is not None})
 
+    fold_phases = {}
     for phase in [None] + all_phases:
         key = str(phase) if phase is not None else "overall"
-        phase_matches = get_matches_for_phase(phase)
-        logger.info(f"Calculating stats for phase '{key}' with {phase_matches.count()} matches")
-        stats.match_details["running_total"][key] = calculate_running_total_for_matches(league_id, phase_matches)
-        stats.match_details["domination"][key] = calculate_domination_for_matches(league_id, phase_matches)
-        stats.match_details["squad_stats"][key] = calculate_squad_stats_for_matches(league_id, phase_matches)
-        stats.match_details["season_total_actives"][key] = calculate_season_total_actives_for_matches(league_id, phase_matches)
-        stats.match_details["most_points_in_match"][key] = calculate_most_points_in_match_for_matches(league_id, phase_matches)
-        stats.match_details["most_players_in_match"][key] = calculate_most_players_in_match_for_matches(league_id, phase_matches)
-        stats.match_details["rank_breakdown"][key] = calculate_rank_breakdown_for_matches(league_id, phase_matches)
-        stats.match_details["league_table"][key] = calculate_league_table_for_matches(league_id, phase_matches)
-        stats.player_details["season_mvp"][key] = calculate_season_mvp_for_matches(league_id, phase_matches)
-        stats.player_details["match_mvp"][key] = calculate_match_mvp_for_matches(league_id, phase_matches)
-        stats.player_details["squad_mvps"][key] = calculate_squad_mvps_for_matches(league_id, phase_matches)
+        if phase is None:
+            data = league_data
+        else:
+            data = league_data.for_matches(match.id for match in league_data.matches if match.phase == phase)
+        logger.info(f"Calculating stats for phase '{key}' with {len(data.matches)} matches")
+        player_totals = calculate_season_player_totals_for_matches(league_id, None, data)
+        rank_counts = calculate_rank_counts_for_matches(league_id, None, data)
+        squad_mvps = calculate_squad_mvps_for_matches(league_id, None, data)
+        stats.match_details["running_total"][key] = calculate_running_total_for_matches(league_id, None, data)
+        stats.match_details["domination"][key] = calculate_domination_for_matches(league_id, None, data)
+        stats.match_details["squad_stats"][key] = calculate_squad_stats_for_matches(league_id, None, data)
+        stats.match_details["season_total_actives"][key] = calculate_season_total_actives_for_matches(league_id, None, data)
+        stats.match_details["most_points_in_match"][key] = calculate_most_points_in_match_for_matches(league_id, None, data)
+        stats.match_details["most_players_in_match"][key] = calculate_most_players_in_match_for_matches(league_id, None, data)
+        stats.match_details["rank_breakdown"][key] = _rank_breakdown(data.squads, rank_counts)
+        stats.match_details["league_table"][key] = calculate_league_table_for_matches(league_id, None, data)
+        stats.player_details["season_mvp"][key] = _top_season_mvps(player_totals)
+        stats.player_details["match_mvp"][key] = calculate_match_mvp_for_matches(league_id, None, data)
+        stats.player_details["squad_mvps"][key] = squad_mvps
+        fold_phases[key] = {
+            "rank_counts": rank_counts,
+            "player_totals": player_totals,
+        }
+
+    positions = [_match_position(match) for match in league_data.matches]
+    stats.fold_state = {
+        "version": FOLD_STATE_VERSION,
+        "match_ids": sorted(match.id for match in league_data.matches),
+        "last_match": max(positions) if positions else None,
+        "phases": fold_phases,
+    }
 
     stats.save()
     logger.info(f"Finished recalculation and saved stats for league {league_id}")
 
+def _fold_running_total(points, data, match):
+    previous = points[-1] if points else {}
+    events = data.match_events_by_match.get(match.id, {})
+    match_data = {}
+    data_point = {
+        "name": str(match.match_number),
+        "match_id": match.id,
+        "date": match.date.strftime('%a, %b %d') if match.date else "Unknown Date",
+        "match_name": _match_name(match),
+        "matchData": match_data
+    }
+    for squad in data.squads:
+        event = events.get(squad["id"])
+        match_points = float(event.total_points or 0) if event else 0.0
+        running_total = float(previous.get(f"squad_{squad['id']}", 0.0)) + match_points
+        match_data[str(squad["id"])] = {
+            "matchPoints": match_points,
+            "runningTotal": running_total,
+            "squad": {"id": squad["id"], "name": str(squad["name"]), "color": str(squad["color"])}
+        }
+    for squad in data.squads:
+        data_point[f"squad_{squad['id']}"] = match_data[str(squad["id"])]["runningTotal"]
+    return points + [data_point]
+
+def _fold_domination(entries, data, match):
+    merged = entries + _domination_entries(match, data.match_events_by_match.get(match.id, {}).values())
+    merged.sort(key=lambda x: x["percentage"], reverse=True)
+    return merged[:TOP_N]
+
+def _fold_squad_stats(entries, data, match, rank_counts):
+    events = data.match_events_by_match.get(match.id, {})
+    by_squad = {entry["squad_id"]: entry for entry in entries}
+    for squad in data.squads:
+        event = events.get(squad["id"])
+        if event is None:
+            if squad["id"] in by_squad:
+                by_squad[squad["id"]].update(squad_name=squad["name"], color=squad["color"])
+            continue
+        entry = by_squad.setdefault(squad["id"], {
+            "most_points_in_match": {"value": 0, "match_id": None},
+            "total_actives": 0,
+            "most_actives_in_match": {"value": 0, "match_id": None},
+            "caps": 0,
+            "recent_form": []
+        })
+        entry["squad_id"] = squad["id"]
+        entry["squad_name"] = squad["name"]
+        entry["color"] = squad["color"]
+        most_points = entry["most_points_in_match"]
+        if most_points["match_id"] is None or float(event.total_points) > most_points["value"]:
+            entry["most_points_in_match"] = {"value": float(event.total_points), "match_id": match.id}
+        entry["total_actives"] += event.players_count
+        most_actives = entry["most_actives_in_match"]
+        if most_actives["match_id"] is None or event.players_count > most_actives["value"]:
+            entry["most_actives_in_match"] = {"value": event.players_count, "match_id": match.id}
+        if event.match_rank == 1:
+            entry["caps"] += 1
+        entry["rank_stats"] = _rank_summary(rank_counts.get(str(squad["id"]), {})) or _empty_rank_stats()
+        entry["recent_form"] = ([event.match_rank] + entry["recent_form"])[:5]
+    return [
+        {key: by_squad[squad["id"]][key] for key in (
+            "squad_id", "squad_name", "color", "most_points_in_match", "total_actives",
+            "most_actives_in_match", "caps", "rank_stats", "recent_form"
+        )}
+        for squad in data.squads if squad["id"] in by_squad
+    ]
+
+def _fold_season_total_actives(entries, data, match):
+    events = data.match_events_by_match.get(match.id, {})
+    counts = {entry["squad"]["id"]: entry["count"] for entry in entries}
+    actives = []
+    for squad in data.squads:
+        event = events.get(squad["id"])
+        actives.append({
+            "squad": {"id": squad["id"], "name": squad["name"], "color": squad["color"]},
+            "count": counts.get(squad["id"], 0) + (event.players_count if event else 0)
+        })
+    actives.sort(key=lambda x: x["count"], reverse=True)
+    return actives
+
+def _fold_best_match(entries, data, match, value_key, build_entry):
+    """Keep one best-match entry per squad, replacing it when the new match beats it."""
+    events = data.match_events_by_match.get(match.id, {})
+    by_squad = {entry["squad_id"]: entry for entry in entries}
+    for squad in data.squads:
+        event = events.get(squad["id"])
+        if event is None:
+            continue
+        candidate = build_entry(squad, event, match)
+        current = by_squad.get(squad["id"])
+        if current is None or candidate[value_key] > current[value_key]:
+            by_squad[squad["id"]] = candidate
+        else:
+            current["squad_name"] = squad["name"] or ""
+            current["color"] = squad["color"] or "#808080"
+    best = [by_squad[squad["id"]] for squad in data.squads if squad["id"] in by_squad]
+    best.sort(key=lambda x: x[value_key], reverse=True)
+    return best[:TOP_N]
+
+def _fold_league_table(entries, data, match, squad_mvps):
+    events = data.match_events_by_match.get(match.id, {})
+    by_squad = {entry["id"]: entry for entry in entries}
+    table = []
+    for squad in data.squads:
+        entry = by_squad.get(squad["id"]) or {
+            "total_points": 0.0,
+            "base_points": 0.0,
+            "boost_points": 0.0,
+            "caps": 0,
+            "total_actives": 0,
+            "recent_form": []
+        }
+        event = events.get(squad["id"])
+        recent_form = list(entry["recent_form"])
+        total_points, base_points, boost_points = entry["total_points"], entry["base_points"], entry["boost_points"]
+        caps, total_actives = entry["caps"], entry["total_actives"]
+        if event is not None:
+            total_points += float(event.total_points)
+            base_points += float(event.total_base_points)
+            boost_points += float(event.total_boost_points)
+            caps += 1 if event.match_rank == 1 else 0
+            total_actives += event.players_count
+            recent_form = (recent_form + [_recent_form_entry(match, event)])[-5:]
+        table.append({
+            "id": squad["id"],
+            "name": squad["name"],
+            "color": squad["color"],
+            "total_points": total_points,
+            "base_points": base_points,
+            "boost_points": boost_points,
+            "caps": caps,
+            "total_actives": total_actives,
+            "mvp": _league_table_mvp(squad_mvps, squad["id"]),
+            "recent_form": recent_form,
+            "rank_change": 0
+        })
+    table.sort(key=lambda x: x["total_points"], reverse=True)
+    return table
+
+def _fold_player_totals(player_totals, player_events):
+    """Add player events to season totals keyed by "<squad_id>:<player_id>"."""
+    counted_matches = set()
+    for pe in player_events:
+        key = f"{pe.fantasy_squad_id}:{pe.player_id}"
+        totals = player_totals.setdefault(key, {
+            "player_id": pe.player_id,
+            "player_name": pe.player_name,
+            "squad_id": pe.fantasy_squad_id,
+            "matches": 0,
+            "base": 0.0,
+            "boost": 0.0,
+            "total": 0.0
+        })
+        if (key, pe.match_id) not in counted_matches:
+            totals["matches"] += 1
+            counted_matches.add((key, pe.match_id))
+        totals["base"] += float(pe.base)
+        totals["boost"] += float(pe.boost_points)
+        totals["total"] += float(pe.base + pe.boost_points)
+    return player_totals
+
+def _fold_match_mvp(entries, data, match):
+    merged = entries + _match_top_performers(match.id, data.player_events_by_match.get(match.id, []))
+    merged.sort(key=lambda x: x["total"], reverse=True)
+    return merged[:TOP_N]
+
+def _fold_phase(stats, phase_state, key, data, match):
+    match_details = stats.match_details
+    player_details = stats.player_details
+    events = data.match_events_by_match.get(match.id, {})
+
+    rank_counts = phase_state["rank_counts"]
+    for squad_id, event in events.items():
+        if event.running_rank is None:
+            continue
+        counts = rank_counts.setdefault(str(squad_id), {})
+        counts[str(event.running_rank)] = counts.get(str(event.running_rank), 0) + 1
+
+    match_details["running_total"][key] = _fold_running_total(match_details["running_total"].get(key, []), data, match)
+    match_details["domination"][key] = _fold_domination(match_details["domination"].get(key, []), data, match)
+    match_details["squad_stats"][key] = _fold_squad_stats(
+        match_details["squad_stats"].get(key, []), data, match, rank_counts
+    )
+    match_details["season_total_actives"][key] = _fold_season_total_actives(
+        match_details["season_total_actives"].get(key, []), data, match
+    )
+    match_details["most_points_in_match"][key] = _fold_best_match(
+        match_details["most_points_in_match"].get(key, []), data, match, "total", _most_points_entry
+    )
+    match_details["most_players_in_match"][key] = _fold_best_match(
+        match_details["most_players_in_match"].get(key, []), data, match, "count", _most_players_entry
+    )
+    match_details["rank_breakdown"][key] = _rank_breakdown(data.squads, rank_counts)
+
+    squad_mvps = _fold_squad_mvps(player_details["squad_mvps"].get(key, {}), data.player_events)
+    player_details["squad_mvps"][key] = squad_mvps
+    match_details["league_table"][key] = _fold_league_table(
+        match_details["league_table"].get(key, []), data, match, squad_mvps
+    )
+    player_totals = _fold_player_totals(phase_state["player_totals"], data.player_events)
+    player_details["season_mvp"][key] = _top_season_mvps(player_totals)
+    player_details["match_mvp"][key] = _fold_match_mvp(player_details["match_mvp"].get(key, []), data, match)
+
+def fold_match_into_stats(stats, league_id, match):
+    """
+    Fold one newly completed match into a league's stored stats.
+
+    Only the match's own FantasyMatchEvent / FantasyPlayerEvent rows are read;
+    earlier matches contribute through the stored JSON and ``stats.fold_state``.
+
+    Returns:
+        True if the stats are up to date, False if the match cannot be folded
+        (no fold state yet, already folded, out of order, or a new phase) and
+        the caller must fall back to recalculate_all_stats.
+    """
+    state = stats.fold_state or {}
+    if state.get("version") != FOLD_STATE_VERSION:
+        return False
+    if match.status not in STATS_MATCH_STATUSES:
+        return False
+    if match.id in state["match_ids"]:
+        return False
+    if state["last_match"] is not None and _match_position(match) <= state["last_match"]:
+        return False
+
+    phase_key = _match_phase_key(match)
+    keys = ["overall"] + ([phase_key] if phase_key is not None else [])
+    running_total = (stats.match_details or {}).get("running_total", {})
+    if any(key not in state["phases"] or key not in running_total for key in keys):
+        return False
+
+    data = load_league_stats_data(league_id, Match.objects.filter(id=match.id))
+    if not data.match_events:
+        # A match without events for this league is not part of its stats.
+        return True
+
+    match_row = data.matches[0]
+    for key in keys:
+        _fold_phase(stats, state["phases"][key], key, data, match_row)
+
+    state["match_ids"].append(match.id)
+    state["last_match"] = _match_position(match)
+    stats.fold_state = state
+    stats.save()
+    logger.info(f"Folded match {match.id} into fantasy stats for league {league_id}")
+    return True
+
 def update_fantasy_stats(league_id, match_id=None):
     """
     Update fantasy stats for a league.
-    If match_id is provided, only update stats for that match.
+
+    If match_id is provided and names the next completed match, it is folded
+    into the stored stats incrementally. Anything else (first build, edits to
+    an already counted match, a match arriving out of order) falls back to a
+    full recalculation.
     """
     logger.info(f"Updating fantasy stats for league {league_id} (match_id={match_id})")
     league = FantasyLeague.objects.get(id=league_id)
@@ -464,8 +797,13 @@ def update_fantasy_stats(league_id, match_id=None):
             "squad_mvps": {}
         }
 
-    # Only full recalculation is supported here
+    if match_id is not None:
+        match = Match.objects.select_related('team_1', 'team_2', 'season_phase').filter(id=match_id).first()
+        if match is not None and fold_match_into_stats(stats, league_id, match):
+            logger.info(f"Stats updated incrementally for league {league_id}")
+            return stats
+        logger.info(f"Match {match_id} cannot be folded for league {league_id}; running full recalculation")
+
     recalculate_all_stats(stats, league_id)
-    stats.save()
     logger.info(f"Stats updated for league {league_id}")
     return stats
@@ -1,16 +1,40 @@
 import logging
 
-from django.db.models.signals import pre_save, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save, post_save
 from django.dispatch import receiver
 
 from .models import (
     DraftWindow,
+    DraftWindowLeagueRun,
     DraftWindowTeamEligibility,
+    FantasyBoostRole,
+    FantasyDraft,
     FantasyLeague,
+    FantasyPlayerEvent,
+    FantasySquad,
+    FantasyStats,
     Match,
+    Player,
+    PlayerMatchEvent,
+    PlayerSeasonTeam,
     SeasonTeam,
+    SquadMembership,
+    SquadPhaseBoost,
+    Team,
 )
-from .services.stats_service import update_fantasy_stats
+from .services.boost_memo import invalidate_boost_memo
+from .services.cache_invalidation import invalidate_league_caches
+from .services.data_versions import bump_all_league_versions, bump_versions
+from .services.identity_resolver import invalidate_identity_cache
+from .services.player_aggregates import (
+    pending_refresh,
+    refresh_fantasy_aggregates,
+    refresh_fantasy_aggregates_for_events,
+    refresh_player_season_aggregates,
+)
+from .services.squad_membership import sync_squad_memberships
+from .services.stats_job_service import submit_stats_jobs
 
 
 logger = logging.getLogger(__name__)
@@ -33,7 +57,7 @@ def match_pre_save(sender, instance, **kwargs):
 @receiver(post_save, sender=Match)
 def recalculate_stats_on_match_completion(sender, instance, created, **kwargs):
     """
-    Recalculate FantasyStats when a match transitions LIVE -> COMPLETED.
+    Queue FantasyStats updates when a match transitions LIVE -> COMPLETED.
     This covers update-points flow and manual admin status edits.
     """
     if created:
@@ -47,24 +71,131 @@ def recalculate_stats_on_match_completion(sender, instance, created, **kwargs):
     if not transitioned_live_to_completed:
         return
 
-    league_ids = FantasyLeague.objects.filter(
+    league_ids = list(FantasyLeague.objects.filter(
         season_id=instance.season_id
-    ).values_list("id", flat=True)
-
-    for league_id in league_ids:
-        try:
-            update_fantasy_stats(league_id)
-            logger.info(
-                "Recalculated FantasyStats after LIVE->COMPLETED transition for match %s in league %s",
-                instance.id,
-                league_id,
-            )
-        except Exception:
-            logger.exception(
-                "Failed FantasyStats recalc for match %s in league %s after status transition",
-                instance.id,
-                league_id,
-            )
+    ).values_list("id", flat=True))
+
+    match_id = instance.id
+
+    # Stats are rebuilt by the run_stats_jobs worker. Queue on commit: the
+    # points refresh marks the match COMPLETED before it writes the final events.
+    transaction.on_commit(lambda: submit_stats_jobs(league_ids, match_id=match_id))
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_identity_resolvers(sender, **kwargs):
+    """
+    Make scorecard ingest reload its player/team lookups after any change.
+    """
+    invalidate_identity_cache()
+
+
+@receiver(post_save, sender=FantasyBoostRole)
+def invalidate_boost_memo_for_role(sender, instance, created, **kwargs):
+    """
+    Stored boost points for a role are stale once its multipliers change, and so
+    is every league response that shows boost points.
+    """
+    if not created:
+        invalidate_boost_memo(boost_ids=[instance.id])
+        bump_all_league_versions()
+
+
+# FantasySquad fields shown in cached league responses, besides the roster
+SQUAD_DISPLAY_FIELDS = {'name', 'color', 'logo'}
+
+
+@receiver(post_save, sender=FantasySquad)
+def sync_memberships_on_squad_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Mirror current_squad changes into SquadMembership and drop the league's
+    cached responses when the roster or the squad's name, colour or logo may
+    have changed. Writers set instance._membership_source to record why the
+    roster changed.
+    """
+    fields = set(update_fields) if update_fields is not None else None
+    opened = closed = 0
+    if fields is None or 'current_squad' in fields:
+        source = getattr(instance, "_membership_source", None) or SquadMembership.Source.MANUAL
+        opened, closed = sync_squad_memberships([instance], source=source)
+    if opened or closed or fields is None or fields & SQUAD_DISPLAY_FIELDS:
+        invalidate_league_caches([instance.league_id])
+
+
+@receiver(post_save, sender=FantasyDraft)
+@receiver(post_save, sender=DraftWindowLeagueRun)
+@receiver(post_save, sender=FantasyStats)
+def invalidate_league_caches_on_league_change(sender, instance, **kwargs):
+    """
+    Draft rankings, executed draft runs and rebuilt stats are part of the
+    cached league responses.
+    """
+    invalidate_league_caches([instance.league_id])
+
+
+@receiver(post_save, sender=SquadPhaseBoost)
+def invalidate_league_caches_on_boost_change(sender, instance, **kwargs):
+    """
+    Boost assignments change the league's boost points.
+    """
+    league_ids = FantasySquad.objects.filter(id=instance.fantasy_squad_id).values_list("league_id", flat=True)
+    invalidate_league_caches(league_ids)
+
+
+@receiver(post_save, sender=Match)
+def bump_versions_on_match_save(sender, instance, **kwargs):
+    """
+    Match edits change the match responses and its season's standings.
+    """
+    bump_versions(season_ids=[instance.season_id], match_ids=[instance.id])
+
+
+@receiver(post_save, sender=PlayerMatchEvent)
+@receiver(post_delete, sender=PlayerMatchEvent)
+def refresh_on_player_event_change(sender, instance, **kwargs):
+    """
+    Player event edits outside scorecard ingest (admin, fix commands). Bulk
+    writers refresh the aggregates and bump the versions themselves; inside
+    batched_refresh() the refresh is collected and run once.
+    """
+    pending = pending_refresh()
+    if pending is not None:
+        pending.add_player_event(instance)
+        return
+    season_id = Match.objects.filter(id=instance.match_id).values_list("season_id", flat=True).first()
+    refresh_player_season_aggregates(season_id, [instance.player_id])
+    refresh_fantasy_aggregates_for_events([instance.id])
+    bump_versions(season_ids=[season_id], match_ids=[instance.match_id])
+
+
+@receiver(post_save, sender=FantasyPlayerEvent)
+@receiver(post_delete, sender=FantasyPlayerEvent)
+def refresh_aggregates_on_fantasy_event_change(sender, instance, **kwargs):
+    """
+    Single fantasy event writes (the FantasyPlayerEvent admin). fix_points and
+    the match and player event admins bulk_update boost points and refresh the
+    squad and league aggregates once themselves.
+    """
+    player_id = PlayerMatchEvent.objects.filter(id=instance.match_event_id).values_list("player_id", flat=True).first()
+    if player_id is None:
+        return
+    pending = pending_refresh()
+    if pending is not None:
+        pending.add_fantasy_event(instance.fantasy_squad_id, player_id)
+    else:
+        refresh_fantasy_aggregates([instance.fantasy_squad_id], [player_id])
+
+
+@receiver(post_save, sender=PlayerSeasonTeam)
+@receiver(post_delete, sender=PlayerSeasonTeam)
+def bump_season_version_on_roster_change(sender, instance, **kwargs):
+    """
+    Season player pools feed the cached league players responses.
+    """
+    bump_versions(season_ids=[instance.season_id])
 
 
 @receiver(post_save, sender=DraftWindow)
@@ -0,0 +1,137 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.models import FantasyTrade, SquadPhaseBoost
+from api.services.cache_invalidation import invalidate_match_caches, player_history_key
+from api.services.data_versions import league_token, match_token
+from api.tests import test_cricket_data_service
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+from api.views import process_trade
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+
+class DataVersionTests(CricketDataServiceTestCase):
+    _scorecard = test_cricket_data_service.UpdateMatchPointsDiffTests._scorecard
+
+    def setUp(self):
+        super().setUp()
+        self.match.cricdata_id = "m1"
+        self.match.save()
+        cache.clear()
+
+    def _tokens(self):
+        return (
+            [league_token(league.id, self.season.id) for league in self.leagues],
+            match_token(self.match.id),
+        )
+
+    def test_update_match_points_bumps_season_and_match(self):
+        league_tokens, match_version = self._tokens()
+        history = [player_history_key(self.batter.id), player_history_key(self.bowler.id)]
+        unrelated = player_history_key(self.bowler.id + 1000)
+        cache.set_many({key: {"cached": True} for key in history + [unrelated]})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.update_match_points("m1", match_data=self._scorecard())
+
+        new_league_tokens, new_match_version = self._tokens()
+        self.assertTrue(all(old != new for old, new in zip(league_tokens, new_league_tokens)))
+        self.assertNotEqual(match_version, new_match_version)
+        self.assertEqual(cache.get_many(history), {})
+        self.assertIsNotNone(cache.get(unrelated))
+
+    def test_unchanged_scorecard_keeps_versions(self):
+        self.service.update_match_points("m1", match_data=self._scorecard())
+        tokens = self._tokens()
+
+        self.service.update_match_points("m1", match_data=self._scorecard(hits_today=2))
+
+        self.assertEqual(self._tokens(), tokens)
+
+    def test_trade_and_boost_edits_bump_only_their_league(self):
+        traded, other = league_token(self.leagues[0].id), league_token(self.leagues[1].id)
+        trade = FantasyTrade.objects.create(
+            initiator=self.squads[0],
+            receiver=self.squads[1],
+            players_given=[self.batter.id],
+            players_received=[self.bowler.id],
+            status="Accepted",
+        )
+        process_trade(trade)
+
+        after_trade = league_token(self.leagues[0].id)
+        self.assertNotEqual(after_trade, traded)
+        self.assertEqual(league_token(self.leagues[1].id), other)
+
+        SquadPhaseBoost.objects.create(
+            fantasy_squad=self.squads[0],
+            phase=self.phase,
+            assignments=[{"boost_id": self.captain.id, "player_id": self.bowler.id}],
+        )
+        self.assertNotEqual(league_token(self.leagues[0].id), after_trade)
+        self.assertEqual(league_token(self.leagues[1].id), other)
+
+    def test_squad_display_edits_bump_the_league_version(self):
+        before, other = league_token(self.leagues[0].id), league_token(self.leagues[1].id)
+        self.squads[0].name = "Renamed"
+        self.squads[0].save()
+        renamed = league_token(self.leagues[0].id)
+        self.assertNotEqual(renamed, before)
+
+        self.squads[0].color = "#000000"
+        self.squads[0].save(update_fields=["color"])
+        recoloured = league_token(self.leagues[0].id)
+        self.assertNotEqual(recoloured, renamed)
+
+        self.squads[0].total_points = 10
+        self.squads[0].save(update_fields=["total_points"])
+        self.assertEqual(league_token(self.leagues[0].id), recoloured)
+        self.assertEqual(league_token(self.leagues[1].id), other)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_stats_views_refresh_when_the_league_version_moves(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="viewer", password="pass123"))
+        url = f"/api/leagues/{self.leagues[0].id}/stats/season-total-actives/"
+
+        first = client.get(url)
+        self.assertEqual(first.status_code, 200)
+        cached_keys = [key for key in cache._cache if f"league_stats_{self.leagues[0].id}_v" in key]
+        self.assertEqual(len(cached_keys), 1)
+
+        invalidate_match_caches(self.match)
+        client.get(url)
+
+        cached_keys = [key for key in cache._cache if f"league_stats_{self.leagues[0].id}_v" in key]
+        self.assertEqual(len(cached_keys), 2)
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+class RedisCacheTests(CricketDataServiceTestCase):
+    def test_invalidation_reaches_every_worker(self):
+        redis_cache = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://stand-in:6379/0",
+                "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+            }
+        }
+        with override_settings(CACHES=redis_cache):
+            # Two connections stand in for two gunicorn workers
+            worker_a, worker_b = caches.create_connection("default"), caches.create_connection("default")
+            key = player_history_key(self.batter.id)
+            worker_a.set(key, {"cached": True})
+            self.assertEqual(worker_b.get(key), {"cached": True})
+
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_match_caches(self.match, player_ids=[self.batter.id])
+
+            self.assertIsNone(worker_b.get(key))
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.models import FantasyMatchEvent, FantasyStats
+from api.services.cache_invalidation import invalidate_league_caches, invalidate_match_caches
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class ConditionalRequestTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.squads[0].user)
+        for squad in self.squads:
+            FantasyMatchEvent.objects.create(match=self.match, fantasy_squad=squad, total_points=10)
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_match_standings_returns_304_without_serializing(self):
+        url = f"/api/matches/{self.match.id}/standings/?league_id={self.leagues[0].id}"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+
+        with mock.patch("api.views.FantasyMatchEventSerializer") as serializer:
+            repeat = self._revalidate(url, first["ETag"])
+        self.assertEqual(repeat.status_code, 304)
+        serializer.assert_not_called()
+
+        invalidate_match_caches(self.match)
+        self.assertEqual(self._revalidate(url, first["ETag"]).status_code, 200)
+
+    def test_match_events_etag_follows_match_version(self):
+        url = f"/api/matches/{self.match.id}/events/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self._revalidate(url, first["ETag"]).status_code, 304)
+
+        invalidate_match_caches(self.match)
+        self.assertEqual(self._revalidate(url, first["ETag"]).status_code, 200)
+
+    def test_league_squads_and_stats_follow_league_version(self):
+        FantasyStats.objects.create(league=self.leagues[0])
+        urls = [
+            f"/api/leagues/{self.leagues[0].id}/squads/",
+            f"/api/leagues/{self.leagues[0].id}/stats/season-total-actives/",
+        ]
+        etags = {}
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etags[url] = response["ETag"]
+            self.assertEqual(self._revalidate(url, etags[url]).status_code, 304)
+
+        # Another league's change leaves these ETags valid
+        invalidate_league_caches([self.leagues[1].id])
+        for url in urls:
+            self.assertEqual(self._revalidate(url, etags[url]).status_code, 304)
+
+        invalidate_league_caches([self.leagues[0].id])
+        for url in urls:
+            self.assertEqual(self._revalidate(url, etags[url]).status_code, 200)
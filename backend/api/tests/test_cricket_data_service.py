@@ -0,0 +1,399 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import models
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from api.models import (
+    BoostPointsMemo,
+    Competition,
+    FantasyBoostRole,
+    FantasyLeague,
+    FantasyMatchEvent,
+    FantasyPlayerEvent,
+    FantasySquad,
+    Match,
+    Player,
+    PlayerMatchEvent,
+    Season,
+    SeasonPhase,
+    SeasonTeam,
+    SquadPhaseBoost,
+    Team,
+)
+from api.services.cricket_data_service import CricketDataService
+from api.services.scoring_service import apply_points
+
+
+class CricketDataServiceTestCase(TestCase):
+    def setUp(self):
+        self.service = CricketDataService(api_key="test")
+        self.competition = Competition.objects.create(
+            name="IPL",
+            format=Competition.Format.T20,
+            grade=Competition.Grade.FRANCHISE,
+        )
+        self.season = Season.objects.create(
+            competition=self.competition,
+            year=2026,
+            name="IPL 2026",
+            start_date=date(2026, 3, 20),
+            end_date=date(2026, 5, 30),
+            status=Season.Status.ONGOING,
+        )
+        self.phase = SeasonPhase.objects.create(
+            season=self.season,
+            phase=1,
+            label="Phase 1",
+            open_at=timezone.make_aware(datetime(2026, 3, 1)),
+            lock_at=timezone.make_aware(datetime(2026, 3, 19)),
+            start=timezone.make_aware(datetime(2026, 3, 20)),
+            end=timezone.make_aware(datetime(2026, 4, 20)),
+        )
+        self.team_a = Team.objects.create(
+            name="Team A", short_name="A", home_ground="Stadium A", city="City A",
+            primary_color="#111111", secondary_color="#222222",
+        )
+        self.team_b = Team.objects.create(
+            name="Team B", short_name="B", home_ground="Stadium B", city="City B",
+            primary_color="#333333", secondary_color="#444444",
+        )
+        SeasonTeam.objects.create(team=self.team_a, season=self.season)
+        SeasonTeam.objects.create(team=self.team_b, season=self.season)
+
+        self.batter = Player.objects.create(name="Batter One", role=Player.Role.BATSMAN, cricdata_id="bat-1")
+        self.bowler = Player.objects.create(name="Bowler One", role=Player.Role.BOWLER, cricdata_id="bowl-1")
+
+        self.captain = FantasyBoostRole.objects.create(
+            label="Captain",
+            role=[Player.Role.BATSMAN, Player.Role.BOWLER],
+            **{field: 2.0 for field in self._multiplier_fields()},
+        )
+
+        self.leagues = []
+        self.squads = []
+        for index in range(2):
+            admin = User.objects.create_user(username=f"admin{index}", password="pass123")
+            league = FantasyLeague.objects.create(
+                name=f"League {index}",
+                color="#0f172a",
+                admin=admin,
+                season=self.season,
+                league_code=f"L{index}CODE",
+            )
+            self.leagues.append(league)
+            for squad_index in range(2):
+                user = User.objects.create_user(username=f"user{index}_{squad_index}", password="pass123")
+                self.squads.append(FantasySquad.objects.create(
+                    name=f"Squad {index}-{squad_index}",
+                    color="#2563eb",
+                    user=user,
+                    league=league,
+                    current_squad=[self.batter.id] if squad_index == 0 else [self.bowler.id],
+                ))
+
+        self.match = self._create_match(1, datetime(2026, 3, 25, 19, 30))
+
+    @staticmethod
+    def _multiplier_fields():
+        return [
+            field.name for field in FantasyBoostRole._meta.get_fields()
+            if field.name.startswith("multiplier_")
+        ]
+
+    def _create_match(self, number, when):
+        return Match.objects.create(
+            season=self.season,
+            season_phase=self.phase,
+            match_number=number,
+            team_1=self.team_a,
+            team_2=self.team_b,
+            date=timezone.make_aware(when),
+            venue="Stadium A",
+            status=Match.Status.LIVE,
+        )
+
+    def _create_event(self, player, match=None, **stats):
+        return PlayerMatchEvent.objects.create(
+            player=player,
+            match=match or self.match,
+            for_team=self.team_a,
+            vs_team=self.team_b,
+            **stats,
+        )
+
+
+class UpdateFantasyEventsTests(CricketDataServiceTestCase):
+    def test_fan_out_upserts_one_event_per_owning_squad(self):
+        SquadPhaseBoost.objects.create(
+            fantasy_squad=self.squads[0],
+            phase=self.phase,
+            assignments=[{"boost_id": self.captain.id, "player_id": self.batter.id}],
+        )
+        batting_event = self._create_event(self.batter, bat_runs=30, bat_balls=20)
+        bowling_event = self._create_event(self.bowler, bowl_wickets=2, bowl_balls=24, bowl_runs=20)
+
+        # Membership index, phase boosts, roles, stored boost memo, FantasyPlayerEvent upsert, memo upsert
+        with self.assertNumQueries(6):
+            fantasy_events = self.service._update_fantasy_events(self.match, [batting_event, bowling_event])
+
+        self.assertEqual(len(fantasy_events), 4)
+        self.assertEqual(FantasyPlayerEvent.objects.count(), 4)
+
+        captained = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[0], match_event=batting_event)
+        self.assertEqual(captained.boost_id, self.captain.id)
+        self.assertEqual(captained.boost_points, float(batting_event.total_points_all))
+
+        plain = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[2], match_event=batting_event)
+        self.assertIsNone(plain.boost_id)
+        self.assertEqual(plain.boost_points, 0)
+
+    def test_repeat_refresh_updates_existing_rows(self):
+        batting_event = self._create_event(self.batter, bat_runs=30, bat_balls=20)
+        self.service._update_fantasy_events(self.match, [batting_event])
+
+        SquadPhaseBoost.objects.create(
+            fantasy_squad=self.squads[0],
+            phase=self.phase,
+            assignments=[{"boost_id": self.captain.id, "player_id": self.batter.id}],
+        )
+        self.service._update_fantasy_events(self.match, [batting_event])
+
+        self.assertEqual(FantasyPlayerEvent.objects.filter(match_event=batting_event).count(), 2)
+        refreshed = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[0], match_event=batting_event)
+        self.assertEqual(refreshed.boost_id, self.captain.id)
+        self.assertGreater(refreshed.boost_points, 0)
+
+
+class BoostMemoTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        for squad in (self.squads[0], self.squads[2]):
+            SquadPhaseBoost.objects.create(
+                fantasy_squad=squad,
+                phase=self.phase,
+                assignments=[{"boost_id": self.captain.id, "player_id": self.batter.id}],
+            )
+        self.batting_event = self._create_event(self.batter, bat_runs=30, bat_balls=20)
+
+    def test_boost_points_are_computed_once_per_event_and_role(self):
+        self.service._update_fantasy_events(self.match, [self.batting_event])
+
+        self.assertEqual(self.service.boost_memo.misses, 1)
+        memo = BoostPointsMemo.objects.get()
+        self.assertEqual((memo.match_event_id, memo.boost_id), (self.batting_event.id, self.captain.id))
+
+        service = CricketDataService(api_key="test")
+        service._update_fantasy_events(self.match, [self.batting_event])
+        self.assertEqual((service.boost_memo.hits, service.boost_memo.misses), (2, 0))
+
+    def test_stat_and_role_changes_invalidate_stored_values(self):
+        self.service._update_fantasy_events(self.match, [self.batting_event])
+
+        self.batting_event.bat_runs = 60
+        self.batting_event.save()
+        self.assertFalse(BoostPointsMemo.objects.exists())
+
+        service = CricketDataService(api_key="test")
+        service._update_fantasy_events(self.match, [self.batting_event])
+        boosted = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[0])
+        self.assertEqual(boosted.boost_points, float(self.batting_event.total_points_all))
+
+        self.captain.multiplier_runs = 3.0
+        self.captain.save()
+        self.assertFalse(BoostPointsMemo.objects.exists())
+
+    def test_rescored_instance_still_invalidates_on_save(self):
+        self.service._update_fantasy_events(self.match, [self.batting_event])
+
+        self.batting_event.bat_runs = 90
+        apply_points([self.batting_event])
+        self.batting_event.save()
+
+        self.assertFalse(BoostPointsMemo.objects.exists())
+
+    def test_admin_stat_edit_refreshes_captain_boost(self):
+        self.service._update_fantasy_events(self.match, [self.batting_event])
+        model_admin = admin.site._registry[PlayerMatchEvent]
+        request = RequestFactory().post("/")
+        request.user = User.objects.create_superuser(username="staff", password="pass123")
+        request._messages = CookieStorage(request)
+
+        event = PlayerMatchEvent.objects.get(id=self.batting_event.id)
+        event.bat_runs = 90
+        model_admin.save_model(request, event, form=None, change=True)
+
+        event.refresh_from_db()
+        boosted = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[0], match_event=event)
+        self.assertEqual(boosted.boost_points, float(event.total_points_all))
+
+
+class UpdateRunningRanksTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.matches = [
+            self.match,
+            self._create_match(2, datetime(2026, 3, 27, 19, 30)),
+            self._create_match(3, datetime(2026, 3, 29, 19, 30)),
+        ]
+        points_by_match = [
+            [40, 10, 25, 25],
+            [0, 50, 30, 5],
+            [12, 12, 0, 60],
+        ]
+        for match, points in zip(self.matches, points_by_match):
+            for squad, total in zip(self.squads, points):
+                FantasyMatchEvent.objects.create(match=match, fantasy_squad=squad, total_points=total)
+
+    def _running_state(self, match):
+        return {
+            event.fantasy_squad_id: (event.running_rank, event.running_total_points)
+            for event in FantasyMatchEvent.objects.filter(match=match)
+        }
+
+    def test_match_ranks_are_computed_in_one_query_and_written_in_one_update(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.service._update_match_ranks(self.matches[0]), 4)
+
+        ranks = dict(FantasyMatchEvent.objects.filter(match=self.matches[0]).values_list('fantasy_squad_id', 'match_rank'))
+        # Ties fall back to squad order
+        self.assertEqual([ranks[squad.id] for squad in self.squads], [1, 2, 1, 2])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service._update_match_ranks(self.matches[0]), 0)
+
+    def test_squad_totals_are_aggregated_in_one_query_and_written_in_one_update(self):
+        FantasyMatchEvent.objects.update(total_base_points=models.F('total_points'))
+
+        with self.assertNumQueries(2):
+            updated = self.service._update_fantasy_squad_totals(self.season)
+
+        self.assertEqual(len(updated), 4)
+        totals = dict(FantasySquad.objects.values_list('id', 'total_points'))
+        self.assertEqual([float(totals[squad.id]) for squad in self.squads], [52, 72, 55, 90])
+
+    def test_squad_totals_can_be_limited_to_squads_playing_in_a_match(self):
+        FantasyMatchEvent.objects.update(total_base_points=models.F('total_points'))
+        event = self._create_event(self.batter, bat_runs=10, bat_balls=8)
+        FantasyPlayerEvent.objects.create(match_event=event, fantasy_squad=self.squads[0])
+
+        updated = self.service._update_fantasy_squad_totals(self.season, match=self.match)
+
+        self.assertEqual([squad.id for squad in updated], [self.squads[0].id])
+        self.assertEqual(FantasySquad.objects.get(id=self.squads[1].id).total_points, 0)
+
+    def test_full_mode_ranks_each_league_by_season_total(self):
+        self.service._update_running_ranks(self.matches[1])
+
+        state = self._running_state(self.matches[1])
+        self.assertEqual(state[self.squads[0].id], (2, 40))
+        self.assertEqual(state[self.squads[1].id], (1, 60))
+        self.assertEqual(state[self.squads[2].id], (1, 55))
+        self.assertEqual(state[self.squads[3].id], (2, 30))
+
+    def test_incremental_mode_matches_full_replay(self):
+        for match in self.matches:
+            self.service._update_running_ranks(match)
+        expected = [self._running_state(match) for match in self.matches]
+
+        FantasyMatchEvent.objects.update(running_rank=None, running_total_points=0)
+        for match in self.matches:
+            with self.assertNumQueries(3):
+                self.service._update_running_ranks(match, incremental=True)
+
+        self.assertEqual([self._running_state(match) for match in self.matches], expected)
+
+
+class UpdateMatchPointsDiffTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.match.cricdata_id = "m1"
+        self.match.save()
+
+    def _scorecard(self, bat_runs=30, hits_today=1):
+        return {
+            "status": "success",
+            "info": {"hitsToday": hits_today, "hitsLimit": 100},
+            "data": {
+                "status": "Team B opt to bowl",
+                "score": [{"r": 120, "w": 3, "o": 14.2}],
+                "scorecard": [{
+                    "inning": "Team A Inning 1",
+                    "batting": [{
+                        "batsman": {"id": "bat-1", "name": "Batter One"},
+                        "r": bat_runs, "b": 20, "4s": 3, "6s": 1, "dismissal-text": "batting",
+                    }],
+                    "bowling": [{
+                        "bowler": {"id": "bowl-1", "name": "Bowler One"},
+                        "o": "3.2", "m": 0, "r": 28, "w": 2,
+                    }],
+                    "catching": [],
+                }],
+            },
+        }
+
+    def test_unchanged_scorecard_is_skipped(self):
+        first = self.service.update_match_points("m1", match_data=self._scorecard())
+        self.assertEqual(first["player_events_updated"], 2)
+        self.assertEqual(FantasyMatchEvent.objects.filter(match=self.match).count(), 4)
+
+        # Savepoint, match, snapshot, release
+        with self.assertNumQueries(4):
+            repeat = self.service.update_match_points("m1", match_data=self._scorecard(hits_today=2))
+
+        self.assertTrue(repeat["unchanged"])
+        self.assertEqual(repeat["player_events_updated"], 0)
+
+    def test_only_changed_players_are_rewritten(self):
+        self.service.update_match_points("m1", match_data=self._scorecard())
+        bowler_squad_event = FantasyMatchEvent.objects.get(match=self.match, fantasy_squad=self.squads[1])
+
+        with mock.patch.object(
+            self.service, "_apply_player_records", wraps=self.service._apply_player_records
+        ) as apply_records:
+            result = self.service.update_match_points("m1", match_data=self._scorecard(bat_runs=55))
+
+        self.assertEqual(list(apply_records.call_args.args[1]), ["bat-1"])
+
+        self.assertEqual(result["player_events_updated"], 1)
+        self.assertEqual(result["fantasy_events_updated"], 2)
+        self.assertEqual(result["fantasy_match_events_updated"], 2)
+
+        batter_event = PlayerMatchEvent.objects.get(player=self.batter, match=self.match)
+        self.assertEqual(batter_event.bat_runs, 55)
+        batter_squad_event = FantasyMatchEvent.objects.get(match=self.match, fantasy_squad=self.squads[0])
+        self.assertEqual(batter_squad_event.total_points, batter_event.total_points_all)
+        self.assertEqual(
+            FantasyMatchEvent.objects.get(id=bowler_squad_event.id).total_points, bowler_squad_event.total_points
+        )
+
+    def test_force_reapplies_every_player(self):
+        self.service.update_match_points("m1", match_data=self._scorecard())
+
+        result = self.service.update_match_points("m1", match_data=self._scorecard(), force=True)
+
+        self.assertEqual(result["player_events_updated"], 2)
+        self.assertNotIn("unchanged", result)
+
+    def test_player_events_are_written_in_bulk(self):
+        records = self.service._parse_player_performances(self.match, self._scorecard())
+
+        # Existing events, then one insert
+        with self.assertNumQueries(2):
+            self.service._apply_player_records(self.match, records)
+
+        records = self.service._parse_player_performances(self.match, self._scorecard(bat_runs=64))
+        # Existing events, one update, and clearing the batter's stale boost memo
+        with self.assertNumQueries(3):
+            applied = self.service._apply_player_records(self.match, records)
+
+        stored = PlayerMatchEvent.objects.get(id=applied["bat-1"].id)
+        self.assertEqual((stored.bat_runs, stored.bowl_balls), (64, 0))
+        self.assertEqual(stored.total_points_all, stored.base_points)
+        bowler = PlayerMatchEvent.objects.get(id=applied["bowl-1"].id)
+        self.assertEqual((bowler.bowl_balls, bowler.bowl_wickets), (20, 2))
+        self.assertEqual(bowler.total_points_all, bowler.base_points)
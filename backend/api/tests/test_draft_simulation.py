@@ -0,0 +1,94 @@
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.admin_views import run_complete_draft
+from api.models import DraftWindow, FantasyDraft, FantasySquad, Player, PlayerSeasonTeam
+from api.services.draft_simulation import (
+    build_mid_season_model,
+    build_pre_season_model,
+    simulate_draft_run,
+    simulate_drafts,
+)
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class DraftSimulationTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.league = self.leagues[0]
+        self.by_role = {}
+        for role in (Player.Role.BATSMAN, Player.Role.WICKET_KEEPER, Player.Role.ALL_ROUNDER, Player.Role.BOWLER):
+            self.by_role[role] = [Player.objects.create(name=f"{role} {index}", role=role).id for index in range(6)]
+            for player_id in self.by_role[role]:
+                PlayerSeasonTeam.objects.create(player_id=player_id, team=self.team_b, season=self.season)
+        # Points only come from the batters, ranked by id
+        for rank, player_id in enumerate(self.by_role[Player.Role.BATSMAN]):
+            self._create_event(Player.objects.get(id=player_id), bat_runs=60 - 10 * rank, bat_balls=30)
+
+    def _projected(self, model, player_ids):
+        return round(sum(model["projections"].get(player_id, 0.0) for player_id in player_ids), 2)
+
+    def test_pre_season_model_reads_orders_without_saving(self):
+        model = build_pre_season_model(self.league)
+
+        self.assertFalse(FantasyDraft.objects.exists())
+        self.assertEqual(model["role_orders"]["BAT"][0], sorted(self.by_role[Player.Role.BATSMAN]))
+        self.assertGreater(model["projections"][self.by_role[Player.Role.BATSMAN][0]], 0)
+
+    def test_noise_free_run_matches_the_real_pre_season_draft(self):
+        squads = FantasySquad.objects.filter(league=self.league).order_by("id")
+        self.league.snake_draft_order = [squad.id for squad in squads]
+        self.league.save()
+        model = build_pre_season_model(self.league)
+
+        report = simulate_drafts(model, runs=5, seed=3, preference_noise=0, order_jitter=0)
+
+        expected = run_complete_draft(self.league, squads)
+        for squad in report["squads"]:
+            points = squad["projected_points"]
+            self.assertEqual(points["stdev"], 0)
+            self.assertEqual(points["mean"], self._projected(model, expected[squad["squad_id"]]))
+            self.assertEqual({role: counts["mean"] for role, counts in squad["roles"].items()},
+                             {"BAT": 3, "WK": 3, "ALL": 3, "BOWL": 3})
+
+    def test_runs_vary_but_repeat_for_a_seed(self):
+        model = build_pre_season_model(self.league)
+
+        drafts = {tuple(simulate_draft_run(model, seed, 3.0, float("inf"))[self.squads[0].id]) for seed in range(20)}
+        self.assertGreater(len(drafts), 1)
+
+        report = simulate_drafts(model, runs=120, seed=11)
+        self.assertEqual(simulate_drafts(model, runs=120, seed=11, workers=3), report)
+        points = report["squads"][0]["projected_points"]
+        self.assertGreater(points["p90"], points["p10"])
+        self.assertEqual(sum(squad["projected_points"]["mean"] for squad in report["squads"]),
+                         self._projected(model, self.by_role[Player.Role.BATSMAN]))
+
+    def test_mid_season_model_keeps_retained_players(self):
+        self.squads[0].current_squad = [self.batter.id] + self.by_role[Player.Role.BOWLER][:3]
+        self.squads[0].save()
+        window = DraftWindow.objects.create(
+            season=self.season, label="Mid-Season", kind=DraftWindow.Kind.MID_SEASON, sequence=1,
+            open_at=timezone.make_aware(datetime(2026, 4, 1)), lock_at=timezone.make_aware(datetime(2026, 4, 10)),
+            retention_phase=self.phase, retention_mode=DraftWindow.RetentionMode.MANUAL_PHASE,
+        )
+        self.squads[0].current_core_squad = [{"boost_id": self.captain.id, "player_id": self.batter.id}]
+        self.squads[0].save()
+
+        model = build_mid_season_model(self.league, window)
+        report = simulate_drafts(model, runs=30, seed=5)
+
+        self.assertEqual(model["retained"][self.squads[0].id], [self.batter.id])
+        first = next(squad for squad in report["squads"] if squad["squad_id"] == self.squads[0].id)
+        self.assertEqual(first["roles"]["BAT"]["min"], 1)
+        self.assertEqual(sum(counts["mean"] for counts in first["roles"].values()), 4)
+
+    def test_command_prints_one_line_per_squad(self):
+        out = StringIO()
+        call_command("simulate_drafts", self.league.id, runs=10, seed=1, workers=1, stdout=out)
+
+        self.assertIn("10 pre-season drafts for League 0 (seed 1)", out.getvalue())
+        self.assertIn("Squad 0-1", out.getvalue())
@@ -0,0 +1,268 @@
+import random
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.admin_views import ensure_draft_orders, run_complete_draft, run_draft_process
+from api.management.commands.benchmark_draft_window import run_synthetic_draft, synthetic_draft
+from api.models import (
+    DraftWindow,
+    DraftWindowLeagueRun,
+    FantasyDraft,
+    FantasySquad,
+    Player,
+    PlayerSeasonTeam,
+    SquadPhaseBoost,
+)
+from api.services.draft_window_service import (
+    ROLE_DRAFT_CONFIG,
+    allocate_draft_picks,
+    build_draft_preferences,
+    execute_draft_window,
+    execute_season_draft_window,
+)
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+def rescanning_allocation(standings_order, role_available, available_players, role_preferences,
+                          global_preferences, role_default_order, global_default_order, role_needs, total_needs):
+    """The previous allocation loop, which rescans each preference list from the head on every pick."""
+    available_players = set(available_players)
+    role_needs = {squad_id: dict(needs) for squad_id, needs in role_needs.items()}
+    total_needs = dict(total_needs)
+    assignments = {squad_id: [] for squad_id in standings_order}
+    for role, reverse_first_round in ROLE_DRAFT_CONFIG:
+        role_pool = set(role_available.get(role, set()))
+        base = list(reversed(standings_order)) if reverse_first_round else list(standings_order)
+        rounds_run = 0
+        while role_pool and any(role_needs[squad_id][role] > 0 for squad_id in standings_order):
+            picked = False
+            for squad_id in base if rounds_run % 2 == 0 else list(reversed(base)):
+                if role_needs[squad_id][role] <= 0 or total_needs[squad_id] <= 0:
+                    continue
+                selected = next((pid for pid in role_preferences[squad_id][role] if pid in role_pool), None)
+                if selected is None:
+                    selected = next((pid for pid in role_default_order[role] if pid in role_pool), None)
+                if selected is None:
+                    continue
+                assignments[squad_id].append(selected)
+                role_pool.remove(selected)
+                available_players.discard(selected)
+                role_needs[squad_id][role] -= 1
+                total_needs[squad_id] -= 1
+                picked = True
+            if not picked:
+                break
+            rounds_run += 1
+    flex_round = 0
+    while available_players and any(need > 0 for need in total_needs.values()):
+        picked = False
+        for squad_id in standings_order if flex_round % 2 == 0 else list(reversed(standings_order)):
+            if total_needs[squad_id] <= 0:
+                continue
+            selected = next((pid for pid in global_preferences[squad_id] if pid in available_players), None)
+            if selected is None:
+                continue
+            assignments[squad_id].append(selected)
+            available_players.remove(selected)
+            total_needs[squad_id] -= 1
+            picked = True
+        if not picked:
+            break
+        flex_round += 1
+    return assignments
+
+
+class DraftEngineTests(SimpleTestCase):
+    def _preferences(self, inputs, legacy_draft_map=None):
+        return build_draft_preferences(
+            inputs["squad_ids"], inputs["role_available"], inputs["available_players"], inputs["role_map"],
+            inputs["role_default_order"], inputs["global_default_order"], inputs["role_draft_map"],
+            legacy_draft_map or {},
+        )
+
+    def test_cursor_allocation_matches_rescanning_allocation(self):
+        rng = random.Random(7)
+        for seed in range(20):
+            inputs = synthetic_draft(pool_size=rng.randint(8, 120), squad_count=rng.randint(2, 8),
+                                     squad_size=rng.randint(3, 15), seed=seed)
+            # Uneven needs push squads into the flex fill
+            for squad_id in inputs["squad_ids"]:
+                inputs["total_needs"][squad_id] += rng.randint(0, 3)
+            role_preferences, global_preferences = self._preferences(inputs)
+            args = (
+                inputs["squad_ids"], inputs["role_available"], inputs["available_players"], role_preferences,
+                global_preferences, inputs["role_default_order"], inputs["global_default_order"],
+                inputs["role_needs"], inputs["total_needs"],
+            )
+
+            assignments, _ = allocate_draft_picks(*args)
+
+            self.assertEqual(assignments, rescanning_allocation(*args), f"seed {seed}")
+
+    def test_inputs_are_left_untouched(self):
+        inputs = synthetic_draft(pool_size=40, squad_count=4, squad_size=9)
+        pool = set(inputs["available_players"])
+        needs = {squad_id: dict(needs) for squad_id, needs in inputs["role_needs"].items()}
+
+        assignments, _ = run_synthetic_draft(inputs)
+
+        self.assertEqual(inputs["available_players"], pool)
+        self.assertEqual(inputs["role_needs"], needs)
+        picked = [player_id for ids in assignments.values() for player_id in ids]
+        self.assertEqual(len(picked), len(set(picked)))
+
+    def test_preferences_put_saved_order_first_then_defaults(self):
+        inputs = synthetic_draft(pool_size=16, squad_count=2, squad_size=6)
+        role, _ = ROLE_DRAFT_CONFIG[0]
+        saved = inputs["role_draft_map"][(1, role)]
+        legacy = [player_id for player_id in reversed(inputs["global_default_order"]) if player_id % 2]
+
+        role_preferences, global_preferences = self._preferences(inputs, legacy_draft_map={2: legacy})
+
+        self.assertEqual(role_preferences[1][role][: len(saved)], saved)
+        self.assertEqual(sorted(role_preferences[1][role]), sorted(inputs["role_available"][role]))
+        self.assertEqual(global_preferences[2][: len(legacy)], legacy)
+        self.assertEqual(sorted(global_preferences[2]), inputs["global_default_order"])
+
+    def test_benchmark_command_reports_each_pool_size(self):
+        out = StringIO()
+        call_command("benchmark_draft_window", pool_sizes="100,200", squads=4, repeat=1, stdout=out)
+
+        self.assertIn("pool=   100", out.getvalue())
+        self.assertIn("pool=   200", out.getvalue())
+
+
+class PreSeasonDraftTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.league = self.leagues[0]
+        self.league_squads = FantasySquad.objects.filter(league=self.league).order_by("id")
+        self.league.snake_draft_order = [squad.id for squad in self.league_squads]
+        self.league.save()
+        self.by_role = {}
+        for role, _ in ROLE_DRAFT_CONFIG:
+            players = [Player.objects.create(name=f"{role} {index:02}", role=role) for index in range(5)]
+            for player in players:
+                PlayerSeasonTeam.objects.create(player=player, team=self.team_a, season=self.season)
+            self.by_role[role] = [player.id for player in players]
+
+    def test_saved_orders_are_normalized_in_bulk_and_drive_the_picks(self):
+        first, second = self.league_squads
+        bat = self.by_role[Player.Role.BATSMAN]
+        FantasyDraft.objects.create(league=self.league, squad=first, type="Pre-Season", role="BAT", order=[bat[0]])
+        # The latest row wins; the bowler id and the duplicate are dropped
+        FantasyDraft.objects.create(
+            league=self.league, squad=first, type="Pre-Season", role="BAT",
+            order=[bat[3], self.bowler.id, bat[3], str(bat[1])],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            role_orders = ensure_draft_orders(self.league, self.league_squads)
+        draft_selects = [
+            query for query in queries
+            if query["sql"].startswith("SELECT") and FantasyDraft._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(draft_selects), 1)
+
+        saved = FantasyDraft.objects.filter(league=self.league, squad=first, role="BAT").order_by("-id").first()
+        self.assertEqual(saved.order[:2], [bat[3], bat[1]])
+        self.assertEqual(sorted(saved.order), sorted(bat))
+        self.assertEqual(FantasyDraft.objects.filter(league=self.league, squad=second).count(), len(ROLE_DRAFT_CONFIG))
+
+        with CaptureQueriesContext(connection) as queries:
+            results = run_complete_draft(self.league, self.league_squads, role_orders=role_orders)
+        self.assertEqual(len(queries), 0)
+
+        # Snake rounds first, second / second, first / first: the second squad
+        # follows the name-ordered default
+        self.assertEqual(results[first.id][:3], [bat[3], bat[2], bat[4]])
+        self.assertEqual(results[second.id][:2], [bat[0], bat[1]])
+        drafted = sorted(pid for picks in results.values() for pid in picks)
+        self.assertEqual(drafted, sorted(pid for ids in self.by_role.values() for pid in ids))
+
+    def test_draft_process_assigns_every_player(self):
+        result = run_draft_process(self.league.id)
+
+        self.assertEqual(result["total_players_drafted"], 20)
+        self.assertEqual(sum(len(squad.current_squad) for squad in self.league_squads.all()), 20)
+
+
+class SeasonDraftWindowTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        for player in (self.batter, self.bowler):
+            PlayerSeasonTeam.objects.create(player=player, team=self.team_a, season=self.season)
+        by_role = {}
+        for role, _ in ROLE_DRAFT_CONFIG:
+            by_role[role] = [Player.objects.create(name=f"{role} {index}", role=role).id for index in range(4)]
+            for player_id in by_role[role]:
+                PlayerSeasonTeam.objects.create(player_id=player_id, team=self.team_b, season=self.season)
+        for index, squad in enumerate(self.squads):
+            squad.current_squad += [by_role["ALL"][index], by_role["BOWL"][index]]
+            squad.save()
+        # The first phase starts after the window locks, so its boosts decide retention
+        SquadPhaseBoost.objects.create(
+            fantasy_squad=self.squads[0], phase=self.phase,
+            assignments=[{"boost_id": self.captain.id, "player_id": self.batter.id}],
+        )
+        self.window = DraftWindow.objects.create(
+            season=self.season, label="Mid-Season", kind=DraftWindow.Kind.MID_SEASON, sequence=1,
+            open_at=timezone.make_aware(datetime(2026, 3, 1)), lock_at=timezone.make_aware(datetime(2026, 3, 10)),
+        )
+
+    def _by_league(self, report):
+        return {summary["league_id"]: summary for summary in report["league_results"]}
+
+    def test_season_run_matches_league_by_league_runs(self):
+        report = execute_season_draft_window(self.window, dry_run=True)
+
+        self.assertEqual((report["leagues"], report["counts"]["dry_run"], report["counts"]["failed"]), (2, 2, 0))
+        results = self._by_league(report)
+        for league in self.leagues:
+            single = execute_draft_window(league, self.window, dry_run=True)
+            self.assertEqual(results[league.id]["squad_snapshots"], single["squad_snapshots"])
+            self.assertEqual(results[league.id]["squad_results"], single["squad_results"])
+
+        self.assertEqual(results[self.leagues[0].id]["drafted"], 5)
+        snapshots = results[self.leagues[0].id]["squad_snapshots"]
+        self.assertEqual(snapshots[str(self.squads[0].id)]["retained_player_ids"], [self.batter.id])
+        self.assertNotIn(self.batter.id, snapshots[str(self.squads[1].id)]["drafted_player_ids"])
+        self.assertFalse(DraftWindowLeagueRun.objects.exists())
+
+    def test_executed_leagues_are_skipped_on_the_next_run(self):
+        report = execute_season_draft_window(self.window)
+
+        self.assertEqual((report["counts"]["executed"], report["counts"]["skipped"]), (2, 0))
+        self.assertEqual(DraftWindowLeagueRun.objects.filter(draft_window=self.window).count(), 2)
+        snapshot = self._by_league(report)[self.leagues[1].id]["squad_snapshots"][str(self.squads[3].id)]
+        self.squads[3].refresh_from_db()
+        self.assertEqual(self.squads[3].current_squad, snapshot["post_draft_player_ids"])
+
+        rerun = execute_season_draft_window(self.window)
+        self.assertEqual((rerun["counts"]["executed"], rerun["counts"]["skipped"]), (0, 2))
+
+    def test_a_failing_league_does_not_stop_the_others(self):
+        FantasySquad.objects.filter(league=self.leagues[1]).delete()
+        progress = []
+
+        report = execute_season_draft_window(
+            self.window, progress=lambda done, total, summary: progress.append((done, total, summary["status"])),
+        )
+
+        results = self._by_league(report)
+        self.assertEqual(results[self.leagues[0].id]["status"], "executed")
+        self.assertEqual(results[self.leagues[1].id]["error"], "No squads in this league.")
+        self.assertEqual(progress, [(1, 2, "executed"), (2, 2, "failed")])
+
+    def test_command_prints_progress_and_summary(self):
+        out = StringIO()
+        call_command("execute_season_draft_window", self.window.id, dry_run=True, workers=1, stdout=out)
+
+        self.assertIn("[2/2] League 1", out.getvalue())
+        self.assertIn("2 dry run, 0 skipped, 0 failed", out.getvalue())
@@ -0,0 +1,38 @@
+from api.models import Player
+from api.services.identity_resolver import IdentityResolver
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class IdentityResolverTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.team_a.other_names = ["Old Team A"]
+        self.team_a.save()
+        self.resolver = IdentityResolver()
+
+    def test_lookups_are_case_insensitive_and_loaded_once(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.resolver.player_by_cricdata_id("BAT-1"), self.batter)
+            self.assertEqual(self.resolver.player_by_name("  bowler one"), self.bowler)
+            self.assertEqual(self.resolver.team_by_name("team a"), self.team_a)
+            self.assertEqual(self.resolver.team_by_name("b"), self.team_b)
+            self.assertEqual(self.resolver.team_by_name("OLD TEAM A"), self.team_a)
+            self.assertIsNone(self.resolver.player_by_name("Nobody"))
+
+    def test_player_save_invalidates_loaded_indexes(self):
+        self.assertIsNone(self.resolver.player_by_name("New Player"))
+
+        Player.objects.create(name="New Player", cricdata_id="new-1")
+
+        self.assertEqual(self.resolver.player_by_cricdata_id("new-1").name, "New Player")
+
+    def test_service_backfills_cricdata_id_for_name_matches(self):
+        Player.objects.filter(id=self.batter.id).update(cricdata_id=None)
+        self.service.resolver = IdentityResolver()
+
+        player = self.service._find_player_by_cricdata_id("bat-9", "BATTER ONE")
+
+        self.assertEqual(player.id, self.batter.id)
+        self.batter.refresh_from_db()
+        self.assertEqual(self.batter.cricdata_id, "bat-9")
+        self.assertEqual(self.service._find_player_by_cricdata_id("bat-9", None).id, self.batter.id)
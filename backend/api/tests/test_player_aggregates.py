@@ -0,0 +1,224 @@
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import (
+    FantasyPlayerEvent,
+    LeaguePlayerAggregate,
+    Player,
+    PlayerMatchEvent,
+    PlayerSeasonAggregate,
+    PlayerSeasonTeam,
+    SquadPlayerAggregate,
+)
+from api.services.draft_window_service import _default_order_for_players
+from api.services import player_aggregates
+from api.services.player_aggregates import refresh_fantasy_aggregates
+from api.tests import test_cricket_data_service
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class PlayerSeasonAggregateTests(CricketDataServiceTestCase):
+    _scorecard = test_cricket_data_service.UpdateMatchPointsDiffTests._scorecard
+
+    def setUp(self):
+        super().setUp()
+        self.match.cricdata_id = "m1"
+        self.match.save()
+        cache.clear()
+
+    def _expected(self, player):
+        return PlayerMatchEvent.objects.filter(player=player, match__season=self.season).aggregate(
+            matches=Count("id"), total_points=Sum("total_points_all"), bat_runs=Sum("bat_runs"),
+            bowl_wickets=Sum("bowl_wickets"),
+        )
+
+    def _row(self, player):
+        return PlayerSeasonAggregate.objects.filter(player=player, season=self.season).values(
+            "matches", "total_points", "bat_runs", "bowl_wickets",
+        ).first()
+
+    def test_ingest_keeps_rows_in_step_with_events(self):
+        self.service.update_match_points("m1", match_data=self._scorecard())
+        self.assertEqual(self._row(self.batter), self._expected(self.batter))
+        self.assertEqual(self._row(self.bowler), self._expected(self.bowler))
+
+        self.service.update_match_points("m1", match_data=self._scorecard(bat_runs=55))
+        self.assertEqual(self._row(self.batter)["bat_runs"], 55)
+        self.assertEqual(self._row(self.batter), self._expected(self.batter))
+
+    def test_event_saves_and_deletes_refresh_the_players_row(self):
+        second = self._create_match(2, datetime(2026, 3, 27, 19, 30))
+        self._create_event(self.batter, bat_runs=10, bat_balls=8)
+        event = self._create_event(self.batter, match=second, bat_runs=40, bat_balls=25)
+
+        row = PlayerSeasonAggregate.objects.get(player=self.batter, season=self.season)
+        self.assertEqual((row.matches, row.bat_runs, row.bat_balls), (2, 50, 33))
+        self.assertEqual(row.avg_points, row.total_points / 2)
+
+        event.delete()
+        self.assertEqual(self._row(self.batter), self._expected(self.batter))
+
+        PlayerMatchEvent.objects.filter(player=self.batter).delete()
+        self.assertFalse(PlayerSeasonAggregate.objects.filter(player=self.batter).exists())
+
+    def test_admin_writes_refresh_once_per_batch(self):
+        second = self._create_match(2, datetime(2026, 3, 27, 19, 30))
+        events = [
+            self._create_event(self.batter, bat_runs=10, bat_balls=8),
+            self._create_event(self.batter, match=second, bat_runs=40, bat_balls=25),
+            self._create_event(self.bowler, bowl_balls=24, bowl_runs=20, bowl_wickets=3),
+        ]
+        model_admin = admin.site._registry[PlayerMatchEvent]
+        request = RequestFactory().post("/")
+        request.user = User.objects.create_superuser(username="staff", password="pass123")
+        request._messages = CookieStorage(request)
+
+        with mock.patch(
+            "api.services.player_aggregates.refresh_player_season_aggregates",
+            wraps=player_aggregates.refresh_player_season_aggregates,
+        ) as refresh, mock.patch("api.signals.refresh_player_season_aggregates") as per_row:
+            event = PlayerMatchEvent.objects.get(id=events[0].id)
+            event.bat_runs = 30
+            model_admin.save_model(request, event, form=None, change=True)
+            self.assertEqual(refresh.call_count, 1)
+            self.assertEqual(self._row(self.batter)["bat_runs"], 70)
+
+            model_admin.delete_queryset(request, PlayerMatchEvent.objects.filter(id__in=[e.id for e in events[1:]]))
+            self.assertEqual(refresh.call_count, 2)
+        per_row.assert_not_called()
+        self.assertEqual(self._row(self.batter), self._expected(self.batter))
+        self.assertFalse(PlayerSeasonAggregate.objects.filter(player=self.bowler).exists())
+
+    def test_backfill_command_rebuilds_missing_rows(self):
+        self._create_event(self.batter, bat_runs=10, bat_balls=8)
+        self._create_event(self.bowler, bowl_balls=24, bowl_runs=20, bowl_wickets=3)
+        PlayerSeasonAggregate.objects.all().delete()
+
+        out = StringIO()
+        call_command("backfill_player_aggregates", season_id=self.season.id, stdout=out)
+
+        self.assertIn("Rebuilt 2 player aggregates", out.getvalue())
+        self.assertEqual(self._row(self.bowler), self._expected(self.bowler))
+
+    def test_draft_order_and_history_read_the_aggregates(self):
+        self._create_event(self.batter, bat_runs=10, bat_balls=8)
+        self._create_event(self.bowler, bowl_balls=24, bowl_runs=20, bowl_wickets=3)
+        spare = Player.objects.create(name="Spare", role=Player.Role.BOWLER)
+
+        self.assertEqual(
+            _default_order_for_players(self.leagues[0], [spare.id, self.batter.id, self.bowler.id])[:2],
+            [self.bowler.id, self.batter.id],
+        )
+
+        client = APIClient()
+        client.force_authenticate(self.squads[0].user)
+        self.match.status = self.match.Status.COMPLETED
+        self.match.save()
+        response = client.get(f"/api/players/{self.bowler.id}/history/")
+        self.assertEqual(response.status_code, 200)
+        (season,) = response.data["seasonStats"]
+        self.assertEqual((season["year"], season["matches"], season["wickets"]), (2026, 1, 3))
+        self.assertEqual(season["economy"], 5.0)
+
+    def test_league_players_reads_one_row_per_player_season(self):
+        for player in (self.batter, self.bowler):
+            PlayerSeasonTeam.objects.create(player=player, team=self.team_a, season=self.season)
+        self._create_event(self.batter, bat_runs=10, bat_balls=8)
+
+        client = APIClient()
+        client.force_authenticate(self.squads[0].user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f"/api/leagues/{self.leagues[0].id}/players/?no_cache=1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if PlayerMatchEvent._meta.db_table in query["sql"]])
+        by_id = {player["id"]: player for player in response.data}
+        self.assertEqual(by_id[self.batter.id]["matches"], 1)
+        self.assertEqual(by_id[self.bowler.id]["matches"], 0)
+
+
+class SquadPlayerAggregateTests(CricketDataServiceTestCase):
+    _scorecard = test_cricket_data_service.UpdateMatchPointsDiffTests._scorecard
+
+    def setUp(self):
+        super().setUp()
+        self.match.cricdata_id = "m1"
+        self.match.save()
+        self.service.update_match_points("m1", match_data=self._scorecard())
+        self.batter_event = PlayerMatchEvent.objects.get(player=self.batter, match=self.match)
+
+    def test_ingest_fills_squad_and_league_rows(self):
+        row = SquadPlayerAggregate.objects.get(fantasy_squad=self.squads[0], player=self.batter)
+        fantasy_event = FantasyPlayerEvent.objects.get(fantasy_squad=self.squads[0], match_event=self.batter_event)
+        self.assertEqual(
+            (row.matches, row.base_points, row.boost_points),
+            (1, self.batter_event.total_points_all, fantasy_event.boost_points),
+        )
+        self.assertFalse(SquadPlayerAggregate.objects.filter(fantasy_squad=self.squads[1], player=self.batter).exists())
+
+        league_row = LeaguePlayerAggregate.objects.get(league=self.leagues[0], player=self.batter)
+        self.assertEqual((league_row.matches, league_row.base_points), (1, self.batter_event.total_points_all))
+
+        self.service.update_match_points("m1", match_data=self._scorecard(bat_runs=55))
+        self.batter_event.refresh_from_db()
+        row.refresh_from_db()
+        self.assertEqual(row.base_points, self.batter_event.total_points_all)
+
+    def test_fantasy_event_delete_drops_the_row(self):
+        FantasyPlayerEvent.objects.filter(fantasy_squad=self.squads[0], match_event=self.batter_event).delete()
+
+        self.assertFalse(SquadPlayerAggregate.objects.filter(fantasy_squad=self.squads[0], player=self.batter).exists())
+        self.assertFalse(LeaguePlayerAggregate.objects.filter(league=self.leagues[0], player=self.batter).exists())
+        self.assertTrue(LeaguePlayerAggregate.objects.filter(league=self.leagues[1], player=self.batter).exists())
+
+    def test_fix_points_refreshes_once_after_rewriting_boosts(self):
+        FantasyPlayerEvent.objects.filter(match_event=self.batter_event).update(boost_points=5)
+        refresh_fantasy_aggregates([self.squads[0].id, self.squads[2].id])
+
+        with mock.patch("api.signals.refresh_fantasy_aggregates") as per_row, mock.patch(
+            "api.management.commands.fix_points.refresh_fantasy_aggregates", wraps=refresh_fantasy_aggregates
+        ) as batched:
+            call_command("fix_points", stdout=StringIO())
+
+        per_row.assert_not_called()
+        batched.assert_called_once()
+        row = SquadPlayerAggregate.objects.get(fantasy_squad=self.squads[0], player=self.batter)
+        self.assertEqual(row.boost_points, 0)
+        league_row = LeaguePlayerAggregate.objects.get(league=self.leagues[1], player=self.batter)
+        self.assertEqual(league_row.boost_points, 0)
+
+    def test_squad_player_events_reads_only_aggregates(self):
+        FantasyPlayerEvent.objects.filter(fantasy_squad=self.squads[0]).update(boost_points=7.5)
+        refresh_fantasy_aggregates([self.squads[0].id])
+        spare = Player.objects.create(name="Spare", role=Player.Role.BOWLER)
+        self.squads[0].current_squad = [self.batter.id, spare.id]
+        self.squads[0].save()
+
+        client = APIClient()
+        client.force_authenticate(self.squads[0].user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f"/api/squads/{self.squads[0].id}/player-events/")
+
+        self.assertEqual(response.status_code, 200)
+        for table in (PlayerMatchEvent._meta.db_table, FantasyPlayerEvent._meta.db_table):
+            self.assertFalse([query for query in queries if table in query["sql"]])
+        base = float(self.batter_event.total_points_all)
+        self.assertEqual(
+            response.data["squad_stats"][self.batter.id],
+            {"player_id": self.batter.id, "matches_played": 1, "base_points": base, "boost_points": 7.5},
+        )
+        self.assertEqual(response.data["squad_stats"][spare.id]["matches_played"], 0)
+        self.assertEqual(response.data["total_stats"][self.batter.id]["boost_points"], 7.5)
+        self.assertEqual(response.data["total_stats"][self.batter.id]["base_points"], base)
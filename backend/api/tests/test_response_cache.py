@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+
+from api.services import response_cache
+from api.services.cache_invalidation import invalidate_league_caches, league_squads_key
+from api.services.data_versions import league_token
+from api.services.response_cache import SingleFlightFill, get_metrics
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class SingleFlightFillTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _fill(self, **kwargs):
+        return SingleFlightFill("league_squads", "payload_v2", "payload_stale", **kwargs)
+
+    def test_first_request_fills_and_later_ones_hit(self):
+        filler = self._fill()
+        self.assertIsNone(filler.get())
+        filler.set({"v": 2}, 60)
+
+        self.assertEqual(self._fill().get(), {"v": 2})
+        self.assertIsNone(cache.get("payload_v2:lock"))
+        counts = get_metrics(["league_squads"])["league_squads"]
+        self.assertEqual((counts["miss"], counts["hit"]), (1, 1))
+
+    def test_concurrent_request_serves_stale_while_another_worker_fills(self):
+        cache.set("payload_stale", {"v": 1})
+        filler = self._fill()
+        self.assertIsNone(filler.get())
+
+        other = self._fill()
+        self.assertEqual(other.get(), {"v": 1})
+        self.assertEqual(other.headers["Cache-Control"], "no-store")
+        self.assertFalse(other.locked)
+
+        filler.set({"v": 2}, 60)
+        self.assertEqual(self._fill().get(), {"v": 2})
+        self.assertEqual(cache.get("payload_stale"), {"v": 2})
+
+    def test_request_without_stale_copy_waits_for_the_filler(self):
+        filler = self._fill()
+        self.assertIsNone(filler.get())
+
+        # The filler finishes while the second worker sleeps
+        with mock.patch.object(response_cache.time, "sleep", side_effect=lambda _: filler.set({"v": 2}, 60)):
+            self.assertEqual(self._fill().get(), {"v": 2})
+        self.assertEqual(get_metrics(["league_squads"])["league_squads"]["wait"], 1)
+
+    def test_waiter_takes_over_when_the_filler_fails(self):
+        filler = self._fill()
+        self.assertIsNone(filler.get())
+
+        waiter = self._fill()
+        with mock.patch.object(response_cache.time, "sleep", side_effect=lambda _: filler.release()):
+            self.assertIsNone(waiter.get())
+        self.assertTrue(waiter.locked)
+
+    def test_cache_stats_command_reports_counts(self):
+        filler = self._fill()
+        filler.get()
+        filler.set({"v": 2}, 60)
+        self._fill().get()
+
+        out = StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+
+        self.assertIn("league_squads: hit=1 miss=1 stale=0 wait=0 served_from_cache=50.0%", out.getvalue())
+        self.assertEqual(get_metrics(["league_squads"])["league_squads"]["hit"], 0)
+
+
+class LeagueSquadsSingleFlightTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.squads[0].user)
+        self.league = self.leagues[0]
+        self.url = f"/api/leagues/{self.league.id}/squads/"
+
+    def test_stale_payload_is_served_without_the_fresh_etag(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        invalidate_league_caches([self.league.id])
+        # Another worker is rebuilding the new version
+        fresh_key = league_squads_key(self.league.id, league_token(self.league.id))
+        cache.add(f"{fresh_key}:lock", 1)
+
+        stale = self.client.get(self.url)
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.data, first.data)
+        self.assertEqual(stale["Cache-Control"], "no-store")
+        self.assertEqual(stale["ETag"], 'W/"stale"')
+        self.assertNotEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=stale["ETag"]).status_code, 304)
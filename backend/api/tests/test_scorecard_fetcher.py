@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase
+
+from api.services.scorecard_fetcher import ScorecardFetcher
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class StubScorecardServer:
+    """Local CricketData stand-in. Behaviour is chosen by the requested match id."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                match_id = parse_qs(urlparse(self.path).query)["id"][0]
+                with stub.lock:
+                    stub.requests.append(match_id)
+                    attempt = stub.requests.count(match_id)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    if match_id == "slow":
+                        time.sleep(1)
+                    if match_id == "limited" and attempt == 1:
+                        self._send(429, {"status": "failure"}, {"Retry-After": "0"})
+                        return
+                    info = {"hitsToday": 100, "hitsLimit": 100} if match_id == "quota" else {"hitsToday": 1, "hitsLimit": 100}
+                    if match_id == "missing":
+                        self._send(200, {"status": "failure", "reason": "Match not found", "info": info})
+                        return
+                    self._send(200, {"status": "success", "data": {"id": match_id}, "info": info})
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def _send(self, code, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ScorecardFetcherTests(SimpleTestCase):
+    def test_fetch_many_bounds_parallelism(self):
+        with StubScorecardServer() as stub:
+            fetcher = ScorecardFetcher(stub.url, "key", max_workers=3)
+            scorecards = fetcher.fetch_many([f"m{index}" for index in range(9)])
+
+        self.assertEqual(list(scorecards), [f"m{index}" for index in range(9)])
+        self.assertTrue(all(card["data"]["id"] == match_id for match_id, card in scorecards.items()))
+        self.assertEqual(stub.max_in_flight, 3)
+
+    def test_rate_limited_request_is_retried_after_retry_after(self):
+        with StubScorecardServer() as stub:
+            fetcher = ScorecardFetcher(stub.url, "key")
+            scorecard = fetcher.fetch("limited")
+
+        self.assertEqual(scorecard["data"]["id"], "limited")
+        self.assertEqual(stub.requests, ["limited", "limited"])
+
+    def test_timeouts_and_api_failures_return_none(self):
+        with StubScorecardServer(delay=0) as stub:
+            fetcher = ScorecardFetcher(stub.url, "key", timeout=0.2, max_retries=0)
+            scorecards = fetcher.fetch_many(["slow", "missing", "ok"])
+
+        self.assertIsNone(scorecards["slow"])
+        self.assertIsNone(scorecards["missing"])
+        self.assertEqual(scorecards["ok"]["data"]["id"], "ok")
+
+    def test_exhausted_quota_stops_further_requests(self):
+        with StubScorecardServer() as stub:
+            fetcher = ScorecardFetcher(stub.url, "key", max_workers=1)
+            scorecards = fetcher.fetch_many(["quota", "m1", "m2"])
+
+        self.assertIsNotNone(scorecards["quota"])
+        self.assertEqual(stub.requests, ["quota"])
+        self.assertIsNone(scorecards["m1"])
+        self.assertTrue(fetcher.quota_exhausted)
+
+
+class UpdateAllEligibleMatchesTests(CricketDataServiceTestCase):
+    def test_fetches_concurrently_then_applies_each_match_in_turn(self):
+        second = self._create_match(2, datetime(2026, 3, 27, 19, 30))
+        third = self._create_match(3, datetime(2026, 3, 29, 19, 30))
+        for match, cricdata_id in ((self.match, "m1"), (second, "missing"), (third, "m3")):
+            match.cricdata_id = cricdata_id
+            match.save()
+
+        with StubScorecardServer() as stub:
+            self.service._fetcher = ScorecardFetcher(stub.url, "key", max_workers=3)
+            with mock.patch.object(
+                self.service, "update_match_points", side_effect=lambda cricdata_id, match_data: {"match": cricdata_id}
+            ) as update:
+                results = self.service.update_all_eligible_matches()
+
+        self.assertEqual(stub.max_in_flight, 3)
+        self.assertEqual([call.args[0] for call in update.call_args_list], ["m1", "m3"])
+        self.assertEqual(update.call_args_list[0].kwargs["match_data"]["data"]["id"], "m1")
+        self.assertEqual(results[1], {"match": second.id, "error": "Failed to fetch match data"})
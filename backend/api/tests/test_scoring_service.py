@@ -0,0 +1,291 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import (
+    Competition,
+    Match,
+    Player,
+    PlayerMatchEvent,
+    Season,
+    SeasonTeam,
+    Team,
+)
+from api.services.scoring_service import (
+    BOOST_CATEGORIES,
+    POINT_FIELDS,
+    boost_points,
+    build_columns,
+    recalculate_event_points,
+    score_boost_components,
+    score_rows,
+)
+
+
+def reference_points(row):
+    """Row-at-a-time Decimal rules the engine has to reproduce."""
+    batting = 0
+    if row["bat_runs"] is not None:
+        runs = row["bat_runs"]
+        batting = runs + (row["bat_fours"] or 0) + 2 * (row["bat_sixes"] or 0)
+        batting += 8 if runs >= 50 else 0
+        batting += 16 if runs >= 100 else 0
+        balls = row["bat_balls"] or 0
+        if balls >= 10:
+            sr = (Decimal(runs) / Decimal(balls) * 100).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+            if sr >= 200:
+                batting += 6
+            elif sr >= 175:
+                batting += 4
+            elif sr >= 150:
+                batting += 2
+            elif sr < 50:
+                batting -= 6
+            elif sr < 75:
+                batting -= 4
+            elif sr < 100:
+                batting -= 2
+        if runs == 0 and not row["bat_not_out"] and row["player_role"] != "BOWL":
+            batting -= 2
+
+    bowling = 0
+    if row["bowl_wickets"] is not None or row["bowl_maidens"] is not None:
+        wickets = row["bowl_wickets"] or 0
+        bowling = wickets * 25 + (row["bowl_maidens"] or 0) * 8
+        bowling += 8 if wickets >= 3 else 0
+        bowling += 16 if wickets >= 5 else 0
+        balls = row["bowl_balls"] or 0
+        if balls >= 10 and row["bowl_runs"] is not None:
+            eco = (Decimal(row["bowl_runs"]) / (Decimal(balls) / 6)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            if eco < 5:
+                bowling += 6
+            elif eco < 6:
+                bowling += 4
+            elif eco < 7:
+                bowling += 2
+            elif eco >= 12:
+                bowling -= 6
+            elif eco >= 11:
+                bowling -= 4
+            elif eco >= 10:
+                bowling -= 2
+
+    fielding = (
+        (row["wk_stumping"] or 0) * 12
+        + (row["field_catch"] or 0) * 8
+        + (row["wk_catch"] or 0) * 8
+        + (row["run_out_solo"] or 0) * 8
+        + (row["run_out_collab"] or 0) * 4
+    )
+    other = (50 if row["player_of_match"] else 0) + 4
+    return {
+        "batting_points_total": batting,
+        "bowling_points_total": bowling,
+        "fielding_points_total": fielding,
+        "other_points_total": other,
+        "total_points_all": batting + bowling + fielding + other,
+    }
+
+
+def reference_boost_points(row, total_points_all, multipliers):
+    """Category-by-category boost rules the stored components have to reproduce."""
+    m = {category: multiplier - 1.0 for category, multiplier in multipliers.items()}
+    runs = row["bat_runs"] or 0
+    boost = runs * m["runs"] + (row["bat_fours"] or 0) * m["fours"] + 2 * (row["bat_sixes"] or 0) * m["sixes"]
+    boost += ((16 if runs >= 100 else 0) + (8 if runs >= 50 else 0)) * m["bat_milestones"]
+    balls = row["bat_balls"] or 0
+    if balls >= 10 and row["bat_runs"] is not None:
+        sr = (Decimal(runs) / Decimal(balls) * 100).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+        bonus = 6 if sr >= 200 else 4 if sr >= 175 else 2 if sr >= 150 else -6 if sr < 50 else -4 if sr < 75 else -2 if sr < 100 else 0
+        boost += bonus * m["sr"]
+
+    wickets = row["bowl_wickets"] or 0
+    boost += wickets * 25 * m["wickets"] + (row["bowl_maidens"] or 0) * 8 * m["maidens"]
+    boost += ((16 if wickets >= 5 else 0) + (8 if wickets >= 3 else 0)) * m["bowl_milestones"]
+    balls = row["bowl_balls"] or 0
+    if balls >= 10 and row["bowl_runs"] is not None:
+        eco = (Decimal(row["bowl_runs"]) / (Decimal(balls) / 6)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        bonus = 6 if eco < 5 else 4 if eco < 6 else 2 if eco < 7 else -6 if eco >= 12 else -4 if eco >= 11 else -2 if eco >= 10 else 0
+        boost += bonus * m["economy"]
+
+    boost += (row["wk_stumping"] or 0) * 12 * m["stumpings"]
+    boost += ((row["field_catch"] or 0) + (row["wk_catch"] or 0)) * 8 * m["catches"]
+    boost += ((row["run_out_solo"] or 0) * 8 + (row["run_out_collab"] or 0) * 4) * m["run_outs"]
+    boost += (50 if row["player_of_match"] else 0) * m["potm"] + 4 * m["playing"]
+    return boost
+
+
+class BoostRole:
+    def __init__(self, multipliers):
+        for category, multiplier in multipliers.items():
+            setattr(self, f"multiplier_{category}", multiplier)
+
+
+def random_row(rng):
+    row = {
+        "bat_runs": rng.choice([None, 0, rng.randint(0, 140)]),
+        "bat_balls": rng.randint(0, 70),
+        "bat_fours": rng.randint(0, 12),
+        "bat_sixes": rng.randint(0, 10),
+        "bat_not_out": rng.choice([None, False, True]),
+        "bowl_balls": rng.randint(0, 24),
+        "bowl_maidens": rng.choice([None, 0, 1, 2]),
+        "bowl_runs": rng.choice([None, rng.randint(0, 60)]),
+        "bowl_wickets": rng.choice([None, rng.randint(0, 6)]),
+        "field_catch": rng.choice([None, rng.randint(0, 3)]),
+        "wk_catch": rng.randint(0, 2),
+        "wk_stumping": rng.randint(0, 2),
+        "run_out_solo": rng.randint(0, 1),
+        "run_out_collab": rng.randint(0, 1),
+        "player_of_match": rng.choice([None, False, True]),
+        "player_role": rng.choice([None, "BAT", "BOWL", "ALL", "WK"]),
+    }
+    return row
+
+
+class ScoringEngineTests(TestCase):
+    def test_engine_matches_reference_rules(self):
+        rng = random.Random(2024)
+        rows = [random_row(rng) for _ in range(3000)]
+        # Rounding boundaries: SR 99.96 -> 100.0 and economy 6.995 -> 7.00.
+        rows.append({**random_row(rng), "bat_runs": 2499, "bat_balls": 2500, "player_role": "BAT"})
+        rows.append({**random_row(rng), "bowl_runs": 1399, "bowl_balls": 1200, "bowl_wickets": 0})
+
+        points = score_rows(rows)
+
+        for index, row in enumerate(rows):
+            expected = reference_points(row)
+            actual = {field: int(points[field][index]) for field in POINT_FIELDS}
+            self.assertEqual(actual, expected, msg=f"row {row}")
+
+
+    def test_boost_points_from_components_match_reference_rules(self):
+        rng = random.Random(7)
+        rows = [random_row(rng) for _ in range(1000)]
+        components = score_boost_components(build_columns(rows))
+        totals = score_rows(rows)["total_points_all"]
+
+        for index, row in enumerate(rows):
+            multipliers = {category: rng.choice([1.0, 1.5, 2.0]) for category in BOOST_CATEGORIES}
+            expected = reference_boost_points(row, int(totals[index]), multipliers)
+            actual = boost_points(components[index].tolist(), int(totals[index]), BoostRole(multipliers))
+            if len(set(multipliers.values())) > 1:
+                self.assertAlmostEqual(actual, expected, places=6, msg=f"row {row}")
+
+        captain = BoostRole({category: 2.0 for category in BOOST_CATEGORIES})
+        self.assertEqual(boost_points(components[0].tolist(), int(totals[0]), captain), float(totals[0]))
+
+
+class ScoringWriteBackTests(TestCase):
+    def setUp(self):
+        competition = Competition.objects.create(
+            name="IPL",
+            format=Competition.Format.T20,
+            grade=Competition.Grade.FRANCHISE,
+        )
+        self.season = Season.objects.create(
+            competition=competition,
+            year=2026,
+            name="IPL 2026",
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=60),
+        )
+        self.team_a = Team.objects.create(
+            name="Team A", short_name="A", home_ground="A", city="A",
+            primary_color="#111111", secondary_color="#222222",
+        )
+        self.team_b = Team.objects.create(
+            name="Team B", short_name="B", home_ground="B", city="B",
+            primary_color="#333333", secondary_color="#444444",
+        )
+        SeasonTeam.objects.create(team=self.team_a, season=self.season)
+        SeasonTeam.objects.create(team=self.team_b, season=self.season)
+        self.match = Match.objects.create(
+            season=self.season,
+            match_number=1,
+            team_1=self.team_a,
+            team_2=self.team_b,
+            date=timezone.make_aware(datetime(2026, 4, 1, 19, 30)),
+            venue="Ground",
+        )
+        self.batter = Player.objects.create(name="Batter", role=Player.Role.BATSMAN)
+
+    def test_save_scores_event_with_engine(self):
+        event = PlayerMatchEvent.objects.create(
+            player=self.batter,
+            match=self.match,
+            for_team=self.team_a,
+            vs_team=self.team_b,
+            bat_runs=52,
+            bat_balls=26,
+            bat_fours=5,
+            bat_sixes=3,
+            bowl_wickets=None,
+            bowl_maidens=None,
+        )
+        # 52 runs + 5 fours + 6 six bonus + 8 fifty + 6 strike rate (200.0)
+        self.assertEqual(event.batting_points_total, 77)
+        self.assertEqual(event.bowling_points_total, 0)
+        self.assertEqual(event.total_points_all, 81)
+        self.assertEqual(event.bat_points, 77)
+        components = dict(zip(BOOST_CATEGORIES, event.boost_components))
+        self.assertEqual((components["runs"], components["sixes"], components["sr"]), (52, 6, 6))
+
+    def test_point_breakdowns_score_once_until_an_input_changes(self):
+        event = PlayerMatchEvent(
+            player=self.batter, match=self.match, for_team=self.team_a, vs_team=self.team_b,
+            bat_runs=52, bat_balls=26,
+        )
+        with mock.patch("api.services.scoring_service.score_rows", wraps=score_rows) as scored:
+            breakdown = (event.bat_points, event.bowl_points, event.field_points, event.other_points)
+            self.assertEqual(event.base_points, sum(breakdown))
+            self.assertEqual(scored.call_count, 1)
+
+            event.bat_runs = 100
+            self.assertGreater(event.bat_points, breakdown[0])
+            self.assertEqual(scored.call_count, 2)
+
+    def test_recalculate_event_points_bulk_updates_stale_rows(self):
+        event = PlayerMatchEvent.objects.create(
+            player=self.batter,
+            match=self.match,
+            for_team=self.team_a,
+            vs_team=self.team_b,
+            bat_runs=10,
+            bat_balls=8,
+        )
+        expected_total = event.total_points_all
+        PlayerMatchEvent.objects.filter(id=event.id).update(total_points_all=0, batting_points_total=0)
+
+        summary = recalculate_event_points(PlayerMatchEvent.objects.all(), batch_size=1)
+
+        event.refresh_from_db()
+        self.assertEqual(summary, {"processed": 1, "updated": 1})
+        self.assertEqual(event.total_points_all, expected_total)
+        self.assertEqual(
+            recalculate_event_points(PlayerMatchEvent.objects.all()),
+            {"processed": 1, "updated": 0},
+        )
+
+    def test_recalculate_event_points_commits_each_batch(self):
+        events = [
+            PlayerMatchEvent.objects.create(
+                player=self.batter, match=self.match, for_team=self.team_a, vs_team=self.team_b,
+                bat_runs=runs, bat_balls=8,
+            )
+            for runs in (10, 20)
+        ]
+        expected = {event.id: event.total_points_all for event in events}
+        PlayerMatchEvent.objects.update(total_points_all=0, batting_points_total=0)
+
+        with mock.patch(
+            "api.services.boost_memo.invalidate_boost_memo", side_effect=[None, RuntimeError("boom")]
+        ), self.assertRaises(RuntimeError):
+            recalculate_event_points(PlayerMatchEvent.objects.all(), batch_size=1)
+
+        stored = dict(PlayerMatchEvent.objects.values_list("id", "total_points_all"))
+        self.assertEqual(stored, {events[0].id: expected[events[0].id], events[1].id: 0})
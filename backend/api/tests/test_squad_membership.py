@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.db.models import RestrictedError
+from django.utils import timezone
+
+from api.models import FantasyTrade, Match, Player, PlayerSeasonTeam, SquadMembership
+from api.services.player_replacement_service import apply_ruled_out_replacement
+from api.services.squad_membership import owned_player_ids, sync_squad_memberships
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+from api.views import process_trade
+
+
+class SquadMembershipTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.next_match = self._create_match(2, (timezone.now() + timedelta(days=2)).replace(tzinfo=None))
+        self.next_match.status = Match.Status.SCHEDULED
+        self.next_match.save()
+
+    def test_squad_saves_open_memberships(self):
+        memberships = SquadMembership.objects.filter(left_at__isnull=True)
+        self.assertEqual(memberships.count(), 4)
+        self.assertEqual(
+            set(memberships.filter(player=self.batter).values_list("fantasy_squad_id", flat=True)),
+            {self.squads[0].id, self.squads[2].id},
+        )
+        self.assertEqual(sorted(owned_player_ids(self.leagues[0].id)), sorted([self.batter.id, self.bowler.id]))
+
+    def test_trade_closes_after_started_match_and_opens_at_next(self):
+        trade = FantasyTrade.objects.create(
+            initiator=self.squads[0],
+            receiver=self.squads[1],
+            players_given=[self.batter.id],
+            players_received=[self.bowler.id],
+            status="Accepted",
+        )
+        process_trade(trade)
+
+        closed = SquadMembership.objects.get(fantasy_squad=self.squads[0], player=self.batter)
+        self.assertIsNotNone(closed.left_at)
+        self.assertEqual(closed.to_match_id, self.match.id)
+        self.assertEqual(closed.to_phase_id, self.phase.id)
+
+        opened = SquadMembership.objects.get(fantasy_squad=self.squads[1], player=self.batter)
+        self.assertEqual(opened.source, SquadMembership.Source.TRADE)
+        self.assertEqual(opened.from_match_id, self.next_match.id)
+        self.assertIsNone(opened.left_at)
+
+        # The live match stays with the squads that fielded the player; later matches follow the trade
+        self.assertEqual(
+            sorted(self.service._build_squad_player_index(self.match)[self.batter.id]),
+            [self.squads[0].id, self.squads[2].id],
+        )
+        self.assertEqual(
+            sorted(self.service._build_squad_player_index(self.next_match)[self.batter.id]),
+            [self.squads[1].id, self.squads[2].id],
+        )
+        self.assertEqual(
+            sorted(owned_player_ids(self.leagues[0].id, include_past=True)),
+            sorted([self.batter.id, self.bowler.id]),
+        )
+
+    def test_player_joining_after_the_last_started_match_only_covers_later_matches(self):
+        self.next_match.delete()
+        self.squads[1].current_squad = [self.bowler.id, self.batter.id]
+        self.squads[1].save()
+
+        joined = SquadMembership.objects.get(fantasy_squad=self.squads[1], player=self.batter)
+        self.assertIsNone(joined.from_match_id)
+        self.assertEqual(joined.after_match_id, self.match.id)
+        self.assertNotIn(self.squads[1].id, self.service._build_squad_player_index(self.match)[self.batter.id])
+
+        later = self._create_match(3, (timezone.now() + timedelta(days=3)).replace(tzinfo=None))
+        self.assertIn(self.squads[1].id, self.service._build_squad_player_index(later)[self.batter.id])
+
+    def test_matches_bounding_a_spell_cannot_be_deleted_on_their_own(self):
+        self.squads[0].current_squad = []
+        self.squads[0].save()
+
+        with self.assertRaises(RestrictedError):
+            self.match.delete()
+
+        self.season.delete()
+        self.assertFalse(SquadMembership.objects.exists())
+
+    def test_resync_is_a_no_op(self):
+        self.assertEqual(sync_squad_memberships(self.squads), (0, 0))
+
+    def test_replacement_joins_owning_squads(self):
+        replacement = Player.objects.create(name="Replacement", role=Player.Role.BATSMAN)
+        mapping = PlayerSeasonTeam.objects.create(
+            player=self.batter,
+            season=self.season,
+            team=self.team_a,
+            ruled_out=True,
+            replacement=replacement,
+        )
+
+        result = apply_ruled_out_replacement(mapping)
+
+        self.assertEqual(result["squads_updated"], 2)
+        memberships = SquadMembership.objects.filter(player=replacement)
+        self.assertEqual(
+            set(memberships.values_list("fantasy_squad_id", flat=True)),
+            {self.squads[0].id, self.squads[2].id},
+        )
+        self.assertTrue(all(m.source == SquadMembership.Source.REPLACEMENT for m in memberships))
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+
+from api.models import FantasyStats, Match, StatsJob
+from api.services.stats_job_service import (
+    claim_next_job,
+    enqueue_stats_jobs,
+    queue_status,
+    requeue_stale_jobs,
+    retry_failed_jobs,
+    run_job,
+    submit_stats_jobs,
+)
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class StatsJobQueueTests(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.league_ids = [league.id for league in self.leagues]
+
+    def test_match_completion_enqueues_one_job_per_league_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.match.status = Match.Status.COMPLETED
+            self.match.save()
+        self.assertEqual(enqueue_stats_jobs(self.league_ids, match_id=self.match.id), 0)
+
+        jobs = StatsJob.objects.filter(match=self.match)
+        self.assertEqual(sorted(jobs.values_list('league_id', flat=True)), sorted(self.league_ids))
+        self.assertTrue(all(job.status == StatsJob.Status.PENDING for job in jobs))
+
+    @override_settings(STATS_JOBS_INLINE=True)
+    def test_jobs_run_inline_when_opted_in(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.match.status = Match.Status.COMPLETED
+            self.match.save()
+
+        jobs = StatsJob.objects.filter(match=self.match)
+        self.assertEqual(jobs.count(), len(self.league_ids))
+        self.assertTrue(all(job.status == StatsJob.Status.SUCCEEDED for job in jobs))
+        self.assertEqual(FantasyStats.objects.filter(league_id__in=self.league_ids).count(), len(self.league_ids))
+        self.assertEqual(submit_stats_jobs(self.league_ids, match_id=self.match.id), len(self.league_ids))
+
+    def test_jobs_for_the_same_league_are_claimed_one_at_a_time(self):
+        enqueue_stats_jobs(self.league_ids[:1], match_id=self.match.id)
+        enqueue_stats_jobs(self.league_ids[:1])
+
+        first = claim_next_job("worker-a")
+        self.assertEqual(first.status, StatsJob.Status.RUNNING)
+        self.assertEqual(first.attempts, 1)
+        self.assertIsNone(claim_next_job("worker-b"))
+
+        self.assertTrue(run_job(first))
+        second = claim_next_job("worker-b")
+        self.assertIsNotNone(second)
+        self.assertIsNone(second.match_id)
+        self.assertTrue(run_job(second))
+
+        self.assertTrue(FantasyStats.objects.filter(league_id=self.league_ids[0]).exists())
+        self.assertEqual(queue_status()["counts"][StatsJob.Status.SUCCEEDED], 2)
+
+    def test_failed_job_backs_off_then_fails_and_can_be_retried(self):
+        enqueue_stats_jobs(self.league_ids[:1], match_id=self.match.id)
+        job = StatsJob.objects.get()
+        job.max_attempts = 2
+        job.save()
+
+        with mock.patch(
+            "api.services.stats_job_service.update_fantasy_stats",
+            side_effect=RuntimeError("boom"),
+        ):
+            self.assertFalse(run_job(claim_next_job("worker")))
+            job.refresh_from_db()
+            self.assertEqual(job.status, StatsJob.Status.PENDING)
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIsNone(claim_next_job("worker"))
+
+            StatsJob.objects.filter(id=job.id).update(run_after=timezone.now())
+            self.assertFalse(run_job(claim_next_job("worker")))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, StatsJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.last_error, "RuntimeError: boom")
+        self.assertEqual(queue_status()["recent_failures"][0]["id"], job.id)
+
+        self.assertEqual(retry_failed_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (StatsJob.Status.PENDING, 0))
+
+    def test_stale_running_jobs_are_requeued(self):
+        enqueue_stats_jobs(self.league_ids[:1], match_id=self.match.id)
+        job = claim_next_job("dead-worker")
+        StatsJob.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_next_job("worker").id, job.id)
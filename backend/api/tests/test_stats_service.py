@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from api.models import FantasyStats, Match
+from api.services.stats_service import calculate_match_mvp_for_matches, update_fantasy_stats
+from api.tests.test_cricket_data_service import CricketDataServiceTestCase
+
+
+class StatsServiceTestCase(CricketDataServiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.league = self.leagues[0]
+        self.matches = [
+            self.match,
+            self._create_match(2, datetime(2026, 3, 27, 19, 30)),
+            self._create_match(3, datetime(2026, 3, 29, 19, 30)),
+        ]
+        stat_lines = [
+            ({"bat_runs": 45, "bat_balls": 30, "bat_fours": 4}, {"bowl_wickets": 1, "bowl_balls": 24, "bowl_runs": 30}),
+            ({"bat_runs": 8, "bat_balls": 12}, {"bowl_wickets": 3, "bowl_balls": 24, "bowl_runs": 22}),
+            ({"bat_runs": 71, "bat_balls": 40, "bat_sixes": 3}, {"bowl_wickets": 0, "bowl_balls": 18, "bowl_runs": 41}),
+        ]
+        for match, (batting, bowling) in zip(self.matches, stat_lines):
+            events = [self._create_event(self.batter, match, **batting), self._create_event(self.bowler, match, **bowling)]
+            fantasy_events = self.service._update_fantasy_events(match, events)
+            self.service._update_fantasy_match_events(match, fantasy_events)
+
+    def _complete(self, match):
+        Match.objects.filter(id=match.id).update(status=Match.Status.COMPLETED)
+
+    def _stored(self):
+        stats = FantasyStats.objects.get(league=self.league)
+        return stats.match_details, stats.player_details
+
+
+class FoldMatchIntoStatsTests(StatsServiceTestCase):
+    def test_folding_next_match_matches_full_rebuild(self):
+        for match in self.matches[:2]:
+            self._complete(match)
+        update_fantasy_stats(self.league.id)
+
+        self._complete(self.matches[2])
+        # Includes the two-query league data version bump on save
+        with self.assertNumQueries(10):
+            update_fantasy_stats(self.league.id, match_id=self.matches[2].id)
+        folded = self._stored()
+
+        update_fantasy_stats(self.league.id)
+        self.assertEqual(folded, self._stored())
+
+    def test_already_counted_match_falls_back_to_full_rebuild(self):
+        for match in self.matches:
+            self._complete(match)
+        update_fantasy_stats(self.league.id)
+        expected = self._stored()
+
+        update_fantasy_stats(self.league.id, match_id=self.matches[1].id)
+
+        self.assertEqual(self._stored(), expected)
+        stats = FantasyStats.objects.get(league=self.league)
+        self.assertEqual(stats.fold_state["match_ids"], sorted(match.id for match in self.matches))
+        self.assertEqual(len(stats.match_details["running_total"]["overall"]), 3)
+
+
+class LeagueStatsDataTests(StatsServiceTestCase):
+    def test_full_rebuild_query_count_does_not_grow_with_matches(self):
+        for match in self.matches:
+            self._complete(match)
+        FantasyStats.objects.create(league=self.league)
+
+        # League, stats row, four loader queries, the save and the data version bump.
+        with self.assertNumQueries(9):
+            stats = update_fantasy_stats(self.league.id)
+
+        self.assertEqual(len(stats.match_details["running_total"]["overall"]), 3)
+
+    def test_calculators_load_their_own_data_when_called_directly(self):
+        for match in self.matches:
+            self._complete(match)
+        stats = update_fantasy_stats(self.league.id)
+
+        matches = Match.objects.filter(id__in=[match.id for match in self.matches])
+        with self.assertNumQueries(4):
+            match_mvp = calculate_match_mvp_for_matches(league_id=self.league.id, matches=matches)
+
+        self.assertEqual(match_mvp, stats.player_details["match_mvp"]["overall"])
@@ -29,9 +29,13 @@ from .models import (
     FantasyPlayerEvent,
     FantasyBoostRole,
     PlayerMatchEvent,
+    PlayerSeasonAggregate,
+    SquadPlayerAggregate,
+    LeaguePlayerAggregate,
     FantasyTrade,
     FantasyMatchEvent,
     DraftWindowLeagueRun,
+    SquadMembership,
 )
 from .serializers import (
     CompetitionSerializer,
@@ -63,6 +67,17 @@ from django.db.models import Q, Prefetch, Count, Avg, Sum
 from functools import reduce
 from operator import or_
 from django.utils import timezone
+from api.services.cache_invalidation import (
+    VERSIONED_CACHE_TIMEOUT,
+    league_players_key,
+    league_players_stale_key,
+    league_squads_key,
+    league_squads_stale_key,
+    match_events_key,
+    player_history_key,
+)
+from api.services.data_versions import league_token, match_token
+from api.services.response_cache import SingleFlightFill
 from api.services.cricket_data_service import CricketDataService
 from api.services.draft_window_service import (
     resolve_draft_window,
@@ -75,6 +90,9 @@ from api.services.draft_window_service import (
     materialize_locked_phase_boosts_for_league,
 )
 from django.core.cache import cache
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .conditional import league_squads_etag, match_events_etag, match_standings_etag, match_standings_last_modified
 from django.db.models import F, Case, When, BooleanField, Value, DecimalField, ExpressionWrapper
 
 class SeasonViewSet(viewsets.ModelViewSet):
@@ -186,6 +204,13 @@ class IPLTeamViewSet(viewsets.ModelViewSet):
         serializer = PlayerTeamHistorySerializer(players, many=True)
         return Response(serializer.data)
 
+# PlayerSeasonAggregate columns behind each history seasonStats entry, in values_list order
+HISTORY_SEASON_FIELDS = (
+    'matches', 'runs', 'balls_faced', 'wickets', 'runs_conceded',
+    'balls_bowled', 'catches', 'runouts', 'total_points',
+)
+
+
 class IPLPlayerViewSet(viewsets.ModelViewSet):
     queryset = Player.objects.filter(is_active=True)
     serializer_class = IPLPlayerSerializer
@@ -208,47 +233,26 @@ class IPLPlayerViewSet(viewsets.ModelViewSet):
             player = self.get_object()
             
             # Try to get from cache first
-            cache_key = f'player_history_{player.id}'
+            cache_key = player_history_key(player.id)
             cached_data = cache.get(cache_key)
             if cached_data:
                 return Response(cached_data)
             
-            # Use efficient database-level aggregation for season stats
-            season_stats = PlayerMatchEvent.objects.filter(
-                player=player,
-                match__status__in=['COMPLETED', 'NO_RESULT']
-            ).values(
-                'match__season__year'
-            ).annotate(
-                year=F('match__season__year'),
-                matches=Count('id'),
-                runs=Sum('bat_runs'),
-                balls_faced=Sum('bat_balls'),
-                wickets=Sum('bowl_wickets'),
-                runs_conceded=Sum('bowl_runs'),
-                balls_bowled=Sum('bowl_balls'),
-                catches=Sum(
-                    Case(
-                        When(field_catch__isnull=False, then=F('field_catch')),
-                        default=0
-                    ) + 
-                    Case(
-                        When(wk_catch__isnull=False, then=F('wk_catch')),
-                        default=0
-                    )
-                ),
-                runouts=Sum(
-                    Case(
-                        When(run_out_solo__isnull=False, then=F('run_out_solo')),
-                        default=0
-                    ) +
-                    Case(
-                        When(run_out_collab__isnull=False, then=F('run_out_collab')),
-                        default=0
-                    )
-                ),
-                total_points=Sum('total_points_all')
-            ).order_by('-year')
+            # Season totals come from the materialized aggregates; seasons sharing a year are combined
+            season_stats = {}
+            aggregates = PlayerSeasonAggregate.objects.filter(player=player).values_list(
+                'season__year', 'matches', 'bat_runs', 'bat_balls', 'bowl_wickets',
+                'bowl_runs', 'bowl_balls', 'catches', 'run_outs', 'total_points',
+            )
+            for year, *totals in aggregates:
+                stat = season_stats.setdefault(year, {
+                    'match__season__year': year,
+                    'year': year,
+                    **{field: 0 for field in HISTORY_SEASON_FIELDS},
+                })
+                for field, value in zip(HISTORY_SEASON_FIELDS, totals):
+                    stat[field] += value
+            season_stats = [season_stats[year] for year in sorted(season_stats, reverse=True)]
             
             # Post-process to calculate rates that are complex in pure SQL
             for stat in season_stats:
@@ -397,6 +401,7 @@ class IPLMatchViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @method_decorator(condition(etag_func=match_events_etag))
     def events(self, request, pk=None):
         """Get all player events for a specific match with optimized queries"""
         try:
@@ -404,7 +409,7 @@ class IPLMatchViewSet(viewsets.ModelViewSet):
             league_id = request.query_params.get('league_id')
             
             # Define cache key
-            cache_key = f'match_events_{match.id}_{league_id or "no_league"}'
+            cache_key = match_events_key(match.id, league_id, match_token(match.id, league_id))
             cached_data = cache.get(cache_key)
             
             if cached_data:
@@ -427,7 +432,7 @@ class IPLMatchViewSet(viewsets.ModelViewSet):
                 if fantasy_events.exists():
                     serializer = FantasyPlayerEventSerializer(fantasy_events, many=True)
                     data = serializer.data
-                    cache.set(cache_key, data, 60 * 15)  # Cache for 15 minutes
+                    cache.set(cache_key, data, VERSIONED_CACHE_TIMEOUT)
                     return Response(data)
             
             # If no league_id or no fantasy events, return IPL events with an optimized query
@@ -440,7 +445,7 @@ class IPLMatchViewSet(viewsets.ModelViewSet):
             
             serializer = IPLPlayerEventSerializer(ipl_events, many=True)
             data = [{**item, 'player_id': item.pop('id')} for item in serializer.data]
-            cache.set(cache_key, data, 60 * 15)  # Cache for 15 minutes
+            cache.set(cache_key, data, VERSIONED_CACHE_TIMEOUT)
             return Response(data)
                 
         except Exception as e:
@@ -721,6 +726,7 @@ class LeagueViewSet(viewsets.ModelViewSet):
 
         """Get all players eligible for drafting in a league with optimized queries and caching"""
         start_time = time.time()
+        fill = None
         
         try:
             league = self.get_object()
@@ -737,15 +743,15 @@ class LeagueViewSet(viewsets.ModelViewSet):
                 return Response([])
             
             # Check cache first
-            cache_key = f'league_players_{league.id}_{season.id}'
+            cache_key = league_players_key(league.id, season.id, league_token(league.id, season.id))
             use_cache = request.query_params.get('no_cache', '0') != '1'
             
             if use_cache:
-                cached_data = cache.get(cache_key)
-                if cached_data:
-                    print(f"Cache hit for {cache_key}")
-                    return Response(cached_data)
-                print(f"Cache miss for {cache_key}")
+                # Only one worker rebuilds a missing entry; the rest serve the previous one
+                fill = SingleFlightFill('league_players', cache_key, league_players_stale_key(league.id, season.id))
+                cached_data = fill.get()
+                if cached_data is not None:
+                    return Response(cached_data, headers=fill.headers)
             
             # Get the last 4 seasons (including current)
             current_year = season.year
@@ -761,29 +767,13 @@ class LeagueViewSet(viewsets.ModelViewSet):
             players = Player.objects.filter(id__in=player_ids)
             print(f"Found {len(player_ids)} players in current season")
             
-            # 2. Efficiently get player stats by season with a single query
-            from django.db.models import Case, When, BooleanField, Value, DecimalField, ExpressionWrapper
-            
-            # Create a combined stats query with window functions
-            player_stats = PlayerMatchEvent.objects.filter(
+            # 2. Per-season totals from the materialized aggregates, one row per player-season
+            player_stats = PlayerSeasonAggregate.objects.filter(
                 player_id__in=player_ids,
-                match__season__year__in=past_seasons
-            ).values(
-                'player_id', 
-                'match__season__year'
-            ).annotate(
-                matches=Count('id'),
-                points=Sum('total_points_all'),
-                avg_points=ExpressionWrapper(
-                    Sum('total_points_all') * 1.0 / Count('id'), 
-                    output_field=DecimalField()
-                ),
-                has_qualifying_season=Case(
-                    When(matches__gte=4, then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField()
-                )
-            ).order_by('player_id', 'match__season__year')
+                season__year__in=past_seasons
+            ).values_list(
+                'player_id', 'season__year', 'matches', 'total_points'
+            ).order_by('player_id', 'season__year')
             
             # 3. Organize data by player
             player_data = {}
@@ -797,24 +787,21 @@ class LeagueViewSet(viewsets.ModelViewSet):
                     'avg_points': 0
                 }
             
-            # 4. Process stats
-            for stat in player_stats:
-                player_id = stat['player_id']
-                year = stat['match__season__year']
-                
-                # Add season data
-                player_data[player_id]['seasons'][year] = {
-                    'matches': stat['matches'],
-                    'points': stat['points'],
-                    'avg_points': stat['avg_points']
-                }
+            # 4. Process stats (seasons sharing a year count as one season)
+            for player_id, year, matches, points in player_stats:
+                season_data = player_data[player_id]['seasons'].setdefault(
+                    year, {'matches': 0, 'points': 0, 'avg_points': 0}
+                )
+                season_data['matches'] += matches
+                season_data['points'] += points
+                season_data['avg_points'] = season_data['points'] / season_data['matches']
                 
                 # Update totals
-                player_data[player_id]['total_matches'] += stat['matches']
-                player_data[player_id]['total_points'] += stat['points']
+                player_data[player_id]['total_matches'] += matches
+                player_data[player_id]['total_points'] += points
                 
                 # Check qualifying status
-                if stat['has_qualifying_season']:
+                if season_data['matches'] >= 4:
                     player_data[player_id]['has_qualifying_season'] = True
             
             # 5. Get player details and team info
@@ -888,9 +875,9 @@ class LeagueViewSet(viewsets.ModelViewSet):
                     'draft_position': None
                 })
             
-            # 9. Cache the result (30 minutes)
-            if use_cache:
-                cache.set(cache_key, response_data, 30 * 60)
+            # 9. Cache the result until the league or season data version moves
+            if fill:
+                fill.set(response_data, VERSIONED_CACHE_TIMEOUT)
             
             total_time = time.time() - start_time
             print(f"Players endpoint completed in {total_time:.2f} seconds")
@@ -899,6 +886,8 @@ class LeagueViewSet(viewsets.ModelViewSet):
 
         except Exception as e:
             import traceback
+            if fill:
+                fill.release()
             print(f"Error in players view: {str(e)}")
             print(traceback.format_exc())
             return Response(
@@ -1045,25 +1034,27 @@ class LeagueViewSet(viewsets.ModelViewSet):
     
 
     @action(detail=True, methods=['get'])
+    @method_decorator(condition(etag_func=league_squads_etag))
     def squads(self, request, pk=None):
         from django.core.cache import cache
         import time
         """Get all squads in a league with their players and draft data with optimized performance""" 
         start_time = time.time()
+        fill = None
         
         try:
             league = self.get_object()
             
             # Check cache first
-            cache_key = f'league_squads_v4_{league.id}'
+            cache_key = league_squads_key(league.id, league_token(league.id, league.season_id))
             use_cache = request.query_params.get('no_cache', '0') != '1'
             
             if use_cache:
-                cached_data = cache.get(cache_key)
-                if cached_data:
-                    print(f"Cache hit for {cache_key}")
-                    return Response(cached_data)
-                print(f"Cache miss for {cache_key}")
+                # Only one worker rebuilds a missing entry; the rest serve the previous one
+                fill = SingleFlightFill('league_squads', cache_key, league_squads_stale_key(league.id))
+                cached_data = fill.get()
+                if cached_data is not None:
+                    return Response(cached_data, headers=fill.headers)
             
             # 1. Efficiently get all squads in a single query with needed relations
             squads = FantasySquad.objects.filter(
@@ -1542,9 +1533,9 @@ class LeagueViewSet(viewsets.ModelViewSet):
                 'avg_mid_season_draft_ranks': mid_season_avg_ranks
             }
             
-            # 9. Cache the result (15 minutes)
-            if use_cache:
-                cache.set(cache_key, response_data, 15 * 60)
+            # 9. Cache the result until the league or season data version moves
+            if fill:
+                fill.set(response_data, VERSIONED_CACHE_TIMEOUT)
             
             total_time = time.time() - start_time
             print(f"Squads endpoint completed in {total_time:.2f} seconds")
@@ -1553,6 +1544,8 @@ class LeagueViewSet(viewsets.ModelViewSet):
         
         except Exception as e:
             import traceback
+            if fill:
+                fill.release()
             print(f"Error in league squads view: {str(e)}")
             print(traceback.format_exc())
             return Response(
@@ -1826,86 +1819,45 @@ def squad_players(request, squad_id):
 def squad_player_events(request, squad_id):
     """Get squad-scoped and season-total player stats for this squad view."""
     squad = get_object_or_404(FantasySquad, id=squad_id)
-    
-    # Get all unique player IDs that have ever had an event for this squad
-    player_ids_with_events = FantasyPlayerEvent.objects.filter(
-        fantasy_squad_id=squad_id
-    ).values_list('match_event__player_id', flat=True).distinct()
-    
-    # Add current squad players to ensure we include everyone
-    all_player_ids = set(list(player_ids_with_events) + (squad.current_squad or []))
-    
-    # Initialize squad-scoped stats for all players in current and historical squad.
-    squad_stats_dict = {
-        player_id: {
-            'player_id': player_id,
-            'matches_played': 0,
-            'base_points': 0,
-            'boost_points': 0
-        }
-        for player_id in all_player_ids
-    }
-    
-    # Aggregate stats for this specific fantasy squad only.
-    squad_stats = FantasyPlayerEvent.objects.filter(
-        fantasy_squad_id=squad_id,
-        match_event__player_id__in=all_player_ids
-    ).values('match_event__player_id').annotate(
-        matches_played=Count('match_event__match', distinct=True),
-        base_points=Sum('match_event__total_points_all'),
-        boost_points=Sum('boost_points')
-    )
-    
-    # Update stats for players that have events
-    for stat in squad_stats:
-        player_id = stat['match_event__player_id']
-        if player_id in squad_stats_dict:  # safeguard
-            squad_stats_dict[player_id].update({
-                'matches_played': stat['matches_played'],
-                'base_points': float(stat['base_points']) if stat['base_points'] else 0,
-                'boost_points': float(stat['boost_points']) if stat['boost_points'] else 0
-            })
 
-    # Season-total stats regardless of which fantasy squad the player belonged to.
-    # Base/matches come from real match events; boost points are league-wide fantasy boosts.
-    total_stats_dict = {
-        player_id: {
+    def empty_stats(player_id):
+        return {'player_id': player_id, 'matches_played': 0, 'base_points': 0, 'boost_points': 0}
+
+    # Squad-scoped totals are materialized per (squad, player); players who
+    # ever scored for this squad have a row, current players are added with zeros.
+    squad_rows = SquadPlayerAggregate.objects.filter(fantasy_squad_id=squad_id).values_list(
+        'player_id', 'matches', 'base_points', 'boost_points'
+    )
+    squad_stats_dict = {}
+    for player_id, matches, base_points, boost_points in squad_rows:
+        squad_stats_dict[player_id] = {
             'player_id': player_id,
-            'matches_played': 0,
-            'base_points': 0,
-            'boost_points': 0
+            'matches_played': matches,
+            'base_points': float(base_points),
+            'boost_points': float(boost_points),
         }
-        for player_id in all_player_ids
-    }
-
-    season = squad.league.season
-    if season and all_player_ids:
-        total_base_stats = PlayerMatchEvent.objects.filter(
-            player_id__in=all_player_ids,
-            match__season=season,
-        ).values('player_id').annotate(
-            matches_played=Count('match', distinct=True),
-            base_points=Sum('total_points_all'),
-        )
+    for player_id in squad.current_squad or []:
+        squad_stats_dict.setdefault(player_id, empty_stats(player_id))
+    all_player_ids = list(squad_stats_dict)
 
-        for stat in total_base_stats:
-            player_id = stat['player_id']
-            if player_id in total_stats_dict:
-                total_stats_dict[player_id]['matches_played'] = stat['matches_played'] or 0
-                total_stats_dict[player_id]['base_points'] = float(stat['base_points']) if stat['base_points'] else 0
-
-        total_boost_stats = FantasyPlayerEvent.objects.filter(
-            fantasy_squad__league=squad.league,
-            match_event__match__season=season,
-            match_event__player_id__in=all_player_ids,
-        ).values('match_event__player_id').annotate(
-            boost_points=Sum('boost_points')
-        )
-
-        for stat in total_boost_stats:
-            player_id = stat['match_event__player_id']
-            if player_id in total_stats_dict:
-                total_stats_dict[player_id]['boost_points'] = float(stat['boost_points']) if stat['boost_points'] else 0
+    # Season-total stats regardless of which fantasy squad the player belonged to.
+    # Base/matches come from the player-season aggregate; boost points are league-wide fantasy boosts.
+    total_stats_dict = {player_id: empty_stats(player_id) for player_id in all_player_ids}
+
+    season_id = squad.league.season_id
+    if season_id and all_player_ids:
+        season_rows = PlayerSeasonAggregate.objects.filter(
+            season_id=season_id, player_id__in=all_player_ids,
+        ).values_list('player_id', 'matches', 'total_points')
+        for player_id, matches, base_points in season_rows:
+            total_stats_dict[player_id]['matches_played'] = matches
+            total_stats_dict[player_id]['base_points'] = float(base_points)
+
+        league_rows = LeaguePlayerAggregate.objects.filter(
+            league_id=squad.league_id, player_id__in=all_player_ids,
+        ).values_list('player_id', 'boost_points')
+        for player_id, boost_points in league_rows:
+            total_stats_dict[player_id]['boost_points'] = float(boost_points)
 
     return Response({
         'squad_stats': squad_stats_dict,
@@ -2348,6 +2300,8 @@ def process_trade(trade):
         update_core_squad_after_trade(receiver, trade.players_received, trade.players_given)
     
     # Save changes
+    initiator._membership_source = SquadMembership.Source.TRADE
+    receiver._membership_source = SquadMembership.Source.TRADE
     initiator.save()
     receiver.save()
     
@@ -2385,6 +2339,7 @@ def update_match_points(request):
     
     match_id = request.data.get('match_id')
     update_all = request.data.get('update_all', False)
+    force = request.data.get('force', False)
     print(f"Updating match points: {match_id} | {update_all}")
     
     if match_id:
@@ -2397,7 +2352,7 @@ def update_match_points(request):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        result = service.update_match_points(match_id)
+        result = service.update_match_points(match_id, force=bool(force))
         
         if 'error' in result:
             logger.error(f"Error updating match {match_id}: {result['error']}")
@@ -2610,6 +2565,7 @@ def season_recent_matches(request, season_id):
     
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@condition(etag_func=match_standings_etag, last_modified_func=match_standings_last_modified)
 def match_standings(request, match_id):
     """
     Get match standings for all fantasy squads in a specific match.
@@ -3120,12 +3076,9 @@ def match_preview(request, match_id):
     players = Player.objects.filter(id__in=player_ids)
 
     # For each player, get matches played and base points this season
-    player_stats = PlayerMatchEvent.objects.filter(
-        player_id__in=player_ids, match__season=season
-    ).values('player_id').annotate(
-        matches=Count('id'),
-        base_points=Sum('total_points_all')
-    )
+    player_stats = PlayerSeasonAggregate.objects.filter(
+        player_id__in=player_ids, season=season
+    ).values('player_id', 'matches', base_points=F('total_points'))
     stats_map = {s['player_id']: s for s in player_stats}
 
     data = []
@@ -3203,21 +3156,18 @@ def league_match_preview(request, league_id, match_id):
     # Map player_id to fantasy squad name and color (if assigned in this league)
     squad_map = {}
     squad_color_map = {}
-    for squad in FantasySquad.objects.filter(league=league):
-        for pid in squad.current_squad or []:
-            squad_map[pid] = squad.name
-            squad_color_map[pid] = squad.color
+    owners = SquadMembership.objects.filter(
+        league=league, player_id__in=player_ids, left_at__isnull=True
+    ).values_list('player_id', 'fantasy_squad__name', 'fantasy_squad__color')
+    for pid, squad_name, squad_color in owners:
+        squad_map[pid] = squad_name
+        squad_color_map[pid] = squad_color
 
     # For each player, get matches played and base points this season (in league context)
-    player_stats = FantasyPlayerEvent.objects.filter(
-        match_event__player_id__in=player_ids,
-        fantasy_squad__league=league,
-        match_event__match__season=season
-    ).values('match_event__player_id').annotate(
-        matches=Count('id'),
-        base_points=Sum('match_event__total_points_all')
-    )
-    stats_map = {s['match_event__player_id']: s for s in player_stats}
+    player_stats = LeaguePlayerAggregate.objects.filter(
+        league=league, player_id__in=player_ids
+    ).values('player_id', 'matches', 'base_points') if league.season_id == season.id else []
+    stats_map = {s['player_id']: s for s in player_stats}
 
     data = []
     for player in players:
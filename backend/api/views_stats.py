@@ -1,10 +1,11 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.core.cache import cache
 from django.db.models import Sum, Count, Q
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from functools import wraps
+import hashlib
 
 from .models import (
     FantasyLeague,
@@ -23,17 +24,48 @@ from .services.stats_service import (
     calculate_season_mvp_for_matches,
     calculate_season_total_actives_for_matches,
 )
+from .conditional import league_stats_etag, league_stats_last_modified
+from .services.cache_invalidation import (
+    VERSIONED_CACHE_TIMEOUT,
+    league_stats_key_prefix,
+    league_stats_stale_key_prefix,
+)
+from .services.data_versions import league_token
+from .services.response_cache import SingleFlightFill
 
 def cache_page_with_bypass(timeout):
     """
-    Decorator: Cache unless request has X-Bypass-Cache header set to '1'
+    Decorator: Cache the response data unless request has X-Bypass-Cache header set to '1'.
+    Keys embed the league's data version, so entries are replaced as soon as the
+    league or its season changes rather than when the timeout runs out. Rebuilds
+    are single-flight: other workers serve the previous payload meanwhile.
     """
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             if request.headers.get('X-Bypass-Cache') == '1':
                 return view_func(request, *args, **kwargs)
-            return cache_page(timeout)(view_func)(request, *args, **kwargs)
+            league_id = kwargs.get('league_id')
+            path_hash = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+            suffix = f"{view_func.__name__}_{path_hash}"
+            fill = SingleFlightFill(
+                "league_stats",
+                f"{league_stats_key_prefix(league_id, league_token(league_id))}_{suffix}",
+                f"{league_stats_stale_key_prefix(league_id)}_{suffix}",
+            )
+            cached_data = fill.get()
+            if cached_data is not None:
+                return Response(cached_data, headers=fill.headers)
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                fill.release()
+                raise
+            if response.status_code == 200:
+                fill.set(response.data, timeout)
+            else:
+                fill.release()
+            return response
         return _wrapped_view
     return decorator
 
@@ -171,7 +203,8 @@ def _build_running_total_fallback(league, squad_ids=None, phase_key="overall"):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)  # Keep fresh during active seasons
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_running_total(request, league_id):
     """
     Get running total data for league (from FantasyStats, by phase if requested)
@@ -237,7 +270,8 @@ def league_stats_running_total(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_domination(request, league_id):
     """
     Get domination data from FantasyStats (by phase if requested)
@@ -277,7 +311,8 @@ def league_stats_domination(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_match_mvp(request, league_id):
     """
     Get match MVP data from FantasyStats (by phase if requested)
@@ -321,7 +356,8 @@ def league_stats_match_mvp(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_season_mvp(request, league_id):
     """
     Get season MVP data from FantasyStats (by phase if requested)
@@ -365,7 +401,8 @@ def league_stats_season_mvp(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_most_points_in_match(request, league_id):
     """
     Get most points in a match data from FantasyStats (by phase if requested)
@@ -408,7 +445,8 @@ def league_stats_most_points_in_match(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_most_players_in_match(request, league_id):
     """
     Get most players active in a match data from FantasyStats (by phase if requested)
@@ -448,7 +486,8 @@ def league_stats_most_players_in_match(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_rank_breakdown(request, league_id):
     """
     Get rank breakdown data from FantasyStats (by phase if requested)
@@ -512,7 +551,8 @@ def league_stats_rank_breakdown(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 5)  # Cache for 5 minutes only
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_table_stats(request, league_id):
     """
     Get live league table stats - calculates everything on-the-fly
@@ -619,7 +659,8 @@ def league_table_stats(request, league_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@cache_page_with_bypass(60 * 10)
+@condition(etag_func=league_stats_etag, last_modified_func=league_stats_last_modified)
+@cache_page_with_bypass(VERSIONED_CACHE_TIMEOUT)
 def league_stats_season_total_actives(request, league_id):
     """
     Get season total actives data from FantasyStats (by phase if requested)
@@ -232,16 +232,58 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Cricket API Key
 CRICDATA_API_KEY = os.environ.get('CRICDATA_API_KEY', '33014fc4-be55-4ece-85fc-b5bd46dd6a63')
+CRICDATA_BASE_URL = os.environ.get('CRICDATA_BASE_URL', 'https://api.cricapi.com/v1')
+# Scorecard fetching: parallel requests, (connect, read) timeout in seconds and
+# minimum spacing between request starts.
+CRICDATA_MAX_CONCURRENT_REQUESTS = int(os.environ.get('CRICDATA_MAX_CONCURRENT_REQUESTS', '4'))
+CRICDATA_REQUEST_TIMEOUT = (
+    float(os.environ.get('CRICDATA_CONNECT_TIMEOUT', '5')),
+    float(os.environ.get('CRICDATA_READ_TIMEOUT', '20')),
+)
+CRICDATA_MIN_REQUEST_INTERVAL = float(os.environ.get('CRICDATA_MIN_REQUEST_INTERVAL', '0'))
+
+# Queued stats jobs are processed by `manage.py run_stats_jobs` (Procfile
+# worker; start.sh runs one next to gunicorn). Local development without a
+# worker can opt in to running them in the committing process instead.
+STATS_JOBS_INLINE = os.environ.get('STATS_JOBS_INLINE', 'False') == 'True'
 
 # Cache configuration
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'player-events-cache',
-        'TIMEOUT': 3600,  # 1 hour default
-        'OPTIONS': {
-            'MAX_ENTRIES': 5000,
-            'CULL_FREQUENCY': 3,
+# Responses are shared between gunicorn workers (and the stats worker) so that
+# api.services.cache_invalidation can clear them after writes. REDIS_URL selects
+# Redis; otherwise CACHE_DIR selects a filesystem cache shared by every process
+# on the host. Without either, each process keeps its own in-memory cache.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_DIR = os.environ.get('CACHE_DIR')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 3600,  # 1 hour default
+            'KEY_PREFIX': 'pitchperfect',
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'TIMEOUT': 3600,  # 1 hour default
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000,
+                'CULL_FREQUENCY': 3,
+            }
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'player-events-cache',
+            'TIMEOUT': 3600,  # 1 hour default
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000,
+                'CULL_FREQUENCY': 3,
+            }
         }
     }
-}
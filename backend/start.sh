@@ -23,6 +23,20 @@ python manage.py collectstatic --noinput --clear
 echo "Applying database migrations..."
 python manage.py migrate --noinput
 
+# Railway runs this script as the only process, so the stats job worker is
+# started here next to gunicorn and restarted if it exits. Procfile platforms
+# run it as a separate worker process and set STATS_WORKER_IN_WEB=False.
+if [ "${STATS_WORKER_IN_WEB:-True}" = "True" ]; then
+    echo "Starting stats job worker..."
+    (
+        while true; do
+            python manage.py run_stats_jobs
+            echo "Stats job worker exited with status $?, restarting in 5s..."
+            sleep 5
+        done
+    ) &
+fi
+
 # Start Gunicorn server
 echo "Starting Gunicorn server on port $PORT..."
 exec gunicorn --bind 0.0.0.0:$PORT backend.wsgi:application
\ No newline at end of file